@@ -8,7 +8,9 @@ from .algorithms import (
     dijkstra_algorithm, 
     bfs_algorithm, 
     dfs_algorithm, 
-    bellman_ford_algorithm)     
+    bellman_ford_algorithm,
+    bellman_ford_result,
+    k_shortest_paths_algorithm)     
 
 __all__ = [
     "prim_algorithm",
@@ -17,4 +19,6 @@ __all__ = [
     "bfs_algorithm",
     "dfs_algorithm",
     "bellman_ford_algorithm",
+    "bellman_ford_result",
+    "k_shortest_paths_algorithm",
 ]
\ No newline at end of file
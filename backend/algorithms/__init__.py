@@ -3,18 +3,52 @@ Module chứa các thuật toán đồ thị
 """
 
 # Import thuật toán Prim
-from .prim import prim_algorithm
+from .prim import prim_algorithm, prim_result
 from .kruskal import kruskal_algorithm
-from .dijkstra import dijkstra_algorithm
+from .boruvka import boruvka_algorithm, boruvka_result
+from .dijkstra import dijkstra_algorithm, dijkstra_result
 from .bfs import bfs_algorithm
-from .dfs import dfs_algorithm
-from .bellman_ford import bellman_ford_algorithm
+from .dfs import dfs_algorithm, dfs_result
+from .scc import scc_algorithm, scc_result
+from .topological_sort import topological_sort_algorithm, topological_sort_result
+from .bridges import bridges_algorithm, bridges_result
+from .bellman_ford import bellman_ford_algorithm, bellman_ford_result
+from .graph_arrays import GraphArrays, as_graph_arrays
+from .profiling import check_profile, graph_profile
+from .landmarks import get_landmark_index, preprocess_landmarks
+from .shared_graph import fan_out
+from .k_shortest import k_shortest_paths_algorithm, k_shortest_paths_result
+from .layout import force_layout, iter_layout, layout_nodes
 
 __all__ = [
     "prim_algorithm",
+    "prim_result",
     "kruskal_algorithm",
+    "boruvka_algorithm",
+    "boruvka_result",
     "dijkstra_algorithm",
+    "dijkstra_result",
     "bfs_algorithm",
     "dfs_algorithm",
+    "dfs_result",
+    "scc_algorithm",
+    "scc_result",
+    "topological_sort_algorithm",
+    "topological_sort_result",
+    "bridges_algorithm",
+    "bridges_result",
     "bellman_ford_algorithm",
+    "bellman_ford_result",
+    "GraphArrays",
+    "as_graph_arrays",
+    "check_profile",
+    "graph_profile",
+    "get_landmark_index",
+    "preprocess_landmarks",
+    "fan_out",
+    "k_shortest_paths_algorithm",
+    "k_shortest_paths_result",
+    "force_layout",
+    "iter_layout",
+    "layout_nodes",
 ]
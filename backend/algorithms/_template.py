@@ -7,7 +7,7 @@ Hướng dẫn:
 2. Đổi tên function từ template_algorithm thành <ten_thuat_toan>_algorithm
 3. Implement logic thuật toán của bạn
 4. Thêm vào backend/algorithms/__init__.py
-5. Thêm vào backend/app.py
+5. Thêm vào backend/service.py (ALGORITHM_FUNCTIONS, ALGORITHM_INFOS)
 """
 
 
@@ -21,6 +21,8 @@ def template_algorithm(graph_data, **kwargs):
             - edges: List các dict với keys: id, source, target, weight, isDirected
             - isDirected: Boolean - đồ thị có hướng hay không
         **kwargs: Các tham số tùy chọn khác (ví dụ: start_node, end_node, etc.)
+            - meta: dict do service truyền vào; thuật toán có thể ghi số liệu
+              (ví dụ meta['queue']) để trả về trong trường "meta" của response
         
     Returns:
         List các StepState dict để visualization. Mỗi step có format:
@@ -2,6 +2,18 @@
 bellman_ford.py - Thuật toán tìm đường đi ngắn nhất (Hỗ trợ trọng số âm)
 """
 
+import numpy as np
+
+from .budget import get_budget, suspend
+from .counters import get_counters
+from .dijkstra import dijkstra_csr
+from .graph_arrays import as_graph_arrays
+from .path_trees import export_tree
+from .priority_queue import weight_stats
+
+# Engine của mode "chỉ kết quả": 'dijkstra' chỉ dùng được khi mọi trọng số không âm
+RESULT_ENGINES = ('bellman_ford', 'dijkstra')
+
 def bellman_ford_algorithm(graph_data, **kwargs):
     """
     Thuật toán Bellman-Ford:
@@ -14,6 +26,11 @@ def bellman_ford_algorithm(graph_data, **kwargs):
         **kwargs: 
             - 'source': ID nút nguồn (Bắt buộc).
             - 'target': ID nút đích (Tùy chọn).
+            - 'max_steps' / 'max_ms' / 'max_ops', 'resume': ngân sách (mỗi cạnh xét là
+              một thao tác) và chạy tiếp (xem budget.py).
+            - 'counters': bộ đếm thao tác (xem counters.py) - rounds, edgeChecks, relaxations.
+            - 'meta': không có target và không có chu trình âm thì cây đường đi ngắn nhất
+              được ghi vào meta['path_tree'] (xem path_trees.py).
     """
     
     # ========== BƯỚC 1: CHUẨN HÓA DỮ LIỆU ==========
@@ -66,13 +83,24 @@ def bellman_ford_algorithm(graph_data, **kwargs):
                 labels[n] = str(int(d)) if d == int(d) else str(round(d, 2))
         return labels
 
-    # Step khởi tạo visualization
-    steps.append({
-        'highlightNodes': {source: '#10b981'}, # Source màu xanh lá
-        'highlightEdges': {},
-        'nodeLabels': get_labels(),
-        'description': f'Khởi tạo: Đặt khoảng cách tại {source} = 0, các nút khác = ∞.'
-    })
+    budget = get_budget(kwargs)
+    counters = get_counters(kwargs)
+    resume = kwargs.get('resume')
+    start_round, start_edge, changed = 0, 0, False
+
+    if resume is None:
+        # Step khởi tạo visualization
+        steps.append({
+            'highlightNodes': {source: '#10b981'}, # Source màu xanh lá
+            'highlightEdges': {},
+            'nodeLabels': get_labels(),
+            'msg': 'bellman_ford.init',
+            'args': {'source': source}
+        })
+    else:
+        distances.update(resume['distances'])
+        predecessors.update(resume['predecessors'])
+        start_round, start_edge, changed = resume['round'], resume['edge'], resume['changed']
 
     # ========== BƯỚC 3: XỬ LÝ DANH SÁCH CẠNH ==========
     # Chuyển đổi cạnh vô hướng thành 2 cạnh có hướng
@@ -98,19 +126,34 @@ def bellman_ford_algorithm(graph_data, **kwargs):
     # Lặp |V| - 1 lần
     num_nodes = len(nodes)
     
-    for i in range(num_nodes - 1):
-        changed = False # Cờ tối ưu: Nếu vòng này không đổi gì thì dừng sớm
-        
-        # Step báo hiệu vòng lặp
-        steps.append({
-            'highlightNodes': {},
-            'highlightEdges': {},
-            'nodeLabels': get_labels(),
-            'description': f'Vòng lặp thứ {i + 1} / {num_nodes - 1}'
-        })
+    for i in range(start_round, num_nodes - 1):
+        # Vòng đang dở khi chạy tiếp: giữ cờ changed và không báo lại vòng lặp
+        if i > start_round or resume is None:
+            changed = False # Cờ tối ưu: Nếu vòng này không đổi gì thì dừng sớm
+            if counters is not None:
+                counters.add('rounds')
+
+            # Step báo hiệu vòng lặp
+            steps.append({
+                'highlightNodes': {},
+                'highlightEdges': {},
+                'nodeLabels': get_labels(),
+                'msg': 'bellman_ford.round',
+                'args': {'i': i + 1, 'total': num_nodes - 1}
+            })
         
-        for edge in edges:
+        for j in range(start_edge if i == start_round else 0, len(edges)):
+            if budget is not None and budget.exhausted(steps):
+                return suspend(steps, kwargs, budget, {
+                    'distances': [(n, d) for n, d in distances.items() if d != float('inf')],
+                    'predecessors': [(n, p) for n, p in predecessors.items() if p is not None],
+                    'round': i, 'edge': j, 'changed': changed,
+                })
+
+            edge = edges[j]
             u, v, w, eid = edge['u'], edge['v'], edge['w'], edge['id']
+            if counters is not None:
+                counters.add('edgeChecks')
             
             # Chỉ xét nếu u đã đến được (distance != inf)
             if distances[u] == float('inf'):
@@ -128,13 +171,17 @@ def bellman_ford_algorithm(graph_data, **kwargs):
                 distances[v] = new_dist
                 predecessors[v] = u
                 changed = True
+                if counters is not None:
+                    counters.add('relaxations')
                 
                 # Step: Cập nhật thành công
                 steps.append({
                     'highlightNodes': {u: '#3b82f6', v: '#10b981'}, # u: xanh dương (nguồn), v: xanh lá (được update)
                     'highlightEdges': {eid: '#10b981'},
                     'nodeLabels': get_labels(),
-                    'description': f'Cập nhật {v}: {old_dist if old_dist != float("inf") else "∞"} → {new_dist} (qua {u}, trọng số {w})'
+                    'msg': 'bellman_ford.update',
+                    'args': {'v': v, 'old': old_dist if old_dist != float('inf') else None,
+                             'new': new_dist, 'u': u, 'w': w}
                 })
         
         # Nếu không có gì thay đổi trong cả vòng lặp -> Dừng sớm (đã tối ưu xong)
@@ -143,7 +190,7 @@ def bellman_ford_algorithm(graph_data, **kwargs):
                 'highlightNodes': {},
                 'highlightEdges': {},
                 'nodeLabels': get_labels(),
-                'description': 'Không có khoảng cách nào thay đổi. Thuật toán hội tụ sớm.'
+                'msg': 'bellman_ford.converged'
             })
             break
 
@@ -161,7 +208,8 @@ def bellman_ford_algorithm(graph_data, **kwargs):
                 'highlightNodes': {u: '#ef4444', v: '#ef4444'}, # ĐỎ RỰC báo lỗi
                 'highlightEdges': {eid: '#ef4444'},
                 'nodeLabels': get_labels(),
-                'description': f'LỖI: Phát hiện CHU TRÌNH ÂM tại cạnh ({u} -> {v}). Không thể tìm đường đi ngắn nhất!'
+                'msg': 'bellman_ford.negative_cycle',
+                'args': {'u': u, 'v': v}
             })
             break # Dừng ngay khi phát hiện
 
@@ -190,7 +238,8 @@ def bellman_ford_algorithm(graph_data, **kwargs):
                 'highlightNodes': {n: '#10b981' for n in path_nodes}, # Tô xanh toàn bộ đường đi
                 'highlightEdges': {e: '#10b981' for e in path_edges},
                 'nodeLabels': get_labels(),
-                'description': f'Hoàn thành! Đường đi ngắn nhất từ {source} đến {target} là {distances[target]}.'
+                'msg': 'bellman_ford.done_target',
+                'args': {'source': source, 'target': target, 'd': distances[target]}
             })
             
         elif target and distances[target] == float('inf'):
@@ -198,7 +247,8 @@ def bellman_ford_algorithm(graph_data, **kwargs):
                 'highlightNodes': {source: '#10b981', target: '#ef4444'},
                 'highlightEdges': {},
                 'nodeLabels': get_labels(),
-                'description': f'Không có đường đi từ {source} đến {target}.'
+                'msg': 'bellman_ford.unreachable',
+                'args': {'source': source, 'target': target}
             })
             
         else:
@@ -208,7 +258,218 @@ def bellman_ford_algorithm(graph_data, **kwargs):
                 'highlightNodes': reached_nodes,
                 'highlightEdges': {},
                 'nodeLabels': get_labels(),
-                'description': f'Hoàn thành! Đã tính toán khoảng cách ngắn nhất từ {source} đến mọi đỉnh.'
+                'msg': 'bellman_ford.done_all',
+                'args': {'source': source}
             })
+            export_tree(kwargs.get('meta'), source, distances, predecessors)
+
+    return steps
+
+
+def _relax_round(dist, u, v, w, starts, heads):
+    """
+    Một vòng thư giãn vectorized trên các cung đã sắp xếp theo đỉnh đích:
+    gather dist[u] + w, lấy min theo từng nhóm đỉnh đích (scatter-min).
+
+    Returns:
+        Tuple (new_dist, cand) với cand là độ dài ứng viên của từng cung.
+    """
+    cand = dist[u] + w
+    best = np.minimum.reduceat(cand, starts)
+    new_dist = dist.copy()
+    new_dist[heads] = np.minimum(dist[heads], best)
+    return new_dist, cand
+
+
+def _count_round(counters, arcs, improved):
+    """Số đếm của một vòng vectorized: mọi cung được xét, mỗi đỉnh cải thiện là một relaxation."""
+    counters.add('rounds')
+    counters.add('edgeChecks', arcs)
+    counters.add('relaxations', int(np.count_nonzero(improved)))
 
-    return steps
\ No newline at end of file
+
+def bellman_ford_result(graph_data, **kwargs):
+    """
+    Bellman-Ford chế độ "chỉ kết quả" (không sinh step), vectorized bằng NumPy.
+    Dùng cho đồ thị lớn (hàng trăm nghìn cạnh) khi không cần visualization.
+
+    Args:
+        graph_data: Dict chứa nodes, edges, isDirected (hoặc GraphArrays).
+        **kwargs:
+            - 'source': ID nút nguồn (bắt buộc, hoặc 'start_node').
+            - 'target': ID nút đích (Tùy chọn).
+            - 'engine': 'bellman_ford' (mặc định) hoặc 'dijkstra' (trọng số không âm;
+              cùng khoảng cách, không có 'rounds').
+            - 'counters': bộ đếm thao tác (xem counters.py). Mỗi vòng vectorized (kể cả
+              vòng kiểm tra chu trình âm) tính là một round với edgeChecks = số cung;
+              relaxations là số đỉnh được cải thiện trong vòng (không phải số cung).
+            - 'meta': không có target và không có chu trình âm thì cây đường đi ngắn nhất
+              được ghi vào meta['path_tree'] (xem path_trees.py).
+
+    Returns:
+        Dict kết quả: engine, distances, predecessors, path/pathEdges (nếu có target),
+        hasNegativeCycle, negativeCycle, rounds.
+
+    Raises:
+        ValueError: nút nguồn / đích không tồn tại, hoặc engine không hợp lệ
+    """
+    graph = as_graph_arrays(graph_data)
+    n = graph.num_nodes
+    if n == 0:
+        return {'distances': {}, 'predecessors': {}, 'hasNegativeCycle': False, 'rounds': 0}
+
+    # Id sai báo lỗi như dijkstra_result (không lặng lẽ chạy từ / tới nút khác)
+    source = kwargs.get('source')
+    if source is None:
+        source = kwargs.get('start_node')
+    if graph.resolve_node(source) is None:
+        raise ValueError(f"Nút nguồn '{source}' không tồn tại trong đồ thị.")
+    source = str(source)
+
+    target = kwargs.get('target')
+    if target not in (None, '') and graph.resolve_node(target) is None:
+        raise ValueError(f"Nút đích '{target}' không tồn tại trong đồ thị.")
+    target = str(target) if target not in (None, '') else None
+
+    engine = kwargs.get('engine') or 'bellman_ford'
+    if engine not in RESULT_ENGINES:
+        raise ValueError(f'engine "{engine}" không hợp lệ. Hỗ trợ: {", ".join(RESULT_ENGINES)}.')
+    if engine == 'dijkstra':
+        return _dijkstra_result(graph, source, target, get_counters(kwargs), kwargs.get('meta'))
+
+    # Sắp xếp cung theo đỉnh đích một lần để dùng reduceat ở mọi vòng
+    u, v, w, eidx = graph.arcs()
+    order = np.argsort(v, kind='stable')
+    u, v, w, eidx = u[order], v[order], w[order], eidx[order]
+    if len(v):
+        starts = np.flatnonzero(np.r_[True, v[1:] != v[:-1]])
+    else:
+        starts = np.zeros(0, dtype=np.int64)
+    heads = v[starts]
+
+    dist = np.full(n, np.inf)
+    dist[graph.index[source]] = 0.0
+    # pred_arc[x]: chỉ số cung (sau sắp xếp) đã cập nhật dist[x] gần nhất
+    pred_arc = np.full(n, -1, dtype=np.int64)
+
+    counters = get_counters(kwargs)
+    rounds = 0
+    converged = len(v) == 0
+    for _ in range(n - 1):
+        if converged:
+            break
+        new_dist, cand = _relax_round(dist, u, v, w, starts, heads)
+        improved = new_dist < dist
+        rounds += 1
+        if counters is not None:
+            _count_round(counters, len(v), improved)
+        if not improved.any():
+            converged = True
+            break
+        hit = np.flatnonzero(improved[v] & (cand == new_dist[v]))
+        pred_arc[v[hit]] = hit
+        dist = new_dist
+
+    # Kiểm tra chu trình âm: thêm một vòng, nếu còn giảm được thì có chu trình âm
+    negative_cycle = []
+    if not converged:
+        new_dist, cand = _relax_round(dist, u, v, w, starts, heads)
+        improved = new_dist < dist
+        if counters is not None:
+            _count_round(counters, len(v), improved)
+        if improved.any():
+            hit = np.flatnonzero(improved[v] & (cand == new_dist[v]))
+            pred_arc[v[hit]] = hit
+            # Lùi n bước theo predecessor để chắc chắn đứng trong chu trình
+            x = int(v[hit[0]])
+            for _ in range(n):
+                x = int(u[pred_arc[x]])
+            cycle = [x]
+            y = int(u[pred_arc[x]])
+            while y != x:
+                cycle.append(y)
+                y = int(u[pred_arc[y]])
+            cycle.reverse()
+            negative_cycle = [graph.node_ids[i] for i in cycle]
+
+    ids = graph.node_ids
+    result = {
+        'source': source,
+        'target': target,
+        'engine': 'bellman_ford',
+        'rounds': rounds,
+        'hasNegativeCycle': bool(negative_cycle),
+        'negativeCycle': negative_cycle,
+    }
+    if negative_cycle:
+        return result
+
+    pred_nodes = np.full(n, -1, dtype=np.int64)
+    has_pred = pred_arc >= 0
+    pred_nodes[has_pred] = u[pred_arc[has_pred]]
+    result['distances'] = {
+        ids[i]: (float(d) if d != np.inf else None) for i, d in enumerate(dist.tolist())
+    }
+    result['predecessors'] = {
+        ids[i]: (ids[p] if p >= 0 else None) for i, p in enumerate(pred_nodes.tolist())
+    }
+    if target is None:
+        pred_edges = np.full(n, -1, dtype=np.int64)
+        pred_edges[has_pred] = eidx[pred_arc[has_pred]]
+        export_tree(kwargs.get('meta'), source, dist, pred_nodes, pred_edges)
+
+    if target is not None:
+        t = graph.index[target]
+        if dist[t] == np.inf:
+            result['path'] = []
+            result['pathEdges'] = []
+            result['distance'] = None
+        else:
+            path, path_edges = [t], []
+            while pred_arc[path[-1]] >= 0:
+                a = pred_arc[path[-1]]
+                path_edges.append(graph.edge_ids[eidx[a]])
+                path.append(int(u[a]))
+            path.reverse()
+            path_edges.reverse()
+            result['path'] = [ids[i] for i in path]
+            result['pathEdges'] = path_edges
+            result['distance'] = float(dist[t])
+
+    return result
+
+
+def _dijkstra_result(graph, source, target, counters=None, meta=None):
+    """Kết quả cùng định dạng bellman_ford_result() nhưng tính bằng Dijkstra (trọng số không âm)."""
+    stats = weight_stats(graph.weight)
+    if stats[0] < 0:
+        raise ValueError('engine "dijkstra" yêu cầu mọi trọng số không âm.')
+    ids = graph.node_ids
+    dist, pred, pred_edge, _ = dijkstra_csr(
+        graph.csr_lists(), graph.index[source], queue='auto', stats=stats, counters=counters,
+    )
+
+    result = {
+        'source': source,
+        'target': target,
+        'engine': 'dijkstra',
+        'hasNegativeCycle': False,
+        'negativeCycle': [],
+        'distances': {ids[i]: (d if d != np.inf else None) for i, d in enumerate(dist)},
+        'predecessors': {ids[i]: (ids[p] if p >= 0 else None) for i, p in enumerate(pred)},
+    }
+    if target is None:
+        export_tree(meta, source, dist, pred, pred_edge)
+    else:
+        t = graph.index[target]
+        if dist[t] == np.inf:
+            result.update({'path': [], 'pathEdges': [], 'distance': None})
+        else:
+            path, path_edges = [t], []
+            while pred[path[-1]] >= 0:
+                path_edges.append(graph.edge_ids[pred_edge[path[-1]]])
+                path.append(pred[path[-1]])
+            path.reverse()
+            path_edges.reverse()
+            result.update({'path': [ids[i] for i in path], 'pathEdges': path_edges, 'distance': dist[t]})
+    return result
@@ -2,6 +2,10 @@
 bfs.py - Thuật toán Tìm kiếm theo chiều rộng (Breadth-First Search)
 """
 
+from .budget import get_budget, suspend
+from .counters import get_counters
+
+
 def bfs_algorithm(graph_data, **kwargs):
     # ========== BƯỚC 1: Parse dữ liệu ==========
     # FIX: Ép kiểu ID về string để tránh lỗi so sánh int vs string
@@ -42,19 +46,34 @@ def bfs_algorithm(graph_data, **kwargs):
         adj[u].sort(key=lambda x: x['neighbor'])
 
     # ========== BƯỚC 3: Khởi tạo BFS ==========
-    queue = [start_node]
-    visited = {start_node}
-    processed = set()
-    
-    steps.append({
-        'highlightNodes': {start_node: '#f59e0b'},
-        'highlightEdges': {},
-        'description': f'Bắt đầu BFS từ nút {start_node}.'
-    })
+    # Ngân sách max_steps / max_ms / max_ops; 'resume' để chạy tiếp (xem budget.py)
+    budget = get_budget(kwargs)
+    # Bộ đếm thao tác (counters.py): enqueues, dequeues, edgeChecks
+    counters = get_counters(kwargs)
+    resume = kwargs.get('resume')
+    if resume is None:
+        queue = [start_node]
+        if counters is not None:
+            counters.add('enqueues')
+        visited = {start_node}
+        processed = set()
+
+        steps.append({
+            'highlightNodes': {start_node: '#f59e0b'},
+            'highlightEdges': {},
+            'msg': 'bfs.start',
+            'args': {'start': start_node}
+        })
+    else:
+        queue = resume['queue']
+        visited = set(resume['visited'])
+        processed = set(resume['processed'])
 
     # ========== BƯỚC 4: Vòng lặp chính ==========
     while queue:
         u = queue.pop(0)
+        if counters is not None:
+            counters.add('dequeues')
         
         steps.append({
             'highlightNodes': {
@@ -63,7 +82,8 @@ def bfs_algorithm(graph_data, **kwargs):
                 u: '#3b82f6'
             },
             'highlightEdges': {},
-            'description': f'Duyệt nút {u}.'
+            'msg': 'bfs.visit',
+            'args': {'u': u}
         })
         
         for item in adj[u]:
@@ -73,6 +93,8 @@ def bfs_algorithm(graph_data, **kwargs):
             # Chỉ xét v nếu v thực sự tồn tại trong nodes (đề phòng edge rác)
             if v not in nodes: 
                 continue
+            if counters is not None:
+                counters.add('edgeChecks')
 
             steps.append({
                 'highlightNodes': {
@@ -82,12 +104,15 @@ def bfs_algorithm(graph_data, **kwargs):
                     v: '#f59e0b' if v in visited else '#ef4444'
                 },
                 'highlightEdges': {edge_id: '#f59e0b'},
-                'description': f'Kiểm tra hàng xóm {v}.'
+                'msg': 'bfs.check',
+                'args': {'v': v}
             })
             
             if v not in visited:
                 visited.add(v)
                 queue.append(v)
+                if counters is not None:
+                    counters.add('enqueues')
                 
                 steps.append({
                     'highlightNodes': {
@@ -96,7 +121,8 @@ def bfs_algorithm(graph_data, **kwargs):
                         u: '#3b82f6'
                     },
                     'highlightEdges': {edge_id: '#10b981'},
-                    'description': f'Thêm {v} vào hàng đợi.'
+                    'msg': 'bfs.enqueue',
+                    'args': {'v': v}
                 })
         
         processed.add(u)
@@ -106,14 +132,20 @@ def bfs_algorithm(graph_data, **kwargs):
                 **{n: '#f59e0b' for n in queue}
             },
             'highlightEdges': {},
-            'description': f'Hoàn tất {u}.'
+            'msg': 'bfs.finish',
+            'args': {'u': u}
         })
 
+        if budget is not None and queue and budget.exhausted(steps):
+            return suspend(steps, kwargs, budget, {
+                'queue': queue, 'visited': list(visited), 'processed': list(processed),
+            })
+
     # ========== BƯỚC 5: Kết thúc ==========
     steps.append({
         'highlightNodes': {n: '#10b981' for n in processed},
         'highlightEdges': {},
-        'description': 'Hoàn thành BFS.'
+        'msg': 'bfs.done'
     })
     
     return steps
\ No newline at end of file
@@ -0,0 +1,318 @@
+"""
+Thuật toán Borůvka - Cây (rừng) khung nhỏ nhất theo từng vòng, vector hóa bằng NumPy
+
+Prim và Kruskal chốt từng cạnh một nên chỉ chạy tuần tự. Borůvka làm theo vòng:
+    1. mỗi thành phần chọn cạnh rẻ nhất đi ra ngoài nó (grouped-min trên mảng cạnh)
+    2. thêm mọi cạnh được chọn vào rừng khung và gộp các thành phần (nhảy con trỏ)
+    3. bỏ các cạnh đã nằm trong một thành phần, lặp lại tới khi không còn cạnh nối
+Số thành phần giảm ít nhất một nửa mỗi vòng nên có tối đa log2(V) vòng; mỗi vòng là
+vài phép toán NumPy trên các cạnh còn sống.
+
+Cạnh được so sánh theo (trọng số, chỉ số cạnh trong đầu vào): thứ tự toàn phần nên
+không có chu trình khi gộp và kết quả xác định, trùng với Kruskal (sắp xếp ổn định).
+
+Với executor (process pool), bước 1 + 3 của mỗi vòng chạy song song trên các phần
+của mảng cạnh đặt trong shared memory: mỗi worker lọc phần của mình tại chỗ và trả
+về cạnh rẻ nhất của các thành phần nó chạm tới; process chủ gộp kết quả và co thành phần.
+"""
+
+import numpy as np
+
+from .budget import get_budget, suspend
+from .counters import get_counters
+from .graph_arrays import as_graph_arrays
+from .scc import COMPONENT_COLORS
+
+
+class _Forest:
+    """
+    Trạng thái Borůvka trên mảng cạnh đã sắp theo hạng (trọng số, chỉ số cạnh):
+    cạnh hạng r là cạnh order[r] của đồ thị, hai đầu mút src[r], dst[r].
+    """
+
+    def __init__(self, graph):
+        n, m = graph.num_nodes, graph.num_edges
+        dtype = np.int32 if max(n, m) < 2 ** 31 else np.int64
+        self.n, self.m = n, m
+        self.order = np.argsort(graph.weight, kind='stable')
+        self.weight = graph.weight[self.order]
+        self.src = graph.src[self.order].astype(dtype)
+        self.dst = graph.dst[self.order].astype(dtype)
+        self.comp = np.arange(n, dtype=dtype)
+        self.tree = []        # hạng các cạnh đã chọn, theo từng vòng
+        self.rounds = 0
+        # Cạnh còn sống (hai đầu khác thành phần ở lần lọc gần nhất)
+        self.live = (self.src, self.dst, np.arange(m, dtype=dtype))
+
+    def restore(self, state):
+        self.comp[:] = state['comp']
+        self.tree = [np.asarray(state['tree'], dtype=self.comp.dtype)] if state['tree'] else []
+        self.rounds = state['rounds']
+
+    def state(self):
+        return {'comp': self.comp.tolist(), 'tree': self.tree_ranks().tolist(), 'rounds': self.rounds}
+
+    def tree_ranks(self):
+        return np.concatenate(self.tree) if self.tree else np.zeros(0, dtype=np.int64)
+
+    def cheapest_serial(self, counters=None):
+        """Lọc cạnh nội bộ và tìm cạnh rẻ nhất (hạng nhỏ nhất) của từng thành phần."""
+        src, dst, rank = self.live
+        if counters is not None:
+            counters.add('edgeScans', len(rank))
+        best = np.full(self.n, self.m, dtype=self.comp.dtype)
+        keep = _scan(self.comp, src, dst, rank, best)
+        self.live = (src[keep], dst[keep], rank[keep])
+        return best
+
+    def contract(self, best):
+        """
+        Thêm cạnh rẻ nhất của mọi thành phần vào rừng và gộp thành phần.
+
+        Returns:
+            Hạng các cạnh vừa thêm, hoặc None nếu không thành phần nào còn cạnh ra ngoài
+        """
+        roots = np.flatnonzero(best < self.m)
+        if not len(roots):
+            return None
+        chosen = best[roots]
+        comp = self.comp
+        other = comp[self.src[chosen]]
+        other = np.where(other == roots, comp[self.dst[chosen]], other)
+
+        # Đồ thị "thành phần -> thành phần bên kia cạnh đã chọn" là rừng mà mỗi cây có
+        # đúng một cặp chọn lẫn nhau (cùng một cạnh): gốc mới là đầu có chỉ số nhỏ hơn
+        parent = np.arange(self.n, dtype=comp.dtype)
+        parent[roots] = other
+        pair = parent[other] == roots
+        mutual = pair & (roots < other)
+        parent[roots[mutual]] = roots[mutual]
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+        self.comp = parent[comp]
+
+        # Hai đầu của một cặp chọn lẫn nhau chọn cùng một cạnh: chỉ tính một lần
+        added = chosen[~pair | mutual]
+        self.tree.append(added)
+        self.rounds += 1
+        return added
+
+    def result(self):
+        tree = np.sort(self.order[self.tree_ranks()])
+        return tree, int(np.count_nonzero(self.comp == np.arange(self.n)))
+
+
+def _scan(comp, src, dst, rank, best):
+    """
+    Grouped-min: best[c] = hạng nhỏ nhất của cạnh nối c ra ngoài. Trả về mask cạnh giữ lại.
+    Mọi mảng cùng dtype: ufunc.at với mảng khác dtype rơi vào nhánh chậm (~30 lần).
+    """
+    cu, cv = comp[src], comp[dst]
+    keep = cu != cv
+    live = rank[keep]
+    np.minimum.at(best, cu[keep], live)
+    np.minimum.at(best, cv[keep], live)
+    return keep
+
+
+def _scan_task(name, n, m, dtype, lo, count):
+    """
+    Tác vụ trong worker: lọc phần [lo, lo + count) của mảng cạnh trong segment tại chỗ
+    và tìm cạnh rẻ nhất của các thành phần phần đó chạm tới.
+
+    Returns:
+        Tuple (số cạnh còn lại, bytes chỉ số thành phần, bytes hạng cạnh rẻ nhất)
+    """
+    from .shared_graph import open_segment  # shared_graph import dijkstra: import lười
+
+    shm = open_segment(name)
+    try:
+        return _scan_part(shm, n, m, dtype, lo, count)
+    finally:
+        shm.close()
+
+
+def _scan_part(shm, n, m, dtype, lo, count):
+    # Mảng NumPy trên segment chỉ sống trong frame này (segment đóng được sau khi trả về)
+    src, dst, rank, comp = _segment_arrays(shm, n, m, dtype)
+    part = slice(lo, lo + count)
+    best = np.full(n, m, dtype=dtype)
+    keep = _scan(comp, src[part], dst[part], rank[part], best)
+    kept = int(np.count_nonzero(keep))
+    for arr in (src, dst, rank):
+        arr[lo:lo + kept] = arr[part][keep]
+    touched = np.flatnonzero(best < m)
+    return kept, touched.tobytes(), best[touched].tobytes()
+
+
+def _segment_arrays(shm, n, m, dtype):
+    """Mảng src, dst, rank (m phần tử) và comp (n phần tử) trong segment."""
+    size = np.dtype(dtype).itemsize
+    arrays = [np.frombuffer(shm.buf, dtype=dtype, count=m, offset=i * m * size) for i in range(3)]
+    arrays.append(np.frombuffer(shm.buf, dtype=dtype, count=n, offset=3 * m * size))
+    return arrays
+
+
+def _run_parallel(forest, executor, workers, counters=None):
+    """Các vòng Borůvka với bước lọc + grouped-min chạy trên executor."""
+    from multiprocessing import shared_memory
+
+    n, m = forest.n, forest.m
+    size = (3 * m + n) * forest.comp.dtype.itemsize
+    shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+    try:
+        _parallel_rounds(forest, shm, executor, workers, counters)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _parallel_rounds(forest, shm, executor, workers, counters):
+    n, m, dtype = forest.n, forest.m, forest.comp.dtype.str
+    src, dst, rank, comp = _segment_arrays(shm, n, m, dtype)
+    src[:], dst[:], rank[:] = forest.live
+    size = -(-m // workers)
+    parts = [[lo, min(size, m - lo)] for lo in range(0, m, size)]
+    while True:
+        comp[:] = forest.comp
+        parts = [p for p in parts if p[1]]
+        if counters is not None:
+            counters.add('edgeScans', sum(count for _, count in parts))
+        futures = [executor.submit(_scan_task, shm.name, n, m, dtype, lo, count) for lo, count in parts]
+        best = np.full(n, m, dtype=dtype)
+        for part, future in zip(parts, futures):
+            kept, touched, cheapest = future.result()
+            part[1] = kept
+            np.minimum.at(best, np.frombuffer(touched, dtype=np.intp), np.frombuffer(cheapest, dtype=dtype))
+        if forest.contract(best) is None:
+            return
+
+
+def boruvka_algorithm(graph_data, **kwargs):
+    """
+    Thuật toán Borůvka tìm cây (rừng) khung nhỏ nhất. Trace thô: mỗi vòng một step
+    (màu nút theo thành phần, nhãn nút là nút đại diện của thành phần).
+
+    Args:
+        graph_data: Dict chứa nodes và edges
+        **kwargs: ngân sách max_steps / max_ms / max_ops và 'resume' để chạy tiếp (xem budget.py);
+            'counters' là bộ đếm thao tác (xem counters.py)
+
+    Returns:
+        List các StepState dict để visualization
+    """
+
+    # ========== BƯỚC 1: Parse dữ liệu đầu vào ==========
+    graph = as_graph_arrays(graph_data)
+    steps = []
+
+    if graph.num_nodes == 0:
+        steps.append({'highlightNodes': {}, 'highlightEdges': {}, 'msg': 'graph.empty'})
+        return steps
+    if graph.is_directed:
+        steps.append({'highlightNodes': {}, 'highlightEdges': {}, 'msg': 'boruvka.directed'})
+        return steps
+
+    # ========== BƯỚC 2: Khởi tạo (mỗi nút là một thành phần) ==========
+    ids, edge_ids = graph.node_ids, graph.edge_ids
+    forest = _Forest(graph)
+    budget = get_budget(kwargs)
+    counters = get_counters(kwargs)
+    resume = kwargs.get('resume')
+    if resume is None:
+        steps.append({
+            'highlightNodes': {},
+            'highlightEdges': {},
+            'msg': 'boruvka.start',
+            'args': {'components': graph.num_nodes},
+        })
+    else:
+        forest.restore(resume)
+
+    # ========== BƯỚC 3: Các vòng chọn cạnh rẻ nhất và gộp thành phần ==========
+    while True:
+        before = int(np.count_nonzero(forest.comp == np.arange(forest.n)))
+        added = forest.contract(forest.cheapest_serial(counters))
+        if added is None:
+            break
+        if counters is not None:
+            counters.add('rounds')
+            counters.add('contractions', len(added))
+
+        comp = forest.comp.tolist()
+        colors = {root: COMPONENT_COLORS[i % len(COMPONENT_COLORS)] for i, root in enumerate(dict.fromkeys(comp))}
+        new_edges = {edge_ids[e] for e in forest.order[added].tolist()}
+        steps.append({
+            'highlightNodes': {ids[v]: colors[c] for v, c in enumerate(comp)},
+            'highlightEdges': {edge_ids[e]: ('#f59e0b' if edge_ids[e] in new_edges else '#10b981')
+                               for e in forest.order[forest.tree_ranks()].tolist()},
+            'nodeLabels': {ids[v]: ids[c] for v, c in enumerate(comp)},
+            'msg': 'boruvka.round',
+            'args': {
+                'round': forest.rounds,
+                'before': before,
+                'added': len(added),
+                'after': len(colors),
+                'total': float(forest.weight[forest.tree_ranks()].sum()),
+            },
+        })
+
+        if budget is not None and budget.exhausted(steps):
+            return suspend(steps, kwargs, budget, forest.state())
+
+    # ========== BƯỚC 4: Kết thúc ==========
+    tree, components = forest.result()
+    steps.append({
+        'highlightNodes': {n: '#10b981' for n in ids},
+        'highlightEdges': {edge_ids[e]: '#10b981' for e in tree.tolist()},
+        'msg': 'boruvka.done' if components == 1 else 'boruvka.forest',
+        'args': {'total': float(graph.weight[tree].sum()), 'components': components},
+    })
+    return steps
+
+
+def boruvka_result(graph_data, **kwargs):
+    """
+    Borůvka chế độ "chỉ kết quả" (không sinh step).
+
+    kwargs:
+        - executor, workers: process pool (service truyền vào với đồ thị từ
+          BORUVKA_PARALLEL_MIN_EDGES cạnh) để lọc + tìm cạnh rẻ nhất song song
+        - counters: bộ đếm thao tác (rounds, edgeScans, contractions)
+
+    Returns:
+        Dict: engine ('numpy' | 'parallel'), workers, edges (id các cạnh của cây/rừng
+        khung, theo thứ tự đầu vào), totalWeight, rounds, connected, components
+    """
+    graph = as_graph_arrays(graph_data)
+    if graph.is_directed:
+        raise ValueError("Borůvka chỉ áp dụng cho đồ thị vô hướng.")
+    counters = get_counters(kwargs)
+    executor, workers = kwargs.get('executor'), int(kwargs.get('workers') or 1)
+
+    forest = _Forest(graph)
+    if executor is not None and workers > 1 and graph.num_edges:
+        engine = 'parallel'
+        _run_parallel(forest, executor, workers, counters)
+    else:
+        engine, workers = 'numpy', 1
+        while forest.contract(forest.cheapest_serial(counters)) is not None:
+            pass
+    if counters is not None:
+        counters.add('rounds', forest.rounds)
+        counters.add('contractions', len(forest.tree_ranks()))
+
+    tree, components = forest.result()
+    edge_ids = graph.edge_ids
+    return {
+        'engine': engine,
+        'workers': workers,
+        'edges': [edge_ids[e] for e in tree.tolist()],
+        'totalWeight': float(graph.weight[tree].sum()) if len(tree) else 0.0,
+        'rounds': forest.rounds,
+        'connected': components <= 1,
+        'components': components,
+    }
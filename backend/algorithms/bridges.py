@@ -0,0 +1,237 @@
+"""
+bridges.py - Cầu (bridge) và khớp (articulation point) của đồ thị vô hướng
+
+Chạy trên lõi DFS lặp (dfs_core), O(V + E). low[u] là thời điểm phát hiện nhỏ
+nhất tới được từ cây con của u qua tối đa một cạnh ngược. Với cạnh cây p -> c:
+    - low[c] > disc[p]:  cạnh (p, c) là cầu
+    - low[c] >= disc[p]: p là khớp (nếu p không phải gốc)
+Gốc cây DFS là khớp khi có từ 2 con trở lên. Cạnh song song được xét là cạnh
+ngược nên không bao giờ là cầu. Đồ thị có hướng được xét như đồ thị vô hướng.
+"""
+
+from .budget import get_budget, suspend
+from .dfs_core import DISCOVER, EDGE, FINISH, dfs_roots, dfs_state, iter_dfs, resolve_start, sorted_csr_lists
+from .graph_arrays import GraphArrays, as_graph_arrays
+
+
+def _undirected(graph):
+    """Bản vô hướng của đồ thị (dùng chung mảng, chỉ bỏ hướng)."""
+    if not graph.is_directed:
+        return graph
+    return GraphArrays(graph.node_ids, graph.src, graph.dst, graph.weight, graph.edge_ids, False)
+
+
+def _low_link_state(graph, csr):
+    n = graph.num_nodes
+    return {
+        'dfs': dfs_state(n, csr[0], graph.num_edges, False),
+        'disc': [-1] * n,
+        'low': [0] * n,
+        'parent': [-1] * n,
+        'children': [0] * n,
+        'is_cut': bytearray(n),
+    }
+
+
+def _low_link_events(graph, csr, roots, state=None):
+    """
+    Low-link trên dãy sự kiện của lõi DFS.
+
+    Args:
+        state: dict trạng thái (_low_link_state()) cập nhật tại chỗ, để tạm dừng/tiếp tục
+
+    Yields:
+        Tuple (event, disc, low, found): found là ('bridge', edge) hoặc
+        ('articulation', node) phát hiện tại sự kiện này (list, có thể rỗng)
+    """
+    if state is None:
+        state = _low_link_state(graph, csr)
+    disc = state['disc']
+    low = state['low']
+    parent = state['parent']
+    children = state['children']
+    is_cut = state['is_cut']
+    counter = max(disc, default=-1) + 1
+
+    for event in iter_dfs(csr, graph.num_edges, False, roots, state['dfs']):
+        found = []
+        if event[0] == DISCOVER:
+            _, u, p, _ = event
+            disc[u] = low[u] = counter
+            counter += 1
+            parent[u] = p
+            if p >= 0:
+                children[p] += 1
+        elif event[0] == FINISH:
+            _, u, p, e = event
+            if p >= 0:
+                if low[u] < low[p]:
+                    low[p] = low[u]
+                if low[u] > disc[p]:
+                    found.append(('bridge', e))
+                if parent[p] >= 0 and low[u] >= disc[p] and not is_cut[p]:
+                    is_cut[p] = 1
+                    found.append(('articulation', p))
+            elif children[u] >= 2:
+                is_cut[u] = 1
+                found.append(('articulation', u))
+        else:
+            _, u, v, _, _ = event
+            if disc[v] < low[u]:
+                low[u] = disc[v]
+        yield event, disc, low, found
+
+
+def bridges_algorithm(graph_data, **kwargs):
+    """
+    Tìm cầu và khớp có visualization.
+
+    Args:
+        graph_data: Dict chứa nodes, edges, isDirected (có hướng thì bỏ hướng)
+        **kwargs: 'start_node' (tùy chọn) - nút bắt đầu DFS; ngân sách
+            max_steps / max_ms / max_ops và 'resume' để chạy tiếp (xem budget.py)
+
+    Returns:
+        List các StepState dict để visualization.
+    """
+
+    # ========== BƯỚC 1: Parse dữ liệu ==========
+    graph = _undirected(as_graph_arrays(graph_data))
+    n = graph.num_nodes
+    if n == 0:
+        return []
+
+    ids = list(graph.node_ids)
+    edge_ids = list(graph.edge_ids)
+    start = resolve_start(graph, kwargs)
+
+    # ========== BƯỚC 2: Trạng thái để highlight ==========
+    csr = sorted_csr_lists(graph)
+    budget = get_budget(kwargs)
+    resume = kwargs.get('resume')
+    if resume is None:
+        low_link = _low_link_state(graph, csr)
+        visited = set()
+        tree_edges = set()
+        bridges, cuts = [], []
+    else:
+        low_link = resume['low_link']
+        visited = set(resume['visited'])
+        tree_edges = set(resume['tree_edges'])
+        bridges, cuts = resume['bridges'], resume['cuts']
+    steps = []
+
+    def snapshot(current=None):
+        highlight = {ids[i]: '#10b981' for i in visited}    # Xanh lá: Đã thăm
+        highlight.update({ids[i]: '#ef4444' for i in cuts})  # Đỏ: Khớp
+        if current is not None:
+            highlight[ids[current]] = '#3b82f6'             # Xanh dương: Đang xét
+        edges = {edge_ids[e]: '#10b981' for e in tree_edges}
+        edges.update({edge_ids[e]: '#ef4444' for e in bridges})  # Đỏ: Cầu
+        return highlight, edges
+
+    if resume is None:
+        steps.append({
+            'highlightNodes': {},
+            'highlightEdges': {},
+            'msg': 'bridges.start'
+        })
+
+    # ========== BƯỚC 3: Low-link trên sự kiện DFS ==========
+    for event, disc, low, found in _low_link_events(graph, csr, dfs_roots(n, start), low_link):
+        if event[0] == DISCOVER:
+            _, v, u, e = event
+            visited.add(v)
+            if e >= 0:
+                tree_edges.add(e)
+                msg, args = 'bridges.discover', {'u': ids[u], 'v': ids[v], 'd': disc[v]}
+            else:
+                msg, args = 'bridges.root', {'v': ids[v]}
+            current = v
+
+        elif event[0] == FINISH:
+            _, u, p, e = event
+            notes = []
+            for kind, item in found:
+                if kind == 'bridge':
+                    bridges.append(item)
+                    notes.append({'msg': 'bridges.bridge',
+                                  'args': {'u': ids[u], 'p': ids[p], 'low': low[u], 'd': disc[p]}})
+                else:
+                    cuts.append(item)
+                    if item == u:
+                        notes.append({'msg': 'bridges.root_cut', 'args': {'u': ids[u]}})
+                    else:
+                        notes.append({'msg': 'bridges.cut',
+                                      'args': {'u': ids[u], 'p': ids[p], 'low': low[u], 'd': disc[p]}})
+            if p >= 0:
+                msg, args = 'bridges.finish', {'u': ids[u], 'p': ids[p], 'plow': low[p]}
+            else:
+                msg, args = 'bridges.finish_root', {'u': ids[u]}
+            if notes:
+                msg += '_notes'
+                args['notes'] = notes
+            current = p if p >= 0 else None
+
+        else:
+            _, u, v, e, _ = event
+            msg, args = 'bridges.back', {'u': ids[u], 'v': ids[v], 'low': low[u]}
+            current = u
+
+        highlight, edges = snapshot(current)
+        if event[0] == EDGE:
+            edges[edge_ids[event[3]]] = '#f59e0b'
+        steps.append({
+            'highlightNodes': highlight,
+            'highlightEdges': edges,
+            'nodeLabels': {ids[i]: f'{disc[i]}/{low[i]}' for i in visited},
+            'msg': msg,
+            'args': args
+        })
+
+        if budget is not None and budget.exhausted(steps):
+            return suspend(steps, kwargs, budget, {
+                'low_link': low_link, 'visited': list(visited), 'tree_edges': list(tree_edges),
+                'bridges': bridges, 'cuts': cuts,
+            })
+
+    # ========== BƯỚC 4: Kết thúc ==========
+    highlight, edges = snapshot()
+    steps.append({
+        'highlightNodes': highlight,
+        'highlightEdges': edges,
+        'msg': 'bridges.done',
+        'args': {'bridge_count': len(bridges), 'bridges': [edge_ids[e] for e in bridges],
+                 'cut_count': len(cuts), 'cuts': [ids[i] for i in cuts]}
+    })
+    return steps
+
+
+def bridges_result(graph_data, **kwargs):
+    """
+    Tìm cầu và khớp chế độ "chỉ kết quả".
+
+    Returns:
+        Dict: bridges (list edge_id), articulationPoints (list id), components
+        (số thành phần liên thông), treatedAsUndirected
+    """
+    original = as_graph_arrays(graph_data)
+    graph = _undirected(original)
+    n = graph.num_nodes
+
+    bridges, cuts = [], []
+    components = 0
+    if n:
+        roots = dfs_roots(n, resolve_start(graph, kwargs))
+        for event, _, _, found in _low_link_events(graph, graph.csr_lists(), roots):
+            if event[0] == DISCOVER and event[2] < 0:
+                components += 1
+            for kind, item in found:
+                (bridges if kind == 'bridge' else cuts).append(item)
+
+    return {
+        'bridges': [graph.edge_ids[e] for e in bridges],
+        'articulationPoints': [graph.node_ids[i] for i in cuts],
+        'components': components,
+        'treatedAsUndirected': original.is_directed,
+    }
@@ -0,0 +1,81 @@
+"""
+budget.py - Ngân sách chạy hợp tác (số step, thời gian, số thao tác) cho các thuật toán có visualization
+
+Thuật toán tự kiểm tra ngân sách sau mỗi đơn vị công việc của vòng lặp chính
+(pop một nút, xét một cạnh, một sự kiện DFS, ...). Khi hết ngân sách, thuật toán
+trả về các step đã sinh và ghi trạng thái để chạy tiếp vào meta:
+
+    meta['suspended'] = {'stoppedBy': 'steps' | 'time' | 'ops', 'state': {...}}
+
+Trạng thái chỉ gồm dict/list/số/chuỗi (bytearray và set được chuyển thành list
+khi serialize) để service đóng gói thành continuation token. Lần gọi sau truyền
+lại trạng thái qua kwargs['resume']: thuật toán bỏ qua bước khởi tạo và tiếp tục
+vòng lặp chính, các step trả về nối tiếp trang trước.
+
+kwargs:
+    - max_steps: số step tối đa mỗi lần gọi (có thể vượt vài step của đơn vị công việc cuối)
+    - max_ms: thời gian tối đa (ms) mỗi lần gọi
+    - max_ops: số đơn vị công việc tối đa mỗi lần gọi (max_iter là tên cũ)
+"""
+
+import time
+
+BUDGET_PARAMS = ('max_steps', 'max_ms', 'max_ops', 'max_iter')
+
+
+class Budget:
+    """Ngân sách của một lần gọi; reason là lý do dừng ('steps' | 'time' | 'ops') sau khi hết."""
+
+    def __init__(self, max_steps=None, max_ms=None, max_ops=None):
+        self.max_steps = max_steps
+        self.max_ops = max_ops
+        self.deadline = time.perf_counter() + max_ms / 1000 if max_ms is not None else None
+        self.ops = 0
+        self.reason = None
+
+    def exhausted(self, steps):
+        """
+        Gọi sau mỗi đơn vị công việc. Đơn vị đầu tiên của mỗi lần gọi luôn được
+        chạy, nên mỗi trang đều tiến triển kể cả với ngân sách rất nhỏ.
+        """
+        self.ops += 1
+        if self.ops == 1:
+            return False
+        if self.max_steps is not None and len(steps) >= self.max_steps:
+            self.reason = 'steps'
+        elif self.max_ops is not None and self.ops >= self.max_ops:
+            self.reason = 'ops'
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.reason = 'time'
+        return self.reason is not None
+
+
+def get_budget(kwargs):
+    """
+    Budget từ kwargs; None nếu không có giới hạn nào (thuật toán chạy như cũ).
+
+    Raises:
+        ValueError: giới hạn không phải số dương
+    """
+    limits = {}
+    for key in BUDGET_PARAMS:
+        if kwargs.get(key) is None:
+            continue
+        try:
+            value = float(kwargs[key])
+        except (TypeError, ValueError):
+            raise ValueError(f'{key} phải là số.')
+        if value <= 0:
+            raise ValueError(f'{key} phải > 0.')
+        limits['max_ops' if key == 'max_iter' else key] = value
+    if not limits:
+        return None
+    return Budget(**limits)
+
+
+def suspend(steps, kwargs, budget, state):
+    """Ghi trạng thái chạy tiếp vào meta (nếu có) và trả về các step của trang hiện tại."""
+    meta = kwargs.get('meta')
+    if meta is not None:
+        meta['suspended'] = {'stoppedBy': budget.reason, 'state': state}
+    return steps
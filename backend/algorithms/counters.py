@@ -0,0 +1,95 @@
+"""
+counters.py - Bộ đếm thao tác cấp thuật toán và hook theo dõi
+
+Thời gian chạy không giải thích được vì sao một thay đổi làm thuật toán chậm đi;
+bộ đếm ghi lại số thao tác cơ bản của từng lần chạy:
+    - hàng đợi ưu tiên (Dijkstra, Prim): pushes, pops, decreaseKeys, stalePops,
+      maxQueueSize - lấy từ số liệu sẵn có của hàng đợi (priority_queue.py), tích
+      lũy từ đầu khi chạy tiếp như meta.queue; relaxations, edgeScans
+    - Bellman-Ford: rounds, edgeChecks, relaxations
+    - Kruskal (DSU): finds, findDepth (tổng số bước lên cha), maxFindDepth, unions
+    - Borůvka: rounds, edgeScans (cạnh còn sống được quét mỗi vòng), contractions
+    - delta-stepping: buckets, phases, edgeScans, relaxations
+    - BFS: enqueues, dequeues, edgeChecks; DFS: stackPushes, stackPops, edgeChecks
+
+Giống budget.py: thuật toán lấy bộ đếm bằng get_counters(kwargs) và nhận None khi
+không bật, nên khi tắt mỗi điểm đếm chỉ tốn một phép so sánh `is not None`; vòng
+lặp nóng của engine "chỉ kết quả" không đếm từng phần tử mà suy ra số đếm sau khi
+chạy (từ số liệu hàng đợi, mảng đã chốt, ...).
+
+kwargs:
+    - counters: đối tượng Counters (service tạo khi payload có "counters": true
+      hoặc khi process đã đăng ký hook bằng set_hooks())
+"""
+
+import threading
+
+_hooks = {'on_run': None, 'on_count': None}
+_hooks_lock = threading.Lock()
+
+
+class Counters:
+    """Bộ đếm của một lần chạy; on_count(name, n) (nếu có) được gọi ở mỗi lần đếm."""
+
+    __slots__ = ('counts', 'on_count')
+
+    def __init__(self, on_count=None):
+        self.counts = {}
+        self.on_count = on_count
+
+    def add(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+        if self.on_count is not None:
+            self.on_count(name, n)
+
+    def peak(self, name, value):
+        """Ghi nhận giá trị lớn nhất (ví dụ độ sâu find, kích thước hàng đợi)."""
+        if value > self.counts.get(name, 0):
+            self.counts[name] = value
+
+    def add_queue(self, stats):
+        """Cộng số liệu của hàng đợi ưu tiên (PriorityQueue.stats())."""
+        for name in ('pushes', 'pops', 'decreaseKeys', 'stalePops'):
+            if stats.get(name):
+                self.add(name, stats[name])
+        self.peak('maxQueueSize', stats.get('maxSize', 0))
+
+    def snapshot(self):
+        return dict(sorted(self.counts.items()))
+
+
+def get_counters(kwargs):
+    """Counters từ kwargs; None nếu request không bật bộ đếm."""
+    counters = kwargs.get('counters')
+    return counters if isinstance(counters, Counters) else None
+
+
+def set_hooks(on_run=None, on_count=None):
+    """
+    Đăng ký hook cho mọi request của process (gọi lại với None để gỡ). Khi có hook,
+    bộ đếm được bật cho mọi request.
+
+    Args:
+        on_run: on_run(algorithm, counts) sau mỗi lần chạy, với số đếm cuối cùng
+            (ví dụ đẩy vào profiler / hệ thống metrics)
+        on_count: on_count(name, n) ở mỗi lần đếm (theo dõi chi tiết, chậm hơn)
+    """
+    with _hooks_lock:
+        _hooks['on_run'] = on_run
+        _hooks['on_count'] = on_count
+
+
+def new_counters(enabled=False):
+    """Counters cho một request, hoặc None nếu request không bật và không có hook."""
+    if not enabled and _hooks['on_run'] is None and _hooks['on_count'] is None:
+        return None
+    return Counters(_hooks['on_count'])
+
+
+def finish_counters(algorithm, counters):
+    """Số đếm cuối cùng của một lần chạy (cho meta.counters); gọi hook on_run nếu có."""
+    counts = counters.snapshot()
+    on_run = _hooks['on_run']
+    if on_run is not None:
+        on_run(algorithm, counts)
+    return counts
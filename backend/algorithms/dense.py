@@ -0,0 +1,166 @@
+"""
+dense.py - Engine ma trận kề cho đồ thị dày (Prim, Dijkstra bản O(V²))
+
+Trên đồ thị đầy đủ hoặc gần đầy đủ (E ≈ V²), bản dùng heap tốn O(E log V) và phải
+dựng danh sách kề E phần tử. Bản cổ điển quét mảng chỉ tốn O(V²): mỗi vòng chọn nút
+bằng argmin trên mảng khóa, rồi cập nhật cả hàng của ma trận trọng số bằng một
+phép np.minimum - cả hai đều vectorized.
+
+Ma trận trọng số V x V (float64, ∞ = không có cạnh) được dựng trực tiếp từ các cung
+của GraphArrays; với cạnh song song chỉ giữ cạnh nhẹ nhất. Số nút tối đa
+DENSE_MAX_NODES giới hạn bộ nhớ của ma trận (8 byte x V²).
+"""
+
+import numpy as np
+
+from .priority_queue import is_dense
+
+# 10 000 nút -> ma trận 800 MB
+DENSE_MAX_NODES = 10_000
+
+
+def use_dense(graph, queue='auto'):
+    """
+    Có dùng engine ma trận cho mode result hay không.
+
+    Args:
+        queue: tham số 'queue' của request: 'dense' ép dùng, 'auto' chọn theo mật độ,
+            loại hàng đợi khác thì dùng bản heap
+
+    Raises:
+        ValueError: queue='dense' nhưng đồ thị vượt DENSE_MAX_NODES
+    """
+    n = graph.num_nodes
+    if queue == 'dense':
+        if n > DENSE_MAX_NODES:
+            raise ValueError(f'Engine ma trận chỉ hỗ trợ tối đa {DENSE_MAX_NODES} nút.')
+        return True
+    if queue != 'auto' or n > DENSE_MAX_NODES:
+        return False
+    arcs = graph.num_edges if graph.is_directed else 2 * graph.num_edges
+    return is_dense(n, arcs)
+
+
+def dense_matrix(graph):
+    """Ma trận trọng số V x V của GraphArrays (∞ nếu không có cung, cạnh song song lấy min)."""
+    n = graph.num_nodes
+    u, v, w, _ = graph.arcs()
+    matrix = np.full((n, n), np.inf)
+    matrix[u, v] = w
+    # Cung song song: phép gán chỉ giữ một giá trị, bổ sung các cung nhẹ hơn bị ghi đè
+    lost = w < matrix[u, v]
+    if lost.any():
+        np.minimum.at(matrix, (u[lost], v[lost]), w[lost])
+    return matrix
+
+
+def pair_edges(graph, heads, tails):
+    """
+    Chỉ số cạnh gốc nhẹ nhất nối từng cặp (heads[i] -> tails[i]); -1 nếu không có.
+    Chỉ quét các cung một lần (searchsorted trên các cặp cần tìm), không dựng ma trận chỉ số.
+    """
+    heads = np.asarray(heads, dtype=np.int64)
+    tails = np.asarray(tails, dtype=np.int64)
+    result = np.full(len(heads), -1, dtype=np.int64)
+    if not len(heads):
+        return result
+
+    n = graph.num_nodes
+    u, v, w, eidx = graph.arcs()
+    wanted = heads * n + tails
+    order = np.argsort(wanted)
+    sorted_wanted = wanted[order]
+    keys = u * n + v
+    pos = np.minimum(np.searchsorted(sorted_wanted, keys), len(sorted_wanted) - 1)
+    hit = np.flatnonzero(sorted_wanted[pos] == keys)
+    if not len(hit):
+        return result
+
+    # Cung nhẹ nhất cho từng cặp (cùng trọng số thì cạnh có chỉ số nhỏ hơn)
+    hit = hit[np.lexsort((eidx[hit], w[hit], pos[hit]))]
+    first = np.r_[True, pos[hit][1:] != pos[hit][:-1]]
+    best = hit[first]
+    result[order[pos[best]]] = eidx[best]
+    # Các cặp trùng nhau trong heads/tails nhận cùng một cạnh
+    result[order] = result[order][np.searchsorted(sorted_wanted, sorted_wanted)]
+    return result
+
+
+def prim_dense(matrix, start=0):
+    """
+    Prim O(V²) trên ma trận trọng số đối xứng. Đồ thị không liên thông: tiếp tục từ
+    nút nhỏ nhất chưa thăm (rừng khung nhỏ nhất).
+
+    Returns:
+        Tuple (parent, order): parent[v] là nút cha trong cây (-1 nếu v là gốc),
+        order là thứ tự các nút được thêm vào cây
+    """
+    n = len(matrix)
+    parent = np.full(n, -1, dtype=np.int64)
+    key = np.full(n, np.inf)
+    in_tree = np.zeros(n, dtype=bool)
+    order = []
+
+    root = start
+    while True:
+        # Gốc mới: khóa của các nút kề là trọng số cạnh tới gốc
+        in_tree[root] = True
+        order.append(root)
+        row = matrix[root]
+        better = (row < key) & ~in_tree
+        key[better] = row[better]
+        parent[better] = root
+        key[root] = np.inf
+
+        while len(order) < n:
+            v = int(key.argmin())
+            if key[v] == np.inf:
+                break
+            in_tree[v] = True
+            order.append(v)
+            key[v] = np.inf
+            row = matrix[v]
+            better = (row < key) & ~in_tree
+            key[better] = row[better]
+            parent[better] = v
+
+        if len(order) == n:
+            return parent, order
+        root = int(np.flatnonzero(~in_tree)[0])
+
+
+def dijkstra_dense(matrix, source, target=None):
+    """
+    Dijkstra O(V²) trên ma trận trọng số: mỗi vòng chốt nút có khoảng cách nhỏ nhất
+    (argmin) rồi nới lỏng cả hàng bằng một phép so sánh vectorized.
+
+    Returns:
+        Tuple (dist, pred, settled): mảng khoảng cách (∞ nếu không tới được),
+        mảng nút trước (-1), số nút đã chốt
+    """
+    n = len(matrix)
+    dist = np.full(n, np.inf)
+    pred = np.full(n, -1, dtype=np.int64)
+    done = np.zeros(n, dtype=bool)
+    # Khoảng cách của các nút chưa chốt (∞ với nút đã chốt) để argmin
+    frontier = np.full(n, np.inf)
+    dist[source] = frontier[source] = 0.0
+    settled = 0
+
+    while settled < n:
+        u = int(frontier.argmin())
+        du = frontier[u]
+        if du == np.inf:
+            break
+        done[u] = True
+        frontier[u] = np.inf
+        settled += 1
+        if u == target:
+            break
+        candidate = du + matrix[u]
+        better = (candidate < dist) & ~done
+        dist[better] = candidate[better]
+        frontier[better] = candidate[better]
+        pred[better] = u
+
+    return dist, pred, settled
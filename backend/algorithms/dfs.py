@@ -2,124 +2,197 @@
 dfs.py - Thuật toán Tìm kiếm theo chiều sâu (Depth-First Search)
 """
 
+from .budget import get_budget, suspend
+from .counters import get_counters
+from .dfs_core import (
+    BACK, CROSS, DISCOVER, EDGE_KIND_COLORS, EDGE_KIND_NAMES, FINISH, FORWARD, TREE,
+    dfs_state, iter_dfs, resolve_start, run_dfs, sorted_csr_lists,
+)
+from .graph_arrays import as_graph_arrays
+
+# Id thông điệp (messages.py) của step phân loại cạnh
+EDGE_KIND_MESSAGES = {
+    BACK: 'dfs.back',
+    FORWARD: 'dfs.forward',
+    CROSS: 'dfs.cross',
+}
+
+
 def dfs_algorithm(graph_data, **kwargs):
     """
     Thuật toán DFS duyệt đồ thị theo chiều sâu.
-    Sử dụng Ngăn xếp (Stack) để khử đệ quy, giúp visualization dễ hơn.
-    
+    Dùng lõi DFS lặp (dfs_core): mỗi nút trên Stack giữ con trỏ tới cung kế tiếp,
+    nên cạnh cây được ghi nhận đúng lúc phát hiện nút, kèm thời điểm phát hiện /
+    kết thúc (nhãn "d/f") và phân loại cạnh cây / ngược / xuôi / chéo.
+
     Args:
         graph_data: Dict chứa nodes, edges, isDirected
-        **kwargs: Cần chứa 'start_node'.
-        
+        **kwargs: Cần chứa 'start_node'. Ngân sách max_steps / max_ms / max_ops
+            và 'resume' để chạy tiếp (xem budget.py). 'counters': bộ đếm thao tác
+            (xem counters.py) - stackPushes, stackPops, edgeChecks (cạnh được phân loại).
+
     Returns:
         List các StepState dict để visualization.
     """
-    
+
     # ========== BƯỚC 1: Parse dữ liệu ==========
-    nodes = {n['id']: n for n in graph_data['nodes']}
-    raw_edges = graph_data['edges']
-    is_directed = graph_data.get('isDirected', False)
-    
-    steps = []
-    
-    if not nodes:
+    graph = as_graph_arrays(graph_data)
+    if graph.num_nodes == 0:
         return []
 
-    start_node = kwargs.get('start_node')
-    if start_node not in nodes:
-        start_node = list(nodes.keys())[0]
-
-    # ========== BƯỚC 2: Xây dựng Adjacency List ==========
-    adj = {node_id: [] for node_id in nodes}
-    for edge in raw_edges:
-        src = edge['source']
-        tgt = edge['target']
-        edge_id = edge['id']
-        adj[src].append({'neighbor': tgt, 'id': edge_id})
-        if not is_directed:
-            adj[tgt].append({'neighbor': src, 'id': edge_id})
-    
-    # Sắp xếp ngược để khi push vào Stack và pop ra sẽ theo thứ tự tăng dần (thẩm mỹ)
-    for u in adj:
-        adj[u].sort(key=lambda x: x['neighbor'], reverse=True)
-
-    # ========== BƯỚC 3: Khởi tạo DFS ==========
-    stack = [start_node]
-    visited = set() # Set các node đã duyệt (pop ra khỏi stack)
-    
-    # Lưu vết đường đi để highlight (tuỳ chọn)
-    path_edges = set() 
+    ids = list(graph.node_ids)
+    edge_ids = list(graph.edge_ids)
+    start = resolve_start(graph, kwargs)
 
-    steps.append({
-        'highlightNodes': {start_node: '#f59e0b'}, # Cam: Trong stack
-        'highlightEdges': {},
-        'description': f'Bắt đầu DFS. Đưa nút {start_node} vào Stack.'
-    })
+    # ========== BƯỚC 2: Trạng thái để highlight ==========
+    # Láng giềng duyệt theo id tăng dần (thẩm mỹ, giống cách cài đặt cũ)
+    csr = sorted_csr_lists(graph)
+    budget = get_budget(kwargs)
+    counters = get_counters(kwargs)
+    resume = kwargs.get('resume')
+    if resume is None:
+        core = dfs_state(graph.num_nodes, csr[0], graph.num_edges, graph.is_directed)
+        disc, fin = {}, {}
+        active = []          # Các nút đang trên Stack (đã phát hiện, chưa kết thúc)
+        edge_colors = {}     # Cạnh đã phân loại -> màu theo loại
+        kind_counts = [0, 0, 0, 0]
+        clock = 0
+    else:
+        core = resume['dfs']
+        disc, fin = dict(resume['disc']), dict(resume['fin'])
+        active = resume['active']
+        edge_colors = dict(resume['edges'])
+        kind_counts = resume['counts']
+        clock = resume['clock']
+
+    def labels():
+        return {ids[i]: f'{d}/{fin[i]}' if i in fin else str(d) for i, d in disc.items()}
+
+    def snapshot(current=None):
+        highlight = {ids[i]: '#10b981' for i in fin}          # Xanh lá: Đã kết thúc
+        highlight.update({ids[i]: '#f59e0b' for i in active})  # Cam: Đang trong Stack
+        if current is not None:
+            highlight[ids[current]] = '#3b82f6'                # Xanh dương: Đang xét
+        return highlight, dict(edge_colors)
+
+    steps = []
+
+    # ========== BƯỚC 3: Duyệt theo sự kiện của lõi DFS ==========
+    for event in iter_dfs(csr, graph.num_edges, graph.is_directed, [start], core):
+        kind = event[0]
+        if kind == DISCOVER:
+            _, v, u, e = event
+            disc[v] = clock
+            clock += 1
+            active.append(v)
+            if counters is not None:
+                counters.add('stackPushes')
+                if e >= 0:
+                    counters.add('edgeChecks')
+            if e >= 0:
+                edge_colors[edge_ids[e]] = EDGE_KIND_COLORS[TREE]
+                kind_counts[TREE] += 1
+                msg, args = 'dfs.discover', {'u': ids[u], 'v': ids[v], 'd': disc[v]}
+            else:
+                msg, args = 'dfs.start', {'v': ids[v], 'd': disc[v]}
+            highlight, edges = snapshot(v)
+            steps.append({
+                'highlightNodes': highlight,
+                'highlightEdges': edges,
+                'nodeLabels': labels(),
+                'msg': msg,
+                'args': args
+            })
 
-    # ========== BƯỚC 4: Vòng lặp Stack ==========
-    while stack:
-        # Lấy node từ đỉnh stack nhưng CHƯA pop ngay (để highlight trước)
-        u = stack.pop()
-        
-        if u in visited:
-            continue
-            
-        visited.add(u)
-        
-        steps.append({
-            'highlightNodes': {
-                **{n: '#10b981' for n in visited}, # Xanh lá: Đã visit
-                u: '#3b82f6'                       # Xanh dương: Đang xét
-            },
-            'highlightEdges': {e: '#10b981' for e in path_edges},
-            'description': f'Pop nút {u} từ Stack và đánh dấu đã thăm.'
-        })
-        
-        # Duyệt các hàng xóm
-        neighbors = adj[u]
-        for item in neighbors:
-            v = item['neighbor']
-            edge_id = item['id']
-            
-            # Nếu đã thăm rồi thì bỏ qua (hoặc highlight nhẹ)
-            if v in visited:
-                continue
-                
-            # Highlight cạnh đang xét
+        elif kind == FINISH:
+            _, u, _, _ = event
+            fin[u] = clock
+            clock += 1
+            active.pop()
+            if counters is not None:
+                counters.add('stackPops')
+            highlight, edges = snapshot()
             steps.append({
-                'highlightNodes': {
-                    **{n: '#10b981' for n in visited},
-                    u: '#3b82f6',
-                    v: '#f59e0b' # Cam: Mục tiêu tiềm năng
-                },
-                'highlightEdges': {
-                    **{e: '#10b981' for e in path_edges},
-                    edge_id: '#f59e0b'
-                },
-                'description': f'Xét hàng xóm {v} của {u}.'
+                'highlightNodes': highlight,
+                'highlightEdges': edges,
+                'nodeLabels': labels(),
+                'msg': 'dfs.finish',
+                'args': {'u': ids[u], 'f': fin[u]}
             })
-            
-            # Push vào stack
-            stack.append(v)
-            path_edges.add(edge_id) # Lưu cạnh này thuộc đường đi DFS
-            
+
+        else:
+            _, u, v, e, edge_kind = event
+            if counters is not None:
+                counters.add('edgeChecks')
+            edge_colors[edge_ids[e]] = EDGE_KIND_COLORS[edge_kind]
+            kind_counts[edge_kind] += 1
+            highlight, edges = snapshot(u)
             steps.append({
-                'highlightNodes': {
-                    **{n: '#10b981' for n in visited},
-                    u: '#3b82f6',
-                    v: '#f59e0b' # Cam: Đã vào stack
-                },
-                'highlightEdges': {
-                    **{e: '#10b981' for e in path_edges}
-                },
-                'description': f'Đẩy {v} vào Stack.'
+                'highlightNodes': highlight,
+                'highlightEdges': edges,
+                'nodeLabels': labels(),
+                'msg': EDGE_KIND_MESSAGES[edge_kind],
+                'args': {'u': ids[u], 'v': ids[v]}
             })
 
-    # ========== BƯỚC 5: Kết thúc ==========
+        if budget is not None and budget.exhausted(steps):
+            return suspend(steps, kwargs, budget, {
+                'dfs': core, 'disc': list(disc.items()), 'fin': list(fin.items()), 'active': active,
+                'edges': list(edge_colors.items()), 'counts': kind_counts, 'clock': clock,
+            })
+
+    # ========== BƯỚC 4: Kết thúc ==========
+    highlight, edges = snapshot()
     steps.append({
-        'highlightNodes': {n: '#10b981' for n in visited},
-        'highlightEdges': {e: '#10b981' for e in path_edges},
-        'description': 'Hoàn thành thuật toán DFS.'
+        'highlightNodes': highlight,
+        'highlightEdges': edges,
+        'nodeLabels': labels(),
+        'msg': 'dfs.done',
+        'args': {'visited': len(fin), **{EDGE_KIND_NAMES[k]: kind_counts[k] for k in (TREE, BACK, FORWARD, CROSS)}}
     })
-    
-    return steps
\ No newline at end of file
+
+    return steps
+
+
+def dfs_result(graph_data, **kwargs):
+    """
+    DFS chế độ "chỉ kết quả": rừng DFS phủ mọi nút (bắt đầu từ start_node, sau
+    đó lần lượt các nút chưa thăm), không sinh step.
+
+    Returns:
+        Dict: preorder, postorder, discovery, finish, parent, roots,
+        edgeKinds (edge_id -> 'tree' | 'back' | 'forward' | 'cross'), counts,
+        hasCycle (có cạnh ngược). kwargs 'counters' (counters.py) nhận số đếm suy ra
+        từ kết quả: stackPushes, stackPops, edgeChecks.
+    """
+    graph = as_graph_arrays(graph_data)
+    if graph.num_nodes == 0:
+        return {'preorder': [], 'postorder': [], 'discovery': {}, 'finish': {}, 'parent': {},
+                'roots': [], 'edgeKinds': {}, 'counts': dict.fromkeys(EDGE_KIND_NAMES, 0), 'hasCycle': False}
+
+    dfs = run_dfs(graph, resolve_start(graph, kwargs))
+    ids = graph.node_ids
+    edge_ids = graph.edge_ids
+    counts = [0, 0, 0, 0]
+    edge_kinds = {}
+    for e, k in enumerate(dfs['edge_kind']):
+        if k >= 0:
+            edge_kinds[edge_ids[e]] = EDGE_KIND_NAMES[k]
+            counts[k] += 1
+    counters = get_counters(kwargs)
+    if counters is not None:
+        counters.add('stackPushes', len(dfs['preorder']))
+        counters.add('stackPops', len(dfs['postorder']))
+        counters.add('edgeChecks', sum(counts))
+
+    return {
+        'preorder': [ids[i] for i in dfs['preorder']],
+        'postorder': [ids[i] for i in dfs['postorder']],
+        'discovery': {ids[i]: d for i, d in enumerate(dfs['disc'])},
+        'finish': {ids[i]: f for i, f in enumerate(dfs['fin'])},
+        'parent': {ids[i]: ids[p] if p >= 0 else None for i, p in enumerate(dfs['parent'])},
+        'roots': [ids[i] for i in dfs['preorder'] if dfs['parent'][i] < 0],
+        'edgeKinds': edge_kinds,
+        'counts': dict(zip(EDGE_KIND_NAMES, counts)),
+        'hasCycle': counts[BACK] > 0,
+    }
@@ -0,0 +1,208 @@
+"""
+dfs_core.py - Lõi DFS lặp (không đệ quy) dùng chung cho DFS, SCC, sắp xếp topo, cầu/khớp
+
+Duyệt trên CSR của GraphArrays với con trỏ cung cho từng nút (không đẩy mọi láng
+giềng vào stack), nên mỗi cung được xét đúng một lần và thời điểm phát hiện /
+kết thúc là chính xác như DFS đệ quy.
+
+iter_dfs() sinh ra dãy sự kiện:
+    (DISCOVER, u, parent, edge)   - phát hiện u qua cạnh edge (-1 nếu u là gốc)
+    (EDGE, u, v, edge, kind)      - cạnh không phải cây: BACK, FORWARD hoặc CROSS
+    (FINISH, u, parent, edge)     - kết thúc u (mọi cung ra đã xét)
+
+Đồ thị vô hướng: mỗi cạnh chỉ được phân loại một lần (TREE hoặc BACK), cạnh cây
+không bị xét lại theo chiều ngược; cạnh song song vẫn được tính là cạnh ngược.
+"""
+
+import numpy as np
+
+from .graph_arrays import as_graph_arrays
+
+DISCOVER, EDGE, FINISH = 0, 1, 2
+TREE, BACK, FORWARD, CROSS = 0, 1, 2, 3
+
+EDGE_KIND_NAMES = ('tree', 'back', 'forward', 'cross')
+
+# Màu cạnh theo loại trong visualization: cây xanh lá, ngược đỏ, xuôi tím, chéo xám
+EDGE_KIND_COLORS = ('#10b981', '#ef4444', '#8b5cf6', '#9ca3af')
+
+
+def sorted_csr_lists(graph):
+    """
+    CSR (dạng list) với láng giềng của mỗi nút sắp theo id (chuỗi) tăng dần - thứ
+    tự duyệt của các thuật toán có visualization.
+    """
+    offsets, targets, weights, eidx = graph.csr()
+    if len(targets):
+        rank = np.empty(graph.num_nodes, dtype=np.int64)
+        rank[np.argsort(np.array(list(graph.node_ids), dtype=object), kind='stable')] = np.arange(graph.num_nodes)
+        owner = np.repeat(np.arange(graph.num_nodes), np.diff(offsets))
+        order = np.lexsort((eidx, rank[targets], owner))
+        targets, weights, eidx = targets[order], weights[order], eidx[order]
+    return offsets.tolist(), targets.tolist(), weights.tolist(), eidx.tolist()
+
+
+def dfs_state(n, offsets, num_edges, directed):
+    """
+    Trạng thái ban đầu của iter_dfs(): chỉ gồm list/bytearray/số nên serialize
+    được để tạm dừng và tiếp tục duyệt (xem budget.py).
+    """
+    return {
+        'disc': [-1] * n,
+        'fin': [-1] * n,
+        'parent': [-1] * n,
+        'parent_edge': [-1] * n,
+        'ptr': list(offsets[:-1]),
+        'seen': None if directed else bytearray(num_edges),
+        'stack': [],
+    }
+
+
+def iter_dfs(csr, num_edges, directed, roots, state=None):
+    """
+    DFS lặp từ lần lượt các gốc trong `roots` (gốc đã được thăm thì bỏ qua).
+
+    Args:
+        csr: Tuple (offsets, targets, weights, edge_index) dạng list
+        num_edges: số cạnh gốc (kích thước mảng đánh dấu cạnh vô hướng)
+        directed: đồ thị có hướng hay không
+        roots: list/range chỉ số nút gốc
+        state: dict trạng thái (dfs_state()) - được cập nhật tại chỗ trước mỗi sự
+            kiện, nên sau bất kỳ sự kiện nào cũng có thể dừng rồi truyền lại state
+            (cùng csr, roots) để duyệt tiếp. Đồng hồ được suy ra từ disc/fin khi
+            tiếp tục, gốc đã thăm bị bỏ qua, nên vòng lặp không ghi thêm gì vào state.
+
+    Yields:
+        Sự kiện DISCOVER / EDGE / FINISH (xem docstring module). Thời điểm phát
+        hiện/kết thúc là thứ tự của sự kiện DISCOVER/FINISH (xem run_dfs()).
+    """
+    offsets, targets, _, eidx = csr
+    if state is None:
+        state = dfs_state(len(offsets) - 1, offsets, num_edges, directed)
+    disc = state['disc']
+    fin = state['fin']
+    parent = state['parent']
+    parent_edge = state['parent_edge']
+    ptr = state['ptr']
+    seen = state['seen']
+    stack = state['stack']
+    clock = max(max(disc, default=-1), max(fin, default=-1)) + 1
+    num_roots = len(roots)
+    r = 0
+
+    while True:
+        if not stack:
+            while r < num_roots and disc[roots[r]] >= 0:
+                r += 1
+            if r == num_roots:
+                return
+            root = roots[r]
+            disc[root] = clock
+            clock += 1
+            stack.append(root)
+            yield DISCOVER, root, -1, -1
+
+        u = stack[-1]
+        a = ptr[u]
+        if a == offsets[u + 1]:
+            stack.pop()
+            fin[u] = clock
+            clock += 1
+            yield FINISH, u, parent[u], parent_edge[u]
+            continue
+        ptr[u] = a + 1
+
+        v = targets[a]
+        e = eidx[a]
+        if seen is not None:
+            # Vô hướng: bỏ chiều ngược của cạnh cây và cạnh đã phân loại
+            if seen[e]:
+                continue
+            seen[e] = 1
+
+        if disc[v] < 0:
+            disc[v] = clock
+            clock += 1
+            parent[v] = u
+            parent_edge[v] = e
+            stack.append(v)
+            yield DISCOVER, v, u, e
+        elif fin[v] < 0:
+            yield EDGE, u, v, e, BACK
+        elif disc[u] < disc[v]:
+            yield EDGE, u, v, e, FORWARD
+        else:
+            yield EDGE, u, v, e, CROSS
+
+
+def dfs_roots(n, start=None):
+    """Thứ tự gốc: start (nếu có) rồi lần lượt mọi nút còn lại."""
+    if start is None:
+        return range(n)
+    return [start] + [i for i in range(n) if i != start]
+
+
+def run_dfs(graph_data, start=None, all_roots=True, csr=None):
+    """
+    Chạy DFS đầy đủ và thu thập kết quả.
+
+    Args:
+        start: chỉ số nút bắt đầu (None = nút 0)
+        all_roots: True = phủ mọi nút (rừng DFS), False = chỉ thành phần chứa start
+        csr: CSR dạng list muốn dùng (mặc định graph.csr_lists())
+
+    Returns:
+        Dict: graph, disc, fin, parent, parent_edge, preorder, postorder,
+        edge_kind (list theo chỉ số cạnh, -1 nếu không được xét)
+    """
+    graph = as_graph_arrays(graph_data)
+    n = graph.num_nodes
+    csr = csr or graph.csr_lists()
+    start = 0 if start is None else start
+    roots = dfs_roots(n, start) if all_roots else [start]
+
+    disc = [-1] * n
+    fin = [-1] * n
+    parent = [-1] * n
+    parent_edge = [-1] * n
+    edge_kind = [-1] * graph.num_edges
+    preorder, postorder = [], []
+    clock = 0
+    if n:
+        for event in iter_dfs(csr, graph.num_edges, graph.is_directed, roots):
+            if event[0] == DISCOVER:
+                _, u, p, e = event
+                disc[u] = clock
+                parent[u] = p
+                parent_edge[u] = e
+                if e >= 0:
+                    edge_kind[e] = TREE
+                preorder.append(u)
+            elif event[0] == FINISH:
+                u = event[1]
+                fin[u] = clock
+                postorder.append(u)
+            else:
+                edge_kind[event[3]] = event[4]
+                continue
+            clock += 1
+
+    return {
+        'graph': graph,
+        'disc': disc,
+        'fin': fin,
+        'parent': parent,
+        'parent_edge': parent_edge,
+        'preorder': preorder,
+        'postorder': postorder,
+        'edge_kind': edge_kind,
+    }
+
+
+def resolve_start(graph, kwargs, key='start_node'):
+    """Chỉ số nút bắt đầu từ kwargs (start_node/source), mặc định nút đầu tiên."""
+    for k in (key, 'source'):
+        i = graph.resolve_node(kwargs.get(k))
+        if i is not None:
+            return i
+    return 0
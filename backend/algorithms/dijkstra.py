@@ -2,7 +2,14 @@
 Thuật toán Dijkstra - Tìm đường đi ngắn nhất (Shortest Path)
 """
 
-import heapq
+import numpy as np
+
+from .budget import get_budget, suspend
+from .counters import get_counters
+from .dense import dense_matrix, dijkstra_dense, pair_edges, use_dense
+from .graph_arrays import as_graph_arrays
+from .path_trees import export_tree
+from .priority_queue import dump_queue, load_queue, make_queue, weight_stats
 
 
 def dijkstra_algorithm(graph_data, **kwargs):
@@ -13,6 +20,12 @@ def dijkstra_algorithm(graph_data, **kwargs):
     kwargs:
         - source: id nút nguồn (bắt buộc, mặc định: nút đầu tiên)
         - target: id nút đích (tùy chọn, nếu không có thì tìm đường đến tất cả)
+        - queue: loại hàng đợi ưu tiên ('auto' | 'dary_heap' | 'dial' | 'lazy_heap' | 'dense');
+          'auto' chọn mảng quét O(V²) (ArrayQueue) trên đồ thị dày
+        - meta: dict nhận số liệu hàng đợi (meta['queue']); không có target thì cây
+          đường đi ngắn nhất được ghi vào meta['path_tree'] (xem path_trees.py)
+        - max_steps / max_ms / max_ops, resume: ngân sách và chạy tiếp (xem budget.py)
+        - counters: bộ đếm thao tác (xem counters.py)
     """
     
     # ========== BƯỚC 1: Parse dữ liệu đầu vào ==========
@@ -26,7 +39,7 @@ def dijkstra_algorithm(graph_data, **kwargs):
         steps.append({
             "highlightNodes": {},
             "highlightEdges": {},
-            "description": "Đồ thị rỗng. Vui lòng thêm ít nhất một nút.",
+            "msg": "graph.empty",
         })
         return steps
     
@@ -40,7 +53,7 @@ def dijkstra_algorithm(graph_data, **kwargs):
             steps.append({
                 "highlightNodes": {},
                 "highlightEdges": {},
-                "description": "Không có nút nào trong đồ thị để làm nguồn.",
+                "msg": "dijkstra.no_source",
             })
             return steps
         source = str(next(iter(nodes.keys())))
@@ -53,7 +66,8 @@ def dijkstra_algorithm(graph_data, **kwargs):
         steps.append({
             "highlightNodes": {},
             "highlightEdges": {},
-            "description": f"Nút nguồn '{source}' không tồn tại trong đồ thị. Các nút có sẵn: {available_nodes}",
+            "msg": "dijkstra.source_missing",
+            "args": {"source": source, "available": available_nodes},
         })
         return steps
     
@@ -68,13 +82,16 @@ def dijkstra_algorithm(graph_data, **kwargs):
             steps.append({
                 "highlightNodes": {source: "#3b82f6"},
                 "highlightEdges": {},
-                "description": f"Nút đích '{target}' không tồn tại trong đồ thị. Các nút có sẵn: {available_nodes}",
+                "msg": "dijkstra.target_missing",
+                "args": {"target": target, "available": available_nodes},
             })
             return steps
     else:
         target = None
     
     # ========== BƯỚC 3: Xây dựng adjacency list ==========
+    budget = get_budget(kwargs)
+    resume = kwargs.get("resume")
     adj = {u: [] for u in nodes.keys()}
     edge_map = {}  # Map (u, v) -> edge_id để truy vết đường đi
     
@@ -84,12 +101,13 @@ def dijkstra_algorithm(graph_data, **kwargs):
         w = float(e.get("weight", 1))
         eid = e["id"]
         
-        # Kiểm tra trọng số âm
-        if w < 0:
+        # Kiểm tra trọng số âm (đã cảnh báo ở trang đầu nếu đang chạy tiếp)
+        if w < 0 and resume is None:
             steps.append({
                 "highlightNodes": {},
                 "highlightEdges": {eid: "#ef4444"},
-                "description": f"Cảnh báo: Cạnh ({u}, {v}) có trọng số âm ({w}). Dijkstra không hỗ trợ trọng số âm!",
+                "msg": "dijkstra.negative",
+                "args": {"u": u, "v": v, "w": w},
             })
             # Vẫn thêm vào, nhưng có thể không cho kết quả chính xác
         
@@ -107,30 +125,47 @@ def dijkstra_algorithm(graph_data, **kwargs):
     distances[source] = 0.0
     previous = {}  # Truy vết đường đi: previous[v] = u nghĩa là đường ngắn nhất đến v đi qua u
     visited = set()
-    heap = [(0.0, source)]  # (distance, node)
-    
-    # Bước khởi tạo
-    node_labels = {source: "0"}
-    for node in nodes.keys():
-        if node != source:
-            node_labels[node] = "∞"
+
+    # Hàng đợi có chỉ số: mỗi nút một phần tử, cập nhật khoảng cách bằng decrease-key
+    node_list = list(nodes.keys())
+    node_index = {node: i for i, node in enumerate(node_list)}
+    queue = make_queue(
+        len(node_list),
+        len(edges) * (1 if is_directed else 2),
+        [float(e.get("weight", 1)) for e in edges],
+        kind=kwargs.get("queue", "auto"),
+    )
+    meta = kwargs.get("meta")
+    counters = get_counters(kwargs)
     
-    steps.append({
-        "highlightNodes": {source: "#3b82f6"},
-        "highlightEdges": {},
-        "nodeLabels": node_labels.copy(),
-        "description": f"Khởi tạo Dijkstra từ nút nguồn {source}. Khoảng cách ban đầu: {source} = 0, các nút khác = ∞.",
-    })
+    if resume is None:
+        queue.push(node_index[source], 0.0)
+
+        # Bước khởi tạo
+        node_labels = {source: "0"}
+        for node in nodes.keys():
+            if node != source:
+                node_labels[node] = "∞"
+
+        steps.append({
+            "highlightNodes": {source: "#3b82f6"},
+            "highlightEdges": {},
+            "nodeLabels": node_labels.copy(),
+            "msg": "dijkstra.init",
+            "args": {"source": source},
+        })
+    else:
+        distances.update(resume["distances"])
+        previous.update(resume["previous"])
+        visited.update(resume["visited"])
+        load_queue(queue, resume["queue"])
     
     # ========== BƯỚC 5: Vòng lặp chính Dijkstra ==========
     path_edges = set()  # Các cạnh thuộc đường đi ngắn nhất (để highlight cuối)
     
-    while heap:
-        dist_u, u = heapq.heappop(heap)
-        
-        # Bỏ qua nếu đã xử lý với khoảng cách nhỏ hơn
-        if u in visited:
-            continue
+    while queue:
+        i, dist_u = queue.pop()
+        u = node_list[i]
         
         # Đánh dấu đã thăm
         visited.add(u)
@@ -158,7 +193,8 @@ def dijkstra_algorithm(graph_data, **kwargs):
             "highlightNodes": {u: "#10b981"} | {v: "#3b82f6" for v in visited if v != u},
             "highlightEdges": highlight_edges,
             "nodeLabels": current_labels,
-            "description": f"Chọn nút {u} với khoảng cách ngắn nhất = {distances[u]}. Đánh dấu đã xử lý.",
+            "msg": "dijkstra.select",
+            "args": {"u": u, "d": distances[u]},
         })
         
         # Nếu đã tìm thấy đích, có thể dừng sớm (tùy chọn)
@@ -179,11 +215,16 @@ def dijkstra_algorithm(graph_data, **kwargs):
                 if edge_id:
                     path_edges.add(edge_id)
             
+            if meta is not None:
+                meta["queue"] = queue.stats()
+            if counters is not None:
+                counters.add_queue(queue.stats())
             steps.append({
                 "highlightNodes": {node: "#10b981" for node in path} | {u: "#3b82f6" for u in visited if u not in path},
                 "highlightEdges": {eid: "#10b981" for eid in path_edges},
                 "nodeLabels": current_labels,
-                "description": f"Tìm thấy đường đi ngắn nhất từ {source} đến {target}: {' -> '.join(path)}, tổng độ dài = {distances[target]}.",
+                "msg": "dijkstra.found",
+                "args": {"source": source, "target": target, "path": path, "d": distances[target]},
             })
             return steps
         
@@ -198,8 +239,11 @@ def dijkstra_algorithm(graph_data, **kwargs):
                 old_dist = distances[v]
                 distances[v] = new_dist
                 previous[v] = u
-                heapq.heappush(heap, (new_dist, v))
+                queue.push(node_index[v], new_dist)
                 relaxed_edges.append((v, w, eid, old_dist))
+        if counters is not None:
+            counters.add("edgeScans", len(adj[u]))
+            counters.add("relaxations", len(relaxed_edges))
         
         # Hiển thị bước relaxation
         if relaxed_edges:
@@ -219,11 +263,28 @@ def dijkstra_algorithm(graph_data, **kwargs):
                 "highlightEdges": highlight_edges,
                 "nodeLabels": relaxed_labels,
                 "edgeLabels": {eid: str(w) for _, w, eid, _ in relaxed_edges},
-                "description": f"Cập nhật khoảng cách các nút kề của {u}: " + 
-                              ", ".join([f"{v}: {old_dist if old_dist != INF else '∞'} → {distances[v]} (qua cạnh {w})" 
-                                        for v, w, eid, old_dist in relaxed_edges]),
+                "msg": "dijkstra.relax",
+                "args": {"u": u, "updates": [(v, old_dist if old_dist != INF else None, distances[v], w)
+                                             for v, w, eid, old_dist in relaxed_edges]},
+            })
+
+        if budget is not None and queue and budget.exhausted(steps):
+            if meta is not None:
+                meta["queue"] = queue.stats()
+            if counters is not None:
+                counters.add_queue(queue.stats())
+            return suspend(steps, kwargs, budget, {
+                "distances": [(node, d) for node, d in distances.items() if d != INF],
+                "previous": list(previous.items()),
+                "visited": list(visited),
+                "queue": dump_queue(queue),
             })
     
+    if meta is not None:
+        meta["queue"] = queue.stats()
+    if counters is not None:
+        counters.add_queue(queue.stats())
+
     # ========== BƯỚC 6: Kết quả cuối cùng ==========
     # Nếu có đích nhưng chưa tìm thấy
     if target is not None and target not in visited:
@@ -231,7 +292,8 @@ def dijkstra_algorithm(graph_data, **kwargs):
             "highlightNodes": {n: "#ef4444" for n in nodes.keys() if n not in visited},
             "highlightEdges": {},
             "nodeLabels": {node: str(distances[node]) if distances[node] != INF else "∞" for node in nodes.keys()},
-            "description": f"Không tìm thấy đường đi từ {source} đến {target}. Đồ thị có thể không liên thông.",
+            "msg": "dijkstra.unreachable",
+            "args": {"source": source, "target": target},
         })
         return steps
     
@@ -257,6 +319,8 @@ def dijkstra_algorithm(graph_data, **kwargs):
             edge_id = edge_map.get((u, v))
             if edge_id:
                 path_edges.add(edge_id)
+        # Giữ lại cả cây để truy vấn đường đi tới đích khác không phải chạy lại
+        export_tree(meta, source, distances, previous)
     
     final_labels = {node: str(distances[node]) if distances[node] != INF else "∞" for node in nodes.keys()}
     
@@ -264,10 +328,220 @@ def dijkstra_algorithm(graph_data, **kwargs):
         "highlightNodes": {n: "#10b981" if distances[n] != INF else "#ef4444" for n in nodes.keys()},
         "highlightEdges": {eid: "#10b981" for eid in path_edges},
         "nodeLabels": final_labels,
-        "description": f"Hoàn thành Dijkstra từ {source}. " + 
-                      (f"Khoảng cách đến {target}: {distances[target]}." if target else 
-                       "Đã tìm khoảng cách ngắn nhất đến tất cả các nút."),
+        "msg": "dijkstra.done_target" if target else "dijkstra.done_all",
+        "args": {"source": source, "target": target, "d": distances[target]} if target else {"source": source},
     })
     
     return steps
 
+
+def dijkstra_csr(csr, source, target=None, heuristic=None, queue='lazy_heap', stats=None, meta=None,
+                 counters=None):
+    """
+    Dijkstra (hoặc A* nếu có heuristic) trên danh sách kề CSR dạng list Python.
+    Không sinh step; dùng cho các engine "chỉ kết quả".
+
+    Args:
+        csr: Tuple (offsets, targets, weights, edge_index) - xem GraphArrays.csr_lists()
+        source: Chỉ số nút nguồn
+        target: Chỉ số nút đích (tùy chọn) - dừng ngay khi chốt được target
+        heuristic: List/mảng cận dưới h[v] của d(v, target), phải nhất quán (consistent)
+        queue: loại hàng đợi (xem priority_queue.make_queue); 'auto' chọn Dial nếu
+            trọng số là số nguyên nhỏ, ngược lại heapq
+        stats: weight_stats() của đồ thị nếu đã có (tránh tính lại trên list)
+        meta: dict nhận số liệu hàng đợi (meta['queue'])
+        counters: Counters (tùy chọn); số đếm được suy ra sau vòng lặp, vòng lặp
+            không tốn thêm gì
+
+    Returns:
+        Tuple (dist, pred, pred_edge, settled): pred[v] là nút trước v,
+        pred_edge[v] là chỉ số cạnh gốc, settled là số nút đã chốt.
+    """
+    offsets, targets, weights, eidx = csr
+    n = len(offsets) - 1
+    INF = float('inf')
+    dist = [INF] * n
+    pred = [-1] * n
+    pred_edge = [-1] * n
+    done = [False] * n
+    h = heuristic
+
+    # Priority của A* là số thực dist + h: không dùng được hàng đợi Dial
+    if h is not None and queue == 'auto':
+        queue = 'lazy_heap'
+    elif h is not None and queue == 'dial':
+        raise ValueError("Hàng đợi Dial không dùng được với A* (landmarks).")
+    q = make_queue(n, len(targets), weights, kind=queue, stats=stats, fallback='lazy_heap')
+    push, pop = q.push, q.pop
+
+    dist[source] = 0.0
+    push(source, h[source] if h is not None else 0.0)
+    settled = 0
+
+    while q:
+        u, _ = pop()
+        done[u] = True
+        settled += 1
+        if u == target:
+            break
+
+        du = dist[u]
+        for a in range(offsets[u], offsets[u + 1]):
+            v = targets[a]
+            if done[v]:
+                continue
+            nd = du + weights[a]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                pred_edge[v] = eidx[a]
+                if h is None:
+                    push(v, nd)
+                elif h[v] != INF:
+                    # h[v] = ∞: v không thể tới target, khỏi đưa vào hàng đợi
+                    push(v, nd + h[v])
+
+    if meta is not None:
+        meta['queue'] = q.stats()
+    if counters is not None:
+        # Mỗi lần nới lỏng thành công là một push hoặc decrease-key (trừ push của nguồn;
+        # với A*, nút có h = ∞ không được đưa vào hàng đợi nên không được tính)
+        queue_stats = q.stats()
+        counters.add_queue(queue_stats)
+        counters.add('relaxations', queue_stats['pushes'] + queue_stats['decreaseKeys'] - 1)
+        counters.add('edgeScans', sum(offsets[u + 1] - offsets[u] for u in range(n) if done[u]))
+    return dist, pred, pred_edge, settled
+
+
+def dijkstra_result(graph_data, **kwargs):
+    """
+    Dijkstra chế độ "chỉ kết quả" (không sinh step) trên biểu diễn mảng.
+
+    kwargs:
+        - source: id nút nguồn (bắt buộc)
+        - target: id nút đích (tùy chọn)
+        - landmarks: số landmark K (hoặc True = mặc định) để chạy A* với cận dưới
+          ALT; cần target. Bảng khoảng cách landmark được cache theo hash đồ thị.
+        - queue: loại hàng đợi ưu tiên (mặc định 'auto'); không có landmarks thì đồ thị
+          dày ('auto') hoặc queue='dense' dùng engine ma trận O(V²) (dense.py)
+        - engine: 'delta_stepping' để dùng delta-stepping NumPy (delta_stepping.py, trọng
+          số không âm); delta là độ rộng bucket (mặc định tự chọn); executor / workers
+          là process pool để chia các pha lớn
+        - meta: dict nhận số liệu hàng đợi (meta['queue']) và cây đường đi ngắn nhất
+          khi không có target (meta['path_tree'], xem path_trees.py)
+        - counters: bộ đếm thao tác (xem counters.py)
+    """
+    graph = as_graph_arrays(graph_data)
+    if graph.num_nodes == 0:
+        raise ValueError("Đồ thị rỗng. Vui lòng thêm ít nhất một nút.")
+
+    source = graph.resolve_node(kwargs.get("source"))
+    if source is None:
+        raise ValueError(f"Nút nguồn '{kwargs.get('source')}' không tồn tại trong đồ thị.")
+    target = graph.resolve_node(kwargs.get("target"))
+    if kwargs.get("target") not in (None, "") and target is None:
+        raise ValueError(f"Nút đích '{kwargs.get('target')}' không tồn tại trong đồ thị.")
+
+    ids = graph.node_ids
+    result = {"source": ids[source], "target": ids[target] if target is not None else None}
+    has_negative = graph.num_edges > 0 and float(graph.weight.min()) < 0
+    if has_negative:
+        result["warning"] = "Đồ thị có cạnh trọng số âm. Dijkstra có thể cho kết quả sai."
+
+    heuristic = None
+    landmarks = kwargs.get("landmarks")
+    if kwargs.get("engine") == "delta_stepping" and not (landmarks and target is not None):
+        from .delta_stepping import delta_stepping
+        dist, pred, pred_edge, info = delta_stepping(
+            graph, source, kwargs.get("delta"), kwargs.get("executor"), int(kwargs.get("workers") or 1),
+            get_counters(kwargs),
+        )
+        result["engine"] = "delta_stepping"
+        result.update(info)
+        return _finish_result(graph, source, target, result, dist.tolist(), pred.tolist(), pred_edge.tolist(),
+                              int(np.count_nonzero(dist < np.inf)), kwargs.get("meta"))
+    if not (landmarks and target is not None) and use_dense(graph, kwargs.get("queue", "auto")):
+        result["engine"] = "dense"
+        return _dense_result(graph, source, target, result, get_counters(kwargs), kwargs.get("meta"))
+    if landmarks and target is not None:
+        if has_negative:
+            raise ValueError("Landmark (ALT) yêu cầu mọi trọng số không âm.")
+        from .landmarks import DEFAULT_LANDMARKS, get_landmark_index
+        k = DEFAULT_LANDMARKS if landmarks is True else int(landmarks)
+        index = get_landmark_index(graph, k)
+        heuristic = index.lower_bounds(target).tolist()
+        result["engine"] = "alt"
+        result["graphHash"] = index.graph_hash
+        result["landmarks"] = [ids[i] for i in index.landmarks]
+    else:
+        result["engine"] = "dijkstra"
+
+    dist, pred, pred_edge, settled = dijkstra_csr(
+        graph.csr_lists(), source, target, heuristic,
+        queue=kwargs.get("queue", "auto"), stats=weight_stats(graph.weight), meta=kwargs.get("meta"),
+        counters=get_counters(kwargs),
+    )
+    return _finish_result(graph, source, target, result, dist, pred, pred_edge, settled, kwargs.get("meta"))
+
+
+def _finish_result(graph, source, target, result, dist, pred, pred_edge, settled, meta=None):
+    """Dựng kết quả của dijkstra_result() từ dist / pred / pred_edge dạng list theo chỉ số nút."""
+    ids = graph.node_ids
+    result["settled"] = settled
+
+    if target is None:
+        result["distances"] = {ids[i]: (d if d != float("inf") else None) for i, d in enumerate(dist)}
+        result["predecessors"] = {ids[i]: (ids[p] if p >= 0 else None) for i, p in enumerate(pred)}
+        export_tree(meta, ids[source], dist, pred, pred_edge)
+        return result
+
+    if dist[target] == float("inf"):
+        result.update({"path": [], "pathEdges": [], "distance": None})
+        return result
+
+    path, path_edges = [target], []
+    while pred[path[-1]] >= 0:
+        path_edges.append(graph.edge_ids[pred_edge[path[-1]]])
+        path.append(pred[path[-1]])
+    path.reverse()
+    path_edges.reverse()
+    result.update({
+        "path": [ids[i] for i in path],
+        "pathEdges": path_edges,
+        "distance": dist[target],
+    })
+    return result
+
+
+def _dense_result(graph, source, target, result, counters=None, meta=None):
+    """Phần còn lại của dijkstra_result() với engine ma trận (cùng định dạng kết quả)."""
+    dist, pred, settled = dijkstra_dense(dense_matrix(graph), source, target)
+    result["settled"] = settled
+    if counters is not None:
+        # Mỗi nút được chốt quét cả một hàng V phần tử của ma trận (trừ target: dừng ngay)
+        rows = settled - (target is not None and dist[target] != np.inf)
+        counters.add("pops", settled)
+        counters.add("edgeScans", int(rows) * graph.num_nodes)
+    ids = graph.node_ids
+
+    if target is None:
+        result["distances"] = {ids[i]: (d if d != np.inf else None) for i, d in enumerate(dist.tolist())}
+        result["predecessors"] = {ids[i]: (ids[p] if p >= 0 else None) for i, p in enumerate(pred.tolist())}
+        export_tree(meta, ids[source], dist, pred)
+        return result
+
+    if dist[target] == np.inf:
+        result.update({"path": [], "pathEdges": [], "distance": None})
+        return result
+
+    path = [target]
+    while pred[path[-1]] >= 0:
+        path.append(int(pred[path[-1]]))
+    path.reverse()
+    edges = pair_edges(graph, path[:-1], path[1:])
+    result.update({
+        "path": [ids[i] for i in path],
+        "pathEdges": [graph.edge_ids[e] for e in edges.tolist()],
+        "distance": float(dist[target]),
+    })
+    return result
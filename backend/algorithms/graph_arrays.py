@@ -0,0 +1,417 @@
+"""
+graph_arrays.py - Biểu diễn đồ thị dạng mảng NumPy cho các engine "chỉ kết quả" (result-only)
+
+Thay vì list các dict {'source', 'target', 'weight', 'id'}, đồ thị được lưu thành:
+    - node_ids: list id nút (chuỗi), chỉ số i <-> node_ids[i]
+    - src, dst: mảng int64 chỉ số hai đầu mút của mỗi cạnh
+    - weight:   mảng float64 trọng số
+    - edge_ids: list id cạnh (hoặc IdTable), cùng thứ tự với src/dst/weight
+    - x, y:     mảng float64 tọa độ nút (None nếu đồ thị không có tọa độ)
+
+Đồ thị do server sinh ra (generators.py) dùng RangeIds cho node_ids/edge_ids để
+không phải tạo hàng triệu chuỗi id; đồ thị của thư viện trên đĩa (graph_library.py)
+dùng MappedIds đọc thẳng từ file được memory-map.
+"""
+
+import hashlib
+import sys
+from array import array
+
+import numpy as np
+
+
+class RangeIds:
+    """Dãy id f'{prefix}{i}' với i = 0..n-1, không lưu từng chuỗi."""
+
+    def __init__(self, n, prefix=''):
+        self.n = int(n)
+        self.prefix = prefix
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.n))]
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        return f'{self.prefix}{i}'
+
+    def __iter__(self):
+        prefix = self.prefix
+        return (f'{prefix}{i}' for i in range(self.n))
+
+
+class IdTable:
+    """
+    Dãy id lưu gọn trong một buffer UTF-8 + mảng offset (không giữ từng đối tượng
+    chuỗi), dùng cho edge_ids của đồ thị đọc theo luồng (ingest.py). Id số nguyên
+    được trả lại dạng int, mọi id khác dạng chuỗi.
+    """
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array('q', [0])
+        self._is_int = bytearray()
+
+    def append(self, value):
+        self._is_int.append(type(value) is int)
+        self._data += str(value).encode('utf-8')
+        self._offsets.append(len(self._data))
+
+    def __len__(self):
+        return len(self._is_int)
+
+    @property
+    def nbytes(self):
+        return len(self._data) + self._offsets.itemsize * len(self._offsets) + len(self._is_int)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        value = self._data[self._offsets[i]:self._offsets[i + 1]].decode('utf-8')
+        return int(value) if self._is_int[i] else value
+
+    def __iter__(self):
+        data, offsets, is_int = self._data, self._offsets, self._is_int
+        for i in range(len(is_int)):
+            value = data[offsets[i]:offsets[i + 1]].decode('utf-8')
+            yield int(value) if is_int[i] else value
+
+
+class MappedIds:
+    """
+    Dãy id trong các mảng NumPy (thường là memory-map của thư viện đồ thị): buffer
+    UTF-8 data, offsets (id i là data[offsets[i]:offsets[i + 1]]), is_int (id số nguyên
+    trả lại dạng int như IdTable, None nếu mọi id là chuỗi) và order - các chỉ số xếp
+    theo id tăng dần để tra ngược bằng tìm kiếm nhị phân (None nếu không cần tra ngược).
+    """
+
+    def __init__(self, data, offsets, is_int=None, order=None):
+        self.data = data
+        self.offsets = offsets
+        self.is_int = is_int
+        self.order = order
+
+    @classmethod
+    def encode(cls, ids, sort=False):
+        """Các mảng (data, offsets, is_int, order) của một dãy id bất kỳ."""
+        encoded = [str(v).encode('utf-8') for v in ids]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        is_int = np.fromiter((type(v) is int for v in ids), dtype=np.uint8, count=len(encoded))
+        order = None
+        if sort:
+            # So sánh bytes UTF-8 cùng thứ tự với so sánh chuỗi theo code point
+            order = np.array(sorted(range(len(encoded)), key=encoded.__getitem__), dtype=np.int64)
+        return data, offsets, is_int if is_int.any() else None, order
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.data, self.offsets, self.is_int, self.order) if a is not None)
+
+    def _bytes(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        value = self._bytes(i).decode('utf-8')
+        return int(value) if self.is_int is not None and self.is_int[i] else value
+
+    def __iter__(self):
+        data = self.data.tobytes() if len(self.data) else b''
+        offsets = self.offsets.tolist()
+        is_int = self.is_int.tolist() if self.is_int is not None else None
+        for i in range(len(offsets) - 1):
+            value = data[offsets[i]:offsets[i + 1]].decode('utf-8')
+            yield int(value) if is_int is not None and is_int[i] else value
+
+    def find(self, value):
+        """Chỉ số của id value (chuỗi) theo order, hoặc None."""
+        key = value.encode('utf-8')
+        order = self.order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and self._bytes(order[lo]) == key:
+            return int(order[lo])
+        return None
+
+
+class _MappedIndex:
+    """Ánh xạ ngược id -> chỉ số của MappedIds (tìm kiếm nhị phân, không dựng dict)."""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def get(self, node_id, default=None):
+        if not isinstance(node_id, str):
+            return default
+        i = self.ids.find(node_id)
+        return default if i is None else i
+
+    def __getitem__(self, node_id):
+        i = self.get(node_id)
+        if i is None:
+            raise KeyError(node_id)
+        return i
+
+    def __contains__(self, node_id):
+        return self.get(node_id) is not None
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class _RangeIndex:
+    """Ánh xạ ngược id -> chỉ số của RangeIds, tính trực tiếp từ chuỗi id."""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def get(self, node_id, default=None):
+        prefix = self.ids.prefix
+        if not isinstance(node_id, str) or not node_id.startswith(prefix):
+            return default
+        digits = node_id[len(prefix):]
+        # Chỉ nhận dạng chuẩn ('7', không nhận '07' hay '+7')
+        if not digits.isdigit() or (len(digits) > 1 and digits[0] == '0'):
+            return default
+        i = int(digits)
+        return i if i < self.ids.n else default
+
+    def __getitem__(self, node_id):
+        i = self.get(node_id)
+        if i is None:
+            raise KeyError(node_id)
+        return i
+
+    def __contains__(self, node_id):
+        return self.get(node_id) is not None
+
+    def __len__(self):
+        return self.ids.n
+
+
+
+class GraphArrays:
+    def __init__(self, node_ids, src, dst, weight, edge_ids, is_directed=False, x=None, y=None):
+        self.node_ids = node_ids if isinstance(node_ids, (RangeIds, MappedIds)) else list(node_ids)
+        self.src = np.asarray(src, dtype=np.int64)
+        self.dst = np.asarray(dst, dtype=np.int64)
+        self.weight = np.asarray(weight, dtype=np.float64)
+        self.edge_ids = edge_ids if isinstance(edge_ids, (RangeIds, IdTable, MappedIds)) else list(edge_ids)
+        self.is_directed = bool(is_directed)
+        self.x = None if x is None else np.asarray(x, dtype=np.float64)
+        self.y = None if y is None else np.asarray(y, dtype=np.float64)
+        # Gợi ý tham số chạy (ví dụ source/sink của mạng luồng do generator sinh ra)
+        self.hints = {}
+        self._index = None
+        self._arcs = None
+        self._csr = None
+        self._csr_lists = None
+        self._hash = None
+        self._coords_hash = None
+
+    @classmethod
+    def from_graph_data(cls, graph_data):
+        """
+        Chuyển graph_data (định dạng của frontend) sang dạng mảng.
+        ID được ép kiểu về string; cạnh có đầu mút không tồn tại bị bỏ qua.
+        """
+        nodes = graph_data.get('nodes', [])
+        node_ids = [str(n['id']) for n in nodes]
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+        src, dst, weight, edge_ids = [], [], [], []
+        for e in graph_data.get('edges', []):
+            u = index.get(str(e['source']))
+            v = index.get(str(e['target']))
+            if u is None or v is None:
+                continue
+            src.append(u)
+            dst.append(v)
+            weight.append(float(e.get('weight', 1)))
+            edge_ids.append(e['id'])
+
+        x = y = None
+        if nodes and all(isinstance(n.get('x'), (int, float)) and isinstance(n.get('y'), (int, float))
+                         for n in nodes):
+            x = [n['x'] for n in nodes]
+            y = [n['y'] for n in nodes]
+
+        return cls(node_ids, src, dst, weight, edge_ids, graph_data.get('isDirected', False), x, y)
+
+    def to_graph_data(self):
+        """
+        Chuyển ngược về graph_data (định dạng của frontend) cho các thuật toán
+        có visualization vốn làm việc trên list dict.
+        """
+        node_ids = list(self.node_ids)
+        if self.x is not None and self.y is not None:
+            nodes = [{'id': node_id, 'x': x, 'y': y}
+                     for node_id, x, y in zip(node_ids, self.x.tolist(), self.y.tolist())]
+        else:
+            nodes = [{'id': node_id} for node_id in node_ids]
+
+        weights = self.weight.tolist()
+        # Giữ trọng số nguyên ở dạng int như dữ liệu frontend gửi lên
+        if self.num_edges and np.array_equal(self.weight, np.round(self.weight)):
+            weights = [int(w) for w in weights]
+        edges = [
+            {'id': edge_id, 'source': node_ids[u], 'target': node_ids[v], 'weight': w,
+             'isDirected': self.is_directed}
+            for edge_id, u, v, w in zip(self.edge_ids, self.src.tolist(), self.dst.tolist(), weights)
+        ]
+        return {'nodes': nodes, 'edges': edges, 'isDirected': self.is_directed}
+
+    @property
+    def index(self):
+        """Ánh xạ id nút -> chỉ số (tạo lười, xem id_index)."""
+        if self._index is None:
+            self._index = id_index(self.node_ids)
+        return self._index
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_ids)
+
+    def arcs(self):
+        """
+        Danh sách cung có hướng (u, v, w, edge_index). Đồ thị vô hướng được nhân
+        đôi thành hai chiều; edge_index trỏ về cạnh gốc để tra edge_ids.
+        """
+        if self._arcs is None:
+            eidx = np.arange(self.num_edges, dtype=np.int64)
+            if self.is_directed:
+                self._arcs = (self.src, self.dst, self.weight, eidx)
+            else:
+                self._arcs = (
+                    np.concatenate([self.src, self.dst]),
+                    np.concatenate([self.dst, self.src]),
+                    np.concatenate([self.weight, self.weight]),
+                    np.concatenate([eidx, eidx]),
+                )
+        return self._arcs
+
+    def csr(self):
+        """
+        Danh sách kề dạng CSR: cung ra của nút i nằm trong [offsets[i], offsets[i + 1]).
+
+        Returns:
+            Tuple (offsets, targets, weights, edge_index)
+        """
+        if self._csr is None:
+            u, v, w, eidx = self.arcs()
+            order = np.argsort(u, kind='stable')
+            counts = np.bincount(u, minlength=self.num_nodes)
+            offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            self._csr = (offsets, v[order], w[order], eidx[order])
+        return self._csr
+
+    def csr_lists(self):
+        """CSR dưới dạng list Python (truy cập từng phần tử nhanh hơn mảng NumPy trong vòng lặp)."""
+        if self._csr_lists is None:
+            self._csr_lists = tuple(a.tolist() for a in self.csr())
+        return self._csr_lists
+
+    def reversed(self):
+        """Đồ thị đảo chiều mọi cạnh (vô hướng thì trả về chính nó)."""
+        if not self.is_directed:
+            return self
+        rev = GraphArrays.__new__(GraphArrays)
+        rev.__dict__.update(self.__dict__)
+        rev.src, rev.dst = self.dst, self.src
+        rev._arcs = rev._csr = rev._csr_lists = None
+        rev._hash = None
+        return rev
+
+    def content_hash(self):
+        """Hash nội dung đồ thị (id nút, cạnh, trọng số, hướng) để làm khóa cache."""
+        if self._hash is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(b'D' if self.is_directed else b'U')
+            for ids in (self.node_ids, self.edge_ids):
+                if isinstance(ids, RangeIds):
+                    h.update(f'\x02{ids.prefix}\x02{ids.n}'.encode('utf-8'))
+                else:
+                    h.update('\x00'.join(map(str, ids)).encode('utf-8'))
+                h.update(b'\x01')
+            for arr in (self.src, self.dst, self.weight):
+                h.update(np.ascontiguousarray(arr).tobytes())
+            self._hash = h.hexdigest()
+        return self._hash
+
+    def coords_hash(self):
+        """
+        Hash tọa độ x/y của nút ('' nếu không có tọa độ). content_hash() không gồm tọa
+        độ (thuật toán không dùng), nên cache phụ thuộc vị trí nút (viewport) phải
+        ghép thêm hash này.
+        """
+        if self._coords_hash is None:
+            if self.x is None or self.y is None:
+                self._coords_hash = ''
+            else:
+                h = hashlib.blake2b(digest_size=8)
+                h.update(np.ascontiguousarray(self.x).tobytes())
+                h.update(np.ascontiguousarray(self.y).tobytes())
+                self._coords_hash = h.hexdigest()
+        return self._coords_hash
+
+    def resolve_node(self, node_id, default=None):
+        """Chỉ số của node_id (ép về string), hoặc default nếu không tồn tại."""
+        if node_id is None or node_id == '':
+            return default
+        return self.index.get(str(node_id), default)
+
+
+def id_index(node_ids):
+    """Ánh xạ id nút -> chỉ số của một dãy id (RangeIds / MappedIds tự tra ngược được)."""
+    if isinstance(node_ids, RangeIds):
+        return _RangeIndex(node_ids)
+    if isinstance(node_ids, MappedIds) and node_ids.order is not None:
+        return _MappedIndex(node_ids)
+    return {node_id: i for i, node_id in enumerate(node_ids)}
+
+
+def ids_nbytes(ids):
+    """Ước lượng bộ nhớ (byte) của một dãy id hoặc ánh xạ ngược của nó."""
+    if isinstance(ids, (RangeIds, _RangeIndex, _MappedIndex)):
+        return 0
+    if isinstance(ids, (IdTable, MappedIds)):
+        return ids.nbytes
+    if isinstance(ids, dict):
+        # Khóa là chính các chuỗi của node_ids, đã được tính ở dãy id
+        return sys.getsizeof(ids)
+    return sys.getsizeof(ids) + sum(sys.getsizeof(v) for v in ids)
+
+
+def as_graph_arrays(graph):
+    """Nhận graph_data dạng dict hoặc GraphArrays, trả về GraphArrays."""
+    if isinstance(graph, GraphArrays):
+        return graph
+    return GraphArrays.from_graph_data(graph)
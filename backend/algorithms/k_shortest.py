@@ -0,0 +1,320 @@
+"""
+k_shortest.py - K đường đi ngắn nhất không lặp (Yen's algorithm)
+
+Tối ưu so với cài đặt Yen "sách giáo khoa":
+- Không sao chép đồ thị cho mỗi lần tìm spur path: nút/cung bị cấm được đánh
+  dấu bằng mặt nạ bytearray trên mảng kề CSR rồi gỡ ra sau.
+- Dùng lại công việc của root path: các đường đã chọn được lưu trong một trie
+  theo cung, nên cung cần cấm tại spur node thứ i chính là các nhánh con của trie
+  ở độ sâu i; nút của root path được cấm dần theo i thay vì cấm lại từ đầu.
+- Chỉ xét spur node từ vị trí rẽ nhánh (deviation index) của đường trước (Lawler).
+- Khoảng cách tới đích trên đồ thị gốc (Dijkstra ngược một lần) là cận dưới hợp lệ
+  khi cấm bớt nút/cung, nên mọi spur search là A* với heuristic gần như chính xác.
+- Ứng viên đi qua heap có khử trùng lặp (set các đường đã thấy).
+"""
+
+import heapq
+
+import numpy as np
+
+from .budget import get_budget, suspend
+from .dijkstra import dijkstra_csr
+from .graph_arrays import as_graph_arrays
+
+INF = float('inf')
+
+
+def _spur_search(csr, arc_src, h, source, target, banned_nodes, banned_arcs):
+    """
+    A* từ source tới target, bỏ qua nút/cung bị cấm.
+
+    Returns:
+        Tuple (cost, arcs, settled): arcs là list vị trí cung CSR, None nếu không có đường.
+    """
+    offsets, targets, weights, _ = csr
+    dist = {source: 0.0}
+    pred_arc = {}
+    done = set()
+    heap = [(h[source], source)]
+    settled = 0
+
+    while heap:
+        _, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+        settled += 1
+        if u == target:
+            arcs = []
+            while u != source:
+                a = pred_arc[u]
+                arcs.append(a)
+                u = arc_src[a]
+            arcs.reverse()
+            return dist[target], arcs, settled
+
+        du = dist[u]
+        for a in range(offsets[u], offsets[u + 1]):
+            if banned_arcs[a]:
+                continue
+            v = targets[a]
+            if banned_nodes[v] or h[v] == INF:
+                continue
+            nd = du + weights[a]
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                pred_arc[v] = a
+                heapq.heappush(heap, (nd + h[v], v))
+
+    return None, None, settled
+
+
+def _yen_state():
+    return {'accepted': [], 'deviation': [], 'candidates': [], 'seen': set(),
+            'stats': {'spurSearches': 0, 'settled': 0}}
+
+
+def iter_yen(graph, source, target, k, state=None):
+    """
+    Lõi Yen trên GraphArrays (chỉ số nguyên), sinh lần lượt từng đường.
+
+    Args:
+        state: dict trạng thái (_yen_state()) cập nhật tại chỗ trước mỗi đường sinh
+            ra; truyền lại state (đã qua JSON cũng được) để tìm tiếp các đường sau.
+            Trie và cận dưới h được dựng lại từ đồ thị và các đường đã chọn.
+
+    Yields:
+        Tuple (cost, arcs) theo cost tăng dần; state['stats'] gồm spurSearches và settled.
+    """
+    offsets, targets, weights, _ = csr = graph.csr_lists()
+    arc_src = np.repeat(np.arange(graph.num_nodes), np.diff(graph.csr()[0])).tolist()
+
+    if state is None:
+        state = _yen_state()
+    stats = state['stats']
+    accepted = state['accepted']
+    deviation = state['deviation']
+    # Sau khi qua JSON: tuple/set thành list - khôi phục để so sánh trong heap và tra cứu
+    candidates = state['candidates'] = [(c, n, tuple(key), dev) for c, n, key, dev in state['candidates']]
+    seen = state['seen'] = set(map(tuple, state['seen']))
+
+    # Khoảng cách tới target trên đồ thị gốc: cận dưới cho mọi spur search
+    rev = graph.reversed()
+    h = dijkstra_csr(rev.csr_lists(), target)[0]
+    if h[source] == INF:
+        return
+
+    banned_nodes = bytearray(graph.num_nodes)
+    banned_arcs = bytearray(len(targets))
+
+    if not accepted:
+        cost, arcs, settled = _spur_search(csr, arc_src, h, source, target, banned_nodes, banned_arcs)
+        stats['spurSearches'] += 1
+        stats['settled'] += settled
+        accepted.append((cost, arcs))
+        deviation.append(0)
+        seen.add(tuple(arcs))
+        yield cost, arcs
+
+    trie = {}
+    for _, arcs in accepted:
+        node = trie
+        for a in arcs:
+            node = node.setdefault(a, {})
+
+    while len(accepted) < k:
+        prev_cost, prev_arcs = accepted[-1]
+        prev_nodes = [source] + [targets[a] for a in prev_arcs]
+        start = deviation[-1]
+
+        # Đi theo trie tới độ sâu start, cấm dần các nút của root path
+        trie_node = trie
+        root_cost = 0.0
+        for i in range(start):
+            banned_nodes[prev_nodes[i]] = 1
+            root_cost += weights[prev_arcs[i]]
+            trie_node = trie_node[prev_arcs[i]]
+
+        touched_nodes = prev_nodes[:start]
+        for i in range(start, len(prev_arcs)):
+            spur = prev_nodes[i]
+            # Cấm cung tiếp theo của mọi đường đã chọn có cùng root path
+            next_arcs = list(trie_node.keys())
+            for a in next_arcs:
+                banned_arcs[a] = 1
+
+            spur_cost, spur_arcs, settled = _spur_search(
+                csr, arc_src, h, spur, target, banned_nodes, banned_arcs
+            )
+            stats['spurSearches'] += 1
+            stats['settled'] += settled
+
+            for a in next_arcs:
+                banned_arcs[a] = 0
+
+            if spur_arcs is not None:
+                total_arcs = prev_arcs[:i] + spur_arcs
+                key = tuple(total_arcs)
+                if key not in seen:
+                    seen.add(key)
+                    heapq.heappush(candidates, (root_cost + spur_cost, len(total_arcs), key, i))
+
+            # Mở rộng root path thêm một cung
+            banned_nodes[spur] = 1
+            touched_nodes.append(spur)
+            root_cost += weights[prev_arcs[i]]
+            trie_node = trie_node[prev_arcs[i]]
+
+        for x in touched_nodes:
+            banned_nodes[x] = 0
+
+        if not candidates:
+            return
+        cost, _, key, dev = heapq.heappop(candidates)
+        arcs = list(key)
+        accepted.append((cost, arcs))
+        deviation.append(dev)
+        node = trie
+        for a in arcs:
+            node = node.setdefault(a, {})
+        yield cost, arcs
+
+
+def yen_k_shortest(graph, source, target, k):
+    """
+    Chạy Yen tới hết (xem iter_yen).
+
+    Returns:
+        Tuple (paths, stats): paths là list (cost, arcs) tăng dần theo cost,
+        stats gồm spurSearches và settled.
+    """
+    state = _yen_state()
+    paths = list(iter_yen(graph, source, target, k, state))
+    return paths, state['stats']
+
+
+def _resolve_endpoints(graph, kwargs):
+    source = graph.resolve_node(kwargs.get('source'))
+    if source is None:
+        raise ValueError(f"Nút nguồn '{kwargs.get('source')}' không tồn tại trong đồ thị.")
+    target = graph.resolve_node(kwargs.get('target'))
+    if target is None:
+        raise ValueError(f"Nút đích '{kwargs.get('target')}' không tồn tại trong đồ thị.")
+    k = int(kwargs.get('k', 3))
+    if k < 1:
+        raise ValueError("k phải >= 1.")
+    if graph.num_edges and float(graph.weight.min()) < 0:
+        raise ValueError("Yen (k đường đi ngắn nhất) yêu cầu mọi trọng số không âm.")
+    return source, target, k
+
+
+def _describe_paths(graph, source, paths):
+    _, targets, _, eidx = graph.csr_lists()
+    out = []
+    for cost, arcs in paths:
+        nodes = [graph.node_ids[source]] + [graph.node_ids[targets[a]] for a in arcs]
+        out.append({
+            'nodes': nodes,
+            'edges': [graph.edge_ids[eidx[a]] for a in arcs],
+            'cost': cost,
+        })
+    return out
+
+
+def k_shortest_paths_result(graph_data, **kwargs):
+    """
+    K đường đi ngắn nhất không lặp, chế độ "chỉ kết quả".
+
+    kwargs:
+        - source, target: id nút nguồn/đích (bắt buộc)
+        - k: số đường cần tìm (mặc định 3)
+
+    Returns:
+        Dict: source, target, k, paths (list {'nodes', 'edges', 'cost'}), spurSearches, settled
+    """
+    graph = as_graph_arrays(graph_data)
+    source, target, k = _resolve_endpoints(graph, kwargs)
+    paths, stats = yen_k_shortest(graph, source, target, k)
+    return {
+        'source': graph.node_ids[source],
+        'target': graph.node_ids[target],
+        'k': k,
+        'paths': _describe_paths(graph, source, paths),
+        **stats,
+    }
+
+
+def k_shortest_paths_algorithm(graph_data, **kwargs):
+    """
+    K đường đi ngắn nhất không lặp (Yen) với visualization: mỗi đường tìm được
+    là một step, step cuối tô toàn bộ các đường.
+
+    kwargs:
+        - source, target: id nút nguồn/đích (bắt buộc)
+        - k: số đường cần tìm (mặc định 3)
+        - max_steps / max_ms / max_ops, resume: ngân sách (mỗi đường là một thao tác)
+          và chạy tiếp (xem budget.py)
+    """
+    graph = as_graph_arrays(graph_data)
+    steps = []
+
+    if graph.num_nodes == 0:
+        steps.append({
+            'highlightNodes': {},
+            'highlightEdges': {},
+            'msg': 'graph.empty',
+        })
+        return steps
+
+    try:
+        source, target, k = _resolve_endpoints(graph, kwargs)
+    except ValueError as e:
+        steps.append({'highlightNodes': {}, 'highlightEdges': {}, 'msg': 'error', 'args': {'text': str(e)}})
+        return steps
+
+    src_id, tgt_id = graph.node_ids[source], graph.node_ids[target]
+    budget = get_budget(kwargs)
+    resume = kwargs.get('resume')
+    if resume is None:
+        yen = _yen_state()
+        found_edges = set()
+        steps.append({
+            'highlightNodes': {src_id: '#3b82f6', tgt_id: '#3b82f6'},
+            'highlightEdges': {},
+            'msg': 'k_shortest.start',
+            'args': {'k': k, 'source': src_id, 'target': tgt_id},
+        })
+    else:
+        yen = resume['yen']
+        found_edges = set(resume['found_edges'])
+
+    for path in iter_yen(graph, source, target, k, yen):
+        p = _describe_paths(graph, source, [path])[0]
+        nodes = p['nodes']
+        steps.append({
+            'highlightNodes': {n: '#f59e0b' for n in nodes},
+            'highlightEdges': {e: '#10b981' for e in found_edges} | {e: '#f59e0b' for e in p['edges']},
+            'msg': 'k_shortest.path',
+            'args': {'i': len(yen['accepted']), 'path': nodes, 'cost': p['cost']},
+        })
+        found_edges.update(p['edges'])
+
+        if budget is not None and len(yen['accepted']) < k and budget.exhausted(steps):
+            return suspend(steps, kwargs, budget, {'yen': yen, 'found_edges': list(found_edges)})
+
+    if not yen['accepted']:
+        steps.append({
+            'highlightNodes': {src_id: '#ef4444', tgt_id: '#ef4444'},
+            'highlightEdges': {},
+            'msg': 'k_shortest.none',
+            'args': {'source': src_id, 'target': tgt_id},
+        })
+        return steps
+
+    steps.append({
+        'highlightNodes': {src_id: '#10b981', tgt_id: '#10b981'},
+        'highlightEdges': {e: '#10b981' for e in found_edges},
+        'msg': 'k_shortest.done',
+        'args': {'found': len(yen['accepted']), 'k': k, 'spur': yen['stats']['spurSearches']},
+    })
+    return steps
@@ -2,16 +2,37 @@
 Thuật toán Kruskal - Tìm cây khung nhỏ nhất (Minimum Spanning Tree)
 """
 
+from .budget import get_budget, suspend
+from .counters import get_counters
+
 class DSU:
-    def __init__(self, node_ids):
+    def __init__(self, node_ids, counters=None):
         # Khởi tạo parent là dictionary map node_id -> node_id
         self.parent = {node_id: node_id for node_id in node_ids}
+        # Bộ đếm thao tác (counters.py): finds, findDepth, maxFindDepth, unions
+        self.counters = counters
     
     def find(self, i):
+        if self.counters is not None:
+            return self._counted_find(i)
         # Tìm gốc (root) có sử dụng Path Compression
         if self.parent[i] != i:
             self.parent[i] = self.find(self.parent[i])
         return self.parent[i]
+
+    def _counted_find(self, i):
+        # Như find() nhưng lặp hai lượt (tìm gốc, rồi nén đường) để đo độ sâu
+        parent = self.parent
+        root, depth = i, 0
+        while parent[root] != root:
+            root = parent[root]
+            depth += 1
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        self.counters.add('finds')
+        self.counters.add('findDepth', depth)
+        self.counters.peak('maxFindDepth', depth)
+        return root
     
     def union(self, i, j):
         # Gộp hai tập hợp chứa i và j
@@ -20,6 +41,8 @@ class DSU:
         
         if root_i != root_j:
             self.parent[root_i] = root_j
+            if self.counters is not None:
+                self.counters.add('unions')
             return True # Gộp thành công
         return False # Đã cùng tập hợp (tạo chu trình)
 
@@ -29,6 +52,8 @@ def kruskal_algorithm(graph_data, **kwargs):
     
     Args:
         graph_data: Dict chứa nodes và edges
+        **kwargs: ngân sách max_steps / max_ms / max_ops và 'resume' để chạy tiếp (xem budget.py);
+            'counters' là bộ đếm thao tác (xem counters.py)
         
     Returns:
         List các StepState dict để visualization
@@ -44,12 +69,12 @@ def kruskal_algorithm(graph_data, **kwargs):
         steps.append({
             'highlightNodes': {},
             'highlightEdges': {},
-            'description': 'Đồ thị rỗng.'
+            'msg': 'kruskal.empty'
         })
         return steps
     
     # ========== BƯỚC 2: Khởi tạo DSU và Sắp xếp cạnh ==========
-    dsu = DSU(list(nodes.keys()))
+    dsu = DSU(list(nodes.keys()), get_counters(kwargs))
     
     # Sắp xếp các cạnh theo trọng số tăng dần
     # Lưu ý: Ép kiểu trọng số về float để so sánh chính xác
@@ -57,15 +82,25 @@ def kruskal_algorithm(graph_data, **kwargs):
     
     mst_edges_ids = set() # Lưu ID các cạnh đã chọn vào MST
     mst_weight = 0
+    next_edge = 0         # Chỉ số cạnh kế tiếp trong sorted_edges
     
-    steps.append({
-        'highlightNodes': {},
-        'highlightEdges': {},
-        'description': 'Sắp xếp các cạnh theo trọng số tăng dần.'
-    })
+    budget = get_budget(kwargs)
+    resume = kwargs.get('resume')
+    if resume is None:
+        steps.append({
+            'highlightNodes': {},
+            'highlightEdges': {},
+            'msg': 'kruskal.sort'
+        })
+    else:
+        dsu.parent = dict(resume['parent'])
+        mst_edges_ids = set(resume['mst_edges'])
+        mst_weight = resume['mst_weight']
+        next_edge = resume['next_edge']
 
     # ========== BƯỚC 3: Vòng lặp chính (Duyệt cạnh) ==========
-    for edge in sorted_edges:
+    for index in range(next_edge, len(sorted_edges)):
+        edge = sorted_edges[index]
         u = edge['source']
         v = edge['target']
         w = float(edge.get('weight', 1))
@@ -79,7 +114,8 @@ def kruskal_algorithm(graph_data, **kwargs):
         steps.append({
             'highlightNodes': {u: '#f59e0b', v: '#f59e0b'}, # Highlight 2 đầu mút
             'highlightEdges': current_edges_highlight,
-            'description': f'Xét cạnh ({u}, {v}) với trọng số {w}'
+            'msg': 'kruskal.consider',
+            'args': {'u': u, 'v': v, 'w': w}
         })
         
         # Kiểm tra chu trình bằng DSU
@@ -91,7 +127,8 @@ def kruskal_algorithm(graph_data, **kwargs):
             steps.append({
                 'highlightNodes': {u: '#10b981', v: '#10b981'},
                 'highlightEdges': {eid: '#10b981' for eid in mst_edges_ids},
-                'description': f'CHẤP NHẬN: Cạnh ({u}, {v}) được thêm vào cây khung.'
+                'msg': 'kruskal.accept',
+                'args': {'u': u, 'v': v}
             })
         else:
             # Tạo chu trình -> Bỏ qua
@@ -101,14 +138,22 @@ def kruskal_algorithm(graph_data, **kwargs):
             steps.append({
                 'highlightNodes': {u: '#ef4444', v: '#ef4444'},
                 'highlightEdges': rejected_highlight,
-                'description': f'BỎ QUA: Cạnh ({u}, {v}) tạo thành chu trình.'
+                'msg': 'kruskal.reject',
+                'args': {'u': u, 'v': v}
+            })
+
+        if budget is not None and index + 1 < len(sorted_edges) and budget.exhausted(steps):
+            return suspend(steps, kwargs, budget, {
+                'parent': list(dsu.parent.items()), 'mst_edges': list(mst_edges_ids),
+                'mst_weight': mst_weight, 'next_edge': index + 1,
             })
             
     # ========== BƯỚC 4: Kết thúc ==========
     steps.append({
         'highlightNodes': {n: '#10b981' for n in nodes.keys()},
         'highlightEdges': {eid: '#10b981' for eid in mst_edges_ids},
-        'description': f'Hoàn thành! Tổng trọng số cây khung nhỏ nhất: {mst_weight}'
+        'msg': 'kruskal.done',
+        'args': {'total': mst_weight}
     })
     
     return steps
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+landmarks.py - Tiền xử lý Landmark (ALT: A*, Landmarks, Triangle inequality)
+
+Dùng cho nhiều truy vấn điểm-điểm (source, target) trên CÙNG một đồ thị:
+1. Chọn K landmark bằng farthest-point selection.
+2. Tính trước khoảng cách từ mỗi landmark tới mọi nút (và từ mọi nút tới landmark
+   nếu đồ thị có hướng).
+3. Khi truy vấn, bất đẳng thức tam giác cho cận dưới
+       h(v) = max_L max(d(L, t) - d(L, v), d(v, L) - d(t, L)) <= d(v, t)
+   để dẫn đường A*, chốt ít nút hơn nhiều so với Dijkstra.
+
+Bảng khoảng cách được cache trong process theo hash nội dung đồ thị (LRU).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .dijkstra import dijkstra_csr
+from .graph_arrays import as_graph_arrays
+
+DEFAULT_LANDMARKS = 8
+MAX_CACHED_GRAPHS = 16
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class LandmarkIndex:
+    def __init__(self, graph_hash, landmarks, dist_from, dist_to, build_ms):
+        self.graph_hash = graph_hash
+        self.landmarks = landmarks      # list chỉ số nút
+        self.dist_from = dist_from      # K x n: d(L, v)
+        self.dist_to = dist_to          # K x n: d(v, L) (vô hướng: chính là dist_from)
+        self.build_ms = build_ms
+
+    def lower_bounds(self, target):
+        """Mảng cận dưới h[v] của d(v, target), tính vectorized trên K landmark."""
+        with np.errstate(invalid='ignore'):
+            fwd = self.dist_from[:, target:target + 1] - self.dist_from
+            bwd = self.dist_to - self.dist_to[:, target:target + 1]
+            # fmax bỏ qua NaN (∞ - ∞); +∞ nghĩa là v không thể tới target
+            h = np.fmax.reduce(np.fmax(fwd, bwd), axis=0)
+        h = np.nan_to_num(h, nan=0.0, posinf=np.inf, neginf=0.0)
+        np.maximum(h, 0.0, out=h)
+        h[target] = 0.0
+        return h
+
+
+def _sssp(csr, source):
+    dist = dijkstra_csr(csr, source)[0]
+    return np.asarray(dist, dtype=np.float64)
+
+
+def select_landmarks(graph, k=DEFAULT_LANDMARKS):
+    """
+    Chọn K landmark bằng farthest-point selection và tính bảng khoảng cách.
+    Nút không tới được từ các landmark đã chọn được ưu tiên (phủ thành phần liên thông khác).
+    """
+    graph = as_graph_arrays(graph)
+    n = graph.num_nodes
+    k = max(1, min(int(k), n))
+    started = time.perf_counter()
+
+    fwd_csr = graph.csr_lists()
+    rev_csr = graph.reversed().csr_lists() if graph.is_directed else fwd_csr
+
+    # Landmark đầu tiên: nút xa nhất tính từ nút 0
+    cover = _sssp(fwd_csr, 0)
+    landmarks, dist_from, dist_to = [], [], []
+
+    for _ in range(k):
+        score = np.where(np.isinf(cover), np.finfo(np.float64).max, cover)
+        score[landmarks] = -1.0
+        chosen = int(np.argmax(score))
+        landmarks.append(chosen)
+
+        d_from = _sssp(fwd_csr, chosen)
+        d_to = _sssp(rev_csr, chosen) if graph.is_directed else d_from
+        dist_from.append(d_from)
+        dist_to.append(d_to)
+
+        near = np.minimum(d_from, d_to)
+        cover = near if len(landmarks) == 1 else np.minimum(cover, near)
+
+    build_ms = (time.perf_counter() - started) * 1000
+    return LandmarkIndex(graph.content_hash(), landmarks, np.vstack(dist_from), np.vstack(dist_to), build_ms)
+
+
+def get_landmark_index(graph, k=DEFAULT_LANDMARKS, build=True):
+    """
+    Lấy LandmarkIndex từ cache theo (hash đồ thị, K); tự tiền xử lý nếu chưa có.
+
+    Returns:
+        LandmarkIndex, hoặc None nếu chưa có trong cache và build=False.
+    """
+    graph = as_graph_arrays(graph)
+    key = (graph.content_hash(), int(k))
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+    if not build:
+        return None
+
+    index = select_landmarks(graph, k)
+    with _cache_lock:
+        _cache[key] = index
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_GRAPHS:
+            _cache.popitem(last=False)
+    return index
+
+
+def preprocess_landmarks(graph_data, **kwargs):
+    """
+    Bước tiền xử lý tường minh cho một đồ thị (endpoint /api/landmarks).
+
+    kwargs:
+        - landmarks: số landmark K (mặc định DEFAULT_LANDMARKS)
+
+    Returns:
+        Dict: graphHash, landmarks (id nút), k, buildMs, cached
+    """
+    graph = as_graph_arrays(graph_data)
+    if graph.num_nodes == 0:
+        raise ValueError("Đồ thị rỗng. Vui lòng thêm ít nhất một nút.")
+    if graph.num_edges and float(graph.weight.min()) < 0:
+        raise ValueError("Landmark (ALT) yêu cầu mọi trọng số không âm.")
+
+    k = kwargs.get('landmarks')
+    k = DEFAULT_LANDMARKS if k in (None, True) else int(k)
+    cached = get_landmark_index(graph, k, build=False)
+    index = cached or get_landmark_index(graph, k)
+    return {
+        'graphHash': index.graph_hash,
+        'landmarks': [graph.node_ids[i] for i in index.landmarks],
+        'k': len(index.landmarks),
+        'buildMs': round(index.build_ms, 3),
+        'cached': cached is not None,
+    }
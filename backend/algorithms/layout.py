@@ -0,0 +1,290 @@
+"""
+layout.py - Bố trí đồ thị tự động kiểu lực (force-directed), vectorized bằng NumPy
+
+- model 'fr': Fruchterman–Reingold (đẩy k^2/d, hút d^2/k, kéo nhẹ về tâm)
+- model 'forceatlas': kiểu ForceAtlas2 (đẩy theo (bậc+1), hút tuyến tính, có trọng lực về tâm)
+
+Lực đẩy giữa mọi cặp nút được xấp xỉ bằng Barnes–Hut: quadtree được dựng theo
+từng mức từ mã ô (không có đối tượng nút cây), và toàn bộ tập nút duyệt cây cùng
+lúc dưới dạng mảng cặp (nút, ô) -> O(n log n) mỗi vòng. Đồ thị nhỏ dùng công
+thức chính xác O(n^2).
+
+Tọa độ cuối cùng được co giãn vào khung canvas [PADDING, CANVAS_SIZE - PADDING].
+"""
+
+import math
+import time
+
+import numpy as np
+
+from .graph_arrays import as_graph_arrays
+
+CANVAS_SIZE = 1000.0
+PADDING = 40.0
+
+DEFAULT_ITERATIONS = 100
+DEFAULT_THETA = 0.8
+
+# Đồ thị tới cỡ này tính lực đẩy chính xác (nhanh hơn dựng quadtree)
+EXACT_MAX_NODES = 1000
+
+# Dừng sớm khi dịch chuyển trung bình nhỏ hơn tỉ lệ này của khoảng cách lý tưởng
+CONVERGENCE_TOL = 1e-3
+
+MODELS = ('fr', 'forceatlas')
+
+# Lực kéo tuyến tính về tâm của model 'fr' (thay cho khung giới hạn của FR gốc),
+# giữ nút cô lập/thành phần rời không bị đẩy ra xa làm co phần còn lại của hình
+FR_GRAVITY = 0.5
+
+
+def _exact_repulsion(x, y, mass, min_d2):
+    """Tổng sum_j m_j * (p_i - p_j) / |p_i - p_j|^2, tính theo khối hàng để giới hạn bộ nhớ."""
+    n = len(x)
+    fx = np.zeros(n)
+    fy = np.zeros(n)
+    block = max(1, 2_000_000 // max(n, 1))
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        dx = x[lo:hi, None] - x[None, :]
+        dy = y[lo:hi, None] - y[None, :]
+        d2 = np.maximum(dx * dx + dy * dy, min_d2)
+        w = mass[None, :] / d2
+        w[np.arange(hi - lo), np.arange(lo, hi)] = 0.0
+        fx[lo:hi] = (w * dx).sum(axis=1)
+        fy[lo:hi] = (w * dy).sum(axis=1)
+    return fx, fy
+
+
+def _barnes_hut_repulsion(x, y, mass, min_d2, theta):
+    """
+    Như _exact_repulsion nhưng ô ở đủ xa (kích thước / khoảng cách < theta) được
+    thay bằng khối tâm của nó.
+    """
+    n = len(x)
+    depth = max(1, min(16, math.ceil(math.log(n, 4)) + 1))
+    xmin, ymin = x.min(), y.min()
+    span = max(x.max() - xmin, y.max() - ymin, 1e-9)
+    side = 1 << depth
+    ix = np.minimum(((x - xmin) / span * side).astype(np.int64), side - 1)
+    iy = np.minimum(((y - ymin) / span * side).astype(np.int64), side - 1)
+
+    # Mỗi mức l: các ô khác rỗng (mã kx * 2^l + ky, đã sắp xếp), khối lượng, khối tâm
+    levels = []
+    for level in range(depth + 1):
+        shift = depth - level
+        key = ((ix >> shift) << level) | (iy >> shift)
+        cells, inv = np.unique(key, return_inverse=True)
+        m = np.bincount(inv, mass)
+        cx = np.bincount(inv, mass * x) / m
+        cy = np.bincount(inv, mass * y) / m
+        levels.append((cells, inv, m, cx, cy))
+
+    fx = np.zeros(n)
+    fy = np.zeros(n)
+    pt = np.arange(n)
+    cell = np.zeros(n, dtype=np.int64)
+    theta2 = theta * theta
+
+    for level in range(depth + 1):
+        cells, inv, m, cx, cy = levels[level]
+        own = inv[pt] == cell
+        cm = m[cell]
+        ccx, ccy = cx[cell], cy[cell]
+        if level == depth:
+            # Lá: ô chứa chính nút đó -> khối tâm của phần còn lại trong ô
+            cm = np.where(own, cm - mass[pt], cm)
+            rest = np.maximum(cm, 1e-12)
+            ccx = np.where(own, (cx[cell] * m[cell] - mass[pt] * x[pt]) / rest, ccx)
+            ccy = np.where(own, (cy[cell] * m[cell] - mass[pt] * y[pt]) / rest, ccy)
+            accept = cm > 1e-12
+        else:
+            size = span / (1 << level)
+            d2 = (x[pt] - ccx) ** 2 + (y[pt] - ccy) ** 2
+            accept = ~own & (size * size < theta2 * d2)
+
+        a_pt = pt[accept]
+        dx = x[a_pt] - ccx[accept]
+        dy = y[a_pt] - ccy[accept]
+        w = cm[accept] / np.maximum(dx * dx + dy * dy, min_d2)
+        fx += np.bincount(a_pt, w * dx, minlength=n)
+        fy += np.bincount(a_pt, w * dy, minlength=n)
+
+        if level == depth:
+            break
+        # Ô chưa đủ xa: thay bằng các ô con khác rỗng ở mức tiếp theo
+        pt, cell = pt[~accept], cell[~accept]
+        key = cells[cell]
+        kx, ky = key >> level, key & ((1 << level) - 1)
+        next_cells = levels[level + 1][0]
+        child_pt, child_cell = [], []
+        for a in (0, 1):
+            for b in (0, 1):
+                ck = ((2 * kx + a) << (level + 1)) | (2 * ky + b)
+                idx = np.minimum(np.searchsorted(next_cells, ck), len(next_cells) - 1)
+                hit = next_cells[idx] == ck
+                child_pt.append(pt[hit])
+                child_cell.append(idx[hit])
+        pt = np.concatenate(child_pt)
+        cell = np.concatenate(child_cell)
+
+    return fx, fy
+
+
+def _initial_positions(graph, n, side, warm_start, rng):
+    """
+    Tọa độ ban đầu trong hình vuông cạnh `side`. Warm start dùng tọa độ sẵn có
+    (co giãn về cùng khung) nếu chúng không bị dồn đống; trả về (x, y, warm).
+    """
+    if warm_start and graph.x is not None and n > 1:
+        distinct = np.unique(np.round(np.stack([graph.x, graph.y]), 6), axis=1).shape[1]
+        if distinct >= n // 2:
+            x, y = graph.x.astype(np.float64), graph.y.astype(np.float64)
+            span = max(x.max() - x.min(), y.max() - y.min(), 1e-9)
+            x = (x - x.min()) / span * side
+            y = (y - y.min()) / span * side
+            # Tách các nút trùng tọa độ bằng nhiễu nhỏ
+            jitter = side * 1e-4
+            return x + rng.uniform(-jitter, jitter, n), y + rng.uniform(-jitter, jitter, n), True
+    return rng.random(n) * side, rng.random(n) * side, False
+
+
+def _fit_to_canvas(x, y):
+    if len(x) == 0:
+        return x, y
+    span = max(x.max() - x.min(), y.max() - y.min())
+    inner = CANVAS_SIZE - 2 * PADDING
+    if span < 1e-9:
+        return np.full_like(x, CANVAS_SIZE / 2), np.full_like(y, CANVAS_SIZE / 2)
+    scale = inner / span
+    ox = PADDING + (inner - (x.max() - x.min()) * scale) / 2
+    oy = PADDING + (inner - (y.max() - y.min()) * scale) / 2
+    return ox + (x - x.min()) * scale, oy + (y - y.min()) * scale
+
+
+def iter_layout(graph_data, iterations=DEFAULT_ITERATIONS, max_ms=None, theta=DEFAULT_THETA,
+                model='fr', seed=0, warm_start=True, every=None):
+    """
+    Chạy layout, sinh ra các snapshot (đã co giãn vào canvas).
+
+    Args:
+        iterations: số vòng tối đa
+        max_ms: ngân sách thời gian (ms); hết thời gian thì dừng ở vòng hiện tại
+        theta: ngưỡng Barnes–Hut (nhỏ hơn = chính xác hơn, chậm hơn)
+        every: sinh snapshot trung gian sau mỗi `every` vòng (None = chỉ snapshot cuối)
+
+    Yields:
+        Dict {'iteration', 'x', 'y', 'done'}; snapshot cuối có thêm iterations,
+        stoppedBy ('iterations' | 'time' | 'converged'), engine, warmStart, elapsedMs
+    """
+    graph = as_graph_arrays(graph_data)
+    if model not in MODELS:
+        raise ValueError(f'model "{model}" không hợp lệ. Hỗ trợ: {", ".join(MODELS)}.')
+    theta = float(theta)
+    if theta <= 0:
+        raise ValueError("theta phải > 0.")
+
+    started = time.perf_counter()
+    n = graph.num_nodes
+    rng = np.random.default_rng(seed)
+    # Khoảng cách lý tưởng k = 1: khung ban đầu có diện tích ~ n
+    side = math.sqrt(max(n, 1))
+    x, y, warm = _initial_positions(graph, n, side, warm_start, rng)
+
+    keep = graph.src != graph.dst
+    src, dst = graph.src[keep], graph.dst[keep]
+    degree = np.bincount(np.concatenate([src, dst]), minlength=n).astype(np.float64)
+    mass = degree + 1 if model == 'forceatlas' else np.ones(n)
+    engine = 'exact' if n <= EXACT_MAX_NODES else 'barnes_hut'
+    min_d2 = 1e-4
+
+    t0 = side / (50 if warm else 10)
+    stopped_by = 'iterations'
+    done_iterations = 0
+    for it in range(int(iterations)):
+        if n > 1:
+            if engine == 'exact':
+                rx, ry = _exact_repulsion(x, y, mass, min_d2)
+            else:
+                rx, ry = _barnes_hut_repulsion(x, y, mass, min_d2, theta)
+            if model == 'forceatlas':
+                rx, ry = rx * mass, ry * mass
+
+            dx = x[src] - x[dst]
+            dy = y[src] - y[dst]
+            if model == 'fr':
+                # Lực hút d^2 / k theo hướng cạnh
+                dist = np.sqrt(dx * dx + dy * dy)
+                dx, dy = dx * dist, dy * dist
+            rx -= np.bincount(src, dx, minlength=n) - np.bincount(dst, dx, minlength=n)
+            ry -= np.bincount(src, dy, minlength=n) - np.bincount(dst, dy, minlength=n)
+
+            # Trọng lực về tâm giữ các thành phần rời không trôi xa
+            gx, gy = x - x.mean(), y - y.mean()
+            if model == 'forceatlas':
+                glen = np.maximum(np.sqrt(gx * gx + gy * gy), 1e-9)
+                rx -= mass * gx / glen
+                ry -= mass * gy / glen
+            else:
+                rx -= FR_GRAVITY * gx
+                ry -= FR_GRAVITY * gy
+
+            # Giới hạn bước theo "nhiệt độ" giảm dần
+            temp = t0 * (1 - it / max(int(iterations), 1))
+            length = np.maximum(np.sqrt(rx * rx + ry * ry), 1e-12)
+            step = np.minimum(length, temp) / length
+            x += rx * step
+            y += ry * step
+            moved = float((np.minimum(length, temp)).mean())
+        else:
+            moved = 0.0
+
+        done_iterations = it + 1
+        if moved < CONVERGENCE_TOL:
+            stopped_by = 'converged'
+            break
+        if max_ms is not None and (time.perf_counter() - started) * 1000 >= max_ms:
+            stopped_by = 'time'
+            break
+        if every and done_iterations % every == 0 and done_iterations < iterations:
+            fx, fy = _fit_to_canvas(x, y)
+            yield {'iteration': done_iterations, 'x': fx, 'y': fy, 'done': False}
+
+    fx, fy = _fit_to_canvas(x, y)
+    yield {
+        'iteration': done_iterations,
+        'x': fx,
+        'y': fy,
+        'done': True,
+        'iterations': done_iterations,
+        'stoppedBy': stopped_by,
+        'engine': engine,
+        'model': model,
+        'warmStart': warm,
+        'elapsedMs': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def layout_nodes(graph, x, y):
+    """Danh sách {'id', 'x', 'y'} (làm tròn 2 chữ số) theo định dạng NodeData của frontend."""
+    return [
+        {'id': node_id, 'x': px, 'y': py}
+        for node_id, px, py in zip(graph.node_ids, np.round(x, 2).tolist(), np.round(y, 2).tolist())
+    ]
+
+
+def force_layout(graph_data, **kwargs):
+    """
+    Layout "một lần": chạy hết ngân sách và trả về vị trí cuối cùng.
+
+    Returns:
+        Dict: nodes ({'id', 'x', 'y'}), iterations, stoppedBy, engine, model, warmStart, elapsedMs
+    """
+    graph = as_graph_arrays(graph_data)
+    kwargs['every'] = None
+    for snapshot in iter_layout(graph, **kwargs):
+        pass
+    x, y = snapshot.pop('x'), snapshot.pop('y')
+    for key in ('iteration', 'done'):
+        snapshot.pop(key)
+    return {'nodes': layout_nodes(graph, x, y), **snapshot}
@@ -0,0 +1,353 @@
+"""
+messages.py - Catalogue mô tả step theo ngôn ngữ và mã trạng thái highlight
+
+Thuật toán không tạo chuỗi mô tả trong vòng lặp: mỗi step mang
+    'msg': id thông điệp (ví dụ 'dijkstra.select')
+    'args': dict tham số gọn (id nút, khoảng cách, ...)
+và service dựng mô tả khi cần (render_step / present_steps), theo ngôn ngữ client yêu cầu.
+
+Quy ước tham số:
+    - None được hiển thị là "∞" (khoảng cách chưa biết)
+    - Tham số dạng list dùng mục '<msg>.<tên tham số>' trong catalogue:
+      (template mỗi phần tử, chuỗi nối, chuỗi khi rỗng). Phần tử là dict có 'msg'
+      thì được dựng đệ quy (thông điệp lồng nhau).
+
+Màu highlight có thể được thay bằng mã trạng thái (chỉ số trong STATES) để step gọn hơn.
+"""
+
+DEFAULT_LOCALE = 'vi'
+
+# Mã trạng thái = chỉ số trong STATES; STATE_COLORS là màu tương ứng
+STATES = (
+    'done',         # Xanh lá: đã xử lý/thành công
+    'current',      # Xanh dương: đang xử lý
+    'considering',  # Vàng cam: đang xét
+    'error',        # Đỏ: lỗi/bỏ qua
+    'muted',        # Xám: đã bỏ qua/phụ
+    'special',      # Tím: loại đặc biệt (ví dụ cạnh xuôi)
+    'group1', 'group2', 'group3', 'group4', 'group5', 'group6',  # Màu nhóm (SCC)
+)
+STATE_COLORS = (
+    '#10b981', '#3b82f6', '#f59e0b', '#ef4444', '#9ca3af', '#8b5cf6',
+    '#ec4899', '#14b8a6', '#f97316', '#6366f1', '#84cc16', '#06b6d4',
+)
+COLOR_CODES = {color: code for code, color in enumerate(STATE_COLORS)}
+
+MESSAGES = {
+    'vi': {
+        'graph.empty': 'Đồ thị rỗng. Vui lòng thêm ít nhất một nút.',
+        'error': '{text}',
+
+        'bfs.start': 'Bắt đầu BFS từ nút {start}.',
+        'bfs.visit': 'Duyệt nút {u}.',
+        'bfs.check': 'Kiểm tra hàng xóm {v}.',
+        'bfs.enqueue': 'Thêm {v} vào hàng đợi.',
+        'bfs.finish': 'Hoàn tất {u}.',
+        'bfs.done': 'Hoàn thành BFS.',
+
+        'dfs.start': 'Bắt đầu DFS từ nút {v}, đẩy vào Stack (d = {d}). Nhãn nút: thời điểm phát hiện / kết thúc.',
+        'dfs.discover': 'Phát hiện nút {v} qua cạnh cây {u} → {v}, đẩy vào Stack (d = {d}).',
+        'dfs.finish': 'Đã xét hết cung ra của {u}: pop khỏi Stack (f = {f}).',
+        'dfs.back': 'Cạnh {u} → {v} là cạnh ngược (tới tổ tiên đang trong Stack).',
+        'dfs.forward': 'Cạnh {u} → {v} là cạnh xuôi (tới hậu duệ đã kết thúc).',
+        'dfs.cross': 'Cạnh {u} → {v} là cạnh chéo (tới nhánh đã kết thúc).',
+        'dfs.done': ('Hoàn thành thuật toán DFS. Đã thăm {visited} nút; phân loại cạnh - '
+                     'tree: {tree}, back: {back}, forward: {forward}, cross: {cross}.'),
+
+        'dijkstra.no_source': 'Không có nút nào trong đồ thị để làm nguồn.',
+        'dijkstra.source_missing': "Nút nguồn '{source}' không tồn tại trong đồ thị. Các nút có sẵn: {available}",
+        'dijkstra.target_missing': "Nút đích '{target}' không tồn tại trong đồ thị. Các nút có sẵn: {available}",
+        'dijkstra.negative': 'Cảnh báo: Cạnh ({u}, {v}) có trọng số âm ({w}). Dijkstra không hỗ trợ trọng số âm!',
+        'dijkstra.init': 'Khởi tạo Dijkstra từ nút nguồn {source}. Khoảng cách ban đầu: {source} = 0, các nút khác = ∞.',
+        'dijkstra.select': 'Chọn nút {u} với khoảng cách ngắn nhất = {d}. Đánh dấu đã xử lý.',
+        'dijkstra.found': 'Tìm thấy đường đi ngắn nhất từ {source} đến {target}: {path}, tổng độ dài = {d}.',
+        'dijkstra.found.path': ('{}', ' -> ', ''),
+        'dijkstra.relax': 'Cập nhật khoảng cách các nút kề của {u}: {updates}',
+        'dijkstra.relax.updates': ('{0}: {1} → {2} (qua cạnh {3})', ', ', ''),
+        'dijkstra.unreachable': 'Không tìm thấy đường đi từ {source} đến {target}. Đồ thị có thể không liên thông.',
+        'dijkstra.done_target': 'Hoàn thành Dijkstra từ {source}. Khoảng cách đến {target}: {d}.',
+        'dijkstra.done_all': 'Hoàn thành Dijkstra từ {source}. Đã tìm khoảng cách ngắn nhất đến tất cả các nút.',
+
+        'bellman_ford.init': 'Khởi tạo: Đặt khoảng cách tại {source} = 0, các nút khác = ∞.',
+        'bellman_ford.round': 'Vòng lặp thứ {i} / {total}',
+        'bellman_ford.update': 'Cập nhật {v}: {old} → {new} (qua {u}, trọng số {w})',
+        'bellman_ford.converged': 'Không có khoảng cách nào thay đổi. Thuật toán hội tụ sớm.',
+        'bellman_ford.negative_cycle': ('LỖI: Phát hiện CHU TRÌNH ÂM tại cạnh ({u} -> {v}). '
+                                        'Không thể tìm đường đi ngắn nhất!'),
+        'bellman_ford.done_target': 'Hoàn thành! Đường đi ngắn nhất từ {source} đến {target} là {d}.',
+        'bellman_ford.unreachable': 'Không có đường đi từ {source} đến {target}.',
+        'bellman_ford.done_all': 'Hoàn thành! Đã tính toán khoảng cách ngắn nhất từ {source} đến mọi đỉnh.',
+
+        'prim.directed': 'Thuật toán Prim yêu cầu đồ thị vô hướng. Vui lòng đặt isDirected = False.',
+        'prim.start': 'Bắt đầu Prim từ nút {start}. Đưa các nút kề (theo cạnh nhẹ nhất) vào hàng đợi ưu tiên.',
+        'prim.select': 'Chọn cạnh ({u}, {v}) trọng số {w} vào MST. Tổng hiện tại: {total}.',
+        'prim.disconnected': 'Đồ thị không liên thông. Không thể tạo MST đầy đủ.',
+        'prim.done': 'Hoàn thành Prim. Tổng trọng số cây khung nhỏ nhất: {total}.',
+
+        'kruskal.empty': 'Đồ thị rỗng.',
+        'kruskal.sort': 'Sắp xếp các cạnh theo trọng số tăng dần.',
+        'kruskal.consider': 'Xét cạnh ({u}, {v}) với trọng số {w}',
+        'kruskal.accept': 'CHẤP NHẬN: Cạnh ({u}, {v}) được thêm vào cây khung.',
+        'kruskal.reject': 'BỎ QUA: Cạnh ({u}, {v}) tạo thành chu trình.',
+        'kruskal.done': 'Hoàn thành! Tổng trọng số cây khung nhỏ nhất: {total}',
+
+        'boruvka.directed': 'Thuật toán Borůvka yêu cầu đồ thị vô hướng. Vui lòng đặt isDirected = False.',
+        'boruvka.start': 'Bắt đầu Borůvka: mỗi nút là một thành phần ({components} thành phần).',
+        'boruvka.round': ('Vòng {round}: mỗi thành phần (trong {before}) chọn cạnh rẻ nhất đi ra ngoài; '
+                          'thêm {added} cạnh, còn {after} thành phần. Tổng hiện tại: {total}.'),
+        'boruvka.done': 'Hoàn thành Borůvka. Tổng trọng số cây khung nhỏ nhất: {total}.',
+        'boruvka.forest': 'Đồ thị không liên thông: rừng khung nhỏ nhất gồm {components} cây, tổng trọng số {total}.',
+
+        'k_shortest.start': 'Tìm {k} đường đi ngắn nhất không lặp từ {source} đến {target} (Yen).',
+        'k_shortest.path': 'Đường thứ {i}: {path}, tổng độ dài = {cost}.',
+        'k_shortest.path.path': ('{}', ' -> ', ''),
+        'k_shortest.none': 'Không có đường đi từ {source} đến {target}.',
+        'k_shortest.done': 'Hoàn thành! Tìm được {found}/{k} đường đi ({spur} lần tìm spur path).',
+
+        'scc.start': ('Bắt đầu Tarjan SCC. Nhãn nút: disc/low - low là thời điểm phát hiện nhỏ nhất '
+                      'tới được từ cây con qua một cạnh tới nút còn trên stack.'),
+        'scc.root': 'Bắt đầu DFS từ {v}: disc = low = {d}, đẩy vào stack.',
+        'scc.discover': 'Phát hiện {v} qua cạnh {u} → {v}: disc = low = {d}, đẩy vào stack.',
+        'scc.backtrack': 'Kết thúc {u}, quay lui về {p}.',
+        'scc.finish': 'Kết thúc {u} (low = {low} < disc = {d}): cập nhật low của {p} = {plow}.',
+        'scc.component': '{u} là gốc SCC (low = disc = {d}). Pop SCC #{index}: {{{nodes}}}.',
+        'scc.component.nodes': ('{}', ', ', ''),
+        'scc.undirected_edge': 'Cạnh ngược {u} - {v}: cùng thành phần liên thông.',
+        'scc.stack_edge': 'Cạnh {u} → {v} tới nút trên stack: low[{u}] = {low}.',
+        'scc.done_edge': 'Cạnh {u} → {v} tới SCC đã hoàn thành - bỏ qua.',
+        'scc.done': 'Hoàn thành Tarjan: {count} thành phần liên thông mạnh.',
+
+        'topological_sort.start': ('Bắt đầu sắp xếp topo bằng DFS: nút kết thúc càng muộn càng đứng trước. '
+                                   'Nhãn nút: vị trí trong thứ tự.'),
+        'topological_sort.root': 'Bắt đầu DFS từ nút chưa thăm {v}.',
+        'topological_sort.discover': 'Đi theo cạnh {u} → {v}, phát hiện {v}.',
+        'topological_sort.finish': '{u} kết thúc (mọi nút sau nó đã được xếp): đặt ở vị trí {pos}.',
+        'topological_sort.cycle': 'Cạnh ngược {u} → {v} tạo chu trình {cycle}. Đồ thị không có thứ tự topo.',
+        'topological_sort.cycle.cycle': ('{}', ' → ', ''),
+        'topological_sort.skip': 'Cạnh {u} → {v}: {v} đã kết thúc (vị trí {pos}) - bỏ qua.',
+        'topological_sort.done': 'Hoàn thành. Thứ tự topo: {order}.',
+        'topological_sort.done.order': ('{}', ', ', ''),
+
+        'bridges.start': ('Bắt đầu tìm cầu và khớp. Nhãn nút: disc/low - low là thời điểm phát hiện nhỏ nhất '
+                          'tới được từ cây con qua một cạnh ngược.'),
+        'bridges.root': 'Bắt đầu DFS từ {v} (gốc cây DFS).',
+        'bridges.discover': 'Phát hiện {v} qua cạnh cây {u} - {v}: disc = low = {d}.',
+        'bridges.finish': 'Kết thúc {u}, quay lui về {p} (low[{p}] = {plow}).',
+        'bridges.finish_notes': 'Kết thúc {u}, quay lui về {p} (low[{p}] = {plow}). {notes}.',
+        'bridges.finish_notes.notes': ('{}', '; ', ''),
+        'bridges.finish_root': 'Kết thúc gốc {u}.',
+        'bridges.finish_root_notes': 'Kết thúc gốc {u}. {notes}.',
+        'bridges.finish_root_notes.notes': ('{}', '; ', ''),
+        'bridges.bridge': 'low[{u}] = {low} > disc[{p}] = {d} → cạnh {p} - {u} là CẦU',
+        'bridges.cut': 'low[{u}] = {low} >= disc[{p}] = {d} → {p} là KHỚP',
+        'bridges.root_cut': 'gốc {u} có từ 2 con trong cây DFS → {u} là KHỚP',
+        'bridges.back': 'Cạnh ngược {u} - {v}: low[{u}] = {low}.',
+        'bridges.done': 'Hoàn thành: {bridge_count} cầu ({bridges}), {cut_count} khớp ({cuts}).',
+        'bridges.done.bridges': ('{}', ', ', 'không có'),
+        'bridges.done.cuts': ('{}', ', ', 'không có'),
+    },
+    'en': {
+        'graph.empty': 'The graph is empty. Please add at least one node.',
+        'error': '{text}',
+
+        'bfs.start': 'Start BFS from node {start}.',
+        'bfs.visit': 'Visit node {u}.',
+        'bfs.check': 'Check neighbour {v}.',
+        'bfs.enqueue': 'Add {v} to the queue.',
+        'bfs.finish': 'Finished {u}.',
+        'bfs.done': 'BFS complete.',
+
+        'dfs.start': 'Start DFS from node {v} and push it onto the stack (d = {d}). Node labels: discovery / finish time.',
+        'dfs.discover': 'Discover node {v} through tree edge {u} → {v} and push it onto the stack (d = {d}).',
+        'dfs.finish': 'All outgoing arcs of {u} explored: pop it from the stack (f = {f}).',
+        'dfs.back': 'Edge {u} → {v} is a back edge (to an ancestor still on the stack).',
+        'dfs.forward': 'Edge {u} → {v} is a forward edge (to a finished descendant).',
+        'dfs.cross': 'Edge {u} → {v} is a cross edge (to a finished branch).',
+        'dfs.done': ('DFS complete. Visited {visited} nodes; edge classes - '
+                     'tree: {tree}, back: {back}, forward: {forward}, cross: {cross}.'),
+
+        'dijkstra.no_source': 'The graph has no node to use as the source.',
+        'dijkstra.source_missing': "Source node '{source}' does not exist in the graph. Available nodes: {available}",
+        'dijkstra.target_missing': "Target node '{target}' does not exist in the graph. Available nodes: {available}",
+        'dijkstra.negative': 'Warning: edge ({u}, {v}) has a negative weight ({w}). Dijkstra does not support negative weights!',
+        'dijkstra.init': 'Initialise Dijkstra from source {source}. Initial distances: {source} = 0, all other nodes = ∞.',
+        'dijkstra.select': 'Select node {u} with the smallest distance = {d}. Mark it as settled.',
+        'dijkstra.found': 'Found the shortest path from {source} to {target}: {path}, total length = {d}.',
+        'dijkstra.found.path': ('{}', ' -> ', ''),
+        'dijkstra.relax': 'Update distances of the neighbours of {u}: {updates}',
+        'dijkstra.relax.updates': ('{0}: {1} → {2} (via edge {3})', ', ', ''),
+        'dijkstra.unreachable': 'No path from {source} to {target}. The graph may be disconnected.',
+        'dijkstra.done_target': 'Dijkstra from {source} complete. Distance to {target}: {d}.',
+        'dijkstra.done_all': 'Dijkstra from {source} complete. Shortest distances to all nodes found.',
+
+        'bellman_ford.init': 'Initialise: distance at {source} = 0, all other nodes = ∞.',
+        'bellman_ford.round': 'Round {i} / {total}',
+        'bellman_ford.update': 'Update {v}: {old} → {new} (via {u}, weight {w})',
+        'bellman_ford.converged': 'No distance changed. The algorithm converged early.',
+        'bellman_ford.negative_cycle': ('ERROR: NEGATIVE CYCLE detected at edge ({u} -> {v}). '
+                                        'Shortest paths are undefined!'),
+        'bellman_ford.done_target': 'Done! The shortest path from {source} to {target} has length {d}.',
+        'bellman_ford.unreachable': 'No path from {source} to {target}.',
+        'bellman_ford.done_all': 'Done! Shortest distances from {source} to every node computed.',
+
+        'prim.directed': 'Prim requires an undirected graph. Please set isDirected = False.',
+        'prim.start': 'Start Prim from node {start}. Push its neighbours (by lightest edge) into the priority queue.',
+        'prim.select': 'Add edge ({u}, {v}) with weight {w} to the MST. Running total: {total}.',
+        'prim.disconnected': 'The graph is disconnected. A full MST cannot be built.',
+        'prim.done': 'Prim complete. Total weight of the minimum spanning tree: {total}.',
+
+        'kruskal.empty': 'The graph is empty.',
+        'kruskal.sort': 'Sort the edges by increasing weight.',
+        'kruskal.consider': 'Consider edge ({u}, {v}) with weight {w}',
+        'kruskal.accept': 'ACCEPT: edge ({u}, {v}) is added to the spanning tree.',
+        'kruskal.reject': 'SKIP: edge ({u}, {v}) would form a cycle.',
+        'kruskal.done': 'Done! Total weight of the minimum spanning tree: {total}',
+
+        'boruvka.directed': 'Borůvka requires an undirected graph. Please set isDirected = False.',
+        'boruvka.start': 'Start Borůvka: every node is its own component ({components} components).',
+        'boruvka.round': ('Round {round}: every component (of {before}) picks its cheapest outgoing edge; '
+                          '{added} edges added, {after} components left. Running total: {total}.'),
+        'boruvka.done': 'Borůvka complete. Total weight of the minimum spanning tree: {total}.',
+        'boruvka.forest': 'The graph is disconnected: the minimum spanning forest has {components} trees, total weight {total}.',
+
+        'k_shortest.start': 'Find {k} shortest loopless paths from {source} to {target} (Yen).',
+        'k_shortest.path': 'Path {i}: {path}, total length = {cost}.',
+        'k_shortest.path.path': ('{}', ' -> ', ''),
+        'k_shortest.none': 'No path from {source} to {target}.',
+        'k_shortest.done': 'Done! Found {found}/{k} paths ({spur} spur path searches).',
+
+        'scc.start': ('Start Tarjan SCC. Node labels: disc/low - low is the smallest discovery time reachable '
+                      'from the subtree through one edge to a node still on the stack.'),
+        'scc.root': 'Start DFS from {v}: disc = low = {d}, push it onto the stack.',
+        'scc.discover': 'Discover {v} through edge {u} → {v}: disc = low = {d}, push it onto the stack.',
+        'scc.backtrack': 'Finish {u} and backtrack to {p}.',
+        'scc.finish': 'Finish {u} (low = {low} < disc = {d}): update low of {p} = {plow}.',
+        'scc.component': '{u} is an SCC root (low = disc = {d}). Pop SCC #{index}: {{{nodes}}}.',
+        'scc.component.nodes': ('{}', ', ', ''),
+        'scc.undirected_edge': 'Back edge {u} - {v}: same connected component.',
+        'scc.stack_edge': 'Edge {u} → {v} reaches a node on the stack: low[{u}] = {low}.',
+        'scc.done_edge': 'Edge {u} → {v} reaches a completed SCC - ignored.',
+        'scc.done': 'Tarjan complete: {count} strongly connected components.',
+
+        'topological_sort.start': ('Start DFS topological sort: the later a node finishes, the earlier it comes. '
+                                   'Node labels: position in the order.'),
+        'topological_sort.root': 'Start DFS from unvisited node {v}.',
+        'topological_sort.discover': 'Follow edge {u} → {v} and discover {v}.',
+        'topological_sort.finish': '{u} finishes (every node after it is placed): put it at position {pos}.',
+        'topological_sort.cycle': 'Back edge {u} → {v} closes the cycle {cycle}. The graph has no topological order.',
+        'topological_sort.cycle.cycle': ('{}', ' → ', ''),
+        'topological_sort.skip': 'Edge {u} → {v}: {v} already finished (position {pos}) - ignored.',
+        'topological_sort.done': 'Done. Topological order: {order}.',
+        'topological_sort.done.order': ('{}', ', ', ''),
+
+        'bridges.start': ('Start searching for bridges and articulation points. Node labels: disc/low - low is the '
+                          'smallest discovery time reachable from the subtree through one back edge.'),
+        'bridges.root': 'Start DFS from {v} (DFS tree root).',
+        'bridges.discover': 'Discover {v} through tree edge {u} - {v}: disc = low = {d}.',
+        'bridges.finish': 'Finish {u} and backtrack to {p} (low[{p}] = {plow}).',
+        'bridges.finish_notes': 'Finish {u} and backtrack to {p} (low[{p}] = {plow}). {notes}.',
+        'bridges.finish_notes.notes': ('{}', '; ', ''),
+        'bridges.finish_root': 'Finish root {u}.',
+        'bridges.finish_root_notes': 'Finish root {u}. {notes}.',
+        'bridges.finish_root_notes.notes': ('{}', '; ', ''),
+        'bridges.bridge': 'low[{u}] = {low} > disc[{p}] = {d} → edge {p} - {u} is a BRIDGE',
+        'bridges.cut': 'low[{u}] = {low} >= disc[{p}] = {d} → {p} is an ARTICULATION POINT',
+        'bridges.root_cut': 'root {u} has 2 or more DFS children → {u} is an ARTICULATION POINT',
+        'bridges.back': 'Back edge {u} - {v}: low[{u}] = {low}.',
+        'bridges.done': 'Done: {bridge_count} bridges ({bridges}), {cut_count} articulation points ({cuts}).',
+        'bridges.done.bridges': ('{}', ', ', 'none'),
+        'bridges.done.cuts': ('{}', ', ', 'none'),
+    },
+}
+
+LOCALES = tuple(MESSAGES)
+
+
+def _format_value(value):
+    return '∞' if value is None else value
+
+
+def render_message(msg_id, args=None, locale=DEFAULT_LOCALE):
+    """
+    Dựng mô tả từ id thông điệp và tham số. Id không có trong ngôn ngữ yêu cầu thì
+    dùng ngôn ngữ mặc định; id không tồn tại thì trả về chính id.
+    """
+    catalogue = MESSAGES.get(locale, MESSAGES[DEFAULT_LOCALE])
+    fallback = MESSAGES[DEFAULT_LOCALE]
+    template = catalogue.get(msg_id) or fallback.get(msg_id)
+    if template is None:
+        return msg_id
+
+    values = {}
+    for key, value in (args or {}).items():
+        if isinstance(value, list):
+            item, sep, empty = catalogue.get(f'{msg_id}.{key}') or fallback.get(f'{msg_id}.{key}', ('{}', ', ', ''))
+            parts = []
+            for x in value:
+                if isinstance(x, dict) and 'msg' in x:
+                    parts.append(render_message(x['msg'], x.get('args'), locale))
+                elif isinstance(x, (list, tuple)):
+                    parts.append(item.format(*map(_format_value, x)))
+                else:
+                    parts.append(item.format(_format_value(x)))
+            values[key] = sep.join(parts) if parts else empty
+        else:
+            values[key] = _format_value(value)
+    return template.format(**values)
+
+
+def _collect_ids(msg_id, args, used):
+    used.add(msg_id)
+    for key, value in (args or {}).items():
+        if isinstance(value, list):
+            used.add(f'{msg_id}.{key}')
+            for x in value:
+                if isinstance(x, dict) and 'msg' in x:
+                    _collect_ids(x['msg'], x.get('args'), used)
+
+
+def templates_for(steps, locale=DEFAULT_LOCALE):
+    """Các template (theo ngôn ngữ) được dùng trong danh sách step - gửi kèm khi client tự dựng mô tả."""
+    used = set()
+    for step in steps:
+        if 'msg' in step:
+            _collect_ids(step['msg'], step.get('args'), used)
+    catalogue = MESSAGES.get(locale, MESSAGES[DEFAULT_LOCALE])
+    fallback = MESSAGES[DEFAULT_LOCALE]
+    return {msg_id: catalogue.get(msg_id, fallback.get(msg_id)) for msg_id in sorted(used)
+            if msg_id in catalogue or msg_id in fallback}
+
+
+def _state_codes(highlight):
+    return {key: COLOR_CODES.get(color, color) for key, color in highlight.items()}
+
+
+def present_steps(steps, locale=DEFAULT_LOCALE, templates=False, state_codes=False):
+    """
+    Chuẩn bị step để trả về client (sửa tại chỗ và trả về chính list).
+
+    Args:
+        locale: ngôn ngữ dựng mô tả
+        templates: True = giữ 'msg'/'args', không dựng 'description'
+        state_codes: True = thay màu trong highlightNodes/highlightEdges bằng mã trạng thái
+            (màu không có trong STATE_COLORS được giữ nguyên)
+    """
+    for step in steps:
+        if not templates and 'msg' in step:
+            step['description'] = render_message(step.pop('msg'), step.pop('args', None), locale)
+        if state_codes:
+            for key in ('highlightNodes', 'highlightEdges'):
+                if step.get(key):
+                    step[key] = _state_codes(step[key])
+    return steps
+
+
+def message_catalogue(locale=DEFAULT_LOCALE):
+    """Toàn bộ catalogue của một ngôn ngữ kèm bảng mã trạng thái (endpoint /api/messages)."""
+    return {
+        'locale': locale,
+        'locales': list(LOCALES),
+        'messages': dict(MESSAGES.get(locale, MESSAGES[DEFAULT_LOCALE])),
+        'states': [{'code': code, 'name': name, 'color': color}
+                   for code, (name, color) in enumerate(zip(STATES, STATE_COLORS))],
+    }
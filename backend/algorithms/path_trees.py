@@ -0,0 +1,218 @@
+"""
+path_trees.py - Cây đường đi ngắn nhất được cache để trả lời truy vấn đường đi
+
+Dijkstra / Bellman-Ford chạy không có target đã tính xong cả cây đường đi ngắn nhất
+từ nguồn (previous / predecessors) nhưng trước đây chỉ trả về dưới dạng màu highlight,
+nên hỏi đường tới một đích khác phải chạy lại từ đầu. Ở đây cây được giữ lại dạng
+mảng gọn (khoảng cách, chỉ số nút cha, chỉ số cạnh cha) theo khóa (hash đồ thị, nguồn);
+truy vấn đường đi (/api/path) chỉ lần ngược theo mảng cha: O(độ dài đường đi).
+
+Luồng dữ liệu:
+    - thuật toán gọi export_tree(meta, ...) khi chạy xong không có target
+      (meta['path_tree'], không nằm trong response)
+    - service.py gọi store_tree(graph, algorithm, exported) với GraphArrays của request
+    - get_tree(graph_hash, source) / PathTree.path(target) khi truy vấn
+
+Cache nằm trong process (LRU), giới hạn theo số cây và tổng số byte cây giữ lại (mảng
+cây cùng bảng id nút / cạnh và ánh xạ ngược mà cây tham chiếu). Để process khác (worker
+khác, process của executor) trả lời được, service.py ghi thêm tree_entry() vào store
+dùng chung (run_cache.py) và nạp lại bằng load_tree().
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .dense import pair_edges
+from .graph_arrays import RangeIds, id_index, ids_nbytes
+
+MAX_CACHED_TREES = 128
+MAX_CACHED_TREE_BYTES = 256 * 1024 * 1024
+
+_cache = OrderedDict()   # (graph_hash, source) -> PathTree
+_cache_lock = threading.Lock()
+_cache_bytes = 0
+
+
+class PathTree:
+    """Cây đường đi ngắn nhất từ một nguồn; chỉ số nút/cạnh theo GraphArrays của đồ thị."""
+
+    __slots__ = ('graph_hash', 'source', 'algorithm', 'node_ids', 'edge_ids', 'index',
+                 'dist', 'parent', 'parent_edge')
+
+    def __init__(self, graph_hash, source, algorithm, node_ids, edge_ids, index, dist, parent, parent_edge):
+        self.graph_hash = graph_hash
+        self.source = source
+        self.algorithm = algorithm
+        self.node_ids = node_ids
+        self.edge_ids = edge_ids
+        self.index = index
+        self.dist = dist
+        self.parent = parent
+        self.parent_edge = parent_edge
+
+    @property
+    def nbytes(self):
+        """Byte cây giữ lại, kể cả bảng id và ánh xạ ngược (còn sống chừng nào cây còn trong cache)."""
+        return (self.dist.nbytes + self.parent.nbytes + self.parent_edge.nbytes
+                + ids_nbytes(self.node_ids) + ids_nbytes(self.edge_ids) + ids_nbytes(self.index))
+
+    def path(self, target):
+        """
+        Đường đi từ nguồn tới target (id nút).
+
+        Returns:
+            Dict: path, pathEdges, distance (None và list rỗng nếu không tới được)
+
+        Raises:
+            ValueError: target không tồn tại trong đồ thị
+        """
+        t = self.index.get(str(target)) if target not in (None, '') else None
+        if t is None:
+            raise ValueError(f"Nút đích '{target}' không tồn tại trong đồ thị.")
+        d = float(self.dist[t])
+        if d == np.inf:
+            return {'path': [], 'pathEdges': [], 'distance': None}
+        path, edges = [t], []
+        parent, parent_edge = self.parent, self.parent_edge
+        while parent[path[-1]] >= 0:
+            edges.append(self.edge_ids[int(parent_edge[path[-1]])])
+            path.append(int(parent[path[-1]]))
+        path.reverse()
+        edges.reverse()
+        return {'path': [self.node_ids[i] for i in path], 'pathEdges': edges, 'distance': d}
+
+
+def export_tree(meta, source, dist, parent, parent_edge=None):
+    """
+    Ghi cây đường đi ngắn nhất của lần chạy vào meta['path_tree'] (nếu có meta).
+
+    Args:
+        source: id nút nguồn
+        dist, parent: dict id -> khoảng cách / id nút cha (engine có visualization),
+            hoặc mảng/list theo chỉ số nút (engine "chỉ kết quả", cha = -1 nếu không có)
+        parent_edge: chỉ số cạnh cha theo chỉ số nút nếu engine đã biết; None thì
+            store_tree() tự tìm cạnh nhẹ nhất giữa nút và cha
+    """
+    if meta is not None:
+        meta['path_tree'] = {'source': str(source), 'dist': dist, 'parent': parent, 'parent_edge': parent_edge}
+
+
+def store_tree(graph, algorithm, exported):
+    """
+    Đưa cây do export_tree() ghi lại vào cache, theo hash nội dung của graph.
+    Cây Dijkstra trên đồ thị có trọng số âm không được lưu (có thể sai).
+
+    Returns:
+        PathTree, hoặc None nếu không lưu
+    """
+    n = graph.num_nodes
+    if algorithm == 'dijkstra' and graph.num_edges and float(graph.weight.min()) < 0:
+        return None
+
+    exported = tree_arrays(graph, exported)
+    dist, parent, parent_edge = exported['dist'], exported['parent'], exported['parent_edge']
+    # Chỉ số vừa int32 thì lưu int32 (nửa bộ nhớ)
+    if max(n, graph.num_edges) < 2 ** 31:
+        parent, parent_edge = parent.astype(np.int32), parent_edge.astype(np.int32)
+    tree = PathTree(graph.content_hash(), exported['source'], algorithm, graph.node_ids, graph.edge_ids,
+                    graph.index, dist, parent, parent_edge)
+    _put(tree)
+    return tree
+
+
+def tree_arrays(graph, exported):
+    """
+    Cây do export_tree() ghi lại ở dạng mảng theo chỉ số nút (dist, parent, parent_edge
+    đều là mảng NumPy), dạng store_tree() dùng và lưu được vào run cache.
+    """
+    n = graph.num_nodes
+    dist, parent = exported['dist'], exported['parent']
+    if isinstance(dist, dict):
+        index = graph.index
+        dist_arr = np.full(n, np.inf)
+        parent_arr = np.full(n, -1, dtype=np.int64)
+        for node, d in dist.items():
+            dist_arr[index[node]] = d
+        for node, p in parent.items():
+            if p is not None:
+                parent_arr[index[node]] = index[p]
+        dist, parent = dist_arr, parent_arr
+    else:
+        dist = np.asarray(dist, dtype=np.float64)
+        parent = np.asarray(parent, dtype=np.int64)
+
+    if exported['parent_edge'] is not None:
+        parent_edge = np.asarray(exported['parent_edge'], dtype=np.int64)
+    else:
+        children = np.flatnonzero(parent >= 0)
+        parent_edge = np.full(n, -1, dtype=np.int64)
+        parent_edge[children] = pair_edges(graph, parent[children], children)
+    return {'source': exported['source'], 'dist': dist, 'parent': parent, 'parent_edge': parent_edge}
+
+
+def _put(tree):
+    global _cache_bytes
+    key = (tree.graph_hash, tree.source)
+    with _cache_lock:
+        old = _cache.pop(key, None)
+        if old is not None:
+            _cache_bytes -= old.nbytes
+        _cache[key] = tree
+        _cache_bytes += tree.nbytes
+        while len(_cache) > 1 and (len(_cache) > MAX_CACHED_TREES or _cache_bytes > MAX_CACHED_TREE_BYTES):
+            _cache_bytes -= _cache.popitem(last=False)[1].nbytes
+
+
+def get_tree(graph_hash, source):
+    """PathTree đã cache của (hash đồ thị, id nguồn), hoặc None."""
+    key = (graph_hash, str(source))
+    with _cache_lock:
+        tree = _cache.get(key)
+        if tree is not None:
+            _cache.move_to_end(key)
+    return tree
+
+
+def tree_key(graph_hash, source):
+    """Khóa của cây trong store dùng chung."""
+    return f'path_tree:{graph_hash}:{source}'
+
+
+def _ids_entry(ids):
+    if isinstance(ids, RangeIds):
+        return {'prefix': ids.prefix, 'n': ids.n}
+    return list(ids)
+
+
+def tree_entry(tree):
+    """Dạng JSON của cây (kèm bảng id) để ghi vào store dùng chung."""
+    return {
+        'graphHash': tree.graph_hash, 'source': tree.source, 'algorithm': tree.algorithm,
+        'nodeIds': _ids_entry(tree.node_ids), 'edgeIds': _ids_entry(tree.edge_ids),
+        'dist': tree.dist.tolist(), 'parent': tree.parent.tolist(), 'parentEdge': tree.parent_edge.tolist(),
+    }
+
+
+def load_tree(entry):
+    """PathTree từ tree_entry() (đọc từ store dùng chung), đưa vào cache của process."""
+    node_ids, edge_ids = entry['nodeIds'], entry['edgeIds']
+    if isinstance(node_ids, dict):
+        node_ids = RangeIds(node_ids['n'], node_ids['prefix'])
+    if isinstance(edge_ids, dict):
+        edge_ids = RangeIds(edge_ids['n'], edge_ids['prefix'])
+    dtype = np.int32 if max(len(node_ids), len(edge_ids)) < 2 ** 31 else np.int64
+    tree = PathTree(
+        entry['graphHash'], entry['source'], entry['algorithm'], node_ids, edge_ids, id_index(node_ids),
+        np.asarray(entry['dist'], dtype=np.float64), np.asarray(entry['parent'], dtype=dtype),
+        np.asarray(entry['parentEdge'], dtype=dtype),
+    )
+    _put(tree)
+    return tree
+
+
+def tree_cache_stats():
+    """Số cây và số byte trong cache của process (cho /api/metrics)."""
+    with _cache_lock:
+        return {'trees': len(_cache), 'bytes': _cache_bytes, 'maxBytes': MAX_CACHED_TREE_BYTES}
@@ -2,7 +2,13 @@
 Thuật toán Prim - Tìm cây khung nhỏ nhất (Minimum Spanning Tree)
 """
 
-import heapq
+import numpy as np
+
+from .budget import get_budget, suspend
+from .counters import get_counters
+from .dense import dense_matrix, pair_edges, prim_dense, use_dense
+from .graph_arrays import as_graph_arrays
+from .priority_queue import dump_queue, load_queue, make_queue, weight_stats
 
 
 def prim_algorithm(graph_data, **kwargs):
@@ -11,6 +17,11 @@ def prim_algorithm(graph_data, **kwargs):
 
     kwargs:
         - start_node: id nút bắt đầu (mặc định: nút đầu tiên trong danh sách)
+        - queue: loại hàng đợi ưu tiên ('auto' | 'dary_heap' | 'dial' | 'lazy_heap' | 'dense');
+          'auto' chọn mảng quét O(V²) (ArrayQueue) trên đồ thị dày
+        - meta: dict nhận số liệu hàng đợi (meta['queue'])
+        - max_steps / max_ms / max_ops, resume: ngân sách và chạy tiếp (xem budget.py)
+        - counters: bộ đếm thao tác (xem counters.py)
     """
 
     # ========== BƯỚC 1: Parse dữ liệu đầu vào ==========
@@ -25,7 +36,7 @@ def prim_algorithm(graph_data, **kwargs):
             {
                 "highlightNodes": {},
                 "highlightEdges": {},
-                "description": "Đồ thị rỗng. Vui lòng thêm ít nhất một nút.",
+                "msg": "graph.empty",
             }
         )
         return steps
@@ -36,7 +47,7 @@ def prim_algorithm(graph_data, **kwargs):
             {
                 "highlightNodes": {},
                 "highlightEdges": {},
-                "description": "Thuật toán Prim yêu cầu đồ thị vô hướng. Vui lòng đặt isDirected = False.",
+                "msg": "prim.directed",
             }
         )
         return steps
@@ -59,27 +70,52 @@ def prim_algorithm(graph_data, **kwargs):
     visited = set()
     mst_edges = set()
     total_weight = 0.0
-    heap = []
-
-    visited.add(start_node)
-    for item in adj[start_node]:
-        heapq.heappush(heap, (item[0], start_node, item[1], item[2]))  # (w, u, v, eid)
 
-    steps.append(
-        {
-            "highlightNodes": {start_node: "#3b82f6"},
-            "highlightEdges": {},
-            "description": f"Bắt đầu Prim từ nút {start_node}. Đưa các cạnh kề vào hàng đợi ưu tiên.",
-        }
+    # Hàng đợi theo nút (không theo cạnh): priority của v là trọng số cạnh nhẹ nhất
+    # nối v với cây hiện tại, best_edge[v] = (u, eid) là cạnh đó
+    node_list = list(nodes.keys())
+    node_index = {node: i for i, node in enumerate(node_list)}
+    queue = make_queue(
+        len(node_list),
+        2 * len(edges),
+        [float(e.get("weight", 1)) for e in edges],
+        monotone=False,
+        kind=kwargs.get("queue", "auto"),
     )
+    best_edge = {}
+    budget = get_budget(kwargs)
+    resume = kwargs.get("resume")
+    meta = kwargs.get("meta")
+    counters = get_counters(kwargs)
 
-    # ========== BƯỚC 4: Vòng lặp chính ==========
-    while heap and len(visited) < len(nodes):
-        w, u, v, eid = heapq.heappop(heap)
+    if resume is None:
+        visited.add(start_node)
+        for w, v, eid in adj[start_node]:
+            if v not in visited and queue.push(node_index[v], w):
+                best_edge[v] = (start_node, eid)
+        if counters is not None:
+            counters.add("edgeScans", len(adj[start_node]))
 
-        # Bỏ qua nếu đỉnh đã được chọn
-        if v in visited:
-            continue
+        steps.append(
+            {
+                "highlightNodes": {start_node: "#3b82f6"},
+                "highlightEdges": {},
+                "msg": "prim.start",
+                "args": {"start": start_node},
+            }
+        )
+    else:
+        visited.update(resume["visited"])
+        mst_edges.update(resume["mst_edges"])
+        total_weight = resume["total_weight"]
+        best_edge.update(resume["best_edge"])
+        load_queue(queue, resume["queue"])
+
+    # ========== BƯỚC 4: Vòng lặp chính ==========
+    while queue and len(visited) < len(nodes):
+        i, w = queue.pop()
+        v = node_list[i]
+        u, eid = best_edge[v]
 
         # Thêm vào MST
         visited.add(v)
@@ -91,14 +127,40 @@ def prim_algorithm(graph_data, **kwargs):
                 "highlightNodes": {u: "#10b981", v: "#3b82f6"},
                 "highlightEdges": {eid: "#f59e0b"} | {m: "#10b981" for m in mst_edges},
                 "edgeLabels": {eid: str(w)},
-                "description": f"Chọn cạnh ({u}, {v}) trọng số {w} vào MST. Tổng hiện tại: {total_weight}.",
+                "msg": "prim.select",
+                "args": {"u": u, "v": v, "w": w, "total": total_weight},
             }
         )
 
-        # Đẩy các cạnh mới từ v
+        # Cập nhật các nút kề của v nếu có cạnh nhẹ hơn (decrease-key)
         for w2, nxt, eid2 in adj.get(v, []):
-            if nxt not in visited:
-                heapq.heappush(heap, (w2, v, nxt, eid2))
+            if nxt not in visited and queue.push(node_index[nxt], w2):
+                best_edge[nxt] = (v, eid2)
+        if counters is not None:
+            counters.add("edgeScans", len(adj[v]))
+
+        if budget is not None and queue and len(visited) < len(nodes) and budget.exhausted(steps):
+            if meta is not None:
+                meta["queue"] = queue.stats()
+            if counters is not None:
+                counters.add_queue(queue.stats())
+            return suspend(
+                steps,
+                kwargs,
+                budget,
+                {
+                    "visited": list(visited),
+                    "mst_edges": list(mst_edges),
+                    "total_weight": total_weight,
+                    "best_edge": [(nxt, best_edge[nxt]) for nxt in best_edge if nxt not in visited],
+                    "queue": dump_queue(queue),
+                },
+            )
+
+    if meta is not None:
+        meta["queue"] = queue.stats()
+    if counters is not None:
+        counters.add_queue(queue.stats())
 
     # Nếu chưa thăm hết đỉnh => đồ thị không liên thông
     if len(visited) < len(nodes):
@@ -106,7 +168,7 @@ def prim_algorithm(graph_data, **kwargs):
             {
                 "highlightNodes": {n: "#ef4444" for n in nodes if n not in visited},
                 "highlightEdges": {eid: "#10b981" for eid in mst_edges},
-                "description": "Đồ thị không liên thông. Không thể tạo MST đầy đủ.",
+                "msg": "prim.disconnected",
             }
         )
         return steps
@@ -116,10 +178,106 @@ def prim_algorithm(graph_data, **kwargs):
         {
             "highlightNodes": {n: "#10b981" for n in nodes.keys()},
             "highlightEdges": {eid: "#10b981" for eid in mst_edges},
-            "description": f"Hoàn thành Prim. Tổng trọng số cây khung nhỏ nhất: {total_weight}.",
+            "msg": "prim.done",
+            "args": {"total": total_weight},
         }
     )
 
     return steps
 
 
+
+
+def prim_csr(csr, n, start=0, queue='auto', stats=None, counters=None):
+    """
+    Prim dùng hàng đợi ưu tiên trên CSR dạng list, không sinh step. Đồ thị không liên
+    thông: tiếp tục từ nút nhỏ nhất chưa thăm (rừng khung nhỏ nhất). counters (tùy
+    chọn) nhận số liệu hàng đợi sau khi chạy.
+
+    Returns:
+        Tuple (parent, parent_edge, order) - xem prim_dense()
+    """
+    offsets, targets, weights, eidx = csr
+    parent = [-1] * n
+    parent_edge = [-1] * n
+    in_tree = [False] * n
+    order = []
+    q = make_queue(n, len(targets), weights, monotone=False, kind=queue, stats=stats, fallback='lazy_heap')
+
+    for root in [start] + list(range(n)):
+        if in_tree[root]:
+            continue
+        q.push(root, 0.0)
+        while q:
+            u, _ = q.pop()
+            in_tree[u] = True
+            order.append(u)
+            for a in range(offsets[u], offsets[u + 1]):
+                v = targets[a]
+                if not in_tree[v] and q.push(v, weights[a]):
+                    parent[v] = u
+                    parent_edge[v] = eidx[a]
+        if len(order) == n:
+            break
+    if counters is not None:
+        counters.add_queue(q.stats())
+        counters.add('edgeScans', offsets[n])
+    return parent, parent_edge, order
+
+
+def prim_result(graph_data, **kwargs):
+    """
+    Prim chế độ "chỉ kết quả" (không sinh step).
+
+    kwargs:
+        - start_node: id nút bắt đầu (mặc định: nút đầu tiên)
+        - queue: 'auto' (mặc định: đồ thị dày dùng engine ma trận O(V²) của dense.py,
+          còn lại dùng heap), 'dense' để ép engine ma trận, hoặc loại hàng đợi khác
+        - counters: bộ đếm thao tác (xem counters.py)
+
+    Returns:
+        Dict: start, engine ('dense' | 'heap'), edges (id các cạnh của cây/rừng khung),
+        totalWeight, parent (id -> id nút cha hoặc None), connected, components
+    """
+    graph = as_graph_arrays(graph_data)
+    n = graph.num_nodes
+    if graph.is_directed:
+        raise ValueError("Prim chỉ áp dụng cho đồ thị vô hướng.")
+    if n == 0:
+        return {'start': None, 'engine': 'heap', 'edges': [], 'totalWeight': 0.0,
+                'parent': {}, 'connected': True, 'components': 0}
+
+    start = graph.resolve_node(kwargs.get('start_node'), 0)
+    queue = kwargs.get('queue', 'auto')
+    counters = get_counters(kwargs)
+    if use_dense(graph, queue):
+        engine = 'dense'
+        parent, order = prim_dense(dense_matrix(graph), start)
+        children = np.flatnonzero(parent >= 0)
+        parent_edge = np.full(n, -1, dtype=np.int64)
+        parent_edge[children] = pair_edges(graph, parent[children], children)
+        parent, parent_edge = parent.tolist(), parent_edge.tolist()
+        if counters is not None:
+            # Mỗi nút thêm vào cây là một lần argmin và cập nhật một hàng của ma trận
+            counters.add('pops', n)
+            counters.add('edgeScans', n * n)
+    else:
+        engine = 'heap'
+        parent, parent_edge, order = prim_csr(
+            graph.csr_lists(), n, start, queue, weight_stats(graph.weight), counters,
+        )
+
+    ids = graph.node_ids
+    edge_ids = graph.edge_ids
+    weights = graph.weight
+    tree = [e for e in parent_edge if e >= 0]
+    components = sum(1 for v in order if parent[v] < 0)
+    return {
+        'start': ids[start],
+        'engine': engine,
+        'edges': [edge_ids[e] for e in tree],
+        'totalWeight': float(weights[tree].sum()) if tree else 0.0,
+        'parent': {ids[v]: (ids[p] if p >= 0 else None) for v, p in enumerate(parent)},
+        'connected': components == 1,
+        'components': components,
+    }
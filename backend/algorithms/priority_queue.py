@@ -0,0 +1,395 @@
+"""
+priority_queue.py - Hàng đợi ưu tiên dùng chung cho Prim và Dijkstra
+
+Khóa (key) là chỉ số nút 0..n-1. Mọi hàng đợi có cùng giao diện:
+    - push(key, priority): thêm key, hoặc giảm priority nếu key đã có (decrease-key).
+      Trả về False nếu key đã có với priority <= priority mới (không làm gì).
+    - pop(): lấy ra (key, priority) nhỏ nhất
+    - len(q): số key đang chờ
+    - stats(): số lần push / pop / decrease-key / pop phần tử cũ (stale) và kích thước lớn nhất
+    - items(): các (key, priority) đang chờ (dump_queue/load_queue dùng để tạm dừng/tiếp tục)
+
+Các loại:
+    - IndexedDaryHeap: d-ary heap có bảng vị trí -> mỗi nút chỉ có một phần tử,
+      decrease-key tại chỗ, không bao giờ pop phần tử cũ. Bộ nhớ O(V) thay vì O(E).
+    - BucketQueue: hàng đợi Dial cho trọng số nguyên không âm nhỏ (<= DIAL_MAX_WEIGHT),
+      push/decrease-key O(1), pop quét tuyến tính qua các bucket.
+    - LazyHeap: heapq với phần tử trùng lặp (cách cài đặt cũ), giữ lại để so sánh.
+    - ArrayQueue: mảng priority theo key, pop bằng argmin vectorized O(V) - phiên bản
+      O(V²) cổ điển của Prim/Dijkstra, tốt hơn heap trên đồ thị dày (E ≈ V²) vì mỗi
+      decrease-key chỉ là một phép gán.
+
+make_queue() chọn loại phù hợp theo mật độ và thống kê trọng số. Lưu ý: trong CPython, heapq
+(cài bằng C) vẫn nhanh hơn heap viết bằng Python dù phải pop phần tử cũ; vì vậy
+engine "chỉ kết quả" dùng LazyHeap khi không dùng được Dial (fallback='lazy_heap'),
+còn các thuật toán có visualization dùng IndexedDaryHeap (bộ nhớ O(V)).
+"""
+
+import heapq
+
+import numpy as np
+
+# Trọng số nguyên lớn nhất để dùng hàng đợi Dial (số bucket = DIAL_MAX_WEIGHT + 1)
+DIAL_MAX_WEIGHT = 256
+
+# Bậc trung bình lớn nhất để tự chọn Dial: đồ thị dày có nhiều decrease-key,
+# mỗi lần là chuyển key giữa hai dict - chậm hơn một lần heappush
+DIAL_MAX_DEGREE = 8
+
+# Đồ thị có ít nhất DENSE_MIN_NODES nút và mật độ cung (m / (n(n-1))) từ DENSE_MIN_DENSITY
+# trở lên được coi là dày: 'auto' chọn ArrayQueue (và engine ma trận ở mode result)
+DENSE_MIN_NODES = 64
+DENSE_MIN_DENSITY = 0.25
+
+QUEUE_KINDS = ('auto', 'dary_heap', 'dial', 'lazy_heap', 'dense')
+
+
+class _QueueStats:
+    def _init_stats(self):
+        self.pushes = 0
+        self.pops = 0
+        self.decrease_keys = 0
+        self.stale_pops = 0
+        self.max_size = 0
+
+    def stats(self):
+        return {
+            'queue': self.kind,
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'decreaseKeys': self.decrease_keys,
+            'stalePops': self.stale_pops,
+            'maxSize': self.max_size,
+        }
+
+
+    def _load_stats(self, stats):
+        self.pushes = stats['pushes']
+        self.pops = stats['pops']
+        self.decrease_keys = stats['decreaseKeys']
+        self.stale_pops = stats['stalePops']
+        self.max_size = stats['maxSize']
+
+
+class IndexedDaryHeap(_QueueStats):
+    """d-ary heap có chỉ số: heap chứa key, _pos[key] là vị trí trong heap (-1 nếu không có)."""
+
+    kind = 'dary_heap'
+
+    def __init__(self, n, d=4):
+        self.d = max(2, int(d))
+        self._heap = []
+        self._pos = [-1] * n
+        self._prio = [0.0] * n
+        self._init_stats()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, key):
+        return self._pos[key] >= 0
+
+    def items(self):
+        return [(key, self._prio[key]) for key in self._heap]
+
+    def _sift_up(self, i):
+        heap, pos, prio, d = self._heap, self._pos, self._prio, self.d
+        key = heap[i]
+        p = prio[key]
+        while i > 0:
+            parent = (i - 1) // d
+            pk = heap[parent]
+            pp = prio[pk]
+            # Cùng priority thì key nhỏ hơn đứng trước (thứ tự ổn định theo nút)
+            if pp < p or (pp == p and pk < key):
+                break
+            heap[i] = pk
+            pos[pk] = i
+            i = parent
+        heap[i] = key
+        pos[key] = i
+
+    def _sift_down(self, i):
+        heap, pos, prio, d = self._heap, self._pos, self._prio, self.d
+        size = len(heap)
+        key = heap[i]
+        p = prio[key]
+        while True:
+            first = d * i + 1
+            if first >= size:
+                break
+            best = first
+            bk = heap[first]
+            bp = prio[bk]
+            for c in range(first + 1, min(first + d, size)):
+                ck = heap[c]
+                cp = prio[ck]
+                if cp < bp or (cp == bp and ck < bk):
+                    best, bk, bp = c, ck, cp
+            if p < bp or (p == bp and key < bk):
+                break
+            heap[i] = bk
+            pos[bk] = i
+            i = best
+        heap[i] = key
+        pos[key] = i
+
+    def push(self, key, priority):
+        i = self._pos[key]
+        if i >= 0:
+            if priority >= self._prio[key]:
+                return False
+            self._prio[key] = priority
+            self.decrease_keys += 1
+            self._sift_up(i)
+            return True
+        self._prio[key] = priority
+        self._heap.append(key)
+        self.pushes += 1
+        self._sift_up(len(self._heap) - 1)
+        if len(self._heap) > self.max_size:
+            self.max_size = len(self._heap)
+        return True
+
+    def pop(self):
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        self._pos[top] = -1
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        self.pops += 1
+        return top, self._prio[top]
+
+
+class BucketQueue(_QueueStats):
+    """
+    Hàng đợi Dial: bucket thứ b chứa các key có priority nguyên b (dict dùng như
+    tập có thứ tự, nên decrease-key chỉ là chuyển key sang bucket khác).
+
+    monotone=True (Dijkstra): priority được pop không giảm và mọi priority đang chờ
+    nằm trong [min, min + max_weight] -> dùng vòng tròn max_weight + 1 bucket.
+    monotone=False (Prim): priority nằm trong [0, max_weight], bucket đánh số trực tiếp.
+    """
+
+    kind = 'dial'
+
+    def __init__(self, n, max_weight, monotone=True):
+        self.size = int(max_weight) + 1
+        self.monotone = monotone
+        self._buckets = [{} for _ in range(self.size)]
+        self._prio = [None] * n
+        self._cursor = 0
+        self._count = 0
+        self._init_stats()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key):
+        return self._prio[key] is not None
+
+    def items(self):
+        # Theo thứ tự bucket rồi thứ tự chèn trong bucket (giữ thứ tự pop khi cùng priority)
+        size = self.size
+        return [(key, self._prio[key]) for b in range(self._cursor, self._cursor + size)
+                for key in self._buckets[b % size]]
+
+    def push(self, key, priority):
+        old = self._prio[key]
+        if old is not None:
+            if priority >= old:
+                return False
+            del self._buckets[int(old) % self.size][key]
+            self.decrease_keys += 1
+        else:
+            self._count += 1
+            self.pushes += 1
+            if self._count > self.max_size:
+                self.max_size = self._count
+        self._prio[key] = priority
+        b = int(priority)
+        self._buckets[b % self.size][key] = None
+        if not self.monotone and b < self._cursor:
+            self._cursor = b
+        return True
+
+    def pop(self):
+        buckets, size = self._buckets, self.size
+        cursor = self._cursor
+        while not buckets[cursor % size]:
+            cursor += 1
+        self._cursor = cursor
+        bucket = buckets[cursor % size]
+        key = next(iter(bucket))
+        del bucket[key]
+        priority = self._prio[key]
+        self._prio[key] = None
+        self._count -= 1
+        self.pops += 1
+        return key, priority
+
+
+class LazyHeap(_QueueStats):
+    """heapq với phần tử trùng lặp: push luôn thêm mới, phần tử lỗi thời bị bỏ qua khi pop."""
+
+    kind = 'lazy_heap'
+
+    def __init__(self, n=0):
+        self._heap = []
+        self._best = {}
+        self._init_stats()
+
+    def __len__(self):
+        return len(self._best)
+
+    def __contains__(self, key):
+        return key in self._best
+
+    def items(self):
+        return list(self._best.items())
+
+    def push(self, key, priority):
+        old = self._best.get(key)
+        if old is not None:
+            if priority >= old:
+                return False
+            self.decrease_keys += 1
+        self._best[key] = priority
+        heapq.heappush(self._heap, (priority, key))
+        self.pushes += 1
+        if len(self._heap) > self.max_size:
+            self.max_size = len(self._heap)
+        return True
+
+    def pop(self):
+        while True:
+            priority, key = heapq.heappop(self._heap)
+            self.pops += 1
+            if self._best.get(key) == priority:
+                del self._best[key]
+                return key, priority
+            self.stale_pops += 1
+
+
+class ArrayQueue(_QueueStats):
+    """Mảng NumPy priority theo key (∞ = không có trong hàng đợi); cùng priority thì key nhỏ hơn ra trước."""
+
+    kind = 'dense'
+
+    def __init__(self, n):
+        self._prio = np.full(n, np.inf)
+        self._size = 0
+        self._init_stats()
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return self._prio[key] != np.inf
+
+    def items(self):
+        keys = np.flatnonzero(self._prio != np.inf)
+        return list(zip(keys.tolist(), self._prio[keys].tolist()))
+
+    def push(self, key, priority):
+        old = self._prio[key]
+        if old != np.inf:
+            if priority >= old:
+                return False
+            self.decrease_keys += 1
+        else:
+            self._size += 1
+            self.pushes += 1
+            if self._size > self.max_size:
+                self.max_size = self._size
+        self._prio[key] = priority
+        return True
+
+    def pop(self):
+        key = int(self._prio.argmin())
+        priority = float(self._prio[key])
+        self._prio[key] = np.inf
+        self._size -= 1
+        self.pops += 1
+        return key, priority
+
+
+def is_dense(n, m):
+    """Đồ thị n nút, m cung có đủ dày để dùng bản O(V²) (ArrayQueue / ma trận trọng số) không."""
+    return n >= DENSE_MIN_NODES and m >= DENSE_MIN_DENSITY * n * (n - 1)
+
+
+def dump_queue(queue):
+    """
+    Trạng thái hàng đợi dạng JSON: các phần tử đang chờ, con trỏ bucket (Dial) và số liệu.
+    LazyHeap chỉ giữ phần tử còn hiệu lực (phần tử cũ bị bỏ, nên stalePops về sau ít hơn).
+    """
+    return {
+        'items': [[key, priority] for key, priority in queue.items()],
+        'cursor': getattr(queue, '_cursor', 0),
+        'stats': queue.stats(),
+    }
+
+
+def load_queue(queue, dumped):
+    """Nạp trạng thái dump_queue() vào hàng đợi rỗng cùng loại, cùng kích thước."""
+    if isinstance(queue, BucketQueue):
+        queue._cursor = dumped['cursor']
+    for key, priority in dumped['items']:
+        queue.push(key, priority)
+    queue._load_stats(dumped['stats'])
+    return queue
+
+
+def weight_stats(weights):
+    """
+    Thống kê trọng số dùng để chọn hàng đợi (list hoặc mảng NumPy).
+
+    Returns:
+        Tuple (min_weight, max_weight, all_integer); (0, 0, True) nếu không có cạnh
+    """
+    w = np.asarray(weights, dtype=np.float64)
+    if w.size == 0:
+        return 0.0, 0.0, True
+    return float(w.min()), float(w.max()), bool(np.all(w == np.floor(w)))
+
+
+def make_queue(n, m, weights=None, monotone=True, kind='auto', stats=None, fallback='dary_heap'):
+    """
+    Tạo hàng đợi cho n key và m cung.
+
+    Args:
+        weights: trọng số cung (để chọn tự động); có thể bỏ qua nếu đã có stats
+        monotone: priority pop ra không giảm (Dijkstra) hay không (Prim: priority là trọng số cạnh)
+        kind: 'auto' | 'dary_heap' | 'dial' | 'lazy_heap' | 'dense'
+        stats: kết quả weight_stats() nếu đã tính sẵn
+        fallback: loại dùng khi 'auto' không chọn được ArrayQueue hay Dial
+
+    Raises:
+        ValueError: kind không hợp lệ, hoặc 'dial' với trọng số không phải nguyên không âm
+            hay lớn hơn DIAL_MAX_WEIGHT (mỗi giá trị trọng số là một bucket)
+    """
+    if kind not in QUEUE_KINDS:
+        raise ValueError(f'queue "{kind}" không hợp lệ. Hỗ trợ: {", ".join(QUEUE_KINDS)}.')
+
+    if kind == 'dense' or (kind == 'auto' and is_dense(n, m)):
+        return ArrayQueue(n)
+
+    if kind in ('auto', 'dial'):
+        lo, hi, integral = stats if stats is not None else weight_stats(weights if weights is not None else ())
+        dial_ok = integral and lo >= 0
+        if kind == 'dial' and not dial_ok:
+            raise ValueError('Hàng đợi Dial yêu cầu trọng số nguyên không âm.')
+        if kind == 'dial' and hi > DIAL_MAX_WEIGHT:
+            raise ValueError(f'Hàng đợi Dial chỉ hỗ trợ trọng số tối đa {DIAL_MAX_WEIGHT}.')
+        if kind == 'dial' or (dial_ok and hi <= DIAL_MAX_WEIGHT and m <= DIAL_MAX_DEGREE * max(n, 1)):
+            return BucketQueue(n, int(hi), monotone)
+        kind = fallback
+
+    if kind == 'lazy_heap':
+        return LazyHeap(n)
+    # Đồ thị dày: heap bậc cao hơn -> ít tầng hơn cho decrease-key (thường gặp)
+    d = min(8, max(2, m // max(n, 1)))
+    return IndexedDaryHeap(n, d)
@@ -0,0 +1,194 @@
+"""
+profiling.py - Hồ sơ đồ thị (profile) tính trong một lượt vectorized
+
+Các thuật toán tự phát hiện những đặc điểm cơ bản theo cách tốn kém: Dijkstra chỉ
+thấy trọng số âm khi dựng danh sách kề, Prim chỉ biết đồ thị không liên thông sau
+khi chạy xong. Profile gom các đặc điểm đó, tính một lần bằng NumPy trên GraphArrays:
+    - số nút, số cạnh, mật độ, phân bố bậc
+    - trọng số nhỏ nhất/lớn nhất, dấu, có phải số nguyên
+    - khuyên (self-loop) và cạnh song song
+    - số thành phần liên thông (có hướng: liên thông yếu)
+
+Profile được cache trong process theo hash nội dung đồ thị (LRU). Bộ điều phối
+(service.py) dùng profile cho cost model, chọn engine và từ chối sớm đầu vào mà
+thuật toán không xử lý được (check_profile()).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .dense import DENSE_MAX_NODES
+from .priority_queue import DIAL_MAX_WEIGHT
+from .graph_arrays import as_graph_arrays
+
+MAX_CACHED_PROFILES = 256
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _degree_stats(degree):
+    if not len(degree):
+        return {'min': 0, 'max': 0, 'mean': 0.0}
+    return {'min': int(degree.min()), 'max': int(degree.max()), 'mean': round(float(degree.mean()), 4)}
+
+
+def _degree_histogram(degree):
+    """Số nút theo khoảng bậc lũy thừa 2: [0], [1], [2, 3], [4, 7], ..."""
+    if not len(degree):
+        return []
+    buckets = np.bincount(np.where(degree > 0, np.floor(np.log2(np.maximum(degree, 1))).astype(np.int64) + 1, 0))
+    histogram = []
+    for b, count in enumerate(buckets.tolist()):
+        if count:
+            lo = 0 if b == 0 else 1 << (b - 1)
+            hi = 0 if b == 0 else (1 << b) - 1
+            histogram.append({'from': lo, 'to': hi, 'count': count})
+    return histogram
+
+
+def _components(n, u, v):
+    """
+    Nhãn thành phần liên thông (bỏ hướng) bằng móc gốc + nén đường đi trên toàn bộ
+    mảng cạnh mỗi vòng (số vòng ~ log V).
+
+    Returns:
+        Mảng root[i]: nút gốc (nhỏ nhất) của thành phần chứa i
+    """
+    parent = np.arange(n, dtype=np.int64)
+    if not len(u):
+        return parent
+    while True:
+        pu, pv = parent[u], parent[v]
+        lo, hi = np.minimum(pu, pv), np.maximum(pu, pv)
+        moving = lo != hi
+        if not moving.any():
+            return parent
+        # Móc gốc lớn hơn vào gốc nhỏ hơn rồi nén mọi đường đi về gốc
+        np.minimum.at(parent, hi[moving], lo[moving])
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def compute_profile(graph):
+    """Tính profile của GraphArrays (không dùng cache)."""
+    started = time.perf_counter()
+    n, m = graph.num_nodes, graph.num_edges
+    directed = graph.is_directed
+    src, dst, w = graph.src, graph.dst, graph.weight
+
+    out_degree = np.bincount(src, minlength=n)
+    in_degree = np.bincount(dst, minlength=n)
+    degree = out_degree + in_degree
+
+    # Cạnh song song: cùng cặp đầu mút (vô hướng: không phân biệt chiều)
+    if m:
+        a, b = (src, dst) if directed else (np.minimum(src, dst), np.maximum(src, dst))
+        keys = np.sort(a * max(n, 1) + b)
+        multi_edges = int(np.count_nonzero(keys[1:] == keys[:-1]))
+    else:
+        multi_edges = 0
+
+    root = _components(n, src, dst)
+    sizes = np.bincount(root, minlength=n)
+    components = int(np.count_nonzero(sizes))
+
+    pairs = n * (n - 1) if directed else n * (n - 1) / 2
+    negative = int(np.count_nonzero(w < 0))
+    profile = {
+        'graphHash': graph.content_hash(),
+        'nodes': n,
+        'edges': m,
+        'directed': directed,
+        'density': round(m / pairs, 6) if pairs else 0.0,
+        'negativeWeights': negative > 0,
+        'degree': {**_degree_stats(degree), 'histogram': _degree_histogram(degree)},
+        'weights': {
+            'min': float(w.min()) if m else 0.0,
+            'max': float(w.max()) if m else 0.0,
+            'integer': bool(np.all(w == np.floor(w))),
+            'negative': negative,
+            'zero': int(np.count_nonzero(w == 0)),
+        },
+        'selfLoops': int(np.count_nonzero(src == dst)),
+        'multiEdges': int(multi_edges),
+        'components': components,
+        'largestComponent': int(sizes.max()) if n else 0,
+        'isolatedNodes': int(np.count_nonzero(degree == 0)),
+    }
+    if directed:
+        profile['inDegree'] = _degree_stats(in_degree)
+        profile['outDegree'] = _degree_stats(out_degree)
+    profile['profileMs'] = round((time.perf_counter() - started) * 1000, 3)
+    return profile
+
+
+def graph_profile(graph_data, with_status=False):
+    """
+    Profile của đồ thị, lấy từ cache theo hash nội dung nếu đã tính.
+    Dict trả về được dùng chung giữa các request: không sửa trực tiếp.
+
+    Args:
+        graph_data: dict (nodes/edges) hoặc GraphArrays
+        with_status: True để trả về thêm cờ cached
+
+    Returns:
+        Dict profile, hoặc tuple (profile, cached) nếu with_status
+    """
+    graph = as_graph_arrays(graph_data)
+    key = graph.content_hash()
+    with _cache_lock:
+        profile = _cache.get(key)
+        if profile is not None:
+            _cache.move_to_end(key)
+    cached = profile is not None
+    if not cached:
+        profile = compute_profile(graph)
+        with _cache_lock:
+            _cache[key] = profile
+            _cache.move_to_end(key)
+            while len(_cache) > MAX_CACHED_PROFILES:
+                _cache.popitem(last=False)
+    return (profile, cached) if with_status else profile
+
+
+def check_profile(algorithm, mode, profile, kwargs):
+    """
+    Từ chối sớm (trước khi chạy) đầu vào mà thuật toán / biến thể được chọn không
+    xử lý được. Các trường hợp thuật toán vẫn chạy được để minh họa (Prim trên đồ
+    thị có hướng ở mode trace, Dijkstra với trọng số âm) không bị chặn ở đây.
+
+    Returns:
+        Thông báo lỗi, hoặc None nếu hợp lệ
+    """
+    weights = profile['weights']
+    if algorithm == 'topological_sort' and not profile['directed']:
+        return 'Sắp xếp topo chỉ áp dụng cho đồ thị có hướng.'
+    if algorithm == 'prim' and mode == 'result' and profile['directed']:
+        return 'Prim chỉ áp dụng cho đồ thị vô hướng.'
+    if algorithm == 'boruvka' and mode == 'result' and profile['directed']:
+        return 'Borůvka chỉ áp dụng cho đồ thị vô hướng.'
+    if algorithm == 'k_shortest_paths' and profile['negativeWeights']:
+        return 'Yen (k đường đi ngắn nhất) yêu cầu mọi trọng số không âm.'
+    if algorithm == 'dijkstra' and kwargs.get('landmarks') and profile['negativeWeights']:
+        return 'Landmark (ALT) yêu cầu mọi trọng số không âm.'
+    if algorithm == 'dijkstra' and kwargs.get('engine') == 'delta_stepping' and mode == 'result':
+        if profile['negativeWeights']:
+            return 'Delta-stepping yêu cầu mọi trọng số không âm.'
+        if kwargs.get('delta') is not None and not (isinstance(kwargs['delta'], (int, float)) and kwargs['delta'] > 0):
+            return 'delta phải là số > 0.'
+    if algorithm in ('prim', 'dijkstra'):
+        queue = kwargs.get('queue', 'auto')
+        if queue == 'dial' and (not weights['integer'] or profile['negativeWeights']):
+            return 'Hàng đợi Dial yêu cầu trọng số nguyên không âm.'
+        if queue == 'dial' and weights['max'] > DIAL_MAX_WEIGHT:
+            return f'Hàng đợi Dial chỉ hỗ trợ trọng số tối đa {DIAL_MAX_WEIGHT}.'
+        if queue == 'dense' and mode == 'result' and profile['nodes'] > DENSE_MAX_NODES:
+            return f'Engine ma trận chỉ hỗ trợ tối đa {DENSE_MAX_NODES} nút.'
+    return None
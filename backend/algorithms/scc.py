@@ -0,0 +1,251 @@
+"""
+scc.py - Thành phần liên thông mạnh (Strongly Connected Components) - Tarjan
+
+Tarjan chạy trên lõi DFS lặp (dfs_core), O(V + E):
+    - low[u]: thời điểm phát hiện nhỏ nhất tới được từ cây con của u qua tối đa
+      một cạnh không phải cây tới nút còn trên stack Tarjan
+    - Khi u kết thúc và low[u] == disc[u]: u là gốc của một SCC -> pop stack tới u
+
+Đồ thị vô hướng: SCC chính là thành phần liên thông (mỗi cây DFS là một thành phần).
+"""
+
+from .budget import get_budget, suspend
+from .dfs_core import DISCOVER, FINISH, dfs_roots, dfs_state, iter_dfs, sorted_csr_lists
+from .graph_arrays import as_graph_arrays
+
+# Bảng màu để tô các thành phần (lặp lại nếu nhiều thành phần hơn số màu)
+COMPONENT_COLORS = [
+    '#10b981', '#3b82f6', '#f59e0b', '#8b5cf6', '#ec4899',
+    '#14b8a6', '#f97316', '#6366f1', '#84cc16', '#06b6d4',
+]
+
+
+def _tarjan_state(graph, csr):
+    n = graph.num_nodes
+    return {
+        'dfs': dfs_state(n, csr[0], graph.num_edges, graph.is_directed),
+        'disc': [-1] * n,
+        'low': [0] * n,
+        'on_stack': bytearray(n),
+        'stack': [],
+    }
+
+
+def _tarjan_events(graph, csr, roots, state=None):
+    """
+    Tarjan trên dãy sự kiện của lõi DFS.
+
+    Args:
+        state: dict trạng thái (_tarjan_state()) cập nhật tại chỗ, để tạm dừng/tiếp tục
+
+    Yields:
+        Tuple (event, disc, low, component): component là list chỉ số nút của SCC
+        vừa tìm được khi kết thúc một gốc SCC, ngược lại là None
+    """
+    directed = graph.is_directed
+    if state is None:
+        state = _tarjan_state(graph, csr)
+    disc = state['disc']
+    low = state['low']
+    on_stack = state['on_stack']
+    stack = state['stack']
+    counter = max(disc, default=-1) + 1
+
+    for event in iter_dfs(csr, graph.num_edges, directed, roots, state['dfs']):
+        component = None
+        if event[0] == DISCOVER:
+            u = event[1]
+            disc[u] = low[u] = counter
+            counter += 1
+            stack.append(u)
+            on_stack[u] = 1
+        elif event[0] == FINISH:
+            _, u, p, _ = event
+            if (low[u] == disc[u]) if directed else (p < 0):
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component.append(w)
+                    if w == u:
+                        break
+            elif p >= 0 and low[u] < low[p]:
+                low[p] = low[u]
+        else:
+            _, u, v, _, _ = event
+            # Vô hướng: chỉ gộp theo cây DFS (cạnh ngược không tạo SCC riêng)
+            if directed and on_stack[v] and disc[v] < low[u]:
+                low[u] = disc[v]
+        yield event, disc, low, component
+
+
+def scc_algorithm(graph_data, **kwargs):
+    """
+    Tarjan SCC có visualization.
+
+    Args:
+        graph_data: Dict chứa nodes, edges, isDirected
+        **kwargs: 'start_node' (tùy chọn) - nút bắt đầu DFS; ngân sách
+            max_steps / max_ms / max_ops và 'resume' để chạy tiếp (xem budget.py)
+
+    Returns:
+        List các StepState dict để visualization.
+    """
+
+    # ========== BƯỚC 1: Parse dữ liệu ==========
+    graph = as_graph_arrays(graph_data)
+    n = graph.num_nodes
+    if n == 0:
+        return []
+
+    ids = list(graph.node_ids)
+    edge_ids = list(graph.edge_ids)
+    start = graph.resolve_node(kwargs.get('start_node'), 0)
+    csr = sorted_csr_lists(graph)
+
+    # ========== BƯỚC 2: Trạng thái để highlight ==========
+    budget = get_budget(kwargs)
+    resume = kwargs.get('resume')
+    if resume is None:
+        tarjan = _tarjan_state(graph, csr)
+        component_of = {}    # nút -> chỉ số SCC đã tìm được
+        component_edges = {} # cạnh nằm trọn trong một SCC -> màu của SCC
+        tree_edges = set()
+        on_stack = set()
+        found = 0
+    else:
+        tarjan = resume['tarjan']
+        component_of = dict(resume['component_of'])
+        component_edges = dict(resume['component_edges'])
+        tree_edges = set(resume['tree_edges'])
+        on_stack = set(resume['on_stack'])
+        found = resume['found']
+    steps = []
+
+    def labels(disc, low):
+        if not graph.is_directed:
+            return {ids[i]: str(disc[i]) for i in range(n) if disc[i] >= 0}
+        return {ids[i]: f'{disc[i]}/{low[i]}' for i in range(n) if disc[i] >= 0}
+
+    def snapshot(current=None):
+        highlight = {ids[i]: COMPONENT_COLORS[c % len(COMPONENT_COLORS)] for i, c in component_of.items()}
+        highlight.update({ids[i]: '#9ca3af' for i in on_stack})  # Xám: Trên stack Tarjan
+        if current is not None:
+            highlight[ids[current]] = '#3b82f6'                   # Xanh dương: Đang xét
+        edges = {edge_ids[e]: '#10b981' for e in tree_edges}
+        edges.update(component_edges)
+        return highlight, edges
+
+    if resume is None:
+        steps.append({
+            'highlightNodes': {},
+            'highlightEdges': {},
+            'msg': 'scc.start'
+        })
+
+    # ========== BƯỚC 3: Tarjan trên sự kiện DFS ==========
+    for event, disc, low, component in _tarjan_events(graph, csr, dfs_roots(n, start), tarjan):
+        if event[0] == DISCOVER:
+            _, v, u, e = event
+            on_stack.add(v)
+            if e >= 0:
+                tree_edges.add(e)
+                msg, args = 'scc.discover', {'u': ids[u], 'v': ids[v], 'd': disc[v]}
+            else:
+                msg, args = 'scc.root', {'v': ids[v], 'd': disc[v]}
+            highlight, edges = snapshot(v)
+
+        elif event[0] == FINISH:
+            _, u, p, _ = event
+            if component is None and not graph.is_directed:
+                msg, args = 'scc.backtrack', {'u': ids[u], 'p': ids[p]}
+                highlight, edges = snapshot(u)
+            elif component is None:
+                msg, args = 'scc.finish', {'u': ids[u], 'low': low[u], 'd': disc[u], 'p': ids[p], 'plow': low[p]}
+                highlight, edges = snapshot(u)
+            else:
+                index = found
+                found += 1
+                color = COMPONENT_COLORS[index % len(COMPONENT_COLORS)]
+                for w in component:
+                    component_of[w] = index
+                    on_stack.discard(w)
+                offsets, targets, _, eidx = csr
+                for w in component:
+                    for a in range(offsets[w], offsets[w + 1]):
+                        if component_of.get(targets[a]) == index:
+                            component_edges[edge_ids[eidx[a]]] = color
+                msg, args = 'scc.component', {'u': ids[u], 'd': disc[u], 'index': index + 1,
+                                              'nodes': [ids[w] for w in reversed(component)]}
+                highlight, edges = snapshot()
+
+        else:
+            _, u, v, e, _ = event
+            if not graph.is_directed:
+                msg, args = 'scc.undirected_edge', {'u': ids[u], 'v': ids[v]}
+            elif v in on_stack:
+                msg, args = 'scc.stack_edge', {'u': ids[u], 'v': ids[v], 'low': low[u]}
+            else:
+                msg, args = 'scc.done_edge', {'u': ids[u], 'v': ids[v]}
+            highlight, edges = snapshot(u)
+            edges[edge_ids[e]] = '#f59e0b'
+
+        steps.append({
+            'highlightNodes': highlight,
+            'highlightEdges': edges,
+            'nodeLabels': labels(disc, low),
+            'msg': msg,
+            'args': args
+        })
+
+        if budget is not None and budget.exhausted(steps):
+            return suspend(steps, kwargs, budget, {
+                'tarjan': tarjan, 'component_of': list(component_of.items()),
+                'component_edges': list(component_edges.items()), 'tree_edges': list(tree_edges),
+                'on_stack': list(on_stack), 'found': found,
+            })
+
+    # ========== BƯỚC 4: Kết thúc ==========
+    highlight, edges = snapshot()
+    steps.append({
+        'highlightNodes': highlight,
+        'highlightEdges': edges,
+        'msg': 'scc.done',
+        'args': {'count': found}
+    })
+    return steps
+
+
+def scc_result(graph_data, **kwargs):
+    """
+    Tarjan SCC chế độ "chỉ kết quả".
+
+    Returns:
+        Dict: components (list các list id, theo thứ tự topo của đồ thị rút gọn),
+        count, componentOf (id -> chỉ số thành phần), largest, isStronglyConnected
+    """
+    graph = as_graph_arrays(graph_data)
+    n = graph.num_nodes
+    start = graph.resolve_node(kwargs.get('start_node'), 0)
+
+    components = []
+    if n:
+        for _, _, _, component in _tarjan_events(graph, graph.csr_lists(), dfs_roots(n, start)):
+            if component is not None:
+                components.append(component)
+    # Tarjan tìm SCC theo thứ tự topo ngược của đồ thị rút gọn
+    components.reverse()
+
+    ids = graph.node_ids
+    component_of = {}
+    for index, component in enumerate(components):
+        for w in component:
+            component_of[ids[w]] = index
+
+    return {
+        'components': [[ids[w] for w in reversed(component)] for component in components],
+        'count': len(components),
+        'componentOf': component_of,
+        'largest': max((len(c) for c in components), default=0),
+        'isStronglyConnected': len(components) == 1,
+    }
@@ -0,0 +1,306 @@
+"""
+shared_graph.py - Kho đồ thị trong shared memory cho các worker chạy song song
+
+Gửi một đồ thị lớn sang process pool bằng pickle tốn thời gian tỉ lệ với kích thước
+đồ thị cho MỖI tác vụ; với bài toán nhiều nguồn trên cùng một đồ thị, phần serialize
+lấn át phần tính toán. Ở đây danh sách kề CSR (offsets, targets, weights, edge_index
+- xem GraphArrays.csr()) được chép MỘT lần vào một segment multiprocessing.shared_memory;
+tác vụ chỉ mang theo handle (tên segment + kích thước các mảng, vài trăm byte). Worker
+gắn vào segment theo tên và đọc trực tiếp qua memoryview (truy cập từng phần tử nhanh
+như list, không chép).
+
+Vòng đời:
+    - STORE.acquire(graph): process chủ tạo segment (hoặc dùng lại segment của cùng
+      đồ thị - theo content_hash) và tăng bộ đếm tham chiếu; STORE.release(handle)
+      giảm bộ đếm, về 0 thì segment bị unlink. STORE.shared(graph) là context manager.
+    - attach(handle): worker mở segment, giữ tối đa MAX_ATTACHED segment gần nhất
+      (gắn một lần cho nhiều tác vụ cùng đồ thị).
+    - Segment còn sót lúc process chủ thoát được dọn bằng atexit; process chủ chết đột
+      ngột thì resource tracker của multiprocessing unlink giúp.
+
+fan_out() chạy Dijkstra / BFS từ nhiều nguồn trên executor (process pool) theo cách này.
+"""
+
+import atexit
+import os
+import threading
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .dijkstra import dijkstra_csr
+from .graph_arrays import as_graph_arrays
+from .priority_queue import weight_stats
+
+# Số segment worker giữ mở cùng lúc (LRU)
+MAX_ATTACHED = 8
+
+# Thứ tự và kiểu các mảng trong segment
+_FIELDS = (('offsets', 'q'), ('targets', 'q'), ('weights', 'd'), ('edge_index', 'q'))
+
+FAN_OUT_KINDS = ('dijkstra', 'bfs')
+
+
+class SharedCSR:
+    """CSR đọc trực tiếp từ shared memory; csr là tuple memoryview dùng như list."""
+
+    def __init__(self, shm, handle):
+        self.handle = handle
+        self.num_nodes = handle['nodes']
+        self._shm = shm
+        self._views = []
+        start = 0
+        for (_, fmt), length in zip(_FIELDS, handle['lengths']):
+            view = shm.buf[start:start + 8 * length].cast(fmt)
+            self._views.append(view)
+            start += 8 * length
+        self.csr = tuple(self._views)
+
+    def close(self):
+        """Bỏ các memoryview rồi đóng segment (không unlink)."""
+        for view in self._views:
+            view.release()
+        self._views, self.csr = [], ()
+        self._shm.close()
+
+
+class GraphStore:
+    """Segment shared memory của process chủ, đếm tham chiếu theo hash đồ thị."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._by_hash = {}   # content_hash -> handle
+        self._owned = {}     # tên segment -> [SharedMemory, số tham chiếu, SharedCSR]
+
+    def acquire(self, graph):
+        """
+        Đưa CSR của đồ thị vào shared memory (hoặc dùng lại segment đã có) và tăng
+        tham chiếu.
+
+        Returns:
+            handle (dict nhỏ, pickle được) để truyền cho worker
+        """
+        graph = as_graph_arrays(graph)
+        key = graph.content_hash()
+        with self._lock:
+            handle = self._by_hash.get(key)
+            if handle is not None:
+                self._owned[handle['name']][1] += 1
+                return handle
+
+            arrays = graph.csr()
+            lengths = [len(a) for a in arrays]
+            shm = shared_memory.SharedMemory(create=True, size=max(8, 8 * sum(lengths)))
+            start = 0
+            for (_, fmt), arr in zip(_FIELDS, arrays):
+                dtype = np.int64 if fmt == 'q' else np.float64
+                end = start + 8 * len(arr)
+                np.frombuffer(shm.buf, dtype=dtype, count=len(arr), offset=start)[:] = arr
+                start = end
+            handle = {
+                'name': shm.name,
+                'graphHash': key,
+                'nodes': graph.num_nodes,
+                'lengths': lengths,
+                'directed': graph.is_directed,
+                'weightStats': weight_stats(graph.weight),
+            }
+            self._by_hash[key] = handle
+            self._owned[shm.name] = [shm, 1, SharedCSR(shm, handle)]
+            return handle
+
+    def release(self, handle):
+        """Giảm tham chiếu; về 0 thì đóng và unlink segment."""
+        with self._lock:
+            entry = self._owned.get(handle['name'])
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._owned[handle['name']]
+            del self._by_hash[handle['graphHash']]
+        _destroy(entry)
+
+    def shared(self, graph):
+        """Context manager: with STORE.shared(graph) as handle: ..."""
+        return _Lease(self, graph)
+
+    def local(self, name):
+        """SharedCSR của segment do chính process này tạo (không phải gắn lại)."""
+        with self._lock:
+            entry = self._owned.get(name)
+        return entry[2] if entry is not None else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'segments': len(self._owned),
+                'bytes': sum(entry[0].size for entry in self._owned.values()),
+                'refs': sum(entry[1] for entry in self._owned.values()),
+            }
+
+    def close_all(self):
+        """Unlink mọi segment còn lại (atexit). Process con được fork không dọn hộ process chủ."""
+        if os.getpid() != self._pid:
+            return
+        with self._lock:
+            entries = list(self._owned.values())
+            self._owned.clear()
+            self._by_hash.clear()
+        for entry in entries:
+            _destroy(entry)
+
+
+class _Lease:
+    def __init__(self, store, graph):
+        self.store, self.graph, self.handle = store, graph, None
+
+    def __enter__(self):
+        self.handle = self.store.acquire(self.graph)
+        return self.handle
+
+    def __exit__(self, *exc):
+        self.store.release(self.handle)
+
+
+def _destroy(entry):
+    shm, _, local = entry
+    local.close()
+    shm.unlink()
+
+
+STORE = GraphStore()
+atexit.register(STORE.close_all)
+
+# Segment worker đang gắn: tên -> SharedCSR (LRU)
+_attached = OrderedDict()
+_attach_lock = threading.Lock()
+_register_lock = threading.Lock()
+
+
+def open_segment(name):
+    """
+    Mở segment do process khác tạo mà không đăng ký với resource tracker: tracker
+    riêng của worker sẽ unlink segment khi worker thoát dù process chủ vẫn đang dùng
+    (bpo-39959). Việc dọn dẹp thuộc về process chủ.
+    """
+    with _register_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def attach(handle):
+    """
+    SharedCSR của handle trong process hiện tại: segment của chính process thì dùng
+    luôn, ngược lại gắn theo tên (giữ lại cho các tác vụ sau).
+    """
+    local = STORE.local(handle['name'])
+    if local is not None:
+        return local
+    name = handle['name']
+    with _attach_lock:
+        shared = _attached.get(name)
+        if shared is not None:
+            _attached.move_to_end(name)
+            return shared
+        shared = _attached[name] = SharedCSR(open_segment(name), handle)
+        while len(_attached) > MAX_ATTACHED:
+            _attached.popitem(last=False)[1].close()
+        return shared
+
+
+def _detach_all():
+    """Đóng các segment đang gắn trước khi interpreter dọn module (tránh BufferError)."""
+    with _attach_lock:
+        while _attached:
+            _attached.popitem()[1].close()
+
+
+atexit.register(_detach_all)
+
+
+def _bfs_levels(csr, n, source):
+    """Số cạnh ít nhất từ source tới mọi nút (∞ nếu không tới được)."""
+    offsets, targets = csr[0], csr[1]
+    INF = float('inf')
+    level = [INF] * n
+    level[source] = 0.0
+    frontier = [source]
+    depth = 0.0
+    while frontier:
+        depth += 1
+        nxt = []
+        for u in frontier:
+            for a in range(offsets[u], offsets[u + 1]):
+                v = targets[a]
+                if level[v] == INF:
+                    level[v] = depth
+                    nxt.append(v)
+        frontier = nxt
+    return level
+
+
+def _fan_out_rows(csr, n, kind, sources, columns, stats):
+    """Hàng khoảng cách (float64) của từng nguồn, chỉ giữ các cột columns (None = mọi nút)."""
+    rows = np.empty((len(sources), n if columns is None else len(columns)))
+    for r, s in enumerate(sources):
+        if kind == 'bfs':
+            dist = _bfs_levels(csr, n, s)
+        else:
+            dist = dijkstra_csr(csr, s, queue='auto', stats=stats)[0]
+        dist = np.asarray(dist, dtype=np.float64)
+        rows[r] = dist if columns is None else dist[columns]
+    return rows
+
+
+def _fan_out_task(handle, kind, sources, columns):
+    """Tác vụ trong worker: gắn segment theo tên rồi chạy một nhóm nguồn."""
+    shared = attach(handle)
+    rows = _fan_out_rows(shared.csr, shared.num_nodes, kind, sources, columns, tuple(handle['weightStats']))
+    return rows.tobytes()
+
+
+def fan_out(graph_data, sources, kind='dijkstra', targets=None, executor=None, workers=1):
+    """
+    Khoảng cách từ nhiều nguồn trên cùng một đồ thị: Dijkstra (trọng số không âm)
+    hoặc BFS (số cạnh). Với executor và hơn một worker, các nhóm nguồn chạy song song
+    trên CSR trong shared memory; ngược lại chạy tuần tự trong process hiện tại.
+
+    Args:
+        sources: chỉ số nút nguồn
+        targets: chỉ số các cột cần trả về (None = mọi nút)
+        executor: concurrent.futures executor (process pool)
+        workers: số worker của executor
+
+    Returns:
+        Mảng float64 (len(sources) x số cột), ∞ nếu không tới được
+    """
+    if kind not in FAN_OUT_KINDS:
+        raise ValueError(f'kind "{kind}" không hợp lệ. Hỗ trợ: {", ".join(FAN_OUT_KINDS)}.')
+    graph = as_graph_arrays(graph_data)
+    stats = weight_stats(graph.weight)
+    if kind == 'dijkstra' and graph.num_edges and stats[0] < 0:
+        raise ValueError('Dijkstra nhiều nguồn yêu cầu mọi trọng số không âm.')
+    sources = [int(s) for s in sources]
+    columns = None if targets is None else np.asarray(targets, dtype=np.int64)
+    width = graph.num_nodes if columns is None else len(columns)
+
+    if executor is None or workers <= 1 or len(sources) <= 1:
+        return _fan_out_rows(graph.csr_lists(), graph.num_nodes, kind, sources, columns, stats)
+
+    # Vài nhóm mỗi worker để cân bằng tải khi thời gian từng nguồn chênh lệch
+    size = max(1, -(-len(sources) // (4 * workers)))
+    with STORE.shared(graph) as handle:
+        futures = [
+            executor.submit(_fan_out_task, handle, kind, sources[i:i + size], columns)
+            for i in range(0, len(sources), size)
+        ]
+        rows = [np.frombuffer(f.result(), dtype=np.float64).reshape(-1, width) for f in futures]
+    return np.concatenate(rows) if rows else np.empty((0, width))
@@ -0,0 +1,200 @@
+"""
+topological_sort.py - Sắp xếp topo bằng DFS (đảo ngược thứ tự kết thúc)
+
+Chạy trên lõi DFS lặp (dfs_core), O(V + E). Nút kết thúc thứ k (đếm từ 0) đứng
+ở vị trí n - 1 - k trong thứ tự topo. Cạnh ngược đầu tiên chứng tỏ đồ thị có
+chu trình: chu trình được khôi phục theo cha trên cây DFS và thuật toán dừng.
+"""
+
+from .budget import get_budget, suspend
+from .dfs_core import BACK, DISCOVER, EDGE, FINISH, dfs_roots, dfs_state, iter_dfs, resolve_start, sorted_csr_lists
+from .graph_arrays import as_graph_arrays
+
+
+def _cycle_from_back_edge(parent, parent_edge, u, v, e):
+    """Chu trình v -> ... -> u -> v tạo bởi cạnh ngược e = (u, v): (list nút, list chỉ số cạnh)."""
+    nodes, edges = [u], [e]
+    w = u
+    while w != v:
+        edges.append(parent_edge[w])
+        w = parent[w]
+        nodes.append(w)
+    nodes.reverse()
+    edges.reverse()
+    return nodes, edges
+
+
+def _require_directed(graph):
+    if not graph.is_directed:
+        raise ValueError('Sắp xếp topo chỉ áp dụng cho đồ thị có hướng.')
+
+
+def topological_sort_algorithm(graph_data, **kwargs):
+    """
+    Sắp xếp topo có visualization.
+
+    Args:
+        graph_data: Dict chứa nodes, edges, isDirected (phải là đồ thị có hướng)
+        **kwargs: 'start_node' (tùy chọn) - nút bắt đầu DFS; ngân sách
+            max_steps / max_ms / max_ops và 'resume' để chạy tiếp (xem budget.py)
+
+    Returns:
+        List các StepState dict để visualization.
+
+    Raises:
+        ValueError: đồ thị vô hướng
+    """
+
+    # ========== BƯỚC 1: Parse dữ liệu ==========
+    graph = as_graph_arrays(graph_data)
+    _require_directed(graph)
+    n = graph.num_nodes
+    if n == 0:
+        return []
+
+    ids = list(graph.node_ids)
+    edge_ids = list(graph.edge_ids)
+    start = resolve_start(graph, kwargs)
+
+    # ========== BƯỚC 2: Trạng thái để highlight ==========
+    csr = sorted_csr_lists(graph)
+    budget = get_budget(kwargs)
+    resume = kwargs.get('resume')
+    if resume is None:
+        core = dfs_state(n, csr[0], graph.num_edges, True)
+        parent = [-1] * n
+        parent_edge = [-1] * n
+        active = set()
+        position = {}        # nút đã kết thúc -> vị trí trong thứ tự topo
+        tree_edges = set()
+    else:
+        core = resume['dfs']
+        parent, parent_edge = resume['parent'], resume['parent_edge']
+        active = set(resume['active'])
+        position = dict(resume['position'])
+        tree_edges = set(resume['tree_edges'])
+    steps = []
+
+    def snapshot(current=None):
+        highlight = {ids[i]: '#10b981' for i in position}       # Xanh lá: Đã có vị trí
+        highlight.update({ids[i]: '#f59e0b' for i in active})   # Cam: Đang trong Stack
+        if current is not None:
+            highlight[ids[current]] = '#3b82f6'                 # Xanh dương: Đang xét
+        return highlight, {edge_ids[e]: '#10b981' for e in tree_edges}
+
+    def labels():
+        return {ids[i]: f'#{p + 1}' for i, p in position.items()}
+
+    if resume is None:
+        steps.append({
+            'highlightNodes': {},
+            'highlightEdges': {},
+            'msg': 'topological_sort.start'
+        })
+
+    # ========== BƯỚC 3: DFS, ghi vị trí khi kết thúc ==========
+    for event in iter_dfs(csr, graph.num_edges, True, dfs_roots(n, start), core):
+        if event[0] == DISCOVER:
+            _, v, u, e = event
+            parent[v], parent_edge[v] = u, e
+            active.add(v)
+            if e >= 0:
+                tree_edges.add(e)
+                msg, args = 'topological_sort.discover', {'u': ids[u], 'v': ids[v]}
+            else:
+                msg, args = 'topological_sort.root', {'v': ids[v]}
+            highlight, edges = snapshot(v)
+
+        elif event[0] == FINISH:
+            u = event[1]
+            active.discard(u)
+            position[u] = n - 1 - len(position)
+            msg, args = 'topological_sort.finish', {'u': ids[u], 'pos': position[u] + 1}
+            highlight, edges = snapshot()
+
+        else:
+            _, u, v, e, kind = event
+            if kind == BACK:
+                cycle, cycle_edges = _cycle_from_back_edge(parent, parent_edge, u, v, e)
+                steps.append({
+                    'highlightNodes': {ids[w]: '#ef4444' for w in cycle},
+                    'highlightEdges': {edge_ids[c]: '#ef4444' for c in cycle_edges},
+                    'nodeLabels': labels(),
+                    'msg': 'topological_sort.cycle',
+                    'args': {'u': ids[u], 'v': ids[v], 'cycle': [ids[w] for w in cycle + [v]]}
+                })
+                return steps
+            msg, args = 'topological_sort.skip', {'u': ids[u], 'v': ids[v], 'pos': position[v] + 1}
+            highlight, edges = snapshot(u)
+            edges[edge_ids[e]] = '#9ca3af'
+
+        steps.append({
+            'highlightNodes': highlight,
+            'highlightEdges': edges,
+            'nodeLabels': labels(),
+            'msg': msg,
+            'args': args
+        })
+
+        if budget is not None and budget.exhausted(steps):
+            return suspend(steps, kwargs, budget, {
+                'dfs': core, 'parent': parent, 'parent_edge': parent_edge, 'active': list(active),
+                'position': list(position.items()), 'tree_edges': list(tree_edges),
+            })
+
+    # ========== BƯỚC 4: Kết thúc ==========
+    order = sorted(position, key=position.get)
+    highlight, edges = snapshot()
+    steps.append({
+        'highlightNodes': highlight,
+        'highlightEdges': edges,
+        'nodeLabels': labels(),
+        'msg': 'topological_sort.done',
+        'args': {'order': [ids[i] for i in order]}
+    })
+    return steps
+
+
+def topological_sort_result(graph_data, **kwargs):
+    """
+    Sắp xếp topo chế độ "chỉ kết quả".
+
+    Returns:
+        Dict: isDag, order (list id, None nếu có chu trình), cycle / cycleEdges
+        (chu trình tìm được, None nếu đồ thị là DAG)
+
+    Raises:
+        ValueError: đồ thị vô hướng
+    """
+    graph = as_graph_arrays(graph_data)
+    _require_directed(graph)
+    n = graph.num_nodes
+    ids = graph.node_ids
+    edge_ids = graph.edge_ids
+
+    parent = [-1] * n
+    parent_edge = [-1] * n
+    postorder = []
+    if n:
+        roots = dfs_roots(n, resolve_start(graph, kwargs))
+        for event in iter_dfs(graph.csr_lists(), graph.num_edges, True, roots):
+            if event[0] == DISCOVER:
+                _, v, u, e = event
+                parent[v], parent_edge[v] = u, e
+            elif event[0] == FINISH:
+                postorder.append(event[1])
+            elif event[0] == EDGE and event[4] == BACK:
+                cycle, cycle_edges = _cycle_from_back_edge(parent, parent_edge, *event[1:4])
+                return {
+                    'isDag': False,
+                    'order': None,
+                    'cycle': [ids[w] for w in cycle],
+                    'cycleEdges': [edge_ids[c] for c in cycle_edges],
+                }
+
+    return {
+        'isDag': True,
+        'order': [ids[i] for i in reversed(postorder)],
+        'cycle': None,
+        'cycleEdges': None,
+    }
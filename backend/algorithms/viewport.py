@@ -0,0 +1,166 @@
+"""
+viewport.py - Lọc step theo vùng đang hiển thị (viewport) cho đồ thị rất lớn
+
+Trên đồ thị hàng chục nghìn nút, canvas chỉ vẽ một vùng nhỏ nhưng mỗi step mang
+highlight / nhãn của toàn bộ nút và cạnh. Client gửi vùng quan tâm:
+    - {"bbox": [x0, y0, x1, y1]}: hình chữ nhật trên tọa độ x/y của nút
+    - {"nodes": [id, ...]}: tập nút cụ thể
+và server chỉ giữ trong highlightNodes / nodeLabels các nút thuộc vùng, trong
+highlightEdges / edgeLabels các cạnh chạm vùng (bbox: hộp bao của cạnh giao viewport;
+tập nút: cạnh có ít nhất một đầu mút trong tập).
+
+Chỉ mục không gian (lưới ô vuông, các nút sắp theo ô) được dựng một lần cho mỗi đồ
+thị và cache theo hash nội dung cộng hash tọa độ (di chuyển nút mà không đổi cạnh thì
+dựng lại). Step gốc của lần chạy được cache (LRU, ít lần chạy) theo runId (cũng gồm
+hash tọa độ) để lọc lại theo vùng khác mà không chạy lại thuật toán; để process khác
+(worker khác, process của executor) lọc lại được, service.py ghi thêm lần chạy vào
+store dùng chung (run_cache.py) dưới khóa viewport_key().
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_CACHED_INDEXES = 16
+MAX_CACHED_RUNS = 4
+
+# Số nút trung bình mỗi ô lưới
+_NODES_PER_CELL = 4
+
+_indexes = OrderedDict()
+_runs = OrderedDict()
+_lock = threading.Lock()
+
+
+class SpatialIndex:
+    """Lưới G x G trên hộp bao các nút; nút của ô c nằm trong order[starts[c]:starts[c + 1]]."""
+
+    def __init__(self, graph):
+        x, y = graph.x, graph.y
+        n = len(x)
+        self.x, self.y = x, y
+        self.x0, self.y0 = float(x.min()), float(y.min())
+        self.size = max(1, int(np.ceil(np.sqrt(n / _NODES_PER_CELL))))
+        span = max(float(x.max()) - self.x0, float(y.max()) - self.y0) or 1.0
+        self.cell = span / self.size * (1 + 1e-9)
+        cells = self._col(x) * self.size + self._col(y, self.y0)
+        self.order = np.argsort(cells, kind='stable')
+        self.starts = np.searchsorted(cells[self.order], np.arange(self.size * self.size + 1))
+        # Hộp bao của từng cạnh
+        xs, xd, ys, yd = x[graph.src], x[graph.dst], y[graph.src], y[graph.dst]
+        self.edge_box = (np.minimum(xs, xd), np.maximum(xs, xd), np.minimum(ys, yd), np.maximum(ys, yd))
+
+    def _col(self, values, origin=None):
+        origin = self.x0 if origin is None else origin
+        return np.clip(((values - origin) / self.cell).astype(np.int64), 0, self.size - 1)
+
+    def query_nodes(self, x0, y0, x1, y1):
+        """Chỉ số các nút nằm trong [x0, x1] x [y0, y1]: chỉ duyệt các ô giao viewport."""
+        cx0, cx1 = (int(c) for c in self._col(np.array([x0, x1])))
+        cy0, cy1 = (int(c) for c in self._col(np.array([y0, y1]), self.y0))
+        parts = [self.order[self.starts[cx * self.size + cy0]:self.starts[cx * self.size + cy1 + 1]]
+                 for cx in range(cx0, cx1 + 1)]
+        candidates = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        xs, ys = self.x[candidates], self.y[candidates]
+        return candidates[(xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)]
+
+    def query_edges(self, x0, y0, x1, y1):
+        """Chỉ số các cạnh có hộp bao giao viewport."""
+        lo_x, hi_x, lo_y, hi_y = self.edge_box
+        return np.flatnonzero((hi_x >= x0) & (lo_x <= x1) & (hi_y >= y0) & (lo_y <= y1))
+
+
+def get_spatial_index(graph):
+    """SpatialIndex của GraphArrays (cache theo hash nội dung và hash tọa độ)."""
+    key = (graph.content_hash(), graph.coords_hash())
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = SpatialIndex(graph)
+    with _lock:
+        _indexes[key] = index
+        while len(_indexes) > MAX_CACHED_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def viewport_region(graph, viewport):
+    """
+    Tập id nút và id cạnh (dạng chuỗi) thuộc viewport.
+
+    Raises:
+        ValueError: viewport không hợp lệ, hoặc bbox trên đồ thị không có tọa độ
+    """
+    if not isinstance(viewport, dict):
+        raise ValueError('"viewport" phải là object {"bbox": [x0, y0, x1, y1]} hoặc {"nodes": [...]}.')
+    if viewport.get('bbox') is not None:
+        bbox = viewport['bbox']
+        if not (isinstance(bbox, list) and len(bbox) == 4
+                and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in bbox)):
+            raise ValueError('"viewport.bbox" phải là [x0, y0, x1, y1].')
+        if graph.x is None or graph.y is None:
+            raise ValueError('Đồ thị không có tọa độ x/y cho mọi nút: hãy dùng "viewport.nodes".')
+        x0, x1 = sorted(bbox[0::2])
+        y0, y1 = sorted(bbox[1::2])
+        if graph.num_nodes == 0:
+            return set(), set()
+        index = get_spatial_index(graph)
+        nodes = index.query_nodes(x0, y0, x1, y1)
+        edges = index.query_edges(x0, y0, x1, y1)
+    elif isinstance(viewport.get('nodes'), list):
+        lookup = graph.index
+        nodes = np.array(sorted({i for i in (lookup.get(str(v)) for v in viewport['nodes']) if i is not None}),
+                         dtype=np.int64)
+        inside = np.zeros(graph.num_nodes, dtype=bool)
+        inside[nodes] = True
+        edges = np.flatnonzero(inside[graph.src] | inside[graph.dst])
+    else:
+        raise ValueError('"viewport" cần "bbox" hoặc "nodes".')
+    node_ids, edge_ids = graph.node_ids, graph.edge_ids
+    return {str(node_ids[i]) for i in nodes.tolist()}, {str(edge_ids[e]) for e in edges.tolist()}
+
+
+def filter_steps(steps, nodes, edges):
+    """
+    Bản sao nông của các step, chỉ giữ highlight / nhãn thuộc vùng (step gốc không đổi,
+    để lọc lại theo vùng khác).
+    """
+    out = []
+    for step in steps:
+        step = dict(step)
+        for key, keep in (('highlightNodes', nodes), ('nodeLabels', nodes),
+                          ('highlightEdges', edges), ('edgeLabels', edges)):
+            values = step.get(key)
+            if values:
+                step[key] = {k: v for k, v in values.items() if str(k) in keep}
+        out.append(step)
+    return out
+
+
+def cache_run(run_id, graph, steps, extra):
+    """
+    Giữ step gốc (chưa qua present_steps) của một lần chạy để lọc lại; extra là các
+    trường khác của response (name, continuation, stoppedBy).
+    """
+    with _lock:
+        _runs[run_id] = {'graph': graph, 'steps': steps, 'extra': extra}
+        _runs.move_to_end(run_id)
+        while len(_runs) > MAX_CACHED_RUNS:
+            _runs.popitem(last=False)
+
+
+def viewport_key(run_id):
+    """Khóa của lần chạy trong store dùng chung."""
+    return f'viewport:{run_id}'
+
+
+def get_run(run_id):
+    """Lần chạy đã cache (dict graph, steps, extra) hoặc None."""
+    with _lock:
+        run = _runs.get(run_id)
+        if run is not None:
+            _runs.move_to_end(run_id)
+    return run
@@ -1,38 +1,66 @@
 """
 MẪU Flask API Backend cho AlgoGraphStudio
 File mẫu để khởi chạy server Flask và tích hợp các thuật toán.
+
+- Chạy dev:        python backend/app.py
+- Chạy production: python backend/serve.py  (xem serve.py)
 """
 
-from flask import Flask, request, jsonify, make_response
+from flask import Blueprint, Flask, Response, request, jsonify, make_response, stream_with_context
 import sys
 import os
 
 # Bổ sung đường dẫn để import các thuật toán trong thư mục backend/algorithms
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Import TẤT CẢ thuật toán từ __init__.py
-from algorithms import (
-    prim_algorithm,
-    kruskal_algorithm,
-    dijkstra_algorithm,
-    bellman_ford_algorithm,
-    bfs_algorithm,
-    dfs_algorithm,
+from bulk import parse_bulk_args, run_bulk_lines
+from config import load_settings
+from service import (
+    ALGORITHM_FUNCTIONS,
+    ALGORITHM_INFOS,
+    configure,
+    execute_generate,
+    execute_landmarks,
+    execute_layout,
+    execute_library,
+    execute_messages,
+    execute_metrics,
+    execute_multi_source,
+    execute_path,
+    execute_viewport,
+    execute_profile,
+    execute_run,
+    execute_run_stream,
+    layout_lines,
+    prepare_layout,
+    preload_algorithms,
+    use_stream_ingest,
 )
 
-app = Flask(__name__)
+api = Blueprint('api', __name__)
 
 # ====== CORS đơn giản ======
-@app.after_request
+@api.after_app_request
 def add_cors_headers(response):
     response.headers["Access-Control-Allow-Origin"] = "*"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
     response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
     return response
 
-@app.route("/api/run", methods=["OPTIONS"])
-@app.route("/api/algorithms", methods=["OPTIONS"])
-@app.route("/api/health", methods=["OPTIONS"])
+@api.route("/api/run", methods=["OPTIONS"])
+@api.route("/api/landmarks", methods=["OPTIONS"])
+@api.route("/api/profile", methods=["OPTIONS"])
+@api.route("/api/multi_source", methods=["OPTIONS"])
+@api.route("/api/path", methods=["OPTIONS"])
+@api.route("/api/viewport", methods=["OPTIONS"])
+@api.route("/api/generate", methods=["OPTIONS"])
+@api.route("/api/layout", methods=["OPTIONS"])
+@api.route("/api/bulk", methods=["OPTIONS"])
+@api.route("/api/algorithms", methods=["OPTIONS"])
+@api.route("/api/health", methods=["OPTIONS"])
+@api.route("/api/metrics", methods=["OPTIONS"])
+@api.route("/api/library", methods=["OPTIONS"])
+@api.route("/api/messages", methods=["OPTIONS"])
 def cors_preflight():
     resp = make_response()
     resp.status_code = 200
@@ -41,88 +69,127 @@ def cors_preflight():
     resp.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
     return resp
 
-# 1. MAPPING: Frontend string -> Backend function
-ALGORITHM_FUNCTIONS = {
-    "prim": prim_algorithm,
-    "kruskal": kruskal_algorithm,
-    "dijkstra": dijkstra_algorithm,
-    #"ford_fulkerson": ford_fulkerson_algorithm,
-    #"fleury": fleury_algorithm,
-    #"hierholzer": hierholzer_algorithm,
-    "bellman_ford": bellman_ford_algorithm,
-    "bfs": bfs_algorithm,
-    "dfs": dfs_algorithm,
-    #"bfs_coloring": bfs_coloring_algorithm
-}
-
-# 2. METADATA: Mô tả cho endpoint /api/algorithms
-ALGORITHM_INFOS = [
-    {"id": "prim", "name": "MST - Prim", "description": "Tìm cây khung nhỏ nhất (Prim)."},
-    {"id": "kruskal", "name": "MST - Kruskal", "description": "Tìm cây khung nhỏ nhất (Kruskal)."},
-    {"id": "dijkstra", "name": "Shortest Path - Dijkstra", "description": "Đường đi ngắn nhất (trọng số dương)."},
-    {"id": "bellman_ford", "name": "Shortest Path - Bellman-Ford", "description": "Đường đi ngắn nhất (xử lý trọng số âm)."},
-    #{"id": "ford_fulkerson", "name": "Max Flow - Ford-Fulkerson", "description": "Luồng cực đại trong mạng."},
-    {"id": "bfs", "name": "Traversal - BFS", "description": "Duyệt đồ thị theo chiều rộng."},
-    {"id": "dfs", "name": "Traversal - DFS", "description": "Duyệt đồ thị theo chiều sâu."},
-    #{"id": "bfs_coloring", "name": "Graph Coloring (BFS)", "description": "Tô màu đồ thị sử dụng BFS."},
-    #{"id": "fleury", "name": "Euler Path - Fleury", "description": "Tìm chu trình/đường đi Euler (Fleury)."},
-    #{"id": "hierholzer", "name": "Euler Path - Hierholzer", "description": "Tìm chu trình Euler (Hierholzer - hiệu quả hơn)."},
-]
-
-@app.route('/api/run', methods=['POST'])
+@api.route('/api/run', methods=['POST'])
 def run_algorithm():
+    # Body lớn (hoặc không rõ độ dài) đọc theo luồng, không dựng dict cho từng nút/cạnh
+    if use_stream_ingest(request.content_length):
+        body, status = execute_run_stream(request.stream, request.content_length)
+    else:
+        body, status = execute_run(request.get_json(silent=True))
+    return jsonify(body), status
+
+@api.route('/api/landmarks', methods=['POST'])
+def build_landmarks():
+    body, status = execute_landmarks(request.get_json(silent=True))
+    return jsonify(body), status
+
+@api.route('/api/profile', methods=['POST'])
+def profile_graph():
+    body, status = execute_profile(request.get_json(silent=True))
+    return jsonify(body), status
+
+@api.route('/api/multi_source', methods=['POST'])
+def multi_source():
+    body, status = execute_multi_source(request.get_json(silent=True))
+    return jsonify(body), status
+
+@api.route('/api/path', methods=['GET', 'POST'])
+def shortest_path():
+    """GET ?graph=<hash>&source=&target= hoặc POST JSON (có thể kèm đồ thị đầy đủ)."""
+    data = request.args.to_dict() if request.method == 'GET' else request.get_json(silent=True)
+    body, status = execute_path(data)
+    return jsonify(body), status
+
+@api.route('/api/viewport', methods=['POST'])
+def filter_viewport():
+    body, status = execute_viewport(request.get_json(silent=True))
+    return jsonify(body), status
+
+@api.route('/api/generate', methods=['POST'])
+def generate_graph():
+    body, status = execute_generate(request.get_json(silent=True))
+    return jsonify(body), status
+
+@api.route('/api/layout', methods=['POST'])
+def layout_graph():
+    """?stream=1: trả về JSON Lines các vị trí trung gian (mỗi "every" vòng) rồi vị trí cuối."""
+    data = request.get_json(silent=True)
+    if request.args.get('stream') in (None, '', '0', 'false'):
+        body, status = execute_layout(data)
+        return jsonify(body), status
+    try:
+        graph, options = prepare_layout(data, stream=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    lines = layout_lines(graph, options)
+    return Response(stream_with_context(line + '\n' for line in lines), mimetype='application/x-ndjson')
+
+@api.route('/api/bulk', methods=['POST'])
+def run_bulk():
+    """
+    Body: JSON Lines (mỗi dòng một đồ thị). Query: algorithm, mode và các tham số
+    như /api/run (source, target, start_node, ...). Response: JSON Lines theo thứ tự
+    đầu vào, dòng cuối là {"summary": {...}}.
+    """
     try:
-        data = request.json
-        algorithm = data.get('algorithm', '').lower()
-        graph_data = data.get('graph', {})
-        
-        # Lấy các tham số tùy chọn (kwargs)
-        kwargs = {}
-        for key in ['start_node', 'source', 'target', 'sink', 'max_iter']:
-            if key in data and data[key] is not None:
-                kwargs[key] = data[key]
-
-        if not graph_data:
-            return jsonify({'error': 'Thiếu dữ liệu đồ thị'}), 400
-
-        if algorithm not in ALGORITHM_FUNCTIONS:
-            return jsonify({
-                'error': f'Thuật toán "{algorithm}" không được hỗ trợ',
-                'supported_algorithms': list(ALGORITHM_FUNCTIONS.keys())
-            }), 400
-        
-        # --- VALIDATE RIÊNG CHO TỪNG THUẬT TOÁN ---
-        
-        # 1. Dijkstra & Bellman-Ford: Cần Source
-        if algorithm in ['dijkstra', 'bellman_ford'] and 'source' not in kwargs:
-             return jsonify({'error': f'{algorithm} yêu cầu "source" (nút nguồn).'}), 400
-
-        # 2. Ford-Fulkerson: Cần Source & Sink
-       # if algorithm == 'ford_fulkerson':
-            #if 'source' not in kwargs or 'sink' not in kwargs:
-               # return jsonify({'error': 'Ford-Fulkerson yêu cầu cả "source" và "sink".'}), 400
-
-        # 3. BFS, DFS, Prim: Thường cần start_node (nếu không có, backend có thể tự chọn nút đầu tiên, nhưng cảnh báo nếu cần)
-        # (Ở đây ta để lỏng, nếu thiếu backend tự xử lý default)
-        
-        # Gọi thuật toán
-        func = ALGORITHM_FUNCTIONS[algorithm]
-        steps = func(graph_data, **kwargs)
-        
-        return jsonify({'name': algorithm, 'steps': steps})
-
-    except Exception as e:
-        # Log lỗi ra console server để debug dễ hơn
-        print(f"Error running {algorithm}: {str(e)}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/health', methods=['GET'])
+        algorithm, params, mode = parse_bulk_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'supported_algorithms': list(ALGORITHM_FUNCTIONS.keys())}), 400
+    lines = run_bulk_lines(request.stream, algorithm, params, mode)
+    return Response(stream_with_context(line + '\n' for line in lines), mimetype='application/x-ndjson')
+
+@api.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'ok', 'message': 'Flask API Ready'})
 
-@app.route('/api/algorithms', methods=['GET'])
+@api.route('/api/algorithms', methods=['GET'])
 def list_algorithms():
     return jsonify({'algorithms': ALGORITHM_INFOS})
 
+@api.route('/api/library', methods=['GET'])
+def graph_library():
+    body, status = execute_library()
+    return jsonify(body), status
+
+@api.route('/api/metrics', methods=['GET'])
+def metrics():
+    body, status = execute_metrics()
+    return jsonify(body), status
+
+
+@api.route('/api/messages', methods=['GET'])
+def messages():
+    body, status = execute_messages(request.args.get('locale'))
+    return jsonify(body), status
+
+
+def create_app(config=None):
+    """
+    App factory: tạo Flask app với cấu hình từ biến môi trường/file (config.py),
+    sau đó ghi đè bằng dict `config` nếu có.
+    """
+    settings = load_settings()
+    if config:
+        settings.update(config)
+
+    app = Flask(__name__)
+    app.config.update(settings)
+    configure(settings)
+
+    if app.config.get('PRELOAD', True):
+        preload_algorithms()
+
+    app.register_blueprint(api)
+    return app
+
+
+# Giữ biến `app` ở mức module để tương thích: `python app.py`, `gunicorn app:app`
+app = create_app()
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
+    app.run(
+        debug=app.config['DEBUG'],
+        port=app.config['PORT'],
+        host=app.config['HOST'],
+        threaded=True,
+    )
@@ -0,0 +1,217 @@
+"""
+asgi.py - Ứng dụng ASGI tối giản (không phụ thuộc framework) cho production.
+
+    gunicorn --preload -w 4 -k uvicorn.workers.UvicornWorker -b 0.0.0.0:5000 asgi:app
+
+Handler /api/run (và các endpoint POST khác) là bất đồng bộ: việc parse JSON
+(body lớn của /api/run đọc theo luồng bằng ingest.py), chạy thuật toán và
+serialize kết quả được đẩy sang executor (process hoặc thread), nên event loop
+vẫn phục vụ /api/health và /api/algorithms khi có request nặng.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bulk import parse_bulk_args, run_bulk_lines
+from config import load_settings
+from metrics import REGISTRY, forward_to_parent
+from service import (
+    ALGORITHM_INFOS,
+    POST_ENDPOINTS,
+    configure,
+    execute_json,
+    execute_library,
+    execute_messages,
+    execute_metrics,
+    execute_path,
+    layout_lines,
+    mark_executor_process,
+    preload_algorithms,
+    prepare_layout,
+)
+
+CORS_HEADERS = [
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-methods", b"GET, POST, PUT, DELETE, OPTIONS"),
+    (b"access-control-allow-headers", b"Content-Type, Authorization"),
+]
+
+
+def init_executor_process():
+    """Initializer của process executor: metrics gửi về process cha, state giữ trong process được đánh dấu."""
+    forward_to_parent()
+    mark_executor_process()
+
+
+def create_asgi_app(config=None):
+    """
+    App factory cho ASGI. Executor được tạo lười ở request đầu tiên (hoặc ở
+    sự kiện lifespan startup) để không bị fork cùng process master.
+    """
+    settings = load_settings()
+    if config:
+        settings.update(config)
+    configure(settings)
+
+    if settings.get('PRELOAD', True):
+        preload_algorithms()
+
+    state = {'executor': None}
+
+    def get_executor():
+        if state['executor'] is None:
+            workers = max(1, int(settings['EXECUTOR_WORKERS']))
+            if settings['EXECUTOR'] == 'thread':
+                state['executor'] = ThreadPoolExecutor(max_workers=workers)
+            else:
+                state['executor'] = ProcessPoolExecutor(max_workers=workers, initializer=init_executor_process)
+        return state['executor']
+
+    async def send_response(send, status, body, content_type=b"application/json"):
+        headers = [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers + CORS_HEADERS})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def send_json(send, status, payload):
+        await send_response(send, status, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+    async def read_body(receive, max_bytes=0):
+        """Gom body của request; trả về None ngay khi vượt max_bytes (0 = không giới hạn)."""
+        chunks = []
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                return None
+            chunks.append(chunk)
+            more = message.get('more_body', False)
+        return b''.join(chunks)
+
+    def query_args(scope):
+        return dict(parse_qsl(scope.get('query_string', b'').decode()))
+
+    def wants_stream(scope):
+        return query_args(scope).get('stream') not in (None, '', '0', 'false')
+
+    async def stream_lines(send, make_lines):
+        """Chạy make_lines() trong thread riêng, đẩy từng dòng JSON ra client ngay khi có."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def produce():
+            try:
+                for line in make_lines():
+                    loop.call_soon_threadsafe(queue.put_nowait, line)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b"content-type", b"application/x-ndjson")] + CORS_HEADERS})
+        producer = loop.run_in_executor(None, produce)
+        while True:
+            line = await queue.get()
+            if line is None:
+                break
+            await send({'type': 'http.response.body', 'body': line.encode('utf-8') + b'\n', 'more_body': True})
+        await producer
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def stream_bulk(scope, receive, send):
+        """/api/bulk: JSON Lines vào, JSON Lines kết quả ra theo thứ tự."""
+        try:
+            algorithm, params, mode = parse_bulk_args(query_args(scope))
+        except ValueError as e:
+            await send_json(send, 400, {'error': str(e)})
+            return
+        body = await read_body(receive)
+        await stream_lines(send, lambda: run_bulk_lines(body.splitlines(), algorithm, params, mode))
+
+    async def stream_layout(receive, send):
+        """/api/layout?stream=1: parse và kiểm tra payload ngoài event loop, rồi stream snapshot."""
+        body = await read_body(receive)
+        loop = asyncio.get_running_loop()
+        try:
+            graph, options = await loop.run_in_executor(
+                None, lambda: prepare_layout(json.loads(body) if body else None, stream=True)
+            )
+        except ValueError as e:
+            await send_json(send, 400, {'error': str(e)})
+            return
+        await stream_lines(send, lambda: layout_lines(graph, options))
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if state['executor'] is not None:
+                    state['executor'].shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        path = scope['path'].rstrip('/')
+        method = scope['method']
+
+        if method == 'OPTIONS':
+            await send_response(send, 200, b'', b'text/plain')
+        elif path == '/api/health' and method == 'GET':
+            await send_json(send, 200, {'status': 'ok', 'message': 'ASGI API Ready'})
+        elif path == '/api/algorithms' and method == 'GET':
+            await send_json(send, 200, {'algorithms': ALGORITHM_INFOS})
+        elif path == '/api/library' and method == 'GET':
+            body, status = execute_library()
+            await send_json(send, status, body)
+        elif path == '/api/metrics' and method == 'GET':
+            body, status = execute_metrics()
+            await send_json(send, status, body)
+        elif path == '/api/path' and method == 'GET':
+            # Cùng executor với POST /api/path (tính cây khi gửi kèm đồ thị, đọc store dùng chung)
+            loop = asyncio.get_running_loop()
+            body, status = await loop.run_in_executor(get_executor(), execute_path, query_args(scope))
+            await send_json(send, status, body)
+        elif path == '/api/messages' and method == 'GET':
+            body, status = execute_messages(query_args(scope).get('locale'))
+            await send_json(send, status, body)
+        elif path == '/api/bulk' and method == 'POST':
+            await stream_bulk(scope, receive, send)
+        elif path == '/api/layout' and method == 'POST' and wants_stream(scope):
+            await stream_layout(receive, send)
+        elif path in POST_ENDPOINTS and method == 'POST':
+            # /api/run: từ chối body quá INGEST_MAX_BYTES trước khi gom hết vào bộ nhớ
+            max_bytes = settings['INGEST_MAX_BYTES'] if path == '/api/run' else 0
+            length = dict(scope.get('headers', [])).get(b'content-length')
+            body = None
+            if not (max_bytes and length and length.isdigit() and int(length) > max_bytes):
+                body = await read_body(receive, max_bytes)
+            if body is None:
+                await send_json(send, 413, {'error': f'Body vượt quá {max_bytes} byte.'})
+                return
+            loop = asyncio.get_running_loop()
+            result, status, records = await loop.run_in_executor(get_executor(), execute_json, path, body)
+            for record in records:
+                REGISTRY.record_run(*record)
+            await send_response(send, status, result)
+        else:
+            await send_json(send, 404, {'error': 'Không tìm thấy endpoint'})
+
+    return app
+
+
+app = create_asgi_app()
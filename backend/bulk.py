@@ -0,0 +1,239 @@
+"""
+bulk.py - Chạy MỘT thuật toán trên RẤT NHIỀU đồ thị nhỏ (ví dụ: chấm bài sinh viên)
+
+Đầu vào là luồng JSON Lines, mỗi dòng là:
+    - một đồ thị {"nodes": [...], "edges": [...], "isDirected": ...}, hoặc
+    - một payload {"graph": {...}, "source": ..., ...} để ghi đè tham số cho đồ thị đó.
+
+Các dòng được gom thành chunk (theo số byte) và phân phối cho process pool: dòng
+JSON thô được gửi sang worker và kết quả đã serialize được gửi về, nên chi phí
+pickle chỉ là chuỗi bytes và được khấu hao trên cả chunk. Kết quả trả về theo
+đúng thứ tự đầu vào; lỗi của từng đồ thị được cô lập trong dòng kết quả của nó.
+
+    python backend/bulk.py kruskal graphs.jsonl > results.jsonl
+    python backend/bulk.py dijkstra graphs.jsonl --param source=1 --mode result
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import REGISTRY, forward_to_parent
+from service import ALGORITHM_FUNCTIONS, RUN_PARAMS, SETTINGS, execute_run
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers=None):
+    """
+    Process pool dùng chung, tạo lười trong worker (không tạo trước khi fork).
+
+    Returns:
+        Tuple (pool, số process)
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            _pool_workers = max(1, int(workers or SETTINGS['BULK_WORKERS']))
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers, initializer=forward_to_parent)
+        return _pool, _pool_workers
+
+
+def reset_pool():
+    """Bỏ pool hiện tại (ví dụ khi một process con bị kill do OOM); lần sau sẽ tạo lại."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def parse_bulk_args(args):
+    """
+    Đọc tham số của /api/bulk từ query string (dict-like).
+
+    Returns:
+        Tuple (algorithm, params, mode)
+
+    Raises:
+        ValueError: thuật toán không được hỗ trợ
+    """
+    algorithm = (args.get('algorithm') or '').lower()
+    if algorithm not in ALGORITHM_FUNCTIONS:
+        raise ValueError(f'Thuật toán "{algorithm}" không được hỗ trợ')
+    params = {key: args.get(key) for key in RUN_PARAMS if args.get(key) is not None}
+    return algorithm, params, args.get('mode')
+
+
+def _run_line(algorithm, params, mode, index, line):
+    """
+    Chạy một đồ thị; mọi lỗi đều được gói vào dòng kết quả, không lan ra chunk.
+
+    Returns:
+        Tuple (dòng kết quả đã serialize, thành công hay không)
+    """
+    try:
+        item = json.loads(line)
+        if not isinstance(item, dict):
+            raise ValueError('Mỗi dòng phải là một object JSON')
+        payload = dict(params)
+        if 'graph' in item:
+            payload.update(item)
+        else:
+            payload['graph'] = item
+        payload['algorithm'] = algorithm
+        if mode:
+            payload['mode'] = mode
+
+        body, status = execute_run(payload)
+        if status >= 400:
+            record = {'index': index, 'status': status, 'error': body.get('error')}
+        else:
+            record = {'index': index, 'status': status, **body}
+    except Exception as e:
+        status = 400
+        record = {'index': index, 'status': status, 'error': str(e)}
+    return json.dumps(record, ensure_ascii=False), status < 400
+
+
+def _run_chunk(algorithm, params, mode, start, lines):
+    """
+    Chạy trong process con: xử lý một chunk dòng JSON thô.
+
+    Returns:
+        Tuple (list dòng kết quả đã serialize, số đồ thị thành công,
+        bản ghi metrics gửi về process cha)
+    """
+    out, ok = [], 0
+    for i, line in enumerate(lines):
+        result, success = _run_line(algorithm, params, mode, start + i, line)
+        out.append(result)
+        ok += success
+    return out, ok, REGISTRY.take_pending()
+
+
+def _chunks(lines, chunk_bytes, max_chunk):
+    """Gom các dòng không rỗng thành chunk theo tổng số byte (và số dòng tối đa)."""
+    chunk, size = [], 0
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append(line)
+        size += len(line)
+        if size >= chunk_bytes or len(chunk) >= max_chunk:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+def run_bulk_lines(lines, algorithm, params=None, mode=None, workers=None,
+                   chunk_bytes=None, max_chunk=None, summary=True):
+    """
+    Chạy thuật toán trên luồng dòng JSON, sinh ra từng dòng kết quả (chuỗi JSON)
+    theo đúng thứ tự đầu vào; dòng cuối cùng là {"summary": {...}} nếu summary=True.
+
+    Số chunk đang xử lý được giới hạn (2 x số worker) nên bộ nhớ không phụ thuộc
+    độ dài luồng đầu vào.
+    """
+    params = {k: v for k, v in (params or {}).items() if v is not None}
+    chunk_bytes = int(chunk_bytes or SETTINGS['BULK_CHUNK_BYTES'])
+    max_chunk = int(max_chunk or SETTINGS['BULK_MAX_CHUNK'])
+    pool, pool_workers = get_pool(workers)
+    window = 2 * pool_workers
+
+    started = time.perf_counter()
+    total = ok = chunks = 0
+    pending = deque()
+    index = 0
+
+    def drain_one():
+        nonlocal total, ok
+        future, start, size = pending.popleft()
+        try:
+            out, chunk_ok, records = future.result()
+        except Exception as e:
+            # Process con chết (OOM, ...): cả chunk được báo lỗi, các chunk khác vẫn chạy
+            reset_pool()
+            out, chunk_ok, records = [
+                json.dumps({'index': start + i, 'status': 500, 'error': f'Worker lỗi: {e}'}, ensure_ascii=False)
+                for i in range(size)
+            ], 0, []
+        for record in records:
+            REGISTRY.record_run(*record)
+        total += len(out)
+        ok += chunk_ok
+        yield from out
+
+    for chunk in _chunks(lines, chunk_bytes, max_chunk):
+        try:
+            future = pool.submit(_run_chunk, algorithm, params, mode, index, chunk)
+        except Exception:
+            # Pool đã hỏng do chunk trước: tạo pool mới rồi gửi lại
+            pool, pool_workers = get_pool(workers)
+            future = pool.submit(_run_chunk, algorithm, params, mode, index, chunk)
+        pending.append((future, index, len(chunk)))
+        index += len(chunk)
+        chunks += 1
+        if len(pending) >= window:
+            yield from drain_one()
+    while pending:
+        yield from drain_one()
+
+    if summary:
+        elapsed = time.perf_counter() - started
+        yield json.dumps({'summary': {
+            'algorithm': algorithm,
+            'total': total,
+            'ok': ok,
+            'failed': total - ok,
+            'chunks': chunks,
+            'workers': pool_workers,
+            'elapsedS': round(elapsed, 3),
+            'graphsPerSec': round(total / elapsed, 1) if elapsed else 0.0,
+        }}, ensure_ascii=False)
+
+
+def run_bulk(graphs, algorithm, params=None, mode=None, workers=None, chunk_bytes=None, max_chunk=None):
+    """
+    Python API: nhận iterable các đồ thị (dict) hoặc dòng JSON, sinh ra dict kết
+    quả theo thứ tự đầu vào. Dict cuối cùng là {"summary": {...}}.
+    """
+    lines = (g if isinstance(g, (str, bytes)) else json.dumps(g) for g in graphs)
+    for line in run_bulk_lines(lines, algorithm, params, mode, workers, chunk_bytes, max_chunk):
+        yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chạy một thuật toán trên nhiều đồ thị (JSON Lines)")
+    parser.add_argument('algorithm')
+    parser.add_argument('input', nargs='?', default='-', help="File JSON Lines (mặc định: stdin)")
+    parser.add_argument('--param', action='append', default=[], metavar='KEY=VALUE')
+    parser.add_argument('--mode', choices=['trace', 'result'])
+    parser.add_argument('-w', '--workers', type=int)
+    args = parser.parse_args(argv)
+
+    params = dict(p.split('=', 1) for p in args.param)
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    try:
+        for line in run_bulk_lines(source, args.algorithm, params, args.mode, args.workers):
+            sys.stdout.write(line + '\n')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+config.py - Đọc cấu hình server từ biến môi trường hoặc file cấu hình JSON
+"""
+
+import json
+import os
+
+# Tiền tố biến môi trường, ví dụ: ALGOGRAPH_WORKERS=4
+ENV_PREFIX = "ALGOGRAPH_"
+
+# Giá trị mặc định. Kiểu của giá trị mặc định quyết định cách ép kiểu biến môi trường.
+DEFAULTS = {
+    "HOST": "0.0.0.0",
+    "PORT": 5000,
+    "DEBUG": False,
+    # Chế độ chạy production: 'wsgi' (gunicorn gthread) hoặc 'asgi' (uvicorn worker)
+    "SERVER": "wsgi",
+    # Số process worker và số thread mỗi worker
+    "WORKERS": os.cpu_count() or 1,
+    "THREADS": 4,
+    # Import sẵn thuật toán trong master trước khi fork (chia sẻ copy-on-write)
+    "PRELOAD": True,
+    # Executor cho handler /api/run bất đồng bộ (ASGI): 'process' hoặc 'thread'
+    "EXECUTOR": "process",
+    "EXECUTOR_WORKERS": os.cpu_count() or 1,
+    # Thời gian tối đa (giây) cho một request trước khi worker bị restart
+    "TIMEOUT": 120,
+    # Ngân sách mặc định/tối đa cho mỗi lần gọi /api/run có visualization
+    # (0 = không giới hạn); hết ngân sách thì trả về continuation để chạy tiếp
+    "RUN_MAX_STEPS": 0,
+    "RUN_MAX_MS": 0,
+    # Cache kết quả /api/run trên đĩa (run_cache.py): file SQLite dùng chung giữa các worker
+    # ("" = tắt), dung lượng tối đa (byte) và thời gian chạy tối thiểu (ms) để được lưu
+    "RUN_CACHE_PATH": "",
+    "RUN_CACHE_MAX_BYTES": 1024 * 1024 * 1024,
+    "RUN_CACHE_MIN_MS": 10,
+    # Thư viện đồ thị trên đĩa (graph_library.py) cho "graph_ref" ("" = tắt)
+    "GRAPH_LIBRARY_DIR": "",
+    # Khóa ký continuation token, giống nhau giữa các worker (rỗng = khóa ngẫu nhiên của
+    # process, token không dùng được ở worker khởi động riêng / sau restart)
+    "CONTINUATION_SECRET": "",
+    # Kiểm soát nạp request theo dự đoán của cost_model.py (0 = tắt): thời gian (ms) và
+    # kích thước trace (byte) tối đa; vượt thì phân trang / đổi mode, không được thì từ chối
+    "ADMISSION_MAX_MS": 0,
+    "ADMISSION_MAX_TRACE_BYTES": 0,
+    # Request dự đoán chạy lâu hơn ADMISSION_HEAVY_MS phải chờ một trong ADMISSION_HEAVY_SLOTS
+    # suất chạy nặng của process, tối đa ADMISSION_QUEUE_MS (ms), quá hạn trả về 503
+    "ADMISSION_HEAVY_MS": 0,
+    "ADMISSION_HEAVY_SLOTS": 1,
+    "ADMISSION_QUEUE_MS": 30_000,
+    # Đọc body /api/run theo luồng (ingest.py) khi body từ INGEST_STREAM_MIN_BYTES byte
+    # trở lên hoặc không rõ độ dài (0 = tắt); giới hạn kích thước body và số nút/cạnh
+    "INGEST_STREAM_MIN_BYTES": 1024 * 1024,
+    "INGEST_MAX_BYTES": 1024 * 1024 * 1024,
+    "INGEST_MAX_NODES": 5_000_000,
+    "INGEST_MAX_EDGES": 20_000_000,
+    # Tỉ lệ request được đo bộ nhớ bằng tracemalloc (0 = tắt, 1 = mọi request)
+    "MEMORY_SAMPLE_RATE": 0.0,
+    # Chạy hàng loạt (/api/bulk): số process, kích thước chunk (byte) và số đồ thị tối đa mỗi chunk
+    "BULK_WORKERS": os.cpu_count() or 1,
+    "BULK_CHUNK_BYTES": 256 * 1024,
+    "BULK_MAX_CHUNK": 500,
+    # Khoảng cách nhiều nguồn (/api/multi_source): số nguồn tối đa mỗi request; từ
+    # MULTI_SOURCE_PARALLEL_MIN nguồn trở lên thì chạy trên process pool của bulk với
+    # đồ thị đặt trong shared memory (algorithms/shared_graph.py)
+    "MULTI_SOURCE_MAX_SOURCES": 10_000,
+    "MULTI_SOURCE_PARALLEL_MIN": 8,
+    # Borůvka mode result (algorithm "boruvka"): từ ngần này cạnh thì các vòng lọc +
+    # tìm cạnh rẻ nhất chạy trên process pool của bulk (0 = luôn chạy trong process)
+    "BORUVKA_PARALLEL_MIN_EDGES": 2_000_000,
+    # Dijkstra mode result với engine "delta_stepping": từ ngần này cạnh thì các pha lớn
+    # được chia cho process pool của bulk (0 = luôn chạy trong process)
+    "DELTA_STEPPING_PARALLEL_MIN_EDGES": 2_000_000,
+    # Sinh đồ thị trên server (/api/generate, spec "generator"): số nút/cạnh tối đa,
+    # và tổng số nút + cạnh tối đa được trả về dạng JSON đầy đủ
+    "GENERATE_MAX_NODES": 5_000_000,
+    "GENERATE_MAX_EDGES": 20_000_000,
+    "GENERATE_MAX_EXPORT": 50_000,
+    # Layout tự động (/api/layout): số nút tối đa, số vòng và thời gian (ms) tối đa mỗi request
+    "LAYOUT_MAX_NODES": 200_000,
+    "LAYOUT_MAX_ITERATIONS": 1000,
+    "LAYOUT_MAX_MS": 10_000,
+}
+
+
+def _coerce(value, default):
+    """Ép chuỗi từ biến môi trường về kiểu của giá trị mặc định."""
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+def load_settings(path=None, environ=None):
+    """
+    Tạo dict cấu hình theo thứ tự ưu tiên: DEFAULTS < file JSON < biến môi trường.
+
+    Args:
+        path: Đường dẫn file JSON (mặc định lấy từ ALGOGRAPH_CONFIG nếu có)
+        environ: Dict biến môi trường (mặc định: os.environ)
+    """
+    environ = os.environ if environ is None else environ
+    settings = dict(DEFAULTS)
+
+    path = path or environ.get(ENV_PREFIX + "CONFIG")
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            settings.update({k.upper(): v for k, v in json.load(f).items()})
+
+    for key, default in DEFAULTS.items():
+        raw = environ.get(ENV_PREFIX + key)
+        if raw is not None and raw != "":
+            settings[key] = _coerce(raw, default)
+
+    return settings
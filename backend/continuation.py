@@ -0,0 +1,80 @@
+"""
+continuation.py - Continuation token cho các lần chạy /api/run bị dừng do hết ngân sách
+
+Token = base64url(zlib(JSON)) + '.' + chữ ký HMAC-SHA256 (khóa CONTINUATION_SECRET).
+Nội dung gồm thuật toán, tham số chạy, hash nội dung đồ thị và trạng thái thuật
+toán (xem algorithms/budget.py), nên worker bất kỳ cũng chạy tiếp được mà server
+không phải lưu gì. Chưa đặt CONTINUATION_SECRET thì token được ký bằng khóa ngẫu
+nhiên sinh khi import module (signing_secret): client vẫn không tự sửa được trạng thái,
+các process fork sau khi import (worker gunicorn có preload, executor ASGI) dùng chung
+khóa, nhưng process khởi động riêng hay lần restart thì không nhận token của nhau -
+chạy nhiều worker / nhiều máy phải đặt CONTINUATION_SECRET giống nhau.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import zlib
+
+TOKEN_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+# Khóa ký khi chưa cấu hình CONTINUATION_SECRET
+_process_secret = {'key': secrets.token_hex(32), 'warned': False}
+
+
+def _json_default(value):
+    # bytearray / set trong trạng thái thuật toán
+    if isinstance(value, (bytearray, set, frozenset)):
+        return list(value)
+    raise TypeError(f'Không serialize được {type(value).__name__} trong continuation')
+
+
+def _sign(data, secret):
+    digest = hmac.new(secret.encode('utf-8'), data, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=')
+
+
+def signing_secret(configured):
+    """Khóa ký thực tế: CONTINUATION_SECRET, hoặc khóa ngẫu nhiên của process (kèm cảnh báo một lần)."""
+    if configured:
+        return configured
+    if not _process_secret['warned']:
+        _process_secret['warned'] = True
+        # Qua logging (stderr), không lẫn vào stdout của bulk.py
+        logger.warning('CONTINUATION_SECRET chưa được đặt: continuation token được ký bằng khóa ngẫu nhiên '
+                       'của process; chạy nhiều worker / nhiều máy phải đặt cùng một CONTINUATION_SECRET.')
+    return _process_secret['key']
+
+
+def encode_token(payload, secret=''):
+    """Đóng gói payload (dict JSON) thành token đã ký."""
+    raw = json.dumps({'v': TOKEN_VERSION, **payload}, separators=(',', ':'), default=_json_default)
+    data = base64.urlsafe_b64encode(zlib.compress(raw.encode('utf-8'))).rstrip(b'=')
+    return (data + b'.' + _sign(data, secret)).decode('ascii')
+
+
+def decode_token(token, secret=''):
+    """
+    Giải mã token của encode_token().
+
+    Raises:
+        ValueError: token hỏng, sai chữ ký hoặc khác phiên bản
+    """
+    try:
+        data, signature = token.encode('ascii').rsplit(b'.', 1)
+    except (AttributeError, UnicodeEncodeError, ValueError):
+        raise ValueError('continuation không hợp lệ.')
+    if not hmac.compare_digest(signature, _sign(data, secret)):
+        raise ValueError('continuation không hợp lệ (sai chữ ký).')
+    try:
+        payload = json.loads(zlib.decompress(base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4))))
+    except (ValueError, zlib.error):
+        raise ValueError('continuation không hợp lệ.')
+    if not isinstance(payload, dict) or payload.get('v') != TOKEN_VERSION:
+        raise ValueError('continuation thuộc phiên bản khác, hãy chạy lại từ đầu.')
+    return payload
@@ -0,0 +1,341 @@
+"""
+cost_model.py - Ước lượng chi phí của một lần chạy /api/run trước khi chạy
+
+Dự đoán thời gian chạy (ms), số step và kích thước trace (byte JSON) từ đặc
+trưng của đồ thị (V, E, mật độ, có trọng số âm hay không - lấy từ profile của
+đồ thị, algorithms/profiling.py) và lớp độ phức tạp của thuật toán. Dự đoán
+được dùng để:
+    - từ chối / xếp hàng request vượt ngân sách (ADMISSION_* trong config.py)
+    - tự chuyển sang trace phân trang (continuation) hoặc mode "result"
+    - chọn engine nhanh hơn (ma trận O(V²) cho đồ thị dày, ALT khi đã có landmark,
+      Dijkstra thay Bellman-Ford)
+
+Mô hình:
+    mode result: ms = work_ns * work
+    mode trace:  ms = TRACE_WORK_NS * work + step_ns * steps * (V + 1)
+                 bytes = step_bytes * steps * (V + 1)
+Mỗi step của trace chụp lại highlight/nhãn của các nút nên chi phí dựng step tỉ
+lệ với V. Hệ số ban đầu (PRIORS) đo trên CPython với đồ thị ngẫu nhiên bậc 4;
+sau mỗi lần chạy thật, hệ số nhân (scale) của từng (thuật toán, mode) được hiệu
+chỉnh bằng trung bình trượt mũ trên log(thực tế / dự đoán). Mỗi worker process
+có bộ hiệu chỉnh riêng (giống metrics.py).
+"""
+
+import math
+import threading
+
+from algorithms import graph_profile
+from algorithms.delta_stepping import DELTA_STEPPING_MIN_NODES
+from algorithms.dense import DENSE_MAX_NODES
+from algorithms.landmarks import DEFAULT_LANDMARKS, get_landmark_index
+from algorithms.priority_queue import is_dense
+
+# Trọng số của lần chạy mới nhất khi hiệu chỉnh (trung bình trượt mũ)
+CALIBRATION_ALPHA = 0.2
+
+# Lần chạy ngắn hơn ngần này (ms) bị chi phí cố định lấn át, không dùng để hiệu chỉnh
+MIN_CALIBRATION_MS = 2.0
+
+# Hệ số hiệu chỉnh bị chặn trong [1/MAX_SCALE, MAX_SCALE] để một lần đo lạ không làm hỏng mô hình
+MAX_SCALE = 1000.0
+
+# ns mỗi đơn vị công việc của phần thuật toán trong mode trace (vòng lặp Python trên dict)
+TRACE_WORK_NS = 1000
+
+# Engine ma trận (dense.py): mỗi ô V x V tốn khoảng ngần này đơn vị công việc của bản heap
+DENSE_CELL_WORK = 0.25
+
+
+def _log_v(f):
+    return math.log2(f['nodes'] + 2)
+
+
+def _bellman_ford_rounds(f):
+    # Không có trọng số âm: thường hội tụ sau vài vòng (số cạnh trên đường đi ngắn nhất);
+    # có trọng số âm thì có thể có chu trình âm -> chạy đủ V - 1 vòng
+    return f['nodes'] if f['negativeWeights'] else _log_v(f) + 1
+
+
+def _arcs(f):
+    return f['edges'] if f['directed'] else 2 * f['edges']
+
+
+def _dense(f):
+    # Giống dense.use_dense(graph, 'auto'): Prim/Dijkstra mode result dùng engine ma trận
+    return f['nodes'] <= DENSE_MAX_NODES and is_dense(f['nodes'], _arcs(f))
+
+
+def _heap_work(f):
+    # Bản heap O((V + E) log V), hoặc O(V²) trên đồ thị dày
+    if _dense(f):
+        return DENSE_CELL_WORK * f['nodes'] * f['nodes']
+    return (f['nodes'] + f['edges']) * _log_v(f)
+
+
+# Mỗi thuật toán: (lớp độ phức tạp xấu nhất, số đơn vị công việc kỳ vọng, số step trace dự đoán)
+COMPLEXITY = {
+    'bfs': ('O(V + E)',
+            lambda f, k: f['nodes'] + f['edges'],
+            lambda f, k: f['nodes'] + f['edges'] + _arcs(f)),
+    'dfs': ('O(V + E)',
+            lambda f, k: f['nodes'] + f['edges'],
+            lambda f, k: f['nodes'] + f['edges']),
+    'scc': ('O(V + E)',
+            lambda f, k: f['nodes'] + f['edges'],
+            lambda f, k: f['nodes'] + f['edges']),
+    'topological_sort': ('O(V + E)',
+                         lambda f, k: f['nodes'] + f['edges'],
+                         lambda f, k: f['nodes'] + f['edges']),
+    'bridges': ('O(V + E)',
+                lambda f, k: f['nodes'] + f['edges'],
+                lambda f, k: f['nodes'] + f['edges']),
+    'dijkstra': ('O((V + E) log V)',
+                 lambda f, k: _heap_work(f),
+                 lambda f, k: f['nodes'] + f['edges']),
+    'prim': ('O(E log V)',
+             lambda f, k: _heap_work(f),
+             lambda f, k: f['nodes'] + 1),
+    'kruskal': ('O(E log E)',
+                lambda f, k: f['nodes'] + f['edges'] * math.log2(f['edges'] + 2),
+                lambda f, k: 2 * f['edges'] + 2),
+    'boruvka': ('O(E log V)',
+                lambda f, k: f['nodes'] + f['edges'] * _log_v(f),
+                lambda f, k: _log_v(f) + 2),
+    'bellman_ford': ('O(V·E)',
+                     lambda f, k: f['nodes'] + f['edges'] * _bellman_ford_rounds(f),
+                     lambda f, k: 2 * (f['nodes'] + f['edges'])),
+    'k_shortest_paths': ('O(k·V·(V + E) log V)',
+                         lambda f, k: k * (f['nodes'] + f['edges']) * _log_v(f),
+                         lambda f, k: k + 2),
+}
+
+# Hệ số ban đầu theo thuật toán: (work_ns mode result, step_ns, step_bytes)
+#   work_ns: ns mỗi đơn vị công việc của engine "chỉ kết quả" (NumPy / CSR)
+#   step_ns: ns mỗi (step x nút) để dựng trace
+#   step_bytes: byte JSON mỗi (step x nút)
+PRIORS = {
+    'bfs': (1000, 55, 13),
+    'dfs': (1300, 280, 45),
+    'scc': (900, 500, 36),
+    'topological_sort': (1000, 200, 28),
+    'bridges': (950, 420, 38),
+    'dijkstra': (200, 250, 22),
+    'prim': (150, 55, 10),
+    'kruskal': (300, 50, 14),
+    'boruvka': (25, 400, 30),
+    'bellman_ford': (50, 400, 14),
+    'k_shortest_paths': (20, 400, 2),
+}
+
+
+def graph_features(graph_data):
+    """
+    Đặc trưng của đồ thị cho mô hình chi phí: nodes, edges, density, directed,
+    negativeWeights - lấy từ profile của đồ thị (algorithms/profiling.py, cache theo hash).
+    """
+    profile = graph_profile(graph_data)
+    return {key: profile[key] for key in ('nodes', 'edges', 'density', 'directed', 'negativeWeights')}
+
+
+class CostModel:
+    """Dự đoán chi phí và hiệu chỉnh theo các lần chạy thật, an toàn khi nhiều thread cùng ghi."""
+
+    def __init__(self, alpha=CALIBRATION_ALPHA):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        # (thuật toán, mode) -> {'ms': log scale, 'steps': log scale, 'bytes': log scale, 'samples': n}
+        self._calibration = {}
+
+    def _scales(self, algorithm, mode):
+        with self._lock:
+            c = self._calibration.get((algorithm, mode))
+            if c is None:
+                return 1.0, 1.0, 1.0, 0
+            return math.exp(c['ms']), math.exp(c['steps']), math.exp(c['bytes']), c['samples']
+
+    def _raw(self, algorithm, mode, features, k):
+        """Dự đoán chưa hiệu chỉnh: (ms, steps, bytes); steps/bytes là None ở mode result."""
+        _, work_fn, steps_fn = COMPLEXITY[algorithm]
+        work_ns, step_ns, step_bytes = PRIORS[algorithm]
+        work = work_fn(features, k)
+        if mode == 'result':
+            return work * work_ns / 1e6, None, None
+        steps = steps_fn(features, k)
+        cells = steps * (features['nodes'] + 1)
+        return (TRACE_WORK_NS * work + step_ns * cells) / 1e6, steps, step_bytes * cells
+
+    def estimate(self, algorithm, mode, features, k=None):
+        """
+        Dự đoán chi phí một lần chạy đầy đủ.
+
+        Returns:
+            Dict: complexity, ms, (mode trace) steps và traceBytes, calibrated
+            (số lần chạy thật đã dùng để hiệu chỉnh)
+        """
+        k = int(k) if k else 3
+        ms, steps, size = self._raw(algorithm, mode, features, k)
+        ms_scale, steps_scale, bytes_scale, samples = self._scales(algorithm, mode)
+        complexity = 'O(V²)' if algorithm in ('prim', 'dijkstra') and _dense(features) else COMPLEXITY[algorithm][0]
+        result = {'complexity': complexity, 'ms': round(ms * ms_scale, 3)}
+        if steps is not None:
+            # Số byte mỗi step không phụ thuộc số step: bytes tỉ lệ với cả hai hệ số
+            result['steps'] = max(1, round(steps * steps_scale))
+            result['traceBytes'] = round(size * steps_scale * bytes_scale)
+        result['calibrated'] = samples
+        return result
+
+    def observe(self, algorithm, mode, features, ms=None, steps=None, step_bytes=None, k=None):
+        """
+        Hiệu chỉnh theo một lần chạy đầy đủ (không tính lần chạy bị dừng do ngân sách).
+
+        Args:
+            ms: thời gian chạy thật (None nếu không đo được chính xác, ví dụ khi bật tracemalloc)
+            steps: số step thật (mode trace)
+            step_bytes: số byte JSON trung bình mỗi step (nếu request được đo bộ nhớ)
+        """
+        if algorithm not in COMPLEXITY:
+            return
+        k = int(k) if k else 3
+        raw_ms, raw_steps, raw_bytes = self._raw(algorithm, mode, features, k)
+        updates = {}
+        if ms is not None and ms >= MIN_CALIBRATION_MS and raw_ms > 0:
+            updates['ms'] = ms / raw_ms
+        if raw_steps and steps:
+            updates['steps'] = steps / raw_steps
+            if step_bytes:
+                # Byte mỗi (step x nút) so với hệ số ban đầu
+                updates['bytes'] = step_bytes * raw_steps / raw_bytes
+        if not updates:
+            return
+
+        limit = math.log(MAX_SCALE)
+        with self._lock:
+            c = self._calibration.setdefault((algorithm, mode), {'ms': 0.0, 'steps': 0.0, 'bytes': 0.0, 'samples': 0})
+            for key, ratio in updates.items():
+                target = min(max(math.log(ratio), -limit), limit)
+                # Lần đầu lấy luôn giá trị đo được, các lần sau trượt dần
+                alpha = 1.0 if c['samples'] == 0 else self.alpha
+                c[key] += alpha * (target - c[key])
+            c['samples'] += 1
+
+    def snapshot(self):
+        """Hệ số hiệu chỉnh hiện hành (cho /api/metrics)."""
+        with self._lock:
+            return {
+                f'{algorithm}/{mode}': {
+                    'msScale': round(math.exp(c['ms']), 4),
+                    'stepsScale': round(math.exp(c['steps']), 4),
+                    'bytesScale': round(math.exp(c['bytes']), 4),
+                    'samples': c['samples'],
+                }
+                for (algorithm, mode), c in sorted(self._calibration.items())
+            }
+
+
+COST_MODEL = CostModel()
+
+
+def _over_budget(estimate, limits):
+    """Lý do vượt ngân sách ('ms' | 'traceBytes') hoặc None."""
+    if limits.get('max_ms') and estimate['ms'] > limits['max_ms']:
+        return 'ms'
+    if limits.get('max_trace_bytes') and estimate.get('traceBytes', 0) > limits['max_trace_bytes']:
+        return 'traceBytes'
+    return None
+
+
+def _page_estimate(estimate, kwargs):
+    """Dự đoán cho một trang nếu client đã tự đặt ngân sách max_steps / max_ms."""
+    page = dict(estimate)
+    max_steps, max_ms = kwargs.get('max_steps'), kwargs.get('max_ms')
+    if max_steps and page.get('steps') and float(max_steps) < page['steps']:
+        ratio = float(max_steps) / page['steps']
+        page['ms'] = round(page['ms'] * ratio, 3)
+        page['traceBytes'] = round(page['traceBytes'] * ratio)
+        page['steps'] = int(float(max_steps))
+    if max_ms:
+        page['ms'] = min(page['ms'], float(max_ms))
+    return page
+
+
+def plan_run(algorithm, mode, features, kwargs, limits, result_modes, degrade=True, model=COST_MODEL):
+    """
+    Quyết định cách chạy request theo dự đoán chi phí.
+
+    Args:
+        mode: mode client yêu cầu: 'trace' | 'result' | 'auto' ('auto' = trace nếu
+            vừa ngân sách, ngược lại mode result nếu thuật toán hỗ trợ)
+        kwargs: tham số chạy (ngân sách max_steps / max_ms của client được tính vào)
+        limits: {'max_ms', 'max_trace_bytes'} (0 / None = không giới hạn)
+        result_modes: các thuật toán có engine "chỉ kết quả"
+        degrade: False = vượt ngân sách thì từ chối thay vì đổi mode / phân trang
+
+    Returns:
+        Dict: mode (mode sẽ chạy), action ('run' | 'result' | 'paged' | 'reject'),
+        estimate, page_ms (thời gian dự đoán của lần gọi này), reason (lý do vượt
+        ngân sách, nếu có), budget (ngân sách trang cần thêm vào kwargs khi action = 'paged')
+    """
+    k = kwargs.get('k')
+    run_mode = 'result' if mode == 'result' else 'trace'
+    estimate = model.estimate(algorithm, run_mode, features, k)
+    page = _page_estimate(estimate, kwargs)
+    reason = _over_budget(page, limits)
+    if reason is None:
+        return {'mode': run_mode, 'action': 'run', 'estimate': estimate, 'page_ms': page['ms']}
+    if run_mode == 'result' or not degrade:
+        return {'mode': run_mode, 'action': 'reject', 'estimate': estimate, 'reason': reason}
+
+    if mode == 'auto' and algorithm in result_modes:
+        result_estimate = model.estimate(algorithm, 'result', features, k)
+        if _over_budget(result_estimate, limits) is None:
+            return {'mode': 'result', 'action': 'result', 'estimate': result_estimate,
+                    'page_ms': result_estimate['ms'], 'reason': reason}
+
+    # Trace phân trang: mỗi trang vừa ngân sách thời gian và kích thước
+    budget = {}
+    if limits.get('max_ms'):
+        budget['max_ms'] = limits['max_ms']
+    if limits.get('max_trace_bytes'):
+        bytes_per_step = estimate['traceBytes'] / estimate['steps']
+        budget['max_steps'] = max(1, int(limits['max_trace_bytes'] / max(bytes_per_step, 1)))
+    page = _page_estimate(estimate, {**kwargs, **budget})
+    return {'mode': 'trace', 'action': 'paged', 'estimate': estimate, 'page_ms': page['ms'],
+            'reason': reason, 'budget': budget}
+
+
+def route_engine(algorithm, mode, graph, features, kwargs, model=COST_MODEL):
+    """
+    Chọn engine nhanh hơn cho mode result khi client không chỉ định (ghi vào kwargs).
+
+    - prim, dijkstra trên đồ thị dày: engine ma trận O(V²) (thuật toán tự chọn
+      khi queue='auto', ở đây chỉ ghi nhận)
+    - dijkstra có target, trọng số không âm: A* ALT nếu bảng landmark của đồ thị
+      đã có trong cache (/api/landmarks), không tốn thêm tiền xử lý
+    - dijkstra không có target trên đồ thị lớn (từ DELTA_STEPPING_MIN_NODES nút),
+      trọng số không âm: delta-stepping NumPy thay cho heap tuần tự
+    - bellman_ford, trọng số không âm: Dijkstra nếu dự đoán rẻ hơn
+
+    Returns:
+        Tên engine đã chọn, hoặc None nếu giữ nguyên
+    """
+    if mode != 'result':
+        return None
+    if algorithm in ('prim', 'dijkstra') and kwargs.get('queue', 'auto') == 'auto' \
+            and 'landmarks' not in kwargs and _dense(features):
+        return 'dense'
+    if features['negativeWeights']:
+        return None
+    if algorithm == 'dijkstra' and kwargs.get('target') not in (None, '') and 'landmarks' not in kwargs:
+        if get_landmark_index(graph, DEFAULT_LANDMARKS, build=False) is not None:
+            kwargs['landmarks'] = DEFAULT_LANDMARKS
+            return 'alt'
+    if algorithm == 'dijkstra' and kwargs.get('target') in (None, '') and 'engine' not in kwargs \
+            and kwargs.get('queue', 'auto') == 'auto' and features['nodes'] >= DELTA_STEPPING_MIN_NODES:
+        kwargs['engine'] = 'delta_stepping'
+        return 'delta_stepping'
+    if algorithm == 'bellman_ford' and 'engine' not in kwargs:
+        k = kwargs.get('k')
+        if model.estimate('dijkstra', 'result', features, k)['ms'] < model.estimate('bellman_ford', 'result', features, k)['ms']:
+            kwargs['engine'] = 'dijkstra'
+            return 'dijkstra'
+    return None
@@ -0,0 +1,352 @@
+"""
+generators.py - Sinh đồ thị lớn ngay trên server theo spec có seed (tái lập được)
+
+Thay vì client dựng và upload một body JSON hàng trăm MB, chỉ cần gửi spec:
+
+    {"generator": "grid", "n": 100000, "seed": 7}
+
+Spec dùng được ở /api/generate hoặc đặt trực tiếp vào trường "graph" của
+/api/run và /api/landmarks. Đồ thị được dựng thẳng thành GraphArrays bằng NumPy
+(không qua list dict), id nút là '0'..'n-1', id cạnh là 'e0'..'e{m-1}'.
+
+Các loại đồ thị:
+    - random:       ngẫu nhiên G(n, m), mặc định liên thông (cây khung ngẫu nhiên + cạnh thêm)
+    - grid:         lưới 4-láng giềng rows x cols
+    - geometric:    điểm ngẫu nhiên trong mặt phẳng, nối các cặp cách nhau <= radius;
+                    trọng số là khoảng cách Euclid
+    - scale_free:   Barabási–Albert, mỗi nút mới nối tới m nút theo bậc
+    - flow_network: mạng luồng phân lớp có hướng từ nút '0' (source) tới nút 'n-1' (sink),
+                    trọng số là sức chứa
+"""
+
+import json
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from algorithms.graph_arrays import GraphArrays, RangeIds
+
+# Kích thước mặt phẳng tọa độ (khớp với canvas của frontend)
+CANVAS_SIZE = 1000.0
+
+# Số đồ thị sinh ra được giữ lại (spec giống nhau -> dùng lại cả CSR, landmark, ...)
+MAX_CACHED_GRAPHS = 4
+
+def _weights(rng, m, min_weight, max_weight):
+    """Trọng số nguyên ngẫu nhiên trong [min_weight, max_weight]."""
+    if min_weight > max_weight:
+        raise ValueError("min_weight phải <= max_weight.")
+    return rng.integers(min_weight, max_weight + 1, size=m).astype(np.float64)
+
+
+def _unique_pairs(src, dst, n, directed):
+    """Bỏ khuyên và cạnh trùng, giữ thứ tự xuất hiện đầu tiên."""
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    if directed:
+        key = src * n + dst
+    else:
+        key = np.minimum(src, dst) * n + np.maximum(src, dst)
+    _, first = np.unique(key, return_index=True)
+    first.sort()
+    return src[first], dst[first]
+
+
+def _random_positions(rng, n):
+    return rng.random(n) * CANVAS_SIZE, rng.random(n) * CANVAS_SIZE
+
+
+def random_graph(rng, n, directed=False, degree=4, m=None, connected=True,
+                 min_weight=1, max_weight=20):
+    """Đồ thị ngẫu nhiên với m cạnh (mặc định n * degree / 2)."""
+    m = int(m if m is not None else n * degree // 2)
+    x, y = _random_positions(rng, n)
+
+    parts_src, parts_dst = [], []
+    if connected and n > 1:
+        # Cây khung ngẫu nhiên: nút v nối với một nút bất kỳ trong [0, v)
+        v = np.arange(1, n, dtype=np.int64)
+        parts_src.append((rng.random(n - 1) * v).astype(np.int64))
+        parts_dst.append(v)
+    extra = max(0, m - (n - 1 if connected else 0))
+    if extra and n > 1:
+        # Lấy dư một chút để bù cho khuyên/cạnh trùng bị loại
+        sample = int(extra * 1.1) + 16
+        parts_src.append(rng.integers(0, n, size=sample))
+        parts_dst.append(rng.integers(0, n, size=sample))
+
+    if parts_src:
+        # Cạnh của cây khung đứng trước nên luôn được giữ lại khi cắt bớt
+        src, dst = _unique_pairs(np.concatenate(parts_src), np.concatenate(parts_dst), n, directed)
+        limit = max(m, n - 1 if connected else 0)
+        src, dst = src[:limit], dst[:limit]
+    else:
+        src = dst = np.zeros(0, dtype=np.int64)
+    weight = _weights(rng, len(src), min_weight, max_weight)
+    return GraphArrays(RangeIds(n), src, dst, weight, RangeIds(len(src), 'e'), directed, x, y)
+
+
+def grid_graph(rng, n, directed=False, rows=None, cols=None, min_weight=1, max_weight=20):
+    """Lưới rows x cols (mặc định gần vuông với khoảng n nút), nút (r, c) có id r * cols + c."""
+    if cols is None:
+        cols = -(-n // int(rows)) if rows else math.isqrt(n - 1) + 1
+    cols = int(cols)
+    rows = int(rows if rows is not None else -(-n // cols))
+    n = rows * cols
+
+    ids = np.arange(n, dtype=np.int64).reshape(rows, cols)
+    src = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    dst = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+
+    spacing = CANVAS_SIZE / max(rows, cols)
+    x = np.tile(np.arange(cols) * spacing + spacing / 2, rows)
+    y = np.repeat(np.arange(rows) * spacing + spacing / 2, cols)
+    weight = _weights(rng, len(src), min_weight, max_weight)
+    return GraphArrays(RangeIds(n), src, dst, weight, RangeIds(len(src), 'e'), directed, x, y)
+
+
+# Nửa lân cận của một ô lưới: mỗi cặp ô kề nhau chỉ được xét một lần
+_HALF_STENCIL = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def geometric_graph(rng, n, directed=False, degree=6, radius=None):
+    """
+    Đồ thị hình học ngẫu nhiên: n điểm đều trong hình vuông, nối mọi cặp cách nhau
+    <= radius (tính trên hình vuông đơn vị; mặc định chọn để bậc trung bình ~ degree).
+    Các cặp được tìm theo ô lưới kích thước >= radius, không xét toàn bộ n^2 cặp.
+    """
+    r = float(radius if radius is not None else math.sqrt(degree / (math.pi * max(n, 1))))
+    if not 0 < r <= 1:
+        raise ValueError("radius phải nằm trong (0, 1].")
+    px, py = rng.random(n), rng.random(n)
+
+    cells = max(1, min(int(1 / r), math.isqrt(max(n, 1)) + 1))
+    cx = np.minimum((px * cells).astype(np.int64), cells - 1)
+    cy = np.minimum((py * cells).astype(np.int64), cells - 1)
+    order = np.argsort(cx * cells + cy, kind='stable')
+    counts = np.bincount(cx * cells + cy, minlength=cells * cells)
+    starts = np.zeros(cells * cells, dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+
+    parts_src, parts_dst = [], []
+    for dx, dy in _HALF_STENCIL:
+        nx, ny = cx + dx, cy + dy
+        valid = np.flatnonzero((nx < cells) & (ny >= 0) & (ny < cells))
+        cell = nx[valid] * cells + ny[valid]
+        cnt = counts[cell]
+        # Mỗi điểm i ghép với mọi điểm trong ô lân cận
+        i = np.repeat(valid, cnt)
+        offset = np.arange(len(i)) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        j = order[np.repeat(starts[cell], cnt) + offset]
+        keep = (j > i) if (dx, dy) == (0, 0) else np.ones(len(i), dtype=bool)
+        i, j = i[keep], j[keep]
+        close = (px[i] - px[j]) ** 2 + (py[i] - py[j]) ** 2 <= r * r
+        parts_src.append(i[close])
+        parts_dst.append(j[close])
+
+    src = np.concatenate(parts_src)
+    dst = np.concatenate(parts_dst)
+    order = np.lexsort((dst, src))
+    src, dst = src[order], dst[order]
+
+    x, y = px * CANVAS_SIZE, py * CANVAS_SIZE
+    weight = np.round(np.hypot(x[src] - x[dst], y[src] - y[dst]), 2)
+    return GraphArrays(RangeIds(n), src, dst, weight, RangeIds(len(src), 'e'), directed, x, y)
+
+
+def scale_free_graph(rng, n, directed=False, m=2, min_weight=1, max_weight=20):
+    """
+    Barabási–Albert: nút t (t >= 1) nối tới m nút cũ, xác suất tỉ lệ với bậc.
+
+    Dùng dạng "chọn đều một đầu mút của các cạnh đã có": đầu mút thứ j hoặc là
+    chính nút mới của cạnh j // 2, hoặc là đích của cạnh j // 2 (đã được chọn
+    trước đó). Vì mọi tham chiếu đều trỏ về cạnh trước, các đích được phân giải
+    bằng pointer jumping vectorized thay vì vòng lặp Python theo từng nút.
+    """
+    m = int(m)
+    if m < 1:
+        raise ValueError("m phải >= 1.")
+    x, y = _random_positions(rng, n)
+    if n < 2:
+        src = dst = np.zeros(0, dtype=np.int64)
+    else:
+        k = np.arange((n - 1) * m, dtype=np.int64)
+        new_node = 1 + k // m
+        # Số đầu mút thuộc các nút cũ hơn (không gồm cạnh của chính nút mới -> không có khuyên)
+        pool = 2 * (new_node - 1) * m
+        pick = (rng.random(len(k)) * pool).astype(np.int64)
+
+        target = np.full(len(k), -1, dtype=np.int64)
+        target[pool == 0] = 0
+        is_source = (pool > 0) & (pick % 2 == 0)
+        target[is_source] = 1 + (pick[is_source] // 2) // m
+        ref = pick // 2
+        pending = np.flatnonzero(target < 0)
+        while len(pending):
+            resolved = target[ref[pending]]
+            done = resolved >= 0
+            target[pending[done]] = resolved[done]
+            # Cạnh được tham chiếu cũng đang chờ: nhảy thẳng tới tham chiếu của nó
+            pending = pending[~done]
+            ref[pending] = ref[ref[pending]]
+        src, dst = _unique_pairs(new_node, target, n, directed)
+
+    weight = _weights(rng, len(src), min_weight, max_weight)
+    return GraphArrays(RangeIds(n), src, dst, weight, RangeIds(len(src), 'e'), directed, x, y)
+
+
+def flow_network(rng, n, directed=True, layers=None, degree=3, min_weight=1, max_weight=20):
+    """
+    Mạng luồng phân lớp: source '0' -> các lớp giữa -> sink 'n-1'. Mỗi nút ở lớp
+    giữa nối tới `degree` nút ngẫu nhiên của lớp kế tiếp; trọng số là sức chứa.
+    Luôn có hướng (tham số directed bị bỏ qua).
+    """
+    if n < 3:
+        raise ValueError("flow_network cần n >= 3.")
+    inner = n - 2
+    layers = int(layers if layers is not None else max(1, round(math.sqrt(inner))))
+    layers = max(1, min(layers, inner))
+    # Nút giữa 1..n-2 chia đều vào các lớp
+    layer_of = (np.arange(inner, dtype=np.int64) * layers) // inner
+    bounds = np.searchsorted(layer_of, np.arange(layers + 1))
+    sink = n - 1
+
+    parts_src = [np.zeros(bounds[1], dtype=np.int64)]
+    parts_dst = [np.arange(1, bounds[1] + 1, dtype=np.int64)]
+    for layer in range(layers - 1):
+        lo, mid, hi = bounds[layer], bounds[layer + 1], bounds[layer + 2]
+        nodes = np.arange(lo, mid, dtype=np.int64)
+        # Cạnh "thẳng" đảm bảo mọi nút lớp sau đều nhận được luồng, cộng các cạnh ngẫu nhiên
+        straight = lo + (np.arange(mid, hi) - mid) * (mid - lo) // (hi - mid)
+        parts_src += [straight + 1, np.repeat(nodes, degree) + 1]
+        parts_dst += [np.arange(mid, hi, dtype=np.int64) + 1,
+                      rng.integers(mid, hi, size=len(nodes) * degree) + 1]
+    parts_src.append(np.arange(bounds[-2], inner, dtype=np.int64) + 1)
+    parts_dst.append(np.full(inner - bounds[-2], sink, dtype=np.int64))
+
+    src, dst = _unique_pairs(np.concatenate(parts_src), np.concatenate(parts_dst), n, True)
+    order = np.lexsort((dst, src))
+    src, dst = src[order], dst[order]
+
+    # Tọa độ: lớp theo trục x, vị trí trong lớp theo trục y
+    x = np.empty(n)
+    y = np.empty(n)
+    x[0], y[0] = 0.0, CANVAS_SIZE / 2
+    x[sink], y[sink] = CANVAS_SIZE, CANVAS_SIZE / 2
+    sizes = np.diff(bounds)
+    pos = np.arange(inner) - np.repeat(bounds[:-1], sizes)
+    x[1:sink] = (layer_of + 1) * CANVAS_SIZE / (layers + 1)
+    y[1:sink] = (pos + 0.5) * CANVAS_SIZE / np.repeat(sizes, sizes)
+
+    weight = _weights(rng, len(src), min_weight, max_weight)
+    graph = GraphArrays(RangeIds(n), src, dst, weight, RangeIds(len(src), 'e'), True, x, y)
+    graph.hints = {'source': '0', 'sink': str(sink), 'target': str(sink)}
+    return graph
+
+
+GENERATORS = {
+    'random': random_graph,
+    'grid': grid_graph,
+    'geometric': geometric_graph,
+    'scale_free': scale_free_graph,
+    'flow_network': flow_network,
+}
+
+# Tham số kiểu bool (các tham số còn lại phải là số)
+_BOOL_PARAMS = ('directed', 'connected')
+
+# Ước lượng số cạnh trước khi sinh, để từ chối sớm spec quá lớn
+_EDGE_ESTIMATES = {
+    'random': lambda n, p: int(p.get('m') or n * p.get('degree', 4) // 2),
+    'grid': lambda n, p: 2 * n,
+    'geometric': lambda n, p: int(n * (math.pi * p['radius'] ** 2 * n if p.get('radius') else p.get('degree', 6)) / 2),
+    'scale_free': lambda n, p: n * int(p.get('m', 2)),
+    'flow_network': lambda n, p: n * (int(p.get('degree', 3)) + 1),
+}
+
+
+def normalize_spec(spec, max_nodes=None, max_edges=None):
+    """
+    Kiểm tra spec và đưa về dạng chuẩn (tên generator, n, seed, tham số đã sắp xếp).
+    max_nodes/max_edges = None nghĩa là không giới hạn.
+
+    Raises:
+        ValueError: spec không hợp lệ hoặc vượt giới hạn kích thước
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Spec đồ thị phải là một object JSON.")
+    params = dict(spec)
+    name = str(params.pop('generator', '')).lower().replace('-', '_')
+    if name == 'flow':
+        name = 'flow_network'
+    if name not in GENERATORS:
+        raise ValueError(f'Generator "{name}" không được hỗ trợ. Hỗ trợ: {", ".join(GENERATORS)}.')
+
+    try:
+        n = int(params.pop('n', 0))
+        seed = int(params.pop('seed', 0))
+    except (TypeError, ValueError):
+        raise ValueError('"n" và "seed" phải là số nguyên.')
+    if name == 'grid' and params.get('rows') and params.get('cols'):
+        n = int(params['rows']) * int(params['cols'])
+    if n < 1:
+        raise ValueError('"n" phải >= 1.')
+    if max_nodes is not None and n > max_nodes:
+        raise ValueError(f'"n" vượt quá giới hạn {max_nodes} nút.')
+
+    for key, value in params.items():
+        if key in _BOOL_PARAMS:
+            params[key] = bool(value)
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f'Tham số "{key}" phải là số.')
+
+    estimate = _EDGE_ESTIMATES[name](n, params)
+    if max_edges is not None and estimate > max_edges:
+        raise ValueError(f'Đồ thị ước tính {estimate} cạnh, vượt quá giới hạn {max_edges}.')
+
+    return {'generator': name, 'n': n, 'seed': seed, **dict(sorted(params.items()))}
+
+
+def is_generator_spec(graph_data):
+    """graph_data là spec sinh đồ thị (có khóa "generator") thay vì nodes/edges."""
+    return isinstance(graph_data, dict) and 'generator' in graph_data
+
+
+def generate_graph(spec, max_nodes=None, max_edges=None):
+    """
+    Sinh đồ thị theo spec. Cùng spec (kể cả seed) luôn cho cùng đồ thị; vài đồ thị
+    gần nhất được cache nên các request lặp lại không sinh lại.
+
+    Returns:
+        GraphArrays
+    """
+    spec = normalize_spec(spec, max_nodes, max_edges)
+    return _generate_cached(json.dumps(spec, sort_keys=True))
+
+
+@lru_cache(maxsize=MAX_CACHED_GRAPHS)
+def _generate_cached(spec_json):
+    params = json.loads(spec_json)
+    name = params.pop('generator')
+    n = params.pop('n')
+    rng = np.random.default_rng(params.pop('seed'))
+    try:
+        return GENERATORS[name](rng, n, **params)
+    except TypeError as e:
+        raise ValueError(f'Tham số không hợp lệ cho generator "{name}": {e}')
+
+
+def describe_graph(graph, spec, include_graph):
+    """Body trả về của /api/generate (spec đã chuẩn hóa)."""
+    body = {
+        'spec': spec,
+        'graphHash': graph.content_hash(),
+        'numNodes': graph.num_nodes,
+        'numEdges': graph.num_edges,
+        'isDirected': graph.is_directed,
+        'hints': graph.hints,
+    }
+    if include_graph:
+        body['graph'] = graph.to_graph_data()
+    return body
@@ -0,0 +1,344 @@
+"""
+graph_library.py - Thư viện đồ thị trên đĩa, memory-map khi mở, tham chiếu theo tên
+
+Đồ thị tham khảo rất lớn (mạng đường bộ, đồ thị phụ thuộc) được chuyển một lần sang
+dạng nhị phân và đặt trong thư mục GRAPH_LIBRARY_DIR; /api/run (và các endpoint nhận
+"graph") chỉ cần gửi {"graph_ref": "roads-eu"} thay vì upload lại cả đồ thị.
+
+Mỗi đồ thị là một thư mục con <tên>/ gồm:
+    - graph.json: manifest (định dạng, hướng, số nút / cạnh, hash nội dung, kiểu id)
+    - src, dst, weight, x, y (.npy): mảng cạnh / tọa độ như GraphArrays
+    - csr_offsets, csr_targets, csr_weights, csr_edges (.npy): CSR dựng sẵn
+    - node_ids_* / edge_ids_* (.npy): bảng id (buffer UTF-8 + offsets, cờ id số
+      nguyên, thứ tự sắp xếp để tra ngược id nút bằng tìm kiếm nhị phân); id dạng
+      f'{prefix}{i}' chỉ ghi prefix (RangeIds)
+
+Khi mở, các mảng được np.load(mmap_mode='r'): không đọc / chép dữ liệu, các trang
+được nạp khi thuật toán chạm tới và nằm trong page cache của OS nên mọi worker process
+dùng chung một bản. Chi phí mở và mỗi request (một stat() kiểm tra manifest) không phụ
+thuộc kích thước đồ thị; hash nội dung được tính lúc import (trùng hash của cùng đồ thị
+upload lên) nên cache theo hash (profile, landmark, cây đường đi, run cache) dùng chung.
+
+Import ghi vào thư mục tạm rồi đổi tên: worker đang giữ bản cũ vẫn đọc được (file đã
+xóa vẫn còn trong memory-map), request sau mở bản mới.
+
+    python backend/graph_library.py import roads-eu roads.txt --directed
+    python backend/graph_library.py import deps deps.json
+    python backend/graph_library.py list
+    python backend/graph_library.py remove roads-eu
+
+Edge list: mỗi dòng "nguồn đích [trọng số]" (cách nhau bởi khoảng trắng hoặc dấu phẩy,
+dòng bắt đầu bằng # hoặc % bị bỏ qua), id nút theo thứ tự xuất hiện, id cạnh 'e0'..
+JSON: {"nodes": [...], "edges": [...], "isDirected": ...} (đọc theo luồng như ingest.py),
+payload {"graph": ...} hoặc spec sinh đồ thị {"generator": ...}.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from algorithms.graph_arrays import GraphArrays, MappedIds, RangeIds, as_graph_arrays
+from generators import generate_graph, is_generator_spec
+from ingest import read_graph
+
+# Đổi khi định dạng trên đĩa thay đổi (đồ thị cũ phải import lại)
+LIBRARY_FORMAT = 1
+MANIFEST = 'graph.json'
+
+# Số đồ thị đang mở được giữ trong mỗi process (mở lại rẻ, nhưng GraphArrays giữ
+# các cache dựng lười như index, csr_lists)
+MAX_OPEN_GRAPHS = 16
+
+_NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$')
+_SEPARATOR = re.compile(r'[\s,]+')
+_CSR = ('csr_offsets', 'csr_targets', 'csr_weights', 'csr_edges')
+
+_open = OrderedDict()
+_lock = threading.Lock()
+
+
+def check_name(name):
+    """Tên đồ thị hợp lệ (chữ, số, '.', '_', '-'; không bắt đầu bằng dấu chấm)."""
+    if not isinstance(name, str) or not _NAME.match(name):
+        raise ValueError(f'Tên đồ thị "{name}" không hợp lệ: chỉ gồm chữ, số, ".", "_", "-" (tối đa 128 ký tự).')
+    return name
+
+
+def _range_spec(ids):
+    """{'kind': 'range', 'prefix': p} nếu ids là f'{p}0', f'{p}1', ..., ngược lại None."""
+    if isinstance(ids, RangeIds):
+        return {'kind': 'range', 'prefix': ids.prefix}
+    if not len(ids) or not isinstance(ids[0], str) or not ids[0].endswith('0'):
+        return None
+    prefix = ids[0][:-1]
+    if all(isinstance(v, str) and v == f'{prefix}{i}' for i, v in enumerate(ids)):
+        return {'kind': 'range', 'prefix': prefix}
+    return None
+
+
+def save_graph(library, name, graph, source=None):
+    """
+    Ghi GraphArrays vào thư viện dưới tên name (thay bản cũ nếu có).
+
+    Returns:
+        Manifest (dict) của đồ thị vừa ghi
+
+    Raises:
+        ValueError: tên không hợp lệ hoặc id nút bị trùng
+    """
+    check_name(name)
+    arrays = {'src': graph.src, 'dst': graph.dst, 'weight': graph.weight}
+    arrays.update(zip(_CSR, graph.csr()))
+    if graph.x is not None and graph.y is not None:
+        arrays.update(x=graph.x, y=graph.y)
+
+    manifest = {
+        'format': LIBRARY_FORMAT, 'name': name, 'directed': graph.is_directed,
+        'nodes': graph.num_nodes, 'edges': graph.num_edges,
+        # Hash của đồ thị gốc: cùng khóa cache với đồ thị upload lên
+        'hash': graph.content_hash(), 'coords': 'x' in arrays,
+    }
+    for role, ids, lookup in (('node_ids', graph.node_ids, True), ('edge_ids', graph.edge_ids, False)):
+        spec = _range_spec(ids)
+        if spec is None:
+            if lookup and len(set(ids)) != len(ids):
+                raise ValueError('Đồ thị có id nút bị trùng.')
+            data, offsets, is_int, order = MappedIds.encode(ids, sort=lookup)
+            arrays.update({f'{role}_data': data, f'{role}_offsets': offsets})
+            if is_int is not None:
+                arrays[f'{role}_is_int'] = is_int
+            if order is not None:
+                arrays[f'{role}_order'] = order
+            spec = {'kind': 'table'}
+        manifest[role] = spec
+
+    os.makedirs(library, exist_ok=True)
+    target = os.path.join(library, name)
+    staging = os.path.join(library, f'.tmp-{name}-{os.getpid()}')
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        for key, values in arrays.items():
+            np.save(os.path.join(staging, f'{key}.npy'), np.ascontiguousarray(values))
+        manifest['bytes'] = sum(os.path.getsize(os.path.join(staging, f)) for f in os.listdir(staging))
+        manifest['source'] = source
+        manifest['created'] = time.time()
+        # Manifest ghi cuối cùng: thư mục không có manifest là bản chưa ghi xong
+        with open(os.path.join(staging, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        # Đổi tên thư mục (không ghi đè file đang được memory-map ở worker khác)
+        retired = None
+        if os.path.exists(target):
+            retired = os.path.join(library, f'.old-{name}-{os.getpid()}')
+            os.replace(target, retired)
+        os.replace(staging, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    if retired is not None:
+        shutil.rmtree(retired, ignore_errors=True)
+    return manifest
+
+
+def _load(path):
+    with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != LIBRARY_FORMAT:
+        raise ValueError(f'Đồ thị "{manifest.get("name")}" thuộc định dạng thư viện cũ, hãy import lại.')
+
+    def load(key):
+        # Mảng thường trên vùng memory-map (phép toán trên np.memmap trả về memmap, chậm hơn)
+        return np.load(os.path.join(path, f'{key}.npy'), mmap_mode='r').view(np.ndarray)
+
+    def optional(key):
+        return load(key) if os.path.exists(os.path.join(path, f'{key}.npy')) else None
+
+    def ids(role, count):
+        spec = manifest[role]
+        if spec['kind'] == 'range':
+            return RangeIds(count, spec['prefix'])
+        return MappedIds(load(f'{role}_data'), load(f'{role}_offsets'),
+                         optional(f'{role}_is_int'), optional(f'{role}_order'))
+
+    x = y = None
+    if manifest['coords']:
+        x, y = load('x'), load('y')
+    graph = GraphArrays(
+        ids('node_ids', manifest['nodes']), load('src'), load('dst'), load('weight'),
+        ids('edge_ids', manifest['edges']), manifest['directed'], x, y,
+    )
+    # CSR và hash đã tính lúc import
+    graph._csr = tuple(load(key) for key in _CSR)
+    graph._hash = manifest['hash']
+    return graph
+
+
+def open_graph(library, name):
+    """
+    GraphArrays của đồ thị name trong thư viện (memory-map, giữ lại giữa các request
+    tới khi manifest đổi do import lại).
+
+    Raises:
+        ValueError: tên không hợp lệ, không có trong thư viện hoặc định dạng cũ
+    """
+    check_name(name)
+    path = os.path.join(library, name)
+    try:
+        stat = os.stat(os.path.join(path, MANIFEST))
+    except OSError:
+        raise ValueError(f'Không có đồ thị "{name}" trong thư viện.')
+    key, stamp = (os.path.abspath(library), name), (stat.st_ino, stat.st_mtime_ns)
+    with _lock:
+        entry = _open.get(key)
+        if entry is not None and entry[0] == stamp:
+            _open.move_to_end(key)
+            return entry[1]
+    try:
+        graph = _load(path)
+    except OSError:
+        # Thư mục bị thay giữa chừng bởi một lần import
+        raise ValueError(f'Đồ thị "{name}" đang được cập nhật, hãy thử lại.')
+    with _lock:
+        _open[key] = (stamp, graph)
+        _open.move_to_end(key)
+        while len(_open) > MAX_OPEN_GRAPHS:
+            _open.popitem(last=False)
+    return graph
+
+
+def list_graphs(library):
+    """Manifest của mọi đồ thị trong thư viện, theo tên."""
+    if not library or not os.path.isdir(library):
+        return []
+    graphs = []
+    for name in sorted(os.listdir(library)):
+        path = os.path.join(library, name, MANIFEST)
+        if name.startswith('.') or not os.path.isfile(path):
+            continue
+        try:
+            with open(path, encoding='utf-8') as f:
+                graphs.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return graphs
+
+
+def remove_graph(library, name):
+    """Xóa đồ thị khỏi thư viện (worker đang memory-map vẫn đọc được tới khi mở lại)."""
+    path = os.path.join(library, check_name(name))
+    if not os.path.isfile(os.path.join(path, MANIFEST)):
+        raise ValueError(f'Không có đồ thị "{name}" trong thư viện.')
+    retired = os.path.join(library, f'.old-{name}-{os.getpid()}')
+    os.replace(path, retired)
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+def read_edge_list(lines, directed=False):
+    """GraphArrays từ các dòng "nguồn đích [trọng số]"."""
+    index, node_ids = {}, []
+    src, dst, weight = array('q'), array('q'), array('d')
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line[0] in '#%':
+            continue
+        parts = _SEPARATOR.split(line)
+        if len(parts) < 2:
+            raise ValueError(f'Dòng {lineno}: cần "nguồn đích [trọng số]".')
+        ends = []
+        for node_id in parts[:2]:
+            i = index.get(node_id)
+            if i is None:
+                i = index[node_id] = len(node_ids)
+                node_ids.append(node_id)
+            ends.append(i)
+        try:
+            w = float(parts[2]) if len(parts) > 2 else 1.0
+        except ValueError:
+            raise ValueError(f'Dòng {lineno}: trọng số "{parts[2]}" không phải số.')
+        src.append(ends[0])
+        dst.append(ends[1])
+        weight.append(w)
+    return GraphArrays(
+        node_ids, np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64),
+        np.frombuffer(weight, dtype=np.float64), RangeIds(len(src), 'e'), directed,
+    )
+
+
+def read_graph_file(path, fmt=None, directed=None):
+    """
+    Đọc file đồ thị để import.
+
+    Args:
+        fmt: 'edgelist' hoặc 'json' (mặc định theo phần mở rộng: .json là JSON)
+        directed: hướng của edge list (mặc định vô hướng); JSON dùng isDirected của file
+            nếu không chỉ định
+    """
+    fmt = fmt or ('json' if path.lower().endswith('.json') else 'edgelist')
+    if fmt == 'edgelist':
+        with open(path, encoding='utf-8') as f:
+            return read_edge_list(f, bool(directed))
+    if fmt != 'json':
+        raise ValueError(f'Định dạng "{fmt}" không hợp lệ. Hỗ trợ: edgelist, json.')
+    with open(path, 'rb') as f:
+        graph = read_graph(f)
+    if isinstance(graph, dict) and 'graph' in graph:
+        graph = graph['graph']
+    if is_generator_spec(graph):
+        graph = generate_graph(graph)
+    graph = as_graph_arrays(graph)
+    if directed is not None and bool(directed) != graph.is_directed:
+        graph = GraphArrays(graph.node_ids, graph.src, graph.dst, graph.weight, graph.edge_ids,
+                            bool(directed), graph.x, graph.y)
+    return graph
+
+
+def main(argv=None):
+    from config import load_settings
+
+    parser = argparse.ArgumentParser(description="Quản lý thư viện đồ thị trên đĩa (GRAPH_LIBRARY_DIR)")
+    parser.add_argument('--library', help="Thư mục thư viện (mặc định: GRAPH_LIBRARY_DIR)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('import', help="Chuyển edge list / JSON sang định dạng thư viện")
+    add.add_argument('name')
+    add.add_argument('input')
+    add.add_argument('--format', choices=['edgelist', 'json'])
+    add.add_argument('--directed', action='store_true', default=None)
+    commands.add_parser('list', help="Liệt kê các đồ thị")
+    remove = commands.add_parser('remove', help="Xóa một đồ thị")
+    remove.add_argument('name')
+    args = parser.parse_args(argv)
+
+    library = args.library or load_settings()['GRAPH_LIBRARY_DIR']
+    if not library:
+        parser.error('Chưa có thư mục thư viện: dùng --library hoặc ALGOGRAPH_GRAPH_LIBRARY_DIR.')
+    try:
+        if args.command == 'import':
+            started = time.perf_counter()
+            check_name(args.name)
+            graph = read_graph_file(args.input, args.format, args.directed)
+            manifest = save_graph(library, args.name, graph, source=os.path.basename(args.input))
+            print(f'{manifest["name"]}: {manifest["nodes"]} nút, {manifest["edges"]} cạnh, '
+                  f'{manifest["bytes"]} byte ({time.perf_counter() - started:.1f} s)')
+        elif args.command == 'list':
+            for m in list_graphs(library):
+                kind = 'có hướng' if m['directed'] else 'vô hướng'
+                print(f'{m["name"]}\t{m["nodes"]} nút\t{m["edges"]} cạnh\t{kind}\t{m["bytes"]} byte')
+        else:
+            remove_graph(library, args.name)
+    except (OSError, ValueError) as e:
+        sys.exit(f'Lỗi: {e}')
+
+
+if __name__ == '__main__':
+    main()
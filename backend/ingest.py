@@ -0,0 +1,371 @@
+"""
+ingest.py - Đọc payload /api/run theo luồng, không dựng dict cho từng nút/cạnh
+
+request.get_json() / json.loads() dựng toàn bộ list 'nodes' và 'edges' thành các
+dict Python (vài trăm byte mỗi cạnh), rồi GraphArrays.from_graph_data() mới chuyển
+sang mảng - đỉnh bộ nhớ gấp nhiều lần bản thân đồ thị. Ở đây body được đọc từng
+chunk từ input stream:
+    - object ngoài cùng và object 'graph' được quét thủ công
+    - mỗi bản ghi nút/cạnh được decode riêng (chỉ một dict tạm tại một thời điểm)
+      rồi ghi thẳng vào mảng kiểu (array) tăng dần: chỉ số hai đầu mút, trọng số,
+      tọa độ, bảng id cạnh (IdTable)
+    - các khóa khác giữ nguyên như json.loads
+
+Kết quả là payload dict, trong đó 'graph' đã là GraphArrays với cùng ngữ nghĩa (và
+cùng content_hash) như đường from_graph_data(). Giới hạn kích thước (byte, số nút,
+số cạnh) được kiểm tra ngay trong lúc đọc; lỗi cú pháp báo kèm vị trí trong body.
+"""
+
+import codecs
+import json
+import re
+from array import array
+
+import numpy as np
+
+from algorithms.graph_arrays import GraphArrays, IdTable
+
+# Kích thước mỗi lần đọc từ stream
+CHUNK_BYTES = 1 << 20
+# Một giá trị JSON đơn lẻ (bản ghi nút/cạnh, tham số) dài nhất được giữ trong buffer
+MAX_VALUE_CHARS = 1 << 20
+
+_WS = re.compile(r'[ \t\n\r]*')
+_raw_decode = json.JSONDecoder().raw_decode
+
+
+class IngestError(ValueError):
+    """
+    Lỗi khi đọc payload: status 400 (cú pháp, kèm position: offset/line/column
+    tính theo ký tự) hoặc 413 (vượt giới hạn kích thước).
+    """
+
+    def __init__(self, message, status=400, position=None):
+        if position is not None:
+            message = f'{message} (dòng {position["line"]}, cột {position["column"]})'
+        super().__init__(message)
+        self.status = status
+        self.position = position
+
+    def to_body(self):
+        body = {'error': str(self)}
+        if self.position is not None:
+            body['position'] = self.position
+        return body
+
+
+class _Reader:
+    """Buffer ký tự trên stream bytes UTF-8, bỏ dần phần đã đọc và nhớ vị trí tuyệt đối."""
+
+    def __init__(self, stream, max_bytes=0):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.base = 0        # offset (ký tự) của buf[0] trong body
+        self.line = 1        # dòng chứa buf[0]
+        self.line_start = 0  # offset đầu dòng đó
+        self.bytes_read = 0
+        self.eof = False
+
+    def fill(self):
+        """Bỏ phần buffer đã đọc rồi nối thêm một chunk (đặt eof nếu stream đã hết)."""
+        if self.pos:
+            self.line += self.buf.count('\n', 0, self.pos)
+            k = self.buf.rfind('\n', 0, self.pos)
+            if k >= 0:
+                self.line_start = self.base + k + 1
+            self.base += self.pos
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+
+        chunk = self.stream.read(CHUNK_BYTES)
+        self.bytes_read += len(chunk)
+        if self.max_bytes and self.bytes_read > self.max_bytes:
+            raise IngestError(f'Body vượt quá {self.max_bytes} byte.', 413)
+        try:
+            self.buf += self.decoder.decode(chunk, final=not chunk)
+        except UnicodeDecodeError:
+            raise self.error('Body không phải UTF-8 hợp lệ', len(self.buf))
+        if not chunk:
+            self.eof = True
+
+    def error(self, message, pos=None):
+        """IngestError 400 tại vị trí pos của buffer (mặc định vị trí hiện tại)."""
+        pos = self.pos if pos is None else pos
+        k = self.buf.rfind('\n', 0, pos)
+        offset = self.base + pos
+        start = self.base + k + 1 if k >= 0 else self.line_start
+        return IngestError(message, 400, {
+            'offset': offset,
+            'line': self.line + self.buf.count('\n', 0, pos),
+            'column': offset - start + 1,
+        })
+
+    def error_at(self, message, offset):
+        """Như error() nhưng theo offset tuyệt đối (vẫn còn trong buffer)."""
+        return self.error(message, offset - self.base)
+
+    def peek(self):
+        """Ký tự khác khoảng trắng tiếp theo ('' nếu hết body), không tiêu thụ."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ''
+            self.fill()
+
+    def expect(self, chars):
+        c = self.peek()
+        if not c:
+            raise self.error('JSON không hợp lệ: body kết thúc giữa chừng')
+        if c not in chars:
+            raise self.error(f'JSON không hợp lệ: cần {" hoặc ".join(repr(ch) for ch in chars)}')
+        self.pos += 1
+        return c
+
+    def value(self):
+        """Decode một giá trị JSON hoàn chỉnh, đọc thêm chunk nếu giá trị bị cắt ở cuối buffer."""
+        while True:
+            self.peek()
+            try:
+                obj, end = _raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if not self.eof and len(self.buf) - self.pos <= MAX_VALUE_CHARS:
+                    self.fill()
+                    continue
+                raise self.error(f'JSON không hợp lệ: {e.msg}', e.pos)
+            # Số / true / false / null kết thúc đúng ở cuối buffer có thể còn tiếp
+            if end == len(self.buf) and not self.eof and not isinstance(obj, (dict, list, str)):
+                self.fill()
+                continue
+            self.pos = end
+            return obj
+
+    def members(self):
+        """Duyệt một object JSON: yield từng khóa, người gọi phải đọc giá trị ngay sau đó."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self.error('JSON không hợp lệ: cần khóa dạng chuỗi')
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.expect(',}') == '}':
+                return
+
+    def elements(self):
+        """
+        Duyệt một mảng JSON, yield (offset, giá trị) của từng phần tử. Đường nhanh
+        decode thẳng trên buffer; chỉ khi phần tử chạm cuối buffer mới quay về value().
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        skip = _WS.match
+        while True:
+            buf, pos = self.buf, skip(self.buf, self.pos).end()
+            try:
+                obj, end = _raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                end = len(buf)
+            start = self.base + pos
+            if end + 1 < len(buf):
+                self.pos = end
+            else:
+                self.pos = pos
+                obj = self.value()
+            yield start, obj
+            # Dấu phân cách: thường ngay sau phần tử
+            pos = self.pos
+            c = self.buf[pos] if pos < len(self.buf) else ''
+            if c == ',':
+                self.pos = pos + 1
+            elif c == ']':
+                self.pos = pos + 1
+                return
+            elif self.expect(',]') == ']':
+                return
+
+
+class GraphBuilder:
+    """
+    Dựng GraphArrays từ từng bản ghi nút/cạnh, cùng ngữ nghĩa với
+    GraphArrays.from_graph_data(): id nút ép về chuỗi, cạnh có đầu mút không tồn tại
+    bị bỏ qua, trọng số mặc định 1, tọa độ chỉ giữ khi mọi nút đều có x/y dạng số.
+    Cạnh tới trước khi mảng 'nodes' kết thúc (thứ tự khóa hiếm gặp) phải được giữ lại
+    nguyên dạng dict cho tới khi có đủ nút.
+    """
+
+    def __init__(self, max_nodes=0, max_edges=0):
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+        self.node_ids = []
+        self.index = {}
+        self.x = array('d')
+        self.y = array('d')
+        self.has_coords = True
+        self.nodes_done = False
+        self.num_records = 0
+        self.src = array('q')
+        self.dst = array('q')
+        self.weight = array('d')
+        self.edge_ids = IdTable()
+        self.pending = []
+
+    def add_node(self, node):
+        if self.max_nodes and len(self.node_ids) >= self.max_nodes:
+            raise IngestError(f'Đồ thị vượt quá {self.max_nodes} nút.', 413)
+        if not isinstance(node, dict) or 'id' not in node:
+            raise ValueError('Nút phải là object có "id"')
+        node_id = str(node['id'])
+        self.index[node_id] = len(self.node_ids)
+        self.node_ids.append(node_id)
+        if self.has_coords:
+            x, y = node.get('x'), node.get('y')
+            if isinstance(x, (int, float)) and isinstance(y, (int, float)):
+                self.x.append(x)
+                self.y.append(y)
+            else:
+                self.has_coords = False
+                self.x = self.y = None
+
+    def add_edge(self, edge):
+        if self.max_edges and self.num_records >= self.max_edges:
+            raise IngestError(f'Đồ thị vượt quá {self.max_edges} cạnh.', 413)
+        if not isinstance(edge, dict):
+            raise ValueError('Cạnh phải là object')
+        self.num_records += 1
+        if not self.nodes_done:
+            self.pending.append(edge)
+            return
+        index = self.index
+        u = index.get(str(edge['source']))
+        v = index.get(str(edge['target']))
+        if u is None or v is None:
+            return
+        weight = float(edge.get('weight', 1))
+        self.edge_ids.append(edge['id'])
+        self.src.append(u)
+        self.dst.append(v)
+        self.weight.append(weight)
+
+    def finish_nodes(self):
+        """Mảng 'nodes' đã đọc xong: nối các cạnh đang chờ."""
+        self.nodes_done = True
+        pending, self.pending = self.pending, []
+        for i, edge in enumerate(pending):
+            try:
+                self.add_edge(edge)
+            except (KeyError, TypeError, ValueError) as e:
+                message = f'thiếu {e}' if isinstance(e, KeyError) else str(e)
+                raise IngestError(f'Cạnh thứ {i + 1} không hợp lệ: {message}')
+        self.num_records -= len(pending)
+
+    def build(self, is_directed=False):
+        self.finish_nodes()
+        x = y = None
+        if self.node_ids and self.has_coords:
+            x, y = np.frombuffer(self.x, dtype=np.float64), np.frombuffer(self.y, dtype=np.float64)
+        return GraphArrays(
+            self.node_ids,
+            np.frombuffer(self.src, dtype=np.int64),
+            np.frombuffer(self.dst, dtype=np.int64),
+            np.frombuffer(self.weight, dtype=np.float64),
+            self.edge_ids, is_directed, x, y,
+        )
+
+
+def _read_records(reader, add):
+    """Đọc mảng bản ghi, chuyển lỗi của từng bản ghi thành lỗi có vị trí."""
+    if reader.peek() != '[':
+        raise reader.error('"nodes" / "edges" phải là mảng')
+    for start, record in reader.elements():
+        try:
+            add(record)
+        except IngestError:
+            raise
+        except (KeyError, TypeError, ValueError) as e:
+            message = f'thiếu {e}' if isinstance(e, KeyError) else str(e)
+            raise reader.error_at(f'Bản ghi không hợp lệ: {message}', start)
+
+
+def _read_graph(reader, max_nodes, max_edges):
+    builder = GraphBuilder(max_nodes, max_edges)
+    other = {}
+    seen = set()
+    for key in reader.members():
+        if key in ('nodes', 'edges'):
+            if key in seen:
+                raise reader.error(f'Khóa "{key}" bị lặp')
+            seen.add(key)
+            if key == 'nodes':
+                _read_records(reader, builder.add_node)
+                builder.finish_nodes()
+            else:
+                _read_records(reader, builder.add_edge)
+        else:
+            other[key] = reader.value()
+
+    # Không có nodes/edges (ví dụ spec "generator"): giữ nguyên dạng dict như json.loads
+    if not seen or 'generator' in other:
+        return other
+    return builder.build(other.get('isDirected', False))
+
+
+def read_graph(stream, max_nodes=0, max_edges=0):
+    """
+    Đọc một đồ thị JSON ({"nodes": [...], "edges": [...], "isDirected": ...}) từ stream
+    bytes, cùng cách đọc theo luồng như trường 'graph' của read_payload().
+
+    Returns:
+        GraphArrays, hoặc dict nếu object không có nodes/edges (ví dụ spec "generator")
+
+    Raises:
+        IngestError: JSON / bản ghi không hợp lệ hoặc vượt giới hạn
+    """
+    reader = _Reader(stream)
+    if reader.peek() != '{':
+        raise reader.error('Đồ thị phải là một object JSON')
+    graph = _read_graph(reader, max_nodes, max_edges)
+    if reader.peek():
+        raise reader.error('JSON không hợp lệ: dữ liệu thừa sau object')
+    return graph
+
+
+def read_payload(stream, content_length=None, max_bytes=0, max_nodes=0, max_edges=0):
+    """
+    Đọc payload /api/run từ stream bytes.
+
+    Args:
+        stream: đối tượng có read(n) (request.stream, io.BytesIO, ...)
+        content_length: độ dài body nếu biết trước (kiểm tra max_bytes trước khi đọc)
+        max_bytes / max_nodes / max_edges: giới hạn (0 = không giới hạn)
+
+    Returns:
+        Dict payload như json.loads(), 'graph' là GraphArrays nếu có nodes/edges
+
+    Raises:
+        IngestError: 400 nếu JSON/bản ghi không hợp lệ, 413 nếu vượt giới hạn
+    """
+    if max_bytes and content_length and content_length > max_bytes:
+        raise IngestError(f'Body vượt quá {max_bytes} byte.', 413)
+
+    reader = _Reader(stream, max_bytes)
+    if reader.peek() != '{':
+        raise reader.error('Payload phải là một object JSON')
+    payload = {}
+    for key in reader.members():
+        if key == 'graph' and reader.peek() == '{':
+            payload[key] = _read_graph(reader, max_nodes, max_edges)
+        else:
+            payload[key] = reader.value()
+    if reader.peek():
+        raise reader.error('JSON không hợp lệ: dữ liệu thừa sau object')
+    return payload
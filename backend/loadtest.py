@@ -0,0 +1,330 @@
+"""
+loadtest.py - Đo tải end-to-end cho HTTP API (chạy hoàn toàn offline với server local)
+
+Phát lại hỗn hợp request /api/run cho mọi thuật toán đã đăng ký và nhiều kích
+thước đồ thị, với số kết nối đồng thời và tốc độ request có thể cấu hình. Đo cả
+phần parse JSON, jsonify, hook CORS after_request và tranh chấp thread của server.
+
+    python backend/loadtest.py --spawn -c 8 -n 2000 --sizes 10,100,1000
+    python backend/loadtest.py --url http://127.0.0.1:5000 -c 16 --rate 200 --duration 30
+    python backend/loadtest.py --compare before.json after.json
+
+Báo cáo: throughput, latency p50/p95/p99, tỉ lệ lỗi, số byte response. Mỗi lần
+chạy được lưu thành file JSON để so sánh trước/sau.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+# ====== Sinh workload ======
+
+# Thuật toán chỉ chạy trên đồ thị có hướng: nhận DAG thay cho đồ thị vô hướng (nếu không
+# mọi request đều là lỗi 400 và tỉ lệ lỗi TOTAL không còn ý nghĩa)
+DIRECTED_ALGORITHMS = {'topological_sort'}
+
+
+def random_graph(n, avg_degree=3, seed=0, directed=False):
+    """
+    Đồ thị liên thông ngẫu nhiên: một cây khung + cạnh ngẫu nhiên, trọng số dương.
+    directed: cạnh luôn đi từ nút chỉ số nhỏ sang lớn (DAG).
+    """
+    rng = random.Random(seed)
+    nodes = [{'id': str(i), 'x': rng.uniform(0, 1000), 'y': rng.uniform(0, 1000)} for i in range(n)]
+    edges = []
+    for v in range(1, n):
+        u = rng.randrange(v)
+        edges.append({'id': f'e{len(edges)}', 'source': str(u), 'target': str(v),
+                      'weight': rng.randint(1, 20), 'isDirected': directed})
+    for _ in range(max(0, n * avg_degree // 2 - (n - 1))):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if directed and u > v:
+            u, v = v, u
+        if u != v:
+            edges.append({'id': f'e{len(edges)}', 'source': str(u), 'target': str(v),
+                          'weight': rng.randint(1, 20), 'isDirected': directed})
+    return {'nodes': nodes, 'edges': edges, 'isDirected': directed}
+
+
+def build_workload(algorithms, sizes, seed=0):
+    """
+    Tạo danh sách (nhãn, body bytes) - body được serialize sẵn một lần để
+    chi phí sinh request không lẫn vào số đo.
+    """
+    workload = []
+    for size in sizes:
+        graphs = {directed: random_graph(size, seed=seed + size, directed=directed) for directed in (False, True)}
+        last = str(size - 1)
+        for algo in algorithms:
+            payload = {
+                'algorithm': algo,
+                'graph': graphs[algo in DIRECTED_ALGORITHMS],
+                'source': '0',
+                'target': last,
+                'start_node': '0',
+                'k': 3,
+            }
+            workload.append((f'{algo}/{size}', json.dumps(payload).encode('utf-8')))
+    return workload
+
+
+# ====== Thực thi ======
+
+class _Client:
+    """Một kết nối HTTP keep-alive cho mỗi thread; tự kết nối lại khi server đóng."""
+
+    def __init__(self, host, port, timeout):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.conn = None
+
+    def post(self, path, body):
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            self.conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+            resp = self.conn.getresponse()
+            data = resp.read()
+        except Exception:
+            self.close()
+            raise
+        if resp.version < 11 or resp.getheader('Connection', '').lower() == 'close':
+            self.close()
+        return resp.status, data
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def run_load(url, workload, concurrency=4, requests=None, duration=None, rate=None, timeout=60, seed=0):
+    """
+    Chạy tải. Dừng sau `requests` request hoặc sau `duration` giây.
+
+    Nếu có `rate` (request/giây), request thứ i được lên lịch tại t0 + i/rate
+    (open-loop) và latency tính từ thời điểm lên lịch, tránh coordinated omission.
+
+    Returns:
+        Tuple (records, elapsed_s): records là list (label, status, latency_s, bytes, error)
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = (parts.path.rstrip('/') or '') + '/api/run'
+    if requests is None and duration is None:
+        requests = 1000
+
+    rng = random.Random(seed)
+    order = [rng.randrange(len(workload)) for _ in range(requests or 100000)]
+    records = []
+    lock = threading.Lock()
+    counter = {'next': 0}
+    t0 = time.perf_counter()
+    deadline = t0 + duration if duration else None
+
+    def worker():
+        client = _Client(host, port, timeout)
+        local = []
+        while True:
+            with lock:
+                i = counter['next']
+                counter['next'] += 1
+            if requests is not None and i >= requests:
+                break
+            scheduled = t0 + i / rate if rate else None
+            now = time.perf_counter()
+            if scheduled is not None and scheduled > now:
+                time.sleep(scheduled - now)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+            label, body = workload[order[i % len(order)]]
+            start = scheduled if scheduled is not None else time.perf_counter()
+            try:
+                status, data = client.post(path, body)
+                error = None if status < 400 else data[:200].decode('utf-8', 'replace')
+                local.append((label, status, time.perf_counter() - start, len(data), error))
+            except Exception as e:
+                local.append((label, 0, time.perf_counter() - start, 0, str(e)))
+        client.close()
+        with lock:
+            records.extend(local)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return records, time.perf_counter() - t0
+
+
+# ====== Thống kê ======
+
+def percentile(sorted_values, p):
+    """Percentile theo nearest-rank trên list đã sắp xếp."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(p / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(records, elapsed):
+    def stats(rows):
+        lat = sorted(r[2] * 1000 for r in rows)
+        errors = sum(1 for r in rows if r[4] is not None)
+        total_bytes = sum(r[3] for r in rows)
+        return {
+            'requests': len(rows),
+            'errors': errors,
+            'errorRate': errors / len(rows) if rows else 0.0,
+            'throughputRps': len(rows) / elapsed if elapsed else 0.0,
+            'latencyMs': {
+                'p50': percentile(lat, 50),
+                'p95': percentile(lat, 95),
+                'p99': percentile(lat, 99),
+                'max': lat[-1] if lat else None,
+                'mean': sum(lat) / len(lat) if lat else None,
+            },
+            'responseBytes': {
+                'total': total_bytes,
+                'mean': total_bytes / len(rows) if rows else 0,
+            },
+        }
+
+    by_label = {}
+    for r in records:
+        by_label.setdefault(r[0], []).append(r)
+    sample_errors = sorted({r[4] for r in records if r[4]})[:5]
+    return {
+        'elapsedS': elapsed,
+        'overall': stats(records),
+        'byLabel': {label: stats(rows) for label, rows in sorted(by_label.items())},
+        'sampleErrors': sample_errors,
+    }
+
+
+def print_report(report):
+    def fmt(v):
+        return '-' if v is None else f'{v:.1f}'
+
+    header = f"{'label':<28}{'req':>7}{'err%':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'KB/req':>9}"
+    print(header)
+    print('-' * len(header))
+    rows = list(report['byLabel'].items()) + [('TOTAL', report['overall'])]
+    for label, s in rows:
+        lat = s['latencyMs']
+        print(f"{label:<28}{s['requests']:>7}{s['errorRate'] * 100:>7.1f}{s['throughputRps']:>9.1f}"
+              f"{fmt(lat['p50']):>9}{fmt(lat['p95']):>9}{fmt(lat['p99']):>9}"
+              f"{s['responseBytes']['mean'] / 1024:>9.1f}")
+    for e in report['sampleErrors']:
+        print(f"  lỗi: {e}")
+
+
+def compare(before_path, after_path):
+    """In chênh lệch throughput/latency giữa hai file kết quả."""
+    with open(before_path, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, encoding='utf-8') as f:
+        after = json.load(f)
+
+    def pct(a, b):
+        if a in (None, 0) or b is None:
+            return '-'
+        return f'{(b - a) / a * 100:+.1f}%'
+
+    labels = sorted(set(before['byLabel']) & set(after['byLabel'])) + ['TOTAL']
+    print(f"{'label':<28}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'KB/req':>10}")
+    for label in labels:
+        a = before['overall'] if label == 'TOTAL' else before['byLabel'][label]
+        b = after['overall'] if label == 'TOTAL' else after['byLabel'][label]
+        print(f"{label:<28}{pct(a['throughputRps'], b['throughputRps']):>10}"
+              f"{pct(a['latencyMs']['p50'], b['latencyMs']['p50']):>10}"
+              f"{pct(a['latencyMs']['p95'], b['latencyMs']['p95']):>10}"
+              f"{pct(a['latencyMs']['p99'], b['latencyMs']['p99']):>10}"
+              f"{pct(a['responseBytes']['mean'], b['responseBytes']['mean']):>10}")
+
+
+def spawn_server():
+    """Chạy Flask app trong thread nền (werkzeug threaded) trên cổng ngẫu nhiên."""
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    # Tắt log từng request của werkzeug để không làm nhiễu số đo
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo tải HTTP cho AlgoGraphStudio API")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--spawn', action='store_true', help='Tự chạy server Flask trong process này')
+    parser.add_argument('-a', '--algorithms', help='Danh sách thuật toán, mặc định: mọi thuật toán đã đăng ký')
+    parser.add_argument('--sizes', default='10,100,1000', help='Số nút của các đồ thị thử')
+    parser.add_argument('-c', '--concurrency', type=int, default=4)
+    parser.add_argument('-n', '--requests', type=int)
+    parser.add_argument('--duration', type=float, help='Thời gian chạy (giây)')
+    parser.add_argument('--rate', type=float, help='Tốc độ request/giây (open-loop)')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--out', help='File JSON lưu kết quả')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.algorithms:
+        algorithms = [a.strip() for a in args.algorithms.split(',') if a.strip()]
+    else:
+        from service import ALGORITHM_FUNCTIONS
+        algorithms = list(ALGORITHM_FUNCTIONS.keys())
+    sizes = [int(s) for s in args.sizes.split(',')]
+
+    server = None
+    url = args.url
+    if args.spawn:
+        server, url = spawn_server()
+
+    workload = build_workload(algorithms, sizes, args.seed)
+    try:
+        records, elapsed = run_load(url, workload, args.concurrency, args.requests,
+                                    args.duration, args.rate, args.timeout, args.seed)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    report = summarize(records, elapsed)
+    report['config'] = {
+        'url': url,
+        'algorithms': algorithms,
+        'sizes': sizes,
+        'concurrency': args.concurrency,
+        'requests': args.requests,
+        'duration': args.duration,
+        'rate': args.rate,
+        'seed': args.seed,
+        'startedAt': datetime.now().isoformat(timespec='seconds'),
+    }
+    print_report(report)
+
+    out = args.out or f"loadtest-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Đã lưu kết quả: {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+metrics.py - Số liệu vận hành theo process: số request, thời gian chạy và bộ nhớ
+theo từng thuật toán (endpoint /api/metrics).
+
+Đo bộ nhớ dùng tracemalloc nên có chi phí đáng kể khi bật; vì vậy chỉ một phần
+request được lấy mẫu (MEMORY_SAMPLE_RATE) hoặc khi client yêu cầu (debug_memory).
+Mỗi worker process có bộ số liệu riêng.
+"""
+
+import json
+import random
+import threading
+import time
+import tracemalloc
+
+# Số step tối đa được serialize để đo kích thước; trace dài hơn thì lấy mẫu đều
+MAX_SIZED_STEPS = 2000
+
+# tracemalloc là trạng thái toàn cục của process: mỗi lúc chỉ một request được đo
+_tracemalloc_lock = threading.Lock()
+
+
+def should_sample(rate):
+    """Quyết định có đo bộ nhớ cho request này hay không theo tỉ lệ lấy mẫu."""
+    return rate > 0 and (rate >= 1 or random.random() < rate)
+
+
+def measure_peak_memory(func, *args, **kwargs):
+    """
+    Gọi func và đo đỉnh bộ nhớ cấp phát (tracemalloc) trong lúc chạy.
+
+    Returns:
+        Tuple (kết quả, peak_bytes). peak_bytes = None nếu một request khác đang
+        được đo (không chờ, để không tuần tự hóa các request).
+    """
+    if not _tracemalloc_lock.acquire(blocking=False):
+        return func(*args, **kwargs), None
+    try:
+        tracemalloc.start()
+        try:
+            result = func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return result, peak
+    finally:
+        _tracemalloc_lock.release()
+
+
+def trace_size_stats(steps):
+    """
+    Thống kê kích thước trace: số step, số byte JSON trung bình/lớn nhất mỗi step,
+    kích thước lớn nhất của highlightNodes/nodeLabels.
+    """
+    if not isinstance(steps, list):
+        return {'steps': 0}
+
+    max_highlight = max((len(s.get('highlightNodes') or ()) for s in steps), default=0)
+    max_labels = max((len(s.get('nodeLabels') or ()) for s in steps), default=0)
+
+    stride = max(1, -(-len(steps) // MAX_SIZED_STEPS))
+    sizes = [len(json.dumps(s, ensure_ascii=False).encode('utf-8')) for s in steps[::stride]]
+    return {
+        'steps': len(steps),
+        'stepBytesAvg': round(sum(sizes) / len(sizes), 1) if sizes else 0,
+        'stepBytesMax': max(sizes, default=0),
+        'sampledSteps': len(sizes),
+        'estimated': stride > 1,
+        'maxHighlightNodes': max_highlight,
+        'maxNodeLabels': max_labels,
+    }
+
+
+class MetricsRegistry:
+    """Tổng hợp số liệu theo thuật toán, an toàn khi nhiều thread cùng ghi."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._algorithms = {}
+        # Trong process con của executor: giữ lại bản ghi để gửi về process cha
+        self._forward = False
+        self._pending = []
+
+    def enable_forwarding(self):
+        self._forward = True
+
+    def take_pending(self):
+        """Lấy (và xóa) các bản ghi chờ gửi về process cha."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def record_run(self, algorithm, status, duration_ms, memory=None):
+        with self._lock:
+            if self._forward:
+                self._pending.append((algorithm, status, duration_ms, memory))
+                return
+
+            m = self._algorithms.setdefault(algorithm, {
+                'requests': 0,
+                'errors': 0,
+                'totalMs': 0.0,
+                'maxMs': 0.0,
+                'memorySamples': 0,
+                'peakBytesMax': 0,
+                'peakBytesTotal': 0,
+                'stepsMax': 0,
+                'stepBytesAvgTotal': 0.0,
+                'stepBytesMax': 0,
+                'maxHighlightNodes': 0,
+                'maxNodeLabels': 0,
+            })
+            m['requests'] += 1
+            if status >= 400:
+                m['errors'] += 1
+            m['totalMs'] += duration_ms
+            m['maxMs'] = max(m['maxMs'], duration_ms)
+
+            if memory and memory.get('peakBytes') is not None:
+                m['memorySamples'] += 1
+                m['peakBytesMax'] = max(m['peakBytesMax'], memory['peakBytes'])
+                m['peakBytesTotal'] += memory['peakBytes']
+                m['stepsMax'] = max(m['stepsMax'], memory.get('steps', 0))
+                m['stepBytesAvgTotal'] += memory.get('stepBytesAvg', 0)
+                m['stepBytesMax'] = max(m['stepBytesMax'], memory.get('stepBytesMax', 0))
+                m['maxHighlightNodes'] = max(m['maxHighlightNodes'], memory.get('maxHighlightNodes', 0))
+                m['maxNodeLabels'] = max(m['maxNodeLabels'], memory.get('maxNodeLabels', 0))
+
+    def snapshot(self):
+        with self._lock:
+            algorithms = {}
+            for name, m in self._algorithms.items():
+                samples = m['memorySamples']
+                algorithms[name] = {
+                    'requests': m['requests'],
+                    'errors': m['errors'],
+                    'avgMs': round(m['totalMs'] / m['requests'], 3) if m['requests'] else 0,
+                    'maxMs': round(m['maxMs'], 3),
+                    'memory': {
+                        'samples': samples,
+                        'peakBytesMax': m['peakBytesMax'],
+                        'peakBytesAvg': round(m['peakBytesTotal'] / samples) if samples else 0,
+                        'stepsMax': m['stepsMax'],
+                        'stepBytesAvg': round(m['stepBytesAvgTotal'] / samples, 1) if samples else 0,
+                        'stepBytesMax': m['stepBytesMax'],
+                        'maxHighlightNodes': m['maxHighlightNodes'],
+                        'maxNodeLabels': m['maxNodeLabels'],
+                    },
+                }
+            return {
+                'uptimeS': round(time.time() - self._started, 1),
+                'algorithms': algorithms,
+            }
+
+
+REGISTRY = MetricsRegistry()
+
+
+def forward_to_parent():
+    """Initializer cho ProcessPoolExecutor: số liệu được gửi kèm kết quả về process cha."""
+    REGISTRY.enable_forwarding()
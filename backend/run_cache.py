@@ -0,0 +1,257 @@
+"""
+run_cache.py - Cache kết quả /api/run trên đĩa (SQLite), giữ được qua các lần restart
+
+Đồ thị trên lớp học là cố định và được hỏi lại hằng ngày, nhưng mọi cache khác đều
+nằm trong bộ nhớ process nên mất sau mỗi lần deploy. Ở đây đầu ra của thuật toán
+(step chưa qua present_steps, hoặc dict kết quả của mode result) cùng phần meta cần
+để dựng lại response (trạng thái chạy tiếp, số liệu hàng đợi) được lưu vào một file
+SQLite:
+
+    - khóa: blake2b(hash nội dung đồ thị, thuật toán, mode, tham số chạy, continuation
+      token, phiên bản thuật toán) - phiên bản là hash mã nguồn của cả package chứa
+      thuật toán (thuật toán dùng chung hàng đợi, CSR, bộ đếm... trong package) cộng
+      CACHE_FORMAT, nên sửa thuật toán hay helper của nó thì các mục cũ tự hết hiệu lực
+    - dữ liệu: JSON nén zlib, kèm blake2b của blob; đọc ra mà sai digest / không giải
+      nén được thì mục bị xóa và coi như miss
+    - dung lượng: tổng kích thước blob giới hạn bởi max_bytes, vượt thì xóa các mục ít
+      được dùng gần đây nhất (LRU theo thời điểm truy cập). Tổng số mục / byte nằm trong
+      bảng một dòng totals do trigger cập nhật cùng câu lệnh ghi, nên put() không phải
+      quét cả bảng entries
+    - nhiều process: SQLite chế độ WAL + busy_timeout, mỗi thread / process một kết
+      nối (kết nối không đi qua fork)
+    - lỗi SQLite (đĩa đầy, khóa quá lâu, file hỏng) không làm hỏng request: get() trả
+      về miss, put() bỏ qua, số lỗi nằm trong stats()['errors']
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# Đổi khi định dạng mục cache thay đổi (mọi mục cũ hết hiệu lực)
+CACHE_FORMAT = 1
+
+# Chỉ cập nhật thời điểm truy cập nếu mục chưa được dùng trong ngần này giây (bớt ghi)
+TOUCH_INTERVAL = 60
+
+# Eviction xóa tới khi tổng dung lượng còn tỉ lệ này của giới hạn
+EVICT_TO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    data BLOB NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_resize AFTER UPDATE OF size ON entries BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0;
+END;
+-- File tạo trước khi có bảng totals: đếm một lần khi mở
+INSERT OR IGNORE INTO totals (id, entries, bytes) SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries;
+"""
+
+_versions = {}
+_package_sources = {}
+
+
+def _json_default(value):
+    # bytearray / set trong trạng thái chạy tiếp (như continuation.py)
+    if isinstance(value, (bytearray, set, frozenset)):
+        return list(value)
+    # Mảng / số NumPy (cây đường đi của meta['path_tree'])
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f'Không serialize được {type(value).__name__} vào run cache')
+
+
+def _source(module):
+    """Mã nguồn mọi module .py của package chứa module (theo tên file), hoặc của riêng module."""
+    path = getattr(module, '__file__', None)
+    if not module.__package__ or path is None:
+        return inspect.getsource(module)
+    directory = os.path.dirname(os.path.abspath(path))
+    source = _package_sources.get(directory)
+    if source is None:
+        parts = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.py'):
+                with open(os.path.join(directory, name), encoding='utf-8') as f:
+                    parts.append(f'# {name}\n{f.read()}')
+        source = _package_sources[directory] = '\n'.join(parts)
+    return source
+
+
+def algorithm_version(func):
+    """Phiên bản của thuật toán: hash mã nguồn package chứa func (tính một lần mỗi process)."""
+    version = _versions.get(func)
+    if version is None:
+        try:
+            source = _source(inspect.getmodule(func))
+        except (OSError, TypeError, AttributeError):
+            source = func.__qualname__
+        version = hashlib.blake2b(f'{CACHE_FORMAT}:{source}'.encode('utf-8'), digest_size=8).hexdigest()
+        _versions[func] = version
+    return version
+
+
+def run_key(graph_hash, algorithm, mode, params, continuation, func):
+    """Khóa cache của một lần chạy /api/run."""
+    raw = json.dumps(
+        [graph_hash, algorithm, mode, params, continuation, algorithm_version(func)],
+        sort_keys=True, separators=(',', ':'), default=str,
+    )
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class RunCache:
+    """Cache trên một file SQLite, dùng chung được giữa các process trên cùng máy."""
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'corrupt': 0, 'errors': 0}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(f'BEGIN IMMEDIATE;{_SCHEMA}COMMIT;')
+        # Giới hạn có thể nhỏ hơn lần mở trước
+        self._evict(conn)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def get(self, key):
+        """
+        Mục đã lưu (dict) hoặc None. Mục hỏng (sai digest, không giải nén / parse được)
+        bị xóa.
+        """
+        try:
+            return self._get(key)
+        except sqlite3.Error:
+            self._count('errors')
+            return None
+
+    def _get(self, key):
+        conn = self._connect()
+        row = conn.execute('SELECT digest, data, accessed FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        digest, data, accessed = row
+        try:
+            if hashlib.blake2b(data, digest_size=16).digest() != digest:
+                raise ValueError('digest')
+            entry = json.loads(zlib.decompress(data))
+        except (ValueError, zlib.error):
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._count('corrupt')
+            self._count('misses')
+            return None
+        now = time.time()
+        if now - accessed > TOUCH_INTERVAL:
+            conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        self._count('hits')
+        return entry
+
+    def put(self, key, algorithm, entry):
+        """
+        Lưu entry (dict JSON). Mục lớn hơn một phần tư giới hạn không được lưu.
+
+        Returns:
+            Số byte đã lưu (sau nén), 0 nếu bỏ qua
+        """
+        try:
+            return self._put(key, algorithm, entry)
+        except sqlite3.Error:
+            self._count('errors')
+            return 0
+
+    def _put(self, key, algorithm, entry):
+        raw = json.dumps(entry, separators=(',', ':'), default=_json_default).encode('utf-8')
+        data = zlib.compress(raw, 6)
+        if len(data) > self.max_bytes // 4:
+            return 0
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        now = time.time()
+        conn = self._connect()
+        # Upsert (không phải INSERT OR REPLACE: phần xóa của REPLACE không chạy trigger)
+        conn.execute(
+            'INSERT INTO entries (key, algorithm, size, digest, data, created, accessed) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET algorithm = excluded.algorithm, '
+            'size = excluded.size, digest = excluded.digest, data = excluded.data, '
+            'created = excluded.created, accessed = excluded.accessed',
+            (key, algorithm, len(data), digest, sqlite3.Binary(data), now, now),
+        )
+        self._count('stores')
+        self._evict(conn)
+        return len(data)
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT bytes FROM totals WHERE id = 0').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Xóa theo thứ tự truy cập cũ nhất trong một transaction (process khác chờ busy_timeout)
+        target = self.max_bytes * EVICT_TO
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Đọc lại trong transaction: process khác có thể vừa xóa bớt
+            total = conn.execute('SELECT bytes FROM totals WHERE id = 0').fetchone()[0]
+            removed = []
+            for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed'):
+                if total <= target:
+                    break
+                removed.append((key,))
+                total -= size
+            conn.executemany('DELETE FROM entries WHERE key = ?', removed)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._count('evictions', len(removed))
+
+    def stats(self):
+        """Số liệu của process; entries / bytes là None nếu không đọc được file."""
+        try:
+            row = self._connect().execute('SELECT entries, bytes FROM totals WHERE id = 0').fetchone()
+        except sqlite3.Error:
+            self._count('errors')
+            row = (None, None)
+        with self._stats_lock:
+            return {**self._stats, 'entries': row[0], 'bytes': row[1], 'maxBytes': self.max_bytes}
+
+    def clear(self):
+        self._connect().execute('DELETE FROM entries')
@@ -0,0 +1,93 @@
+"""
+serve.py - Chạy backend ở chế độ production bằng gunicorn.
+
+    python backend/serve.py                      # WSGI, cấu hình từ biến môi trường
+    python backend/serve.py --server asgi -w 8   # ASGI với uvicorn worker
+
+Các tham số dòng lệnh ghi đè cấu hình trong config.py (ALGOGRAPH_*).
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import load_settings
+
+
+def gunicorn_options(settings):
+    """Chuyển cấu hình của app sang option của gunicorn."""
+    options = {
+        'bind': f"{settings['HOST']}:{settings['PORT']}",
+        'workers': max(1, int(settings['WORKERS'])),
+        'timeout': int(settings['TIMEOUT']),
+        # Nạp app (và toàn bộ module thuật toán) trong master trước khi fork
+        'preload_app': bool(settings['PRELOAD']),
+    }
+    if settings['SERVER'] == 'asgi':
+        options['worker_class'] = 'uvicorn.workers.UvicornWorker'
+    else:
+        options['worker_class'] = 'gthread'
+        options['threads'] = max(1, int(settings['THREADS']))
+    return options
+
+
+def run(settings):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("Chế độ production cần gunicorn: pip install gunicorn (và uvicorn nếu dùng --server asgi)")
+
+    if settings['SERVER'] == 'asgi':
+        from asgi import create_asgi_app
+        application = create_asgi_app(settings)
+    else:
+        from app import create_app
+        application = create_app(settings)
+
+    class StandaloneApplication(BaseApplication):
+        def __init__(self, app, options):
+            self.application = app
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    StandaloneApplication(application, gunicorn_options(settings)).run()
+
+
+def main(argv=None):
+    settings = load_settings()
+
+    parser = argparse.ArgumentParser(description="Chạy AlgoGraphStudio backend (production)")
+    parser.add_argument('--server', choices=['wsgi', 'asgi'], default=settings['SERVER'])
+    parser.add_argument('--host', default=settings['HOST'])
+    parser.add_argument('--port', type=int, default=settings['PORT'])
+    parser.add_argument('-w', '--workers', type=int, default=settings['WORKERS'])
+    parser.add_argument('-t', '--threads', type=int, default=settings['THREADS'])
+    parser.add_argument('--executor', choices=['process', 'thread'], default=settings['EXECUTOR'])
+    parser.add_argument('--executor-workers', type=int, default=settings['EXECUTOR_WORKERS'])
+    parser.add_argument('--no-preload', action='store_true')
+    args = parser.parse_args(argv)
+
+    settings.update({
+        'SERVER': args.server,
+        'HOST': args.host,
+        'PORT': args.port,
+        'WORKERS': args.workers,
+        'THREADS': args.threads,
+        'EXECUTOR': args.executor,
+        'EXECUTOR_WORKERS': args.executor_workers,
+        'PRELOAD': not args.no_preload,
+    })
+    run(settings)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,997 @@
+"""
+service.py - Lõi xử lý request chạy thuật toán, dùng chung cho Flask (WSGI) và ASGI.
+Không phụ thuộc Flask để có thể gọi trong process/thread executor.
+"""
+
+import hashlib
+import io
+import json
+import sqlite3
+import threading
+import time
+
+from config import load_settings
+from continuation import decode_token, encode_token, signing_secret
+from cost_model import COST_MODEL, graph_features, plan_run, route_engine
+from generators import describe_graph, generate_graph, is_generator_spec, normalize_spec
+from graph_library import list_graphs, open_graph
+from ingest import IngestError, read_payload
+from metrics import REGISTRY, measure_peak_memory, should_sample, trace_size_stats
+from run_cache import RunCache, run_key
+
+# Import TẤT CẢ thuật toán từ __init__.py
+from algorithms import (
+    prim_algorithm,
+    prim_result,
+    kruskal_algorithm,
+    boruvka_algorithm,
+    boruvka_result,
+    dijkstra_algorithm,
+    dijkstra_result,
+    bellman_ford_algorithm,
+    bellman_ford_result,
+    bfs_algorithm,
+    dfs_algorithm,
+    dfs_result,
+    scc_algorithm,
+    scc_result,
+    topological_sort_algorithm,
+    topological_sort_result,
+    bridges_algorithm,
+    bridges_result,
+    k_shortest_paths_algorithm,
+    k_shortest_paths_result,
+    preprocess_landmarks,
+    fan_out,
+    GraphArrays,
+    as_graph_arrays,
+    check_profile,
+    graph_profile,
+    force_layout,
+    iter_layout,
+    layout_nodes,
+)
+from algorithms.budget import BUDGET_PARAMS, get_budget
+from algorithms.counters import finish_counters, new_counters
+from algorithms.layout import DEFAULT_ITERATIONS, MODELS as LAYOUT_MODELS
+from algorithms.path_trees import (
+    get_tree,
+    load_tree,
+    store_tree,
+    tree_arrays,
+    tree_cache_stats,
+    tree_entry,
+    tree_key,
+)
+from algorithms.viewport import cache_run, filter_steps, get_run, viewport_key, viewport_region
+from algorithms.messages import (
+    DEFAULT_LOCALE,
+    LOCALES,
+    STATE_COLORS,
+    message_catalogue,
+    present_steps,
+    templates_for,
+)
+
+# 1. MAPPING: Frontend string -> Backend function
+ALGORITHM_FUNCTIONS = {
+    "prim": prim_algorithm,
+    "kruskal": kruskal_algorithm,
+    "boruvka": boruvka_algorithm,
+    "dijkstra": dijkstra_algorithm,
+    #"ford_fulkerson": ford_fulkerson_algorithm,
+    #"fleury": fleury_algorithm,
+    #"hierholzer": hierholzer_algorithm,
+    "bellman_ford": bellman_ford_algorithm,
+    "bfs": bfs_algorithm,
+    "dfs": dfs_algorithm,
+    #"bfs_coloring": bfs_coloring_algorithm
+    "k_shortest_paths": k_shortest_paths_algorithm,
+    "scc": scc_algorithm,
+    "topological_sort": topological_sort_algorithm,
+    "bridges": bridges_algorithm,
+}
+
+# Engine "chỉ kết quả" (mode='result'): không sinh step, trả về dict kết quả
+RESULT_FUNCTIONS = {
+    "prim": prim_result,
+    "boruvka": boruvka_result,
+    "dijkstra": dijkstra_result,
+    "bellman_ford": bellman_ford_result,
+    "k_shortest_paths": k_shortest_paths_result,
+    "dfs": dfs_result,
+    "scc": scc_result,
+    "topological_sort": topological_sort_result,
+    "bridges": bridges_result,
+}
+
+# 2. METADATA: Mô tả cho endpoint /api/algorithms
+ALGORITHM_INFOS = [
+    {"id": "prim", "name": "MST - Prim", "description": "Tìm cây khung nhỏ nhất (Prim)."},
+    {"id": "kruskal", "name": "MST - Kruskal", "description": "Tìm cây khung nhỏ nhất (Kruskal)."},
+    {"id": "boruvka", "name": "MST - Borůvka", "description": "Cây (rừng) khung nhỏ nhất theo vòng, vector hóa / song song (Borůvka)."},
+    {"id": "dijkstra", "name": "Shortest Path - Dijkstra", "description": "Đường đi ngắn nhất (trọng số dương)."},
+    {"id": "bellman_ford", "name": "Shortest Path - Bellman-Ford", "description": "Đường đi ngắn nhất (xử lý trọng số âm)."},
+    {"id": "k_shortest_paths", "name": "K Shortest Paths - Yen", "description": "K đường đi ngắn nhất không lặp (Yen)."},
+    #{"id": "ford_fulkerson", "name": "Max Flow - Ford-Fulkerson", "description": "Luồng cực đại trong mạng."},
+    {"id": "bfs", "name": "Traversal - BFS", "description": "Duyệt đồ thị theo chiều rộng."},
+    {"id": "dfs", "name": "Traversal - DFS", "description": "Duyệt đồ thị theo chiều sâu (thời điểm phát hiện/kết thúc, phân loại cạnh)."},
+    {"id": "scc", "name": "SCC - Tarjan", "description": "Thành phần liên thông mạnh (Tarjan)."},
+    {"id": "topological_sort", "name": "Topological Sort - DFS", "description": "Sắp xếp topo, báo chu trình nếu có."},
+    {"id": "bridges", "name": "Bridges & Articulation Points", "description": "Tìm cầu và khớp của đồ thị."},
+    #{"id": "bfs_coloring", "name": "Graph Coloring (BFS)", "description": "Tô màu đồ thị sử dụng BFS."},
+    #{"id": "fleury", "name": "Euler Path - Fleury", "description": "Tìm chu trình/đường đi Euler (Fleury)."},
+    #{"id": "hierholzer", "name": "Euler Path - Hierholzer", "description": "Tìm chu trình Euler (Hierholzer - hiệu quả hơn)."},
+]
+
+# Các tham số tùy chọn (kwargs) được chuyển tiếp từ payload vào thuật toán
+RUN_PARAMS = ['start_node', 'source', 'target', 'sink', 'landmarks', 'k', 'queue', 'engine', 'delta', *BUDGET_PARAMS]
+
+# Tham số của /api/layout
+LAYOUT_PARAMS = ['iterations', 'max_ms', 'theta', 'model', 'seed', 'warm_start', 'every']
+
+# Khi stream layout mà không chỉ định "every": gửi vị trí sau mỗi ngần này vòng
+DEFAULT_LAYOUT_EVERY = 10
+
+
+# Cấu hình hiện hành của process (app factory gọi configure() để ghi đè)
+SETTINGS = load_settings()
+
+# Suất chạy request nặng của process (ADMISSION_HEAVY_SLOTS), tạo lại khi cấu hình đổi
+_heavy = {'slots': None, 'semaphore': None}
+_heavy_lock = threading.Lock()
+
+# Cache kết quả trên đĩa (RUN_CACHE_PATH), mở lại khi cấu hình đổi; phần meta được lưu
+# cùng đầu ra để dựng lại response (kể cả cây đường đi cho meta.pathTree)
+_run_caches = {}
+_run_caches_lock = threading.Lock()
+RUN_CACHE_META = ('suspended', 'queue', 'path_tree')
+
+# Process con của executor ASGI (mark_executor_process): state giữ trong process (cây
+# đường đi, lần chạy viewport) không chắc được request truy vấn lại tìm thấy
+_process = {'executor_child': False}
+
+
+def configure(settings):
+    """Cập nhật cấu hình dùng cho việc xử lý request (gọi từ create_app/create_asgi_app)."""
+    SETTINGS.update(settings)
+
+
+def mark_executor_process():
+    """Gọi trong initializer của process executor (asgi.py)."""
+    _process['executor_child'] = True
+
+
+def preload_algorithms():
+    """
+    Đảm bảo mọi module thuật toán đã được import. Gọi trong process master
+    trước khi fork worker để các trang bộ nhớ được chia sẻ copy-on-write.
+    """
+    return list(ALGORITHM_FUNCTIONS.keys())
+
+
+def resolve_graph(graph_data):
+    """
+    Spec sinh đồ thị ({"generator": ...}) được thay bằng GraphArrays sinh trên
+    server; graph_data thông thường giữ nguyên.
+    """
+    if is_generator_spec(graph_data):
+        return generate_graph(graph_data, SETTINGS['GENERATE_MAX_NODES'], SETTINGS['GENERATE_MAX_EDGES'])
+    return graph_data
+
+
+def payload_graph(data):
+    """
+    Đồ thị của payload: "graph" (dữ liệu hoặc spec sinh đồ thị), hoặc "graph_ref" - tên
+    một đồ thị trong thư viện trên đĩa (graph_library.py), mở bằng memory-map.
+
+    Raises:
+        ValueError: thư viện chưa bật, hoặc không có đồ thị tên đó
+    """
+    if data.get('graph') or data.get('graph_ref') is None:
+        return data.get('graph')
+    if not SETTINGS['GRAPH_LIBRARY_DIR']:
+        raise ValueError('Thư viện đồ thị chưa được bật (GRAPH_LIBRARY_DIR), hãy gửi "graph".')
+    return open_graph(SETTINGS['GRAPH_LIBRARY_DIR'], data['graph_ref'])
+
+
+def _heavy_semaphore():
+    slots = max(1, SETTINGS['ADMISSION_HEAVY_SLOTS'])
+    with _heavy_lock:
+        if _heavy['slots'] != slots:
+            _heavy.update(slots=slots, semaphore=threading.BoundedSemaphore(slots))
+        return _heavy['semaphore']
+
+
+def _run_cache():
+    path = SETTINGS['RUN_CACHE_PATH']
+    if not path:
+        return None
+    key = (path, SETTINGS['RUN_CACHE_MAX_BYTES'])
+    with _run_caches_lock:
+        if key not in _run_caches:
+            try:
+                _run_caches[key] = RunCache(path, SETTINGS['RUN_CACHE_MAX_BYTES'])
+            except (OSError, sqlite3.Error):
+                # Không mở được file (quyền, đĩa): chạy như khi tắt cache
+                _run_caches[key] = None
+        return _run_caches[key]
+
+
+def _share_state(key, algorithm, make_entry):
+    """
+    Giữ state cho truy vấn lại (cây đường đi, lần chạy viewport) ngoài process: ghi
+    make_entry() vào store dùng chung (RUN_CACHE_PATH) nếu bật.
+
+    Returns:
+        True nếu request sau tìm lại được state: đã ghi vào store dùng chung, hoặc
+        process này tự nhận các request sau (không phải process con của executor)
+    """
+    store = _run_cache()
+    if store is not None and store.put(key, algorithm, make_entry()):
+        return True
+    return not _process['executor_child']
+
+
+def _shared_state(key):
+    """State do _share_state() ghi, hoặc None."""
+    store = _run_cache()
+    return store.get(key) if store is not None else None
+
+
+def execute_run(data):
+    """
+    Chạy thuật toán theo payload của /api/run, ghi số liệu vào metrics.
+
+    Payload tùy chọn:
+        - debug_memory: true để đo bộ nhớ cho request này (ngoài việc lấy mẫu
+          theo MEMORY_SAMPLE_RATE); kết quả nằm trong meta.memory
+        - locale: ngôn ngữ của mô tả step (mặc định 'vi', xem /api/messages)
+        - templates: true để step giữ 'msg'/'args' thay vì 'description';
+          response kèm 'templates' (các template được dùng) để client tự dựng mô tả
+        - state_codes: true để thay màu highlight bằng mã trạng thái;
+          response kèm 'states' (màu theo mã)
+        - max_steps / max_ms / max_ops: ngân sách của lần gọi (bị chặn bởi RUN_MAX_STEPS /
+          RUN_MAX_MS). Hết ngân sách thì response có 'continuation' (token) và 'stoppedBy'
+        - continuation: token của trang trước để chạy tiếp (thay cho tham số chạy;
+          vẫn phải gửi lại graph, có thể kèm ngân sách mới)
+        - mode: 'trace' (mặc định), 'result' hoặc 'auto' (trace nếu vừa ngân sách
+          ADMISSION_*, ngược lại mode result nếu thuật toán hỗ trợ)
+        - degrade: false để bị từ chối (413) thay vì tự phân trang / đổi mode khi
+          dự đoán vượt ngân sách
+        - counters: true để đếm thao tác của thuật toán (algorithms/counters.py);
+          kết quả nằm trong meta.counters (luôn bật nếu process đã đăng ký hook)
+
+        - viewport: {"bbox": [x0, y0, x1, y1]} hoặc {"nodes": [...]} (mode trace) để
+          step chỉ mang highlight / nhãn của vùng đó (algorithms/viewport.py); step gốc
+          được cache, meta.viewport.runId dùng cho /api/viewport để lọc lại theo vùng khác
+          (không có runId khi lần chạy không truy vấn lại được, xem _share_state)
+
+    Dijkstra / Bellman-Ford không có target: cây đường đi ngắn nhất được cache, khóa
+    nằm trong meta.pathTree (graphHash, source) để hỏi đường đi qua /api/path.
+
+    Dự đoán chi phí (cost_model.py) nằm trong meta.estimate, quyết định nạp trong
+    meta.admission.
+
+    RUN_CACHE_PATH đặt: đầu ra được cache trên đĩa (run_cache.py) theo đồ thị, thuật
+    toán, tham số và phiên bản thuật toán; meta.runCache cho biết trúng cache hay đã lưu.
+
+    Returns:
+        Tuple (body_dict, status_code)
+    """
+    started = time.perf_counter()
+    meta = {}
+    body, status = _execute_run(data, meta)
+
+    algorithm = data.get('algorithm', '') if isinstance(data, dict) else ''
+    algorithm = algorithm.lower() if isinstance(algorithm, str) else ''
+    if algorithm not in ALGORITHM_FUNCTIONS:
+        algorithm = '_invalid'
+    REGISTRY.record_run(algorithm, status, (time.perf_counter() - started) * 1000, meta.get('memory'))
+
+    if meta and status < 400:
+        body['meta'] = meta
+    return body, status
+
+
+def use_stream_ingest(content_length):
+    """Body /api/run có được đọc theo luồng (ingest.py) hay parse bằng json như cũ."""
+    threshold = SETTINGS['INGEST_STREAM_MIN_BYTES']
+    return threshold > 0 and (content_length is None or content_length >= threshold)
+
+
+def read_run_payload(stream, content_length=None):
+    """
+    Đọc payload /api/run theo luồng với các giới hạn INGEST_*.
+
+    Raises:
+        IngestError: JSON không hợp lệ (400, kèm vị trí) hoặc vượt giới hạn (413)
+    """
+    return read_payload(stream, content_length, SETTINGS['INGEST_MAX_BYTES'],
+                        SETTINGS['INGEST_MAX_NODES'], SETTINGS['INGEST_MAX_EDGES'])
+
+
+def execute_run_stream(stream, content_length=None):
+    """
+    /api/run với body đọc theo luồng: nút/cạnh được ghi thẳng vào mảng của
+    GraphArrays, không dựng dict cho từng bản ghi.
+
+    Returns:
+        Tuple (body_dict, status_code)
+    """
+    started = time.perf_counter()
+    try:
+        data = read_run_payload(stream, content_length)
+    except IngestError as e:
+        REGISTRY.record_run('_invalid', e.status, (time.perf_counter() - started) * 1000)
+        return e.to_body(), e.status
+    return execute_run(data)
+
+
+def _execute_run(data, meta):
+    algorithm = ''
+    try:
+        if not isinstance(data, dict):
+            return {'error': 'Thiếu dữ liệu đồ thị'}, 400
+
+        algorithm = data.get('algorithm', '').lower()
+        graph_data = payload_graph(data) or {}
+
+        # Lấy các tham số tùy chọn (kwargs)
+        kwargs = {}
+        for key in RUN_PARAMS:
+            if key in data and data[key] is not None:
+                kwargs[key] = data[key]
+
+        # Chạy tiếp: tham số chạy lấy từ token, chỉ ngân sách lấy từ payload
+        token = None
+        if data.get('continuation'):
+            token = decode_token(data['continuation'], signing_secret(SETTINGS['CONTINUATION_SECRET']))
+            if algorithm and algorithm != token['algorithm']:
+                return {'error': f'continuation thuộc thuật toán "{token["algorithm"]}", không phải "{algorithm}".'}, 400
+            algorithm = token['algorithm']
+            kwargs = {**token['params'], **{k: v for k, v in kwargs.items() if k in BUDGET_PARAMS}}
+
+        if not graph_data:
+            return {'error': 'Thiếu dữ liệu đồ thị'}, 400
+
+        locale = data.get('locale') or DEFAULT_LOCALE
+        if locale not in LOCALES:
+            return {'error': f'locale "{locale}" không được hỗ trợ. Hỗ trợ: {", ".join(LOCALES)}.'}, 400
+
+        if algorithm not in ALGORITHM_FUNCTIONS:
+            return {
+                'error': f'Thuật toán "{algorithm}" không được hỗ trợ',
+                'supported_algorithms': list(ALGORITHM_FUNCTIONS.keys())
+            }, 400
+
+        # Đồ thị sinh trên server: dùng source/sink gợi ý nếu payload không chỉ định
+        graph_data = resolve_graph(graph_data)
+        if isinstance(graph_data, GraphArrays):
+            for key, value in graph_data.hints.items():
+                if key in RUN_PARAMS:
+                    kwargs.setdefault(key, value)
+
+        # --- VALIDATE RIÊNG CHO TỪNG THUẬT TOÁN ---
+
+        # 1. Dijkstra & Bellman-Ford: Cần Source
+        if algorithm in ['dijkstra', 'bellman_ford'] and 'source' not in kwargs:
+            return {'error': f'{algorithm} yêu cầu "source" (nút nguồn).'}, 400
+
+        # 2. K đường đi ngắn nhất: Cần cả Source & Target
+        if algorithm == 'k_shortest_paths':
+            if 'source' not in kwargs or 'target' not in kwargs:
+                return {'error': 'k_shortest_paths yêu cầu cả "source" và "target".'}, 400
+
+        # 3. BFS, DFS, Prim: Thường cần start_node (nếu không có, backend tự chọn nút đầu tiên)
+
+        # Chế độ "chỉ kết quả": bỏ qua visualization, dùng engine vectorized
+        mode = data.get('mode', 'trace')
+        if token is not None:
+            mode = 'trace'
+        if mode == 'result':
+            if algorithm not in RESULT_FUNCTIONS:
+                return {
+                    'error': f'Thuật toán "{algorithm}" chưa hỗ trợ mode "result"',
+                    'supported_algorithms': list(RESULT_FUNCTIONS.keys())
+                }, 400
+        get_budget(kwargs)  # kiểm tra ngân sách của client trước khi dự đoán
+
+        # ========== Profile đồ thị (profiling.py, cache theo hash nội dung) ==========
+        # Chuyển sang GraphArrays một lần, dùng chung cho profile, cost model, engine "chỉ
+        # kết quả" và hash của continuation; đầu vào thuật toán không xử lý được bị từ chối ngay
+        graph = as_graph_arrays(graph_data)
+        error = check_profile(algorithm, mode, graph_profile(graph), kwargs)
+        if error is not None:
+            return {'error': error}, 400
+
+        # ========== Dự đoán chi phí và kiểm soát nạp (cost_model.py) ==========
+        features = graph_features(graph)
+        plan = plan_run(
+            algorithm, mode, features, kwargs,
+            {'max_ms': SETTINGS['ADMISSION_MAX_MS'], 'max_trace_bytes': SETTINGS['ADMISSION_MAX_TRACE_BYTES']},
+            RESULT_FUNCTIONS, degrade=data.get('degrade', True) is not False,
+        )
+        meta['estimate'] = {**plan['estimate'], 'features': features}
+        if plan['action'] == 'reject':
+            return {
+                'error': f'Dự đoán vượt ngân sách của server ({plan["reason"]}); hãy dùng đồ thị nhỏ hơn, '
+                         f'mode "result" hoặc ngân sách max_steps / max_ms.',
+                'estimate': meta['estimate'],
+            }, 413
+        meta['admission'] = {'action': plan['action'], 'mode': plan['mode']}
+        if 'reason' in plan:
+            meta['admission']['reason'] = plan['reason']
+        for key, value in plan.get('budget', {}).items():
+            kwargs[key] = min(float(kwargs.get(key, value)), value)
+        mode = plan['mode']
+
+        if mode == 'result':
+            graph_data = graph
+            engine = route_engine(algorithm, mode, graph_data, features, kwargs)
+            if engine is not None:
+                meta['estimate']['engine'] = engine
+            # Engine song song (Borůvka, delta-stepping) trên đồ thị lớn: process pool của bulk
+            min_edges = 0
+            if algorithm == 'boruvka':
+                min_edges = SETTINGS['BORUVKA_PARALLEL_MIN_EDGES']
+            elif algorithm == 'dijkstra' and kwargs.get('engine') == 'delta_stepping':
+                min_edges = SETTINGS['DELTA_STEPPING_PARALLEL_MIN_EDGES']
+            if min_edges and graph.num_edges >= min_edges:
+                from bulk import get_pool  # bulk import service: import lười tránh vòng lặp
+                kwargs['executor'], kwargs['workers'] = get_pool()
+                meta['estimate']['workers'] = kwargs['workers']
+            func = RESULT_FUNCTIONS[algorithm]
+        else:
+            func = ALGORITHM_FUNCTIONS[algorithm]
+            if token is not None:
+                if token['graph'] != graph.content_hash():
+                    return {'error': 'continuation không khớp với đồ thị đã gửi.'}, 400
+                kwargs['resume'] = token['state']
+            for key in ('max_steps', 'max_ms'):
+                cap = SETTINGS[f'RUN_{key.upper()}']
+                if cap:
+                    kwargs[key] = min(float(kwargs.get(key, cap)), cap)
+            # Thuật toán có visualization làm việc trên list dict
+            if isinstance(graph_data, GraphArrays):
+                graph_data = graph_data.to_graph_data()
+        # Vùng hiển thị được kiểm tra trước khi chạy (mode result không có step để lọc)
+        region = None
+        if mode == 'trace' and data.get('viewport') is not None:
+            region = viewport_region(graph, data['viewport'])
+
+        # Cache trên đĩa (run_cache.py): trúng thì bỏ qua hàng đợi và lần chạy. Không dùng
+        # khi đếm thao tác / đo bộ nhớ (số liệu của chính lần chạy)
+        run_cache, cache_key, cached = _run_cache(), None, None
+        if run_cache is not None and data.get('counters') is not True and not data.get('debug_memory'):
+            cache_key = run_key(
+                graph.content_hash(), algorithm, mode, {k: v for k, v in kwargs.items() if k in RUN_PARAMS},
+                data.get('continuation'), func,
+            )
+            cached = run_cache.get(cache_key)
+
+        if cached is not None:
+            output = cached['output']
+            meta.update(cached['meta'])
+            meta['runCache'] = {'hit': True}
+        else:
+            # Request nặng chờ suất chạy của process (xếp hàng), quá hạn thì trả về 503
+            semaphore = None
+            if SETTINGS['ADMISSION_HEAVY_MS'] and plan['page_ms'] > SETTINGS['ADMISSION_HEAVY_MS']:
+                semaphore = _heavy_semaphore()
+                waited = time.perf_counter()
+                if not semaphore.acquire(timeout=SETTINGS['ADMISSION_QUEUE_MS'] / 1000):
+                    return {'error': 'Server đang bận với các request nặng khác, hãy thử lại sau.',
+                            'estimate': meta['estimate']}, 503
+                meta['admission']['queuedMs'] = round((time.perf_counter() - waited) * 1000, 3)
+
+            # Bộ đếm thao tác: không nằm trong RUN_PARAMS nên không vào continuation token
+            counters = new_counters(data.get('counters') is True)
+            if counters is not None:
+                kwargs['counters'] = counters
+
+            # Gọi thuật toán (đo bộ nhớ nếu request được lấy mẫu). Thuật toán có thể
+            # ghi số liệu (ví dụ meta['queue']) vào dict meta được truyền vào.
+            try:
+                run_started = time.perf_counter()
+                elapsed = None
+                if data.get('debug_memory') or should_sample(SETTINGS['MEMORY_SAMPLE_RATE']):
+                    output, peak = measure_peak_memory(func, graph_data, meta=meta, **kwargs)
+                    if peak is not None:
+                        meta['memory'] = {'peakBytes': peak, **trace_size_stats(output)}
+                    else:
+                        elapsed = (time.perf_counter() - run_started) * 1000
+                else:
+                    output = func(graph_data, meta=meta, **kwargs)
+                    elapsed = (time.perf_counter() - run_started) * 1000
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+
+            # Hiệu chỉnh cost model theo lần chạy đầy đủ từ đầu (tracemalloc làm sai lệch thời gian)
+            if token is None and 'suspended' not in meta:
+                COST_MODEL.observe(
+                    algorithm, mode, features, elapsed,
+                    steps=len(output) if mode == 'trace' else None,
+                    step_bytes=meta.get('memory', {}).get('stepBytesAvg'), k=kwargs.get('k'),
+                )
+            if counters is not None:
+                meta['counters'] = finish_counters(algorithm, counters)
+            if cache_key is not None and elapsed is not None and elapsed >= SETTINGS['RUN_CACHE_MIN_MS'] \
+                    and meta.get('suspended', {}).get('stoppedBy') != 'time':
+                # Cây đường đi lưu dạng mảng (khóa dict id nút không qua được JSON)
+                if 'path_tree' in meta:
+                    meta['path_tree'] = tree_arrays(graph, meta['path_tree'])
+                entry = {'output': output, 'meta': {k: meta[k] for k in RUN_CACHE_META if k in meta}}
+                meta['runCache'] = {'hit': False, 'storedBytes': run_cache.put(cache_key, algorithm, entry)}
+
+        # Cây đường đi ngắn nhất (chạy không có target) được cache cho /api/path
+        # (meta.pathTree chỉ có khi truy vấn sau tìm lại được cây, xem _share_state)
+        exported = meta.pop('path_tree', None)
+        tree = store_tree(graph, algorithm, exported) if exported is not None else None
+        if tree is not None and _share_state(tree_key(tree.graph_hash, tree.source), algorithm,
+                                             lambda: tree_entry(tree)):
+            meta['pathTree'] = {'graphHash': tree.graph_hash, 'source': tree.source}
+
+        if mode == 'result':
+            return {'name': algorithm, 'mode': 'result', 'result': output}, 200
+
+        # Mô tả step chỉ được dựng ở đây (ngoài vòng lặp thuật toán), theo yêu cầu client
+        templates, state_codes = bool(data.get('templates')), bool(data.get('state_codes'))
+        # Có viewport: trả về bản sao đã lọc, step gốc giữ nguyên để cache
+        shown = output if region is None else filter_steps(output, *region)
+        body = {'name': algorithm, 'steps': present_steps(shown, locale, templates, state_codes)}
+        suspended = meta.pop('suspended', None)
+        if suspended is not None:
+            body['continuation'] = encode_token({
+                'algorithm': algorithm,
+                'graph': graph.content_hash(),
+                'params': {k: v for k, v in kwargs.items() if k in RUN_PARAMS and k not in BUDGET_PARAMS},
+                'state': suspended['state'],
+            }, signing_secret(SETTINGS['CONTINUATION_SECRET']))
+            body['stoppedBy'] = suspended['stoppedBy']
+        if region is not None:
+            # runId gồm cả hash tọa độ: content_hash() không đổi khi chỉ di chuyển nút
+            run_id = hashlib.blake2b(json.dumps(
+                [graph.content_hash(), graph.coords_hash(), algorithm, {k: v for k, v in kwargs.items() if k in RUN_PARAMS},
+                 data.get('continuation')], sort_keys=True, default=str,
+            ).encode('utf-8'), digest_size=12).hexdigest()
+            extra = {k: body[k] for k in ('name', 'continuation', 'stoppedBy') if k in body}
+            cache_run(run_id, graph, output, extra)
+            # Đồ thị trong thư viện chỉ lưu tên (mở lại bằng memory-map), đồ thị gửi lên lưu đầy đủ
+            ref = None if data.get('graph') else data.get('graph_ref')
+            shared = _share_state(viewport_key(run_id), algorithm, lambda: {
+                'graphHash': graph.content_hash(), 'coordsHash': graph.coords_hash(), 'graphRef': ref,
+                'graph': None if ref is not None else graph.to_graph_data(), 'steps': output, 'extra': extra,
+            })
+            meta['viewport'] = {**({'runId': run_id} if shared else {}),
+                                'nodes': len(region[0]), 'edges': len(region[1])}
+        if templates:
+            body['templates'] = templates_for(shown, locale)
+        if state_codes:
+            body['states'] = list(STATE_COLORS)
+        return body, 200
+
+    except ValueError as e:
+        # Dữ liệu đầu vào không hợp lệ (engine "chỉ kết quả" báo lỗi bằng ValueError)
+        return {'error': str(e)}, 400
+    except Exception as e:
+        # Log lỗi ra console server để debug dễ hơn
+        print(f"Error running {algorithm}: {str(e)}")
+        return {'error': str(e)}, 500
+
+
+def execute_landmarks(data):
+    """
+    Tiền xử lý landmark (ALT) cho một đồ thị; kết quả được cache theo hash đồ thị
+    để các truy vấn dijkstra mode='result' với "landmarks" dùng lại.
+
+    Returns:
+        Tuple (body_dict, status_code)
+    """
+    if not isinstance(data, dict) or not (data.get('graph') or data.get('graph_ref')):
+        return {'error': 'Thiếu dữ liệu đồ thị'}, 400
+    try:
+        graph = resolve_graph(payload_graph(data))
+        return preprocess_landmarks(graph, landmarks=data.get('landmarks')), 200
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except Exception as e:
+        print(f"Error preprocessing landmarks: {str(e)}")
+        return {'error': str(e)}, 500
+
+
+def execute_profile(data):
+    """
+    Profile của đồ thị (endpoint /api/profile), cache theo hash nội dung đồ thị.
+
+    Payload: {"graph": ...} cộng các tham số chạy tùy chọn như /api/run (queue,
+    landmarks, ...) để kiểm tra theo đúng biến thể sẽ dùng.
+
+    Returns:
+        Tuple (body_dict, status_code): body gồm các trường của profile, 'cached'
+        và 'algorithms' - với mỗi thuật toán: supported, mode (result nếu có engine
+        "chỉ kết quả"), error (lý do bị từ chối sớm) hoặc engine được chọn
+    """
+    if not isinstance(data, dict) or not (data.get('graph') or data.get('graph_ref')):
+        return {'error': 'Thiếu dữ liệu đồ thị'}, 400
+    try:
+        graph = as_graph_arrays(resolve_graph(payload_graph(data)))
+        profile, cached = graph_profile(graph, with_status=True)
+        features = graph_features(graph)
+        params = {key: data[key] for key in RUN_PARAMS if data.get(key) is not None}
+
+        algorithms = {}
+        for algorithm in ALGORITHM_FUNCTIONS:
+            mode = 'result' if algorithm in RESULT_FUNCTIONS else 'trace'
+            kwargs = dict(params)
+            error = check_profile(algorithm, mode, profile, kwargs)
+            if error is not None:
+                algorithms[algorithm] = {'supported': False, 'mode': mode, 'error': error}
+                continue
+            algorithms[algorithm] = {'supported': True, 'mode': mode}
+            engine = route_engine(algorithm, mode, graph, features, kwargs)
+            if engine is not None:
+                algorithms[algorithm]['engine'] = engine
+        return {**profile, 'cached': cached, 'algorithms': algorithms}, 200
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except Exception as e:
+        print(f"Error profiling graph: {str(e)}")
+        return {'error': str(e)}, 500
+
+
+def execute_multi_source(data):
+    """
+    Khoảng cách từ nhiều nguồn trên cùng một đồ thị (endpoint /api/multi_source).
+
+    Payload:
+        - graph: đồ thị (hoặc spec "generator")
+        - sources: list id nút nguồn (tối đa MULTI_SOURCE_MAX_SOURCES)
+        - algorithm: 'dijkstra' (mặc định, trọng số không âm) hoặc 'bfs' (số cạnh)
+        - targets: list id nút cần trả về khoảng cách (mặc định: mọi nút)
+
+    Từ MULTI_SOURCE_PARALLEL_MIN nguồn trở lên, các nhóm nguồn chạy song song trên
+    process pool của bulk; đồ thị được đặt MỘT lần vào shared memory thay vì pickle
+    cho từng tác vụ.
+
+    Returns:
+        Tuple (body_dict, status_code): body gồm algorithm, sources, targets,
+        distances (nguồn -> {đích -> khoảng cách hoặc None}), workers, ms
+    """
+    if not isinstance(data, dict) or not (data.get('graph') or data.get('graph_ref')):
+        return {'error': 'Thiếu dữ liệu đồ thị'}, 400
+    try:
+        started = time.perf_counter()
+        kind = data.get('algorithm') or 'dijkstra'
+        sources = data.get('sources')
+        if not isinstance(sources, list) or not sources:
+            return {'error': '"sources" phải là list id nút không rỗng.'}, 400
+        if len(sources) > SETTINGS['MULTI_SOURCE_MAX_SOURCES']:
+            return {'error': f'Tối đa {SETTINGS["MULTI_SOURCE_MAX_SOURCES"]} nguồn mỗi request.'}, 413
+
+        graph = as_graph_arrays(resolve_graph(payload_graph(data)))
+
+        def resolve(node_ids, name):
+            indices = [graph.resolve_node(node_id) for node_id in node_ids]
+            missing = [node_id for node_id, i in zip(node_ids, indices) if i is None]
+            if missing:
+                raise ValueError(f'Nút {name} {missing[0]!r} không tồn tại trong đồ thị.')
+            return indices
+
+        source_idx = resolve(sources, 'nguồn')
+        targets = data.get('targets')
+        target_idx = resolve(targets, 'đích') if targets else None
+
+        executor, workers = None, 1
+        if len(source_idx) >= SETTINGS['MULTI_SOURCE_PARALLEL_MIN']:
+            from bulk import get_pool  # bulk import service: import lười tránh vòng lặp
+            executor, workers = get_pool()
+        dist = fan_out(graph, source_idx, kind, target_idx, executor, workers)
+
+        ids = graph.node_ids
+        columns = [ids[i] for i in (target_idx if target_idx is not None else range(graph.num_nodes))]
+        distances = {
+            ids[s]: {t: (d if d != float('inf') else None) for t, d in zip(columns, row)}
+            for s, row in zip(source_idx, dist.tolist())
+        }
+        return {
+            'algorithm': kind,
+            'sources': [ids[s] for s in source_idx],
+            'targets': columns,
+            'distances': distances,
+            'workers': workers if executor is not None else 1,
+            'ms': round((time.perf_counter() - started) * 1000, 3),
+        }, 200
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except Exception as e:
+        print(f"Error running multi-source: {str(e)}")
+        return {'error': str(e)}, 500
+
+
+def execute_path(data):
+    """
+    Đường đi ngắn nhất từ cây đã cache của một lần chạy Dijkstra / Bellman-Ford không
+    có target (endpoint /api/path): chỉ lần ngược theo mảng nút cha, O(độ dài đường đi).
+
+    Payload (hoặc query string của GET):
+        - graph: hash đồ thị (meta.pathTree.graphHash của lần chạy) hoặc đồ thị đầy đủ
+        - source, target: id nút
+
+    Cây nằm trong cache của từng process, và trong store dùng chung (RUN_CACHE_PATH)
+    nếu bật - khi đó mọi worker / process executor đều trả lời được. Khi gửi đồ thị đầy
+    đủ mà chưa có cây, cây được tính (Dijkstra, hoặc Bellman-Ford nếu có trọng số âm)
+    rồi cache cho các truy vấn sau; chỉ có hash thì trả về 404.
+
+    Returns:
+        Tuple (body_dict, status_code): body gồm graphHash, source, target, algorithm,
+        cached, path, pathEdges, distance (None nếu không tới được)
+    """
+    if not isinstance(data, dict) or not (data.get('graph') or data.get('graph_ref')):
+        return {'error': 'Thiếu "graph" (hash đồ thị hoặc dữ liệu đồ thị) hoặc "graph_ref"'}, 400
+    source, target = data.get('source'), data.get('target')
+    if source in (None, '') or target in (None, ''):
+        return {'error': '/api/path yêu cầu cả "source" và "target".'}, 400
+    try:
+        graph = None
+        if isinstance(data.get('graph'), str):
+            graph_hash = data['graph']
+        else:
+            graph = as_graph_arrays(resolve_graph(payload_graph(data)))
+            graph_hash = graph.content_hash()
+
+        tree = get_tree(graph_hash, source)
+        if tree is None:
+            entry = _shared_state(tree_key(graph_hash, str(source)))
+            tree = load_tree(entry) if entry is not None else None
+        cached = tree is not None
+        if tree is None:
+            if graph is None:
+                return {'error': f'Chưa có cây đường đi ngắn nhất của nguồn "{source}" cho đồ thị này '
+                                 f'(hãy chạy dijkstra / bellman_ford không có target, hoặc gửi kèm đồ thị).'}, 404
+            if graph.resolve_node(source) is None:
+                return {'error': f"Nút nguồn '{source}' không tồn tại trong đồ thị."}, 400
+            negative = graph_profile(graph)['negativeWeights']
+            algorithm = 'bellman_ford' if negative else 'dijkstra'
+            meta = {}
+            RESULT_FUNCTIONS[algorithm](graph, source=source, meta=meta)
+            exported = meta.get('path_tree')
+            if exported is None:
+                return {'error': 'Đồ thị có chu trình âm: không có đường đi ngắn nhất.'}, 400
+            tree = store_tree(graph, algorithm, exported)
+            _share_state(tree_key(tree.graph_hash, tree.source), algorithm, lambda: tree_entry(tree))
+
+        return {
+            'graphHash': graph_hash,
+            'source': tree.source,
+            'target': str(target),
+            'algorithm': tree.algorithm,
+            'cached': cached,
+            **tree.path(target),
+        }, 200
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except Exception as e:
+        print(f"Error answering path query: {str(e)}")
+        return {'error': str(e)}, 500
+
+
+def _load_run(run_id, entry):
+    """Lần chạy viewport đọc từ store dùng chung, đưa vào cache của process; None nếu đồ thị không còn."""
+    if entry['graphRef'] is not None:
+        try:
+            graph = open_graph(SETTINGS['GRAPH_LIBRARY_DIR'], entry['graphRef'])
+        except ValueError:
+            return None
+        # Đồ thị trong thư viện đã bị thay bằng đồ thị khác cùng tên (kể cả chỉ đổi tọa độ)
+        if graph.content_hash() != entry['graphHash'] or graph.coords_hash() != entry['coordsHash']:
+            return None
+    else:
+        graph = as_graph_arrays(entry['graph'])
+    cache_run(run_id, graph, entry['steps'], entry['extra'])
+    return get_run(run_id)
+
+
+def execute_viewport(data):
+    """
+    Lọc lại step của một lần chạy đã cache theo vùng hiển thị mới (endpoint
+    /api/viewport), không chạy lại thuật toán.
+
+    Payload:
+        - run_id: meta.viewport.runId của lần chạy /api/run có "viewport"
+        - viewport: {"bbox": [x0, y0, x1, y1]} hoặc {"nodes": [...]}
+        - locale, templates, state_codes: như /api/run
+
+    Returns:
+        Tuple (body_dict, status_code): body giống /api/run (name, steps, continuation,
+        stoppedBy) kèm meta.viewport; 404 nếu lần chạy không còn trong cache của process
+        lẫn store dùng chung (RUN_CACHE_PATH)
+    """
+    if not isinstance(data, dict) or not data.get('run_id') or data.get('viewport') is None:
+        return {'error': '/api/viewport yêu cầu "run_id" và "viewport".'}, 400
+    locale = data.get('locale') or DEFAULT_LOCALE
+    if locale not in LOCALES:
+        return {'error': f'locale "{locale}" không được hỗ trợ. Hỗ trợ: {", ".join(LOCALES)}.'}, 400
+    run = get_run(data['run_id'])
+    if run is None:
+        entry = _shared_state(viewport_key(data['run_id']))
+        run = _load_run(data['run_id'], entry) if entry is not None else None
+    if run is None:
+        return {'error': 'Lần chạy không còn trong cache, hãy gọi lại /api/run với "viewport".'}, 404
+    try:
+        nodes, edges = viewport_region(run['graph'], data['viewport'])
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    templates, state_codes = bool(data.get('templates')), bool(data.get('state_codes'))
+    shown = filter_steps(run['steps'], nodes, edges)
+    body = {**run['extra'], 'steps': present_steps(shown, locale, templates, state_codes)}
+    if templates:
+        body['templates'] = templates_for(shown, locale)
+    if state_codes:
+        body['states'] = list(STATE_COLORS)
+    body['meta'] = {'viewport': {'runId': data['run_id'], 'nodes': len(nodes), 'edges': len(edges)}}
+    return body, 200
+
+
+def execute_generate(data):
+    """
+    Sinh đồ thị theo spec (endpoint /api/generate).
+
+    Payload là spec {"generator": ..., "n": ..., "seed": ..., <tham số>} cộng thêm:
+        - format: 'graph' (kèm nodes/edges) hoặc 'summary' (chỉ thống kê + hash).
+          Mặc định 'graph' nếu đồ thị đủ nhỏ (GENERATE_MAX_EXPORT), ngược lại 'summary';
+          spec trả về dùng lại được làm "graph" của /api/run.
+
+    Returns:
+        Tuple (body_dict, status_code)
+    """
+    if not isinstance(data, dict):
+        return {'error': 'Thiếu spec đồ thị'}, 400
+    spec = dict(data)
+    fmt = spec.pop('format', None)
+    if fmt not in (None, 'graph', 'summary'):
+        return {'error': f'format "{fmt}" không hợp lệ (graph hoặc summary)'}, 400
+    try:
+        spec = normalize_spec(spec, SETTINGS['GENERATE_MAX_NODES'], SETTINGS['GENERATE_MAX_EDGES'])
+        graph = generate_graph(spec)
+        size = graph.num_nodes + graph.num_edges
+        small = size <= SETTINGS['GENERATE_MAX_EXPORT']
+        if fmt == 'graph' and not small:
+            return {
+                'error': f'Đồ thị có {size} nút + cạnh, vượt quá giới hạn trả về '
+                         f'{SETTINGS["GENERATE_MAX_EXPORT"]}. Dùng format "summary" và truyền spec vào /api/run.'
+            }, 400
+        return describe_graph(graph, spec, include_graph=small if fmt is None else fmt == 'graph'), 200
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except Exception as e:
+        print(f"Error generating graph: {str(e)}")
+        return {'error': str(e)}, 500
+
+
+def prepare_layout(data, stream=False):
+    """
+    Kiểm tra payload /api/layout; số vòng và thời gian bị chặn bởi
+    LAYOUT_MAX_ITERATIONS / LAYOUT_MAX_MS.
+
+    Returns:
+        Tuple (GraphArrays, options cho iter_layout)
+
+    Raises:
+        ValueError: payload không hợp lệ
+    """
+    if not isinstance(data, dict) or not (data.get('graph') or data.get('graph_ref')):
+        raise ValueError('Thiếu dữ liệu đồ thị')
+    graph = as_graph_arrays(resolve_graph(payload_graph(data)))
+    if graph.num_nodes > SETTINGS['LAYOUT_MAX_NODES']:
+        raise ValueError(f'Đồ thị có {graph.num_nodes} nút, vượt quá giới hạn layout {SETTINGS["LAYOUT_MAX_NODES"]}.')
+
+    options = {key: data[key] for key in LAYOUT_PARAMS if data.get(key) is not None}
+    if options.get('model', 'fr') not in LAYOUT_MODELS:
+        raise ValueError(f'model "{options["model"]}" không hợp lệ. Hỗ trợ: {", ".join(LAYOUT_MODELS)}.')
+    try:
+        options['iterations'] = max(0, min(int(options.get('iterations', DEFAULT_ITERATIONS)),
+                                           SETTINGS['LAYOUT_MAX_ITERATIONS']))
+        options['max_ms'] = min(float(options.get('max_ms', SETTINGS['LAYOUT_MAX_MS'])), SETTINGS['LAYOUT_MAX_MS'])
+        if 'theta' in options and float(options['theta']) <= 0:
+            raise ValueError
+        options['every'] = max(1, int(options.get('every', DEFAULT_LAYOUT_EVERY))) if stream else None
+    except (TypeError, ValueError):
+        raise ValueError('iterations, max_ms, every phải là số; theta phải > 0.')
+    return graph, options
+
+
+def execute_layout(data):
+    """
+    Layout force-directed (endpoint /api/layout), trả về vị trí cuối cùng.
+
+    Payload: graph (hoặc spec generator) và các tham số tùy chọn
+    iterations, max_ms, theta, model ('fr' | 'forceatlas'), seed, warm_start.
+
+    Returns:
+        Tuple (body_dict, status_code)
+    """
+    try:
+        graph, options = prepare_layout(data)
+        return force_layout(graph, **options), 200
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except Exception as e:
+        print(f"Error computing layout: {str(e)}")
+        return {'error': str(e)}, 500
+
+
+def layout_lines(graph, options):
+    """
+    Layout dạng stream: mỗi dòng JSON là một snapshot {'iteration', 'done', 'nodes', ...};
+    dòng cuối có done=true và thống kê. Lỗi giữa chừng trở thành dòng {'error': ...}.
+    """
+    try:
+        for snapshot in iter_layout(graph, **options):
+            x, y = snapshot.pop('x'), snapshot.pop('y')
+            yield json.dumps({**snapshot, 'nodes': layout_nodes(graph, x, y)}, ensure_ascii=False)
+    except Exception as e:
+        print(f"Error computing layout: {str(e)}")
+        yield json.dumps({'error': str(e), 'done': True}, ensure_ascii=False)
+
+
+def execute_messages(locale=None):
+    """Catalogue mô tả step của một ngôn ngữ và bảng mã trạng thái (endpoint /api/messages)."""
+    locale = locale or DEFAULT_LOCALE
+    if locale not in LOCALES:
+        return {'error': f'locale "{locale}" không được hỗ trợ. Hỗ trợ: {", ".join(LOCALES)}.'}, 400
+    return message_catalogue(locale), 200
+
+
+def execute_library():
+    """Các đồ thị trong thư viện trên đĩa (endpoint /api/library), dùng qua "graph_ref"."""
+    graphs = list_graphs(SETTINGS['GRAPH_LIBRARY_DIR'])
+    fields = ('name', 'nodes', 'edges', 'directed', 'coords', 'hash', 'bytes', 'source', 'created')
+    return {'enabled': bool(SETTINGS['GRAPH_LIBRARY_DIR']),
+            'graphs': [{k: m.get(k) for k in fields} for m in graphs]}, 200
+
+
+def execute_metrics():
+    """Số liệu tổng hợp của process hiện tại (endpoint /api/metrics)."""
+    body = {**REGISTRY.snapshot(), 'costModel': COST_MODEL.snapshot(), 'pathTrees': tree_cache_stats()}
+    run_cache = _run_cache()
+    if run_cache is not None:
+        body['runCache'] = run_cache.stats()
+    return body, 200
+
+
+# Các endpoint POST nhận/trả JSON, dùng chung cho Flask và ASGI
+POST_ENDPOINTS = {
+    '/api/run': execute_run,
+    '/api/landmarks': execute_landmarks,
+    '/api/profile': execute_profile,
+    '/api/multi_source': execute_multi_source,
+    '/api/path': execute_path,
+    '/api/viewport': execute_viewport,
+    '/api/generate': execute_generate,
+    '/api/layout': execute_layout,
+}
+
+
+def execute_json(path, body):
+    """
+    Phiên bản bytes -> bytes của các handler trong POST_ENDPOINTS, dùng trong
+    executor của ASGI: cả việc parse JSON lẫn serialize kết quả đều chạy ngoài event loop.
+
+    Returns:
+        Tuple (response_bytes, status_code, metric_records): metric_records là các
+        bản ghi metrics cần gộp ở process cha (rỗng nếu chạy trong cùng process).
+    """
+    try:
+        if path == '/api/run' and use_stream_ingest(len(body)):
+            data = read_run_payload(io.BytesIO(body), len(body))
+        else:
+            data = json.loads(body) if body else None
+    except IngestError as e:
+        payload, status = e.to_body(), e.status
+    except ValueError as e:
+        payload, status = {'error': f'JSON không hợp lệ: {e}'}, 400
+    else:
+        payload, status = POST_ENDPOINTS[path](data)
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8'), status, REGISTRY.take_pending()
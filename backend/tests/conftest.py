@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Các module backend import nhau theo tên (như khi chạy serve.py trong backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+import pytest
+
+from algorithms import bellman_ford_result
+
+GRAPH = {
+    'nodes': [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}],
+    'edges': [{'id': 'ab', 'source': 'a', 'target': 'b', 'weight': 2},
+              {'id': 'bc', 'source': 'b', 'target': 'c', 'weight': -1}],
+    'isDirected': True,
+}
+
+
+def test_unknown_source_raises():
+    with pytest.raises(ValueError, match="Nút nguồn 'zz' không tồn tại"):
+        bellman_ford_result(GRAPH, source='zz')
+
+
+def test_unknown_target_raises():
+    with pytest.raises(ValueError, match="Nút đích 'zz' không tồn tại"):
+        bellman_ford_result(GRAPH, source='a', target='zz')
+
+
+def test_known_source_and_target():
+    result = bellman_ford_result(GRAPH, source='a', target='c')
+    assert result['distances']['c'] == 1
+    assert result['path'] == ['a', 'b', 'c']
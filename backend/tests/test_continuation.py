@@ -0,0 +1,27 @@
+import logging
+
+import pytest
+
+import continuation
+from continuation import decode_token, encode_token, signing_secret
+
+
+def test_empty_secret_uses_random_key_and_warns_once(monkeypatch, caplog, capsys):
+    monkeypatch.setitem(continuation._process_secret, 'warned', False)
+    with caplog.at_level(logging.WARNING, logger='continuation'):
+        key = signing_secret('')
+        assert signing_secret('') == key
+    assert key
+    assert len(caplog.records) == 1
+    assert 'CONTINUATION_SECRET' in caplog.records[0].getMessage()
+    assert capsys.readouterr().out == ''
+
+    # Token ký bằng khóa rỗng (giả mạo) không được chấp nhận
+    forged = encode_token({'state': {}}, '')
+    with pytest.raises(ValueError):
+        decode_token(forged, key)
+    assert decode_token(encode_token({'state': {}}, key), key)['state'] == {}
+
+
+def test_configured_secret_is_used_as_is():
+    assert signing_secret('abc') == 'abc'
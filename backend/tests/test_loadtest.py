@@ -0,0 +1,11 @@
+import json
+
+from loadtest import build_workload
+from service import ALGORITHM_FUNCTIONS, execute_run
+
+
+def test_default_workload_has_no_errors():
+    # Mọi request của hỗn hợp mặc định phải hợp lệ: lỗi trong báo cáo là lỗi thật
+    for label, body in build_workload(list(ALGORITHM_FUNCTIONS), [10, 100]):
+        result, status = execute_run(json.loads(body))
+        assert status == 200, (label, result.get('error'))
@@ -0,0 +1,43 @@
+import os
+import sqlite3
+
+from run_cache import RunCache
+
+
+def scanned(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+    finally:
+        conn.close()
+
+
+def test_totals_follow_puts_replaces_evictions_and_clear(tmp_path):
+    path = str(tmp_path / 'rc.sqlite')
+    cache = RunCache(path, 8_000)
+    for i in range(60):
+        assert cache.put(f'k{i}', 'dijkstra', {'output': [os.urandom(200).hex()], 'i': i})
+        # Ghi đè cùng khóa với kích thước khác
+        cache.put('k0', 'dijkstra', {'output': 'x' * (i * 10)})
+        stats = cache.stats()
+        assert (stats['entries'], stats['bytes']) == scanned(path)
+        assert stats['bytes'] <= cache.max_bytes
+    assert cache.stats()['evictions'] > 0
+
+    cache.clear()
+    assert (cache.stats()['entries'], cache.stats()['bytes']) == (0, 0) == scanned(path)
+
+
+def test_file_without_totals_is_counted_on_open(tmp_path):
+    path = str(tmp_path / 'rc.sqlite')
+    cache = RunCache(path, 10_000_000)
+    for i in range(5):
+        cache.put(f'k{i}', 'bfs', {'output': list(range(i * 100))})
+    conn = sqlite3.connect(path)
+    conn.executescript('DROP TRIGGER entries_insert; DROP TRIGGER entries_delete; '
+                       'DROP TRIGGER entries_resize; DROP TABLE totals;')
+    conn.close()
+
+    stats = RunCache(path, 10_000_000).stats()
+    assert (stats['entries'], stats['bytes']) == scanned(path)
+    assert stats['entries'] == 5
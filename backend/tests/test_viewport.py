@@ -0,0 +1,38 @@
+from service import execute_run, execute_viewport
+
+
+def line_graph(x0):
+    """Đường 0 - 1 - 2, nút 0 nằm tại x = x0."""
+    return {
+        'nodes': [{'id': '0', 'x': x0, 'y': 0}, {'id': '1', 'x': 100, 'y': 0}, {'id': '2', 'x': 200, 'y': 0}],
+        'edges': [{'id': 'a', 'source': '0', 'target': '1', 'weight': 1},
+                  {'id': 'b', 'source': '1', 'target': '2', 'weight': 1}],
+    }
+
+
+def run(graph):
+    body, status = execute_run({'algorithm': 'bfs', 'graph': graph, 'source': '1',
+                                'viewport': {'bbox': [-10, -10, 10, 10]}})
+    assert status == 200
+    return body
+
+
+def highlighted(body):
+    return set().union(*(step.get('highlightNodes', {}) for step in body['steps']))
+
+
+def test_moving_node_across_bbox_changes_region_and_run_id():
+    inside, outside = run(line_graph(0)), run(line_graph(50))
+    assert inside['meta']['viewport']['nodes'] == 1
+    assert outside['meta']['viewport']['nodes'] == 0
+    assert highlighted(inside) == {'0'}
+    assert highlighted(outside) == set()
+    assert inside['meta']['viewport']['runId'] != outside['meta']['viewport']['runId']
+
+    # Quay lại vị trí cũ: lần chạy cũ vẫn lọc theo tọa độ của nó
+    again = run(line_graph(0))
+    assert again['meta']['viewport']['runId'] == inside['meta']['viewport']['runId']
+    body, status = execute_viewport({'run_id': outside['meta']['viewport']['runId'],
+                                     'viewport': {'bbox': [40, -10, 60, 10]}})
+    assert status == 200
+    assert body['meta']['viewport']['nodes'] == 1
@@ -0,0 +1,23 @@
+"""
+wsgi.py - Entry point WSGI cho production.
+
+    gunicorn --preload -w 4 --threads 8 -b 0.0.0.0:5000 wsgi:app
+
+Với --preload, module này được import một lần trong process master: các module
+thuật toán được nạp sẵn rồi mới fork worker.
+"""
+
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+
+app = create_app()
+
+# Đưa các object đã nạp sẵn ra khỏi vùng theo dõi của GC để việc quét GC trong
+# worker không ghi vào các trang bộ nhớ dùng chung (giữ copy-on-write hiệu quả).
+if app.config.get('PRELOAD', True):
+    gc.freeze()